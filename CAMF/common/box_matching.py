@@ -0,0 +1,161 @@
+"""Vectorised bounding box matching for CAMF.
+
+Boxes are compared as (N, 4) arrays of [x1, y1, x2, y2] so every pair of
+boxes from two detections is scored in one NumPy operation. BoxGridIndex
+narrows down which stored detections can match at all before any pairs are
+scored.
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Set, Tuple
+import math
+import numpy as np
+
+EMPTY_BOXES = np.zeros((0, 4), dtype=np.float64)
+
+
+def boxes_to_array(boxes: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """Convert bounding box dicts to an (N, 4) array.
+
+    Args:
+        boxes: Dicts with x, y, width and height (missing keys count as 0)
+
+    Returns:
+        Array of [x1, y1, x2, y2] rows
+    """
+    rows = [
+        (box.get('x', 0), box.get('y', 0), box.get('width', 0), box.get('height', 0))
+        for box in boxes or ()
+        if box
+    ]
+    if not rows:
+        return EMPTY_BOXES
+    array = np.asarray(rows, dtype=np.float64)
+    array[:, 2] += array[:, 0]
+    array[:, 3] += array[:, 1]
+    return array
+
+
+def iou_matrix(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    """Intersection over Union of every pair of boxes.
+
+    Returns:
+        (len(boxes1), len(boxes2)) array; pairs with no union score 0
+    """
+    ix1 = np.maximum(boxes1[:, None, 0], boxes2[None, :, 0])
+    iy1 = np.maximum(boxes1[:, None, 1], boxes2[None, :, 1])
+    ix2 = np.minimum(boxes1[:, None, 2], boxes2[None, :, 2])
+    iy2 = np.minimum(boxes1[:, None, 3], boxes2[None, :, 3])
+    intersection = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+
+    area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
+    area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
+    union = area1[:, None] + area2[None, :] - intersection
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(union > 0, intersection / union, 0.0)
+
+
+def center_distance_matrix(boxes1: np.ndarray, boxes2: np.ndarray) -> np.ndarray:
+    """Euclidean distance between the centres of every pair of boxes."""
+    centers1 = (boxes1[:, :2] + boxes1[:, 2:]) / 2
+    centers2 = (boxes2[:, :2] + boxes2[:, 2:]) / 2
+    delta = centers1[:, None, :] - centers2[None, :, :]
+    return np.hypot(delta[..., 0], delta[..., 1])
+
+
+def boxes_match(boxes1: np.ndarray, boxes2: np.ndarray, iou_threshold: float,
+                distance_threshold: float, inclusive: bool = True) -> bool:
+    """Check whether any box of one detection matches any box of another.
+
+    A pair matches if its IoU reaches ``iou_threshold`` or its centres are
+    within ``distance_threshold``.
+
+    Args:
+        boxes1: (N, 4) box array
+        boxes2: (M, 4) box array
+        iou_threshold: Minimum IoU of a matching pair
+        distance_threshold: Maximum centre distance of a matching pair
+        inclusive: Whether a pair exactly at a threshold matches
+
+    Returns:
+        True if any pair matches
+    """
+    if not len(boxes1) or not len(boxes2):
+        return False
+    distances = center_distance_matrix(boxes1, boxes2)
+    if inclusive:
+        if (distances <= distance_threshold).any():
+            return True
+        return bool((iou_matrix(boxes1, boxes2) >= iou_threshold).any())
+    if (distances < distance_threshold).any():
+        return True
+    return bool((iou_matrix(boxes1, boxes2) > iou_threshold).any())
+
+
+class BoxGridIndex:
+    """Uniform grid over the boxes of stored detections.
+
+    Each detection is registered in every cell its boxes cover. A query
+    returns the detections that can possibly match the query boxes: those
+    with a box overlapping a query box (a precondition for any IoU above 0)
+    or with a box centre within ``search_radius`` of a query box centre. The
+    result is a superset of the true matches; callers confirm with
+    ``boxes_match``.
+    """
+
+    def __init__(self, cell_size: float = 100.0, search_radius: float = 100.0):
+        self.cell_size = float(cell_size)
+        self.search_radius = float(search_radius)
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._keys: Dict[Hashable, List[Tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._keys
+
+    def _cell_range(self, x1: float, y1: float, x2: float, y2: float):
+        size = self.cell_size
+        return (
+            range(math.floor(x1 / size), math.floor(x2 / size) + 1),
+            range(math.floor(y1 / size), math.floor(y2 / size) + 1)
+        )
+
+    def insert(self, key: Hashable, boxes: np.ndarray):
+        """Register (or re-register) a detection's boxes under ``key``."""
+        self.remove(key)
+        cells = set()
+        for x1, y1, x2, y2 in boxes:
+            cols, rows = self._cell_range(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+            cells.update((col, row) for col in cols for row in rows)
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(key)
+        self._keys[key] = list(cells)
+
+    def remove(self, key: Hashable):
+        """Unregister a detection."""
+        for cell in self._keys.pop(key, ()):
+            members = self._cells.get(cell)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._cells[cell]
+
+    def query(self, boxes: np.ndarray) -> Set[Hashable]:
+        """Get the detections that may match any of the given boxes."""
+        found: Set[Hashable] = set()
+        radius = self.search_radius
+        for x1, y1, x2, y2 in boxes:
+            cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+            # Cells overlapping the box, widened to reach centres within the radius
+            cols, rows = self._cell_range(
+                min(min(x1, x2), cx - radius), min(min(y1, y2), cy - radius),
+                max(max(x1, x2), cx + radius), max(max(y1, y2), cy + radius)
+            )
+            for col in cols:
+                for row in rows:
+                    members = self._cells.get((col, row))
+                    if members:
+                        found.update(members)
+        return found
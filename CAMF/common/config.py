@@ -37,6 +37,13 @@ class EnvironmentConfig(BaseModel):
             os.getenv("TEMP_DIR", str(Path.home() / "continuity_monitoring" / "temp"))
         )
     )
+    frame_storage_backend: str = Field(
+        default_factory=lambda: os.getenv("FRAME_STORAGE_BACKEND", "segment")
+    )
+    frame_segment_max_mb: int = Field(default=256, ge=16)
+    raw_frame_capture: bool = Field(
+        default_factory=lambda: os.getenv("RAW_FRAME_CAPTURE", "false").lower() == "true"
+    )
     
     # API
     api_host: str = Field(default="127.0.0.1")
@@ -46,13 +53,33 @@ class EnvironmentConfig(BaseModel):
     # Capture
     default_fps: float = Field(default=24.0, gt=0.0) 
     default_image_quality: int = Field(default=90, ge=10, le=100)
+    capture_write_workers: int = Field(default=2, ge=1)
+    capture_write_queue_size: int = Field(default=64, ge=1)
+    capture_write_batch_size: int = Field(default=25, ge=1)
+    capture_screen_persistent_grabber: bool = Field(default=True)
+    capture_screen_tile_size: int = Field(default=0, ge=0)
+    capture_schedule_policy: str = Field(default="catch_up")
+    capture_max_catch_up_frames: int = Field(default=2, ge=0)
+    preview_fps: float = Field(default=5.0, gt=0.0)
+    preview_max_width: int = Field(default=320, ge=16)
+    preview_max_height: int = Field(default=240, ge=16)
+    preview_quality: int = Field(default=70, ge=10, le=100)
     
     # Performance
     max_cache_size_mb: int = Field(default=1024, ge=100)
+    reference_preload_max_mb: int = Field(default=4096, ge=64)
     max_detector_processes: int = Field(default=4, ge=1)
     detector_timeout_seconds: float = Field(default=30.0, ge=1.0)
     detector_adaptive_timeout_initial: float = Field(default=30.0, ge=1.0)
     detector_communication_timeout: float = Field(default=30.0, ge=1.0)
+    detector_worker_queue_size: int = Field(default=32, ge=1)
+    detector_prefetch_depth: int = Field(default=4, ge=0)
+    detector_prefetch_workers: int = Field(default=2, ge=1)
+    detector_max_in_flight: int = Field(default=4, ge=1)
+    detector_change_hash: str = Field(default="dhash")
+    detector_max_lag_frames: int = Field(
+        default_factory=lambda: int(os.getenv("DETECTOR_MAX_LAG_FRAMES", "0")), ge=0
+    )
     
     # GPU
     enable_gpu: bool = Field(default=True)
@@ -124,11 +151,43 @@ class CaptureConfig(BaseModel):
     """Configuration for capture service."""
     default_frame_rate: int = Field(default_factory=lambda: int(env_config.default_fps))
     default_quality: int = Field(default_factory=lambda: env_config.default_image_quality)
+    write_workers: int = Field(default_factory=lambda: env_config.capture_write_workers)
+    write_queue_size: int = Field(default_factory=lambda: env_config.capture_write_queue_size)
+    write_batch_size: int = Field(default_factory=lambda: env_config.capture_write_batch_size)
+    screen_persistent_grabber: bool = Field(default_factory=lambda: env_config.capture_screen_persistent_grabber)
+    screen_tile_size: int = Field(default_factory=lambda: env_config.capture_screen_tile_size)
+    schedule_policy: str = Field(default_factory=lambda: env_config.capture_schedule_policy)
+    max_catch_up_frames: int = Field(default_factory=lambda: env_config.capture_max_catch_up_frames)
+    preview_fps: float = Field(default_factory=lambda: env_config.preview_fps)
+    preview_max_width: int = Field(default_factory=lambda: env_config.preview_max_width)
+    preview_max_height: int = Field(default_factory=lambda: env_config.preview_max_height)
+    preview_quality: int = Field(default_factory=lambda: env_config.preview_quality)
+    
+    @field_validator('schedule_policy')
+    def validate_schedule_policy(cls, v):
+        valid_policies = ["catch_up", "drop"]
+        if v.lower() not in valid_policies:
+            raise ValueError(f"Invalid capture schedule policy. Must be one of: {', '.join(valid_policies)}")
+        return v.lower()
 
 class StorageConfig(BaseModel):
     """Storage configuration."""
     base_dir: str = Field(default_factory=lambda: str(env_config.storage_dir))
     database_url: str = Field(default_factory=lambda: env_config.database_url)
+    frame_backend: str = Field(default_factory=lambda: env_config.frame_storage_backend)
+    segment_max_size_mb: int = Field(default_factory=lambda: env_config.frame_segment_max_mb)
+    raw_frames: bool = Field(default_factory=lambda: env_config.raw_frame_capture)
+    frame_cache_size_mb: int = Field(default_factory=lambda: env_config.max_cache_size_mb)
+    temp_dir: str = Field(default_factory=lambda: str(env_config.temp_dir))
+    reference_preload_memmap: bool = True
+    reference_preload_max_mb: int = Field(default_factory=lambda: env_config.reference_preload_max_mb)
+    
+    @field_validator('frame_backend')
+    def validate_frame_backend(cls, v):
+        valid_backends = ["segment", "png"]
+        if v.lower() not in valid_backends:
+            raise ValueError(f"Invalid frame storage backend. Must be one of: {', '.join(valid_backends)}")
+        return v.lower()
     
     @property
     def absolute_base_dir(self) -> Path:
@@ -144,7 +203,20 @@ class DetectorConfig(BaseModel):
     timeout_seconds: float = Field(default_factory=lambda: env_config.detector_timeout_seconds)
     adaptive_timeout_initial: float = Field(default_factory=lambda: env_config.detector_adaptive_timeout_initial)
     communication_timeout: float = Field(default_factory=lambda: env_config.detector_communication_timeout)
+    worker_queue_size: int = Field(default_factory=lambda: env_config.detector_worker_queue_size)
+    prefetch_depth: int = Field(default_factory=lambda: env_config.detector_prefetch_depth)
+    prefetch_workers: int = Field(default_factory=lambda: env_config.detector_prefetch_workers)
+    max_in_flight: int = Field(default_factory=lambda: env_config.detector_max_in_flight)
+    max_lag_frames: int = Field(default_factory=lambda: env_config.detector_max_lag_frames)
+    change_hash: str = Field(default_factory=lambda: env_config.detector_change_hash)
     cleanup_timeout: float = Field(default=10.0)
+    
+    @field_validator('change_hash')
+    def validate_change_hash(cls, v):
+        valid_hashes = ["dhash", "phash"]
+        if v.lower() not in valid_hashes:
+            raise ValueError(f"Invalid perceptual hash. Must be one of: {', '.join(valid_hashes)}")
+        return v.lower()
 
 class ExportConfig(BaseModel):
     """Configuration for export service."""
@@ -132,6 +132,7 @@ class Frame(BaseModel):
     file_size: int = 0
     frame_number: Optional[int] = None
     path: Optional[str] = None
+    fingerprint: Optional[str] = None  # Pixel hash keying cached detector results
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 class Take(BaseModel):
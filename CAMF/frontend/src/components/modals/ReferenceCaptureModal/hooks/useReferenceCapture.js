@@ -234,12 +234,12 @@ export function useReferenceCapture({ takeName, angleId, sceneId, onComplete })
       // Subscribe to frame updates from SSE
       const frameHandler = async (event) => {
         if (event.type === 'frame_captured' && event.data) {
-          const { frameIndex, frame_index, preview } = event.data;
+          const { frameIndex, frame_index } = event.data;
           const actualFrameIndex = frameIndex !== undefined ? frameIndex : frame_index;
           
           // Update frame count and load the actual frame
           if (isMountedRef.current && actualFrameIndex !== undefined) {
-            console.log('[useReferenceCapture] Frame captured event:', { actualFrameIndex, hasPreview: !!preview });
+            console.log('[useReferenceCapture] Frame captured event:', { actualFrameIndex });
             
             // Update frame count and index
             setFrameState(prev => ({
@@ -10,7 +10,8 @@ import time
 import uuid
 import os
 import cv2
-from fastapi import APIRouter, HTTPException, File, UploadFile, Response, BackgroundTasks, Form
+from fastapi import APIRouter, HTTPException, File, UploadFile, Response, BackgroundTasks, Form, Query
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
 import aiofiles
@@ -21,9 +22,14 @@ from CAMF.services.storage import get_storage_service
 from CAMF.services.detector_framework import get_detector_framework_service
 from ..sse_integration import SSEManager as manager
 from ..sse_handler import send_to_take, broadcast_system_event
+from ..preview_stream import MEDIA_TYPE as PREVIEW_STREAM_MEDIA_TYPE, get_preview_stream_manager
 
 router = APIRouter(tags=["capture"])
 
+# Frames per page of the frame range listing
+FRAME_RANGE_PAGE_SIZE = 1000
+FRAME_RANGE_MAX_PAGE_SIZE = 10000
+
 # ==================== REQUEST MODELS ====================
 
 class CaptureStartRequest(BaseModel):
@@ -285,7 +291,9 @@ async def get_capture_status():
     """Get current capture status."""
     capture_service = get_capture_service()
     
-    return capture_service.get_capture_status()
+    status = capture_service.get_capture_status()
+    status["preview_stream"] = get_preview_stream_manager().get_stats()
+    return status
 
 @router.get("/api/capture/progress/{take_id}")
 async def get_capture_progress(take_id: int):
@@ -369,6 +377,22 @@ async def get_preview_frame(quality: int = 85):
                      getattr(capture_service.source, 'window_handle', None)
     }
 
+@router.get("/api/capture/preview/stream")
+async def stream_preview(
+    fps: Optional[float] = Query(None, gt=0, description="Maximum preview frames per second for this client")
+):
+    """Stream live previews as multipart MJPEG, usable directly as an <img> source."""
+    stream_manager = get_preview_stream_manager()
+    
+    return StreamingResponse(
+        stream_manager.stream(fps),
+        media_type=PREVIEW_STREAM_MEDIA_TYPE,
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 # ==================== FRAME ACCESS ====================
 
 @router.get("/api/frames/take/{take_id}/frame/{frame_id}")
@@ -427,11 +451,17 @@ async def get_frame_count(take_id: int):
     return {"take_id": take_id, "frame_count": count}
 
 @router.get("/api/frames/take/{take_id}/range")
-async def get_frame_range(take_id: int, start: int = 0, end: Optional[int] = None):
-    """Get metadata for a range of frames."""
+async def get_frame_range(
+    take_id: int,
+    start: int = 0,
+    end: Optional[int] = None,
+    cursor: Optional[int] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(FRAME_RANGE_PAGE_SIZE, ge=1, le=FRAME_RANGE_MAX_PAGE_SIZE)
+):
+    """Get metadata for a range of frames, one page at a time."""
     storage = get_storage_service()
     
-    frames = storage.get_frames_in_range(take_id, start, end)
+    page = storage.list_frames(take_id, cursor=cursor, limit=limit, start=start, end=end)
     
     return {
         "take_id": take_id,
@@ -442,8 +472,9 @@ async def get_frame_range(take_id: int, start: int = 0, end: Optional[int] = Non
                 "timestamp": f.timestamp,
                 "path": f.path
             }
-            for f in frames
-        ]
+            for f in page['frames']
+        ],
+        "next_cursor": page['next_cursor']
     }
 
 @router.get("/api/frames/take/{take_id}/frame/{frame_id}/with-bounding-boxes")
@@ -467,6 +498,9 @@ async def get_frame_with_bounding_boxes(take_id: int, frame_id: int):
     if img is None:
         raise HTTPException(status_code=404, detail="Frame data not found")
     
+    # Cached frames are shared and read-only
+    img = img.copy()
+    
     # Draw bounding boxes
     for result in results:
         if result.bounding_boxes:
@@ -709,6 +709,13 @@ async def get_cache_stats() -> Dict[str, Any]:
     
     return detector_framework.get_cache_stats()
 
+@router.get("/change-gate/stats")
+async def get_change_gate_stats() -> Dict[str, Any]:
+    """Get detector invocations skipped on perceptually unchanged frame pairs."""
+    detector_framework = get_detector_framework_service()
+    
+    return detector_framework.get_change_gate_stats()
+
 @router.delete("/cache")
 async def clear_cache() -> Dict[str, Any]:
     """Clear all detector result caches."""
@@ -475,10 +475,10 @@ async def mark_false_positive(request: Dict[str, Any]):
         
         session.commit()
         
-        # Invalidate cache for this take
+        # Update the take's cached error groups
         from CAMF.services.storage.error_cache import get_error_cache
         cache = get_error_cache()
-        cache.invalidate(take_id)
+        cache.set_false_positive(take_id, [result.id for result in results], True)
         
         return {
             "message": "Marked as false positive successfully",
@@ -0,0 +1,206 @@
+"""
+Binary live preview stream.
+
+Live previews are served as multipart MJPEG (``multipart/x-mixed-replace``):
+raw JPEG parts a browser shows directly in an ``<img>`` element, instead of
+base64 strings inside SSE JSON events. The stream is fed by the capture
+service's preview encoder; each preview is framed once and shared by all
+clients.
+
+Every client has a one-slot mailbox holding the newest preview it has not
+sent yet, and is paced on its own. A preview replaced before the client took
+it, because the client reads slowly or asked for a lower rate, is dropped for
+that client only; other clients and the capture path are unaffected.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from CAMF.services.capture.preview import EncodedPreview, PreviewEncoder
+
+logger = logging.getLogger(__name__)
+
+BOUNDARY = "frame"
+MEDIA_TYPE = f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+
+
+def format_part(preview: EncodedPreview) -> bytes:
+    """Frame a preview as one multipart MJPEG part."""
+    header = (
+        f"--{BOUNDARY}\r\n"
+        f"Content-Type: image/jpeg\r\n"
+        f"Content-Length: {len(preview.jpeg)}\r\n"
+        f"X-Preview-Sequence: {preview.sequence}\r\n"
+        f"X-Preview-Timestamp: {preview.timestamp:.3f}\r\n"
+        f"\r\n"
+    )
+    return b"".join((header.encode('ascii'), preview.jpeg, b"\r\n"))
+
+
+class PreviewStreamClient:
+    """A connected preview viewer with a mailbox for the newest preview."""
+
+    def __init__(self, client_id: str, fps: Optional[float] = None):
+        """
+        Args:
+            client_id: Identifier for statistics and logs
+            fps: Most previews per second sent to this client; None for
+                every preview the encoder produces
+        """
+        self.client_id = client_id
+        self.fps = fps
+        self.connected_at = time.time()
+        self.active = True
+
+        self._part: Optional[bytes] = None
+        self._ready = asyncio.Event()
+
+        # Statistics
+        self.sent = 0
+        self.dropped = 0
+        self.bytes_sent = 0
+
+    def offer(self, part: bytes):
+        """Put a preview in the mailbox, replacing one not yet sent."""
+        if self._part is not None:
+            self.dropped += 1
+        self._part = part
+        self._ready.set()
+
+    async def next_part(self) -> bytes:
+        """Take the newest preview, waiting for one if the mailbox is empty."""
+        await self._ready.wait()
+        self._ready.clear()
+        part, self._part = self._part, None
+        return part
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sent, dropped and byte counters."""
+        return {
+            'client_id': self.client_id,
+            'fps': self.fps,
+            'connected_seconds': time.time() - self.connected_at,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'bytes_sent': self.bytes_sent,
+        }
+
+
+class PreviewStreamManager:
+    """Fans encoded previews out to MJPEG stream clients.
+
+    The encoder listener is registered while at least one client is
+    connected. Clients are served on the event loop they connected from.
+    """
+
+    def __init__(self, encoder: PreviewEncoder):
+        """
+        Args:
+            encoder: Preview encoder of the capture service
+        """
+        self.encoder = encoder
+        self.clients: Dict[str, PreviewStreamClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ids = itertools.count(1)
+
+        # Statistics
+        self.total_connections = 0
+        self.total_bytes_sent = 0
+
+    def connect(self, fps: Optional[float] = None) -> PreviewStreamClient:
+        """Register a client; it starts with the latest preview if there is one."""
+        if not self.clients:
+            self._loop = asyncio.get_running_loop()
+            self.encoder.add_listener(self._on_preview)
+
+        client = PreviewStreamClient(f"preview-{next(self._ids)}", fps)
+        self.clients[client.client_id] = client
+        self.total_connections += 1
+
+        latest = self.encoder.get_latest()
+        if latest is not None:
+            client.offer(format_part(latest))
+        logger.info(f"Preview stream client {client.client_id} connected (fps={fps})")
+        return client
+
+    def disconnect(self, client: PreviewStreamClient):
+        """Unregister a client."""
+        client.active = False
+        if self.clients.pop(client.client_id, None) is None:
+            return
+        if not self.clients:
+            self.encoder.remove_listener(self._on_preview)
+        logger.info(f"Preview stream client {client.client_id} disconnected "
+                    f"(sent={client.sent}, dropped={client.dropped})")
+
+    def _on_preview(self, preview: EncodedPreview):
+        # Called on the encoder thread: frame the part once, hand it to the loop
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        part = format_part(preview)
+        try:
+            loop.call_soon_threadsafe(self._dispatch, part)
+        except RuntimeError:
+            # Loop closed between the check and the call
+            pass
+
+    def _dispatch(self, part: bytes):
+        for client in list(self.clients.values()):
+            client.offer(part)
+
+    async def stream(self, fps: Optional[float] = None) -> AsyncIterator[bytes]:
+        """
+        Generate the multipart body for one client.
+
+        Yielding waits for the client to accept the previous part, so a slow
+        reader is not sent previews it could not keep up with; they are
+        replaced in its mailbox and dropped. The generator runs until the
+        response is cancelled when the client disconnects.
+
+        Args:
+            fps: Most previews per second for this client
+        """
+        client = self.connect(fps)
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / fps if fps else 0.0
+        next_send = loop.time()
+        try:
+            while client.active:
+                delay = next_send - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                part = await client.next_part()
+                next_send = loop.time() + interval
+                yield part
+                client.sent += 1
+                client.bytes_sent += len(part)
+                self.total_bytes_sent += len(part)
+        finally:
+            self.disconnect(client)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection and per-client delivery statistics."""
+        return {
+            'active_clients': len(self.clients),
+            'total_connections': self.total_connections,
+            'total_bytes_sent': self.total_bytes_sent,
+            'clients': [client.get_stats() for client in self.clients.values()],
+        }
+
+
+# Global preview stream manager instance
+_preview_stream_manager: Optional[PreviewStreamManager] = None
+
+
+def get_preview_stream_manager() -> PreviewStreamManager:
+    """Get the preview stream manager for the capture service's encoder."""
+    global _preview_stream_manager
+    if _preview_stream_manager is None:
+        from CAMF.services.capture import get_capture_service
+        _preview_stream_manager = PreviewStreamManager(get_capture_service().preview_encoder)
+    return _preview_stream_manager
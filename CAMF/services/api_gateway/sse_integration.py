@@ -68,8 +68,12 @@ def setup_capture_sse(capture_service):
             broadcast_system_event('capture_error', message.get('data', {}))
             broadcast_to_channel('capture_events', message, event_type="capture_error")
             
+        elif message_type == 'reference_preload':
+            # Progress of loading the reference take into memory for monitoring
+            broadcast_to_channel('capture_events', message, event_type="reference_preload")
+            
         elif message_type == 'frame_captured':
-            # Send frame captured events to capture channel with preview
+            # Send frame captured events to capture channel (previews use the binary preview stream)
             data = message.get('data', {})
             take_id = data.get('take_id')
             # Frame captured event for take
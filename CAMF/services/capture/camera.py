@@ -30,6 +30,7 @@ class CameraSource(CaptureSource):
         self.camera_id = camera_id
         self.name = f"Camera {camera_id}"
         self._manager = get_camera_manager()
+        self._frame_pool = self._manager.frame_pool
         self._connected = False
         self._capture_owner = f"camera_source_{camera_id}_{id(self)}"  # Unique owner ID
         
@@ -10,6 +10,8 @@ from typing import Optional, Dict, Any, Tuple
 import logging
 import atexit
 
+from .frame_pool import FrameLease, FramePool
+
 logger = logging.getLogger(__name__)
 
 class CameraManager:
@@ -39,6 +41,10 @@ class CameraManager:
         self._last_read_time = 0
         self._last_frame = None
         
+        # Continuous reads decode into recycled buffers
+        self.frame_pool = FramePool()
+        self._frame_lease: Optional[FrameLease] = None
+        
         # Register cleanup on exit
         atexit.register(self._cleanup_on_exit)
         
@@ -306,10 +312,19 @@ class CameraManager:
             # Grab 1-2 frames to get fresh data
             self._capture.grab()  # Discard one frame
             
-            # Read the fresh frame
-            ret, frame = self._capture.read()
+            # Read the fresh frame into a free buffer of the last frame's size
+            if self._last_frame is not None:
+                shape, dtype = self._last_frame.shape, self._last_frame.dtype
+                # Holders of the previous frame have taken their own leases
+                if self._frame_lease is not None:
+                    self._frame_lease.release()
+                self._frame_lease = self.frame_pool.acquire(shape, dtype)
+                ret, frame = self._capture.read(self._frame_lease.frame)
+            else:
+                ret, frame = self._capture.read()
             if ret and frame is not None:
-                self._last_frame = frame.copy()
+                # The frame is not written after this, so it is kept without copying
+                self._last_frame = frame
                 self._consecutive_failures = 0
                 return frame
             else:
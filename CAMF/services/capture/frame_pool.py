@@ -0,0 +1,231 @@
+# CAMF/services/capture/frame_pool.py
+"""
+Zero-copy frame fan-out and recycled frame buffers.
+
+A captured frame is handed to every subscriber as the same read-only view
+(``share_frame``) instead of one copy per callback. Subscribers that need to
+modify a frame take a private copy (``FramePool.make_writable``); writing to
+the shared view raises.
+
+Frame buffers come from a ``FramePool`` and are owned through leases. The
+producer gets a ``FrameLease`` from ``acquire`` and releases it when it moves
+on to its next frame. A subscriber that keeps a frame beyond its callback
+(a write queue, the last or preview frame) takes a lease of its own with
+``retain_frame`` and releases it once done with the frame. A buffer is only
+handed out again after every lease on it has been released, so a frame still
+queued for writing or kept as the last frame is never overwritten. In steady
+state capture allocates no new frame memory.
+"""
+
+import threading
+import weakref
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Every pool, for finding the pool a fanned-out frame came from
+_pools: "weakref.WeakSet[FramePool]" = weakref.WeakSet()
+
+
+def share_frame(frame: np.ndarray) -> np.ndarray:
+    """A read-only view of a frame for fan-out to subscribers."""
+    if not frame.flags.writeable:
+        return frame
+    view = frame.view()
+    view.flags.writeable = False
+    return view
+
+
+def _base_buffer(frame: np.ndarray) -> np.ndarray:
+    """The array owning the memory of a frame or any view derived from it."""
+    while isinstance(frame.base, np.ndarray):
+        frame = frame.base
+    return frame
+
+
+def retain_frame(frame: np.ndarray) -> 'FrameLease':
+    """
+    Take a lease on a frame to keep it beyond the callback it was received in.
+
+    Args:
+        frame: Frame as received from a fan-out, or any view of it
+
+    Returns:
+        Lease to release once the frame is no longer needed; it holds nothing
+        if the frame did not come from a pool
+    """
+    buffer = _base_buffer(frame)
+    for pool in list(_pools):
+        if pool._retain(buffer):
+            return FrameLease(frame, pool, buffer)
+    return FrameLease(frame)
+
+
+class FrameLease:
+    """One holder's claim on a pooled frame buffer.
+
+    Released explicitly or by leaving a ``with`` block, which yields the
+    frame; releasing again does nothing.
+    """
+
+    def __init__(self, frame: np.ndarray, pool: Optional['FramePool'] = None,
+                 buffer: Optional[np.ndarray] = None):
+        """
+        Args:
+            frame: The leased frame
+            pool: Pool the buffer belongs to, or None for a lease holding nothing
+            buffer: Pooled buffer holding the frame's memory
+        """
+        self.frame = frame
+        self._pool = pool
+        self._buffer = buffer
+
+    @property
+    def shared(self) -> bool:
+        """Whether other leases hold the buffer, so it must not be written in place."""
+        pool, buffer = self._pool, self._buffer
+        return pool is not None and buffer is not None and pool._holders(buffer) > 1
+
+    def release(self):
+        """Give up this claim; the buffer is reused once no lease holds it."""
+        pool, buffer = self._pool, self._buffer
+        self._pool = self._buffer = None
+        if pool is not None:
+            pool._release(buffer)
+
+    def __enter__(self) -> np.ndarray:
+        return self.frame
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class FramePool:
+    """Pool of reusable frame buffers, with allocation and copy counters.
+
+    Thread-safe.
+    """
+
+    def __init__(self, max_buffers: int = 16):
+        """
+        Args:
+            max_buffers: Most buffers kept per frame shape; beyond that
+                buffers are allocated without being pooled
+        """
+        self.max_buffers = max_buffers
+        self._buffers: Dict[Tuple[Tuple[int, ...], str], List[np.ndarray]] = {}
+        # id of a leased buffer -> [buffer, number of leases on it]
+        self._leases: Dict[int, List[Any]] = {}
+        self._lock = threading.Lock()
+        _pools.add(self)
+
+        # Statistics
+        self.acquired = 0
+        self.reused = 0
+        self.allocations = 0
+        self.bytes_allocated = 0
+        self.copies = 0
+        self.bytes_copied = 0
+
+    def acquire(self, shape: Tuple[int, ...], dtype=np.uint8) -> FrameLease:
+        """
+        Lease a buffer no other lease holds.
+
+        Args:
+            shape: Frame shape
+            dtype: Frame dtype
+
+        Returns:
+            Lease on a writable buffer with undefined contents
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            self.acquired += 1
+            buffers = self._buffers.get(key)
+            if buffers is None:
+                # Frame size changed; buffers of other sizes are no longer needed
+                self._buffers.clear()
+                buffers = self._buffers[key] = []
+
+            buffer = next((b for b in buffers if id(b) not in self._leases), None)
+            if buffer is not None:
+                self.reused += 1
+            else:
+                buffer = np.empty(shape, dtype=dtype)
+                self.allocations += 1
+                self.bytes_allocated += buffer.nbytes
+                if len(buffers) < self.max_buffers:
+                    buffers.append(buffer)
+                else:
+                    logger.debug(f"Frame pool exhausted ({self.max_buffers} buffers of {shape} in use)")
+            self._leases[id(buffer)] = [buffer, 1]
+        return FrameLease(buffer, self, buffer)
+
+    def copy(self, frame: np.ndarray) -> FrameLease:
+        """A private writable copy of a frame in a leased buffer."""
+        lease = self.acquire(frame.shape, frame.dtype)
+        np.copyto(lease.frame, frame)
+        with self._lock:
+            self.copies += 1
+            self.bytes_copied += frame.nbytes
+        return lease
+
+    def make_writable(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Copy-on-write: get a frame that may be modified.
+
+        Args:
+            frame: Frame as received from a fan-out
+
+        Returns:
+            The frame itself if it is writable, otherwise a private copy
+            outside the pool, so there is no lease to release
+        """
+        if frame.flags.writeable:
+            return frame
+        copy = np.array(frame)
+        with self._lock:
+            self.copies += 1
+            self.bytes_copied += frame.nbytes
+        return copy
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get allocation, reuse, lease and copy counters."""
+        with self._lock:
+            pooled = sum(len(buffers) for buffers in self._buffers.values())
+            return {
+                'pooled_buffers': pooled,
+                'leased_buffers': len(self._leases),
+                'acquired': self.acquired,
+                'reused': self.reused,
+                'allocations': self.allocations,
+                'bytes_allocated': self.bytes_allocated,
+                'copies': self.copies,
+                'bytes_copied': self.bytes_copied,
+            }
+
+    def _retain(self, buffer: np.ndarray) -> bool:
+        """Add a lease on a buffer this pool has leased out."""
+        with self._lock:
+            entry = self._leases.get(id(buffer))
+            if entry is None or entry[0] is not buffer:
+                return False
+            entry[1] += 1
+            return True
+
+    def _release(self, buffer: np.ndarray):
+        with self._lock:
+            entry = self._leases.get(id(buffer))
+            if entry is None or entry[0] is not buffer:
+                return
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._leases[id(buffer)]
+
+    def _holders(self, buffer: np.ndarray) -> int:
+        with self._lock:
+            entry = self._leases.get(id(buffer))
+            return entry[1] if entry is not None and entry[0] is buffer else 0
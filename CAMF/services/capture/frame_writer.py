@@ -0,0 +1,304 @@
+"""
+Write-behind pipeline for captured frames.
+Encodes and persists frames on worker threads so the capture thread never waits on disk,
+and records them in the database in batches.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+import numpy as np
+
+from CAMF.services.storage.frame_fingerprint import fingerprint_frame
+from .frame_pool import FrameLease, retain_frame
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingFrame:
+    """A captured frame waiting to be persisted."""
+    take_id: int
+    frame_id: int
+    frame: np.ndarray
+    timestamp: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    on_complete: Optional[Callable[[bool], None]] = None
+    submitted_at: float = field(default_factory=time.perf_counter)
+    fingerprint: Optional[str] = None
+    lease: Optional[FrameLease] = None
+
+    def release_frame(self):
+        """Let go of the pixel data once it is written."""
+        self.frame = None
+        if self.lease is not None:
+            self.lease.release()
+            self.lease = None
+
+
+class FrameWriteBehind:
+    """Bounded write-behind queue with a pool of encoder workers.
+
+    Workers encode and write frames through FrameStorage. Written frames are
+    inserted into the database in batches by a separate commit thread, after
+    which the frame's ``on_complete`` callback runs. The capture thread only
+    ever does a non-blocking put; when the queue is full the frame is rejected
+    and counted as dropped.
+    """
+
+    def __init__(self, storage, num_workers: int = 2, max_queue_size: int = 64,
+                 batch_size: int = 25, batch_interval: float = 0.25):
+        self.storage = storage
+        self.num_workers = max(1, num_workers)
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+
+        self._queue: "queue.Queue[Optional[PendingFrame]]" = queue.Queue(maxsize=max_queue_size)
+        self._workers: List[threading.Thread] = []
+        self._commit_thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Frames written to disk, waiting for their database rows
+        self._pending_rows: List[PendingFrame] = []
+        self._pending_paths: List[str] = []
+        self._pending_cond = threading.Condition()
+        self._commit_lock = threading.Lock()
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._written = 0
+        self._committed = 0
+        self._dropped = 0
+        self._write_errors = 0
+        self._batches = 0
+        self._peak_depth = 0
+        self._write_time_total = 0.0
+        self._latency_total = 0.0
+
+    def start(self):
+        """Start the encoder workers and the commit thread."""
+        if self._running:
+            return
+        self._running = True
+
+        for i in range(self.num_workers):
+            worker = threading.Thread(target=self._write_loop, daemon=True, name=f"FrameWriter-{i}")
+            worker.start()
+            self._workers.append(worker)
+
+        self._commit_thread = threading.Thread(target=self._commit_loop, daemon=True, name="FrameCommitter")
+        self._commit_thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Flush outstanding frames and stop all threads."""
+        if not self._running:
+            return
+        self.flush(timeout)
+        self._running = False
+
+        for _ in self._workers:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        with self._pending_cond:
+            self._pending_cond.notify_all()
+
+        for worker in self._workers:
+            worker.join(timeout=1.0)
+        if self._commit_thread:
+            self._commit_thread.join(timeout=1.0)
+        self._workers = []
+        self._commit_thread = None
+
+    def submit(self, take_id: int, frame_id: int, frame: np.ndarray, timestamp: float,
+               metadata: Optional[Dict[str, Any]] = None,
+               on_complete: Optional[Callable[[bool], None]] = None) -> bool:
+        """Queue a frame for writing without blocking.
+
+        Args:
+            take_id: Take the frame belongs to
+            frame_id: Frame number within the take
+            frame: Frame data; the writer holds a lease on it until it is written
+            timestamp: Capture timestamp
+            metadata: Optional frame metadata
+            on_complete: Called with True once the frame is on disk and in the
+                database, or with False if it could not be stored
+
+        Returns:
+            True if queued, False if rejected because the queue is full
+        """
+        if not self._running:
+            self.start()
+
+        item = PendingFrame(take_id, frame_id, frame, timestamp, metadata or {}, on_complete,
+                            lease=retain_frame(frame))
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            item.release_frame()
+            with self._stats_lock:
+                self._dropped += 1
+            logger.warning(f"Write queue full, dropping frame {frame_id} of take {take_id}")
+            return False
+
+        with self._stats_lock:
+            self._submitted += 1
+            self._peak_depth = max(self._peak_depth, self._queue.qsize())
+        return True
+
+    def has_capacity(self) -> bool:
+        """Check whether a frame submitted now would be accepted."""
+        return self._queue.qsize() < self.max_queue_size
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued frame is written and committed.
+
+        Returns:
+            True if everything was flushed before the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks > 0:
+            if time.monotonic() >= deadline:
+                logger.warning(f"Flush timed out with {self._queue.unfinished_tasks} frames unwritten")
+                return False
+            time.sleep(0.01)
+
+        self._commit_pending()
+        return True
+
+    def _write_loop(self):
+        """Encoder worker: write frames to frame storage."""
+        while self._running:
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            if item is None:
+                self._queue.task_done()
+                break
+
+            try:
+                start = time.perf_counter()
+                success = self.storage.frame_storage.store_frame(
+                    item.take_id, item.frame_id, item.frame, item.timestamp, item.metadata
+                )
+                path = self.storage.frame_storage.get_frame_path(item.take_id, item.frame_id) if success else None
+                elapsed = time.perf_counter() - start
+
+                with self._stats_lock:
+                    self._write_time_total += elapsed
+                    if success and path:
+                        self._written += 1
+                    else:
+                        self._write_errors += 1
+
+                if success and path:
+                    # Release the pixel data; only the row is still needed
+                    item.fingerprint = fingerprint_frame(item.frame)
+                    item.release_frame()
+                    with self._pending_cond:
+                        self._pending_rows.append(item)
+                        self._pending_paths.append(path)
+                        if len(self._pending_rows) >= self.batch_size:
+                            self._pending_cond.notify()
+                else:
+                    item.release_frame()
+                    logger.error(f"Failed to write frame {item.frame_id} of take {item.take_id}")
+                    self._notify(item, False)
+            except Exception as e:
+                item.release_frame()
+                with self._stats_lock:
+                    self._write_errors += 1
+                logger.error(f"Error writing frame {item.frame_id} of take {item.take_id}: {e}")
+                self._notify(item, False)
+            finally:
+                self._queue.task_done()
+
+    def _commit_loop(self):
+        """Insert written frames into the database in batches."""
+        while self._running:
+            with self._pending_cond:
+                if len(self._pending_rows) < self.batch_size:
+                    self._pending_cond.wait(timeout=self.batch_interval)
+            self._commit_pending()
+
+    def _commit_pending(self):
+        """Commit all frames currently waiting for their database rows."""
+        with self._commit_lock:
+            with self._pending_cond:
+                items, paths = self._pending_rows, self._pending_paths
+                self._pending_rows, self._pending_paths = [], []
+
+            if not items:
+                return
+
+            rows = [
+                {
+                    'take_id': item.take_id,
+                    'frame_number': item.frame_id,
+                    'timestamp': item.timestamp,
+                    'path': path,
+                    'fingerprint': item.fingerprint
+                }
+                for item, path in zip(items, paths)
+            ]
+
+            outcomes = self.storage.insert_frame_records(rows, batch_size=max(self.batch_size, len(rows)))
+            # A frame recaptured into a take keeps its existing row; that still counts as stored
+            stored = [outcome.stored for outcome in outcomes]
+
+            now = time.perf_counter()
+            with self._stats_lock:
+                self._batches += 1
+                for item, item_stored in zip(items, stored):
+                    if item_stored:
+                        self._committed += 1
+                        self._latency_total += now - item.submitted_at
+                    else:
+                        self._write_errors += 1
+
+            failed = stored.count(False)
+            if failed:
+                logger.error(f"Failed to commit {failed} of {len(items)} frame rows")
+
+            for item, item_stored in zip(items, stored):
+                self._notify(item, item_stored)
+
+    def _notify(self, item: PendingFrame, success: bool):
+        if item.on_complete:
+            try:
+                item.on_complete(success)
+            except Exception as e:
+                logger.error(f"Frame completion callback failed for frame {item.frame_id}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, backpressure and throughput metrics."""
+        depth = self._queue.qsize()
+        with self._pending_cond:
+            awaiting_commit = len(self._pending_rows)
+        with self._stats_lock:
+            return {
+                'queue_depth': depth,
+                'max_queue_size': self.max_queue_size,
+                'queue_utilization': depth / self.max_queue_size if self.max_queue_size else 0.0,
+                'peak_queue_depth': self._peak_depth,
+                'backpressure': depth >= self.max_queue_size * 0.8,
+                'awaiting_commit': awaiting_commit,
+                'workers': self.num_workers,
+                'frames_submitted': self._submitted,
+                'frames_written': self._written,
+                'frames_committed': self._committed,
+                'frames_dropped': self._dropped,
+                'write_errors': self._write_errors,
+                'batches_committed': self._batches,
+                'avg_write_ms': (self._write_time_total / self._written * 1000) if self._written else 0.0,
+                'avg_commit_latency_ms': (self._latency_total / self._committed * 1000) if self._committed else 0.0
+            }
@@ -1,5 +1,4 @@
 # CAMF/services/capture/main.py - Thread-safe version
-import base64
 from typing import Dict, Any, Optional, List, Tuple, Callable, Union
 import threading
 import time
@@ -16,11 +15,15 @@ except ImportError:
     logging.warning("OpenCV (cv2) not available - some features will be disabled")
 
 from CAMF.services.storage import get_storage_service
+from CAMF.common.config import get_config
 from CAMF.common.resolution_utils import downscale_frame, should_downscale
 from .camera import CameraSource
 from .screen import ScreenSource
 from .window import WindowSource
 from .upload import VideoUploadProcessor
+from .frame_pool import FrameLease, retain_frame
+from .frame_writer import FrameWriteBehind
+from .preview import PreviewEncoder
 
 # Resolution presets
 RESOLUTION_PRESETS = {
@@ -61,8 +64,26 @@ class CaptureService:
 
         # Video upload support
         self.video_processor = VideoUploadProcessor()
+        
+        # Frames are encoded and persisted off the capture thread
+        capture_config = get_config().capture
+        self.frame_writer = FrameWriteBehind(
+            self.storage,
+            num_workers=capture_config.write_workers,
+            max_queue_size=capture_config.write_queue_size,
+            batch_size=capture_config.write_batch_size
+        )
+        
+        # Live previews are encoded on their own thread at the preview rate
+        self.preview_encoder = PreviewEncoder(
+            fps=capture_config.preview_fps,
+            max_width=capture_config.preview_max_width,
+            max_height=capture_config.preview_max_height,
+            quality=capture_config.preview_quality
+        )
 
         self._preview_frame = None  
+        self._preview_lease: Optional[FrameLease] = None
         self._preview_lock = threading.Lock()
         
         # SSE callback for real-time streaming
@@ -168,17 +189,62 @@ class CaptureService:
         self._reference_frame_count = None
         if reference_take_id:
             try:
-                reference_frames = self.storage.get_frames_for_take(reference_take_id)
-                if reference_frames:
-                    self._reference_frame_count = len(reference_frames)
+                reference_frame_count = self.storage.get_frame_count(reference_take_id)
+                if reference_frame_count:
+                    self._reference_frame_count = reference_frame_count
                     print(f"[CaptureService] Cached reference frame count: {self._reference_frame_count}")
             except Exception as e:
                 print(f"[CaptureService] Error getting reference frame count: {e}")
         
+        # Hold the reference take in memory so each comparison is a lookup, not a PNG decode
+        if enabled and reference_take_id:
+            self._start_reference_preload(reference_take_id)
+        else:
+            self.storage.release_reference_preload()
+        
         print(f"[CaptureService] Monitoring mode set to: {enabled}, reference take: {reference_take_id}")
         print(f"[CaptureService] is_monitoring_mode = {self.is_monitoring_mode}")
         print(f"[CaptureService] reference_take_id = {self.reference_take_id}")
     
+    def _start_reference_preload(self, reference_take_id: int):
+        """Preload the reference take at its scene's resolution."""
+        target_resolution = None
+        try:
+            take = self.storage.get_take(reference_take_id)
+            angle = self.storage.get_angle(take.angle_id) if take else None
+            scene = self.storage.get_scene(angle.scene_id) if angle else None
+            if scene and scene.resolution:
+                target_resolution = scene.resolution
+        except Exception as e:
+            print(f"[CaptureService] Could not get scene resolution for reference take: {e}")
+        
+        started = self.storage.preload_reference_take(
+            reference_take_id,
+            target_resolution=target_resolution,
+            progress_callback=self._on_reference_preload_progress
+        )
+        if not started:
+            print(f"[CaptureService] Reference take {reference_take_id} could not be preloaded")
+    
+    def _on_reference_preload_progress(self, status: Dict[str, Any]):
+        """Forward reference preload progress to SSE listeners."""
+        for callback in self.sse_callbacks:
+            try:
+                callback({
+                    'type': 'reference_preload',
+                    'data': {
+                        'reference_take_id': status['take_id'],
+                        'state': status['state'],
+                        'loaded': status['loaded'],
+                        'total': status['total'],
+                        'progress': status['progress'],
+                        'bytes': status['bytes'],
+                        'error': status['error']
+                    }
+                })
+            except Exception as e:
+                print(f"Error in SSE callback: {e}")
+    
     def set_max_resolution(self, resolution: Union[str, Tuple[int, int], None]):
         """Set the maximum resolution for captured frames.
         
@@ -248,11 +314,14 @@ class CaptureService:
             self._cleanup_source()
             
             # Create and connect to new source
+            capture_config = get_config().capture
             self.source = ScreenSource(
                 monitor_id=monitor_id,
                 region=region,
                 frame_rate=self.frame_rate,
-                max_resolution=self.max_resolution
+                max_resolution=self.max_resolution,
+                persistent_grabber=capture_config.screen_persistent_grabber,
+                tile_size=capture_config.screen_tile_size
             )
             
             if not self.source.connect():
@@ -437,6 +506,12 @@ class CaptureService:
                 # Stop the source capture thread
                 self.source.stop_capture()
             
+            # Wait for queued frames to reach disk and the database
+            if not self.frame_writer.flush(timeout=30.0):
+                print(f"Warning: not all frames of take {take_id} were written before timeout")
+            if take_id is not None:
+                self.storage.finalize_take(take_id)
+            
             print(f"Capture stopped successfully for take {take_id}, captured {frame_count} frames")
             return True
             
@@ -580,7 +655,11 @@ class CaptureService:
                 "active_take_id": self._active_take_id,
                 "frame_count": self._frame_count,
                 "source_type": self.source_type,
-                "frame_rate": self.frame_rate
+                "frame_rate": self.frame_rate,
+                "write_queue": self.frame_writer.get_stats(),
+                "preview": self.preview_encoder.get_stats(),
+                "screen_grab": self.source.get_grab_stats() if self.source_type == "screen" and self.source else None,
+                "reference_preload": self.storage.get_reference_preload_status()
             }
     
     def get_current_source_info(self) -> Optional[Dict[str, Any]]:
@@ -628,8 +707,7 @@ class CaptureService:
                     manager = get_camera_manager()
                     frame = manager.get_cached_frame()
                     if frame is not None:
-                        with self._preview_lock:
-                            self._preview_frame = frame.copy()
+                        self._set_preview_frame(frame.copy())
                         return frame
                     # Fall back to stored preview frame
                     with self._preview_lock:
@@ -643,8 +721,7 @@ class CaptureService:
                 frame = manager.capture_single_frame(source_id, owner="preview")
                 if frame is not None:
                     # Store it as preview frame
-                    with self._preview_lock:
-                        self._preview_frame = frame.copy()
+                    self._set_preview_frame(frame.copy())
                 return frame
                 
             elif source_type == "screen" or source_type == "monitor":
@@ -657,8 +734,7 @@ class CaptureService:
                     source.disconnect()
                     if frame is not None:
                         # Store it as preview frame
-                        with self._preview_lock:
-                            self._preview_frame = frame.copy()
+                        self._set_preview_frame(frame.copy())
                     return frame
                     
             elif source_type == "window":
@@ -671,8 +747,7 @@ class CaptureService:
                     source.disconnect()
                     if frame is not None:
                         # Store it as preview frame
-                        with self._preview_lock:
-                            self._preview_frame = frame.copy()
+                        self._set_preview_frame(frame.copy())
                     return frame
                     
         except Exception as e:
@@ -682,6 +757,18 @@ class CaptureService:
             
         return None
 
+    def _set_preview_frame(self, frame: Optional[np.ndarray]):
+        """Keep a frame for preview readers, releasing the one it replaces.
+        
+        Readers copy the frame under the preview lock.
+        """
+        lease = retain_frame(frame) if frame is not None else None
+        with self._preview_lock:
+            previous, self._preview_lease = self._preview_lease, lease
+            self._preview_frame = frame
+        if previous is not None:
+            previous.release()
+    
     def get_current_preview_frame(self) -> Optional[np.ndarray]:
         """Get preview frame from current source or last captured frame."""
         # For camera sources, use the manager's preview method
@@ -690,8 +777,7 @@ class CaptureService:
             manager = get_camera_manager()
             frame = manager.get_preview_frame(self.source.camera_id)
             if frame is not None:
-                with self._preview_lock:
-                    self._preview_frame = frame.copy()
+                self._set_preview_frame(frame.copy())
                 return frame
         
         # If we have a stored preview frame, return it
@@ -704,8 +790,7 @@ class CaptureService:
             try:
                 frame = self.source._capture_frame()
                 if frame is not None:
-                    with self._preview_lock:
-                        self._preview_frame = frame.copy()
+                    self._set_preview_frame(frame.copy())
                     return frame
             except:
                 pass
@@ -716,12 +801,19 @@ class CaptureService:
         """Clean up resources."""
         # Clean up source
         self._cleanup_source()
+        
+        # Drain and stop the frame writer
+        self.frame_writer.stop()
+        self.preview_encoder.stop()
+        
+        # Free the preloaded reference take
+        self.storage.release_reference_preload()
 
     def _cleanup_source(self):
         """Enhanced cleanup with preview clearing."""
         # Clear preview frame
-        with self._preview_lock:
-            self._preview_frame = None
+        self._set_preview_frame(None)
+        self.preview_encoder.clear()
         
         if self.source:
             # Always stop capture if active
@@ -764,6 +856,12 @@ class CaptureService:
                 print("Frame handler: No active take ID, ignoring frame")
                 return
             
+            # Drop before reserving an index so frame numbers stay contiguous
+            # while earlier frames are still in flight
+            if not self.frame_writer.has_capacity():
+                print("Frame handler: Write queue full, dropping frame")
+                return
+            
             # Always allow capture - no auto-stop based on frame limit
             # Just increment the frame counter
             current_frame_index = self._frame_count
@@ -781,96 +879,79 @@ class CaptureService:
                 frame = downscale_frame(frame, self.scene_resolution)
                 print(f"Downscaled to {frame.shape[1]}x{frame.shape[0]}")
             
-            # Store frame for preview
-            with self._preview_lock:
-                self._preview_frame = frame.copy()
+            # Store frame for preview; it is read-only and preview readers copy it
+            self._set_preview_frame(frame)
             
-            # Encode frame preview for SSE (resize for performance)
-            preview_frame = frame
-            if CV2_AVAILABLE and (frame.shape[0] > 240 or frame.shape[1] > 320):
-                # Resize for preview
-                scale = min(240/frame.shape[0], 320/frame.shape[1])
-                new_h = int(frame.shape[0] * scale)
-                new_w = int(frame.shape[1] * scale)
-                preview_frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            # Preview encoding happens on the encoder's thread at the preview rate
+            self.preview_encoder.submit(frame, relative_time)
             
-            # Encode preview as base64
-            if CV2_AVAILABLE:
-                _, buffer = cv2.imencode('.jpg', preview_frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                preview_b64 = base64.b64encode(buffer).decode('utf-8')
-            else:
-                preview_b64 = ""  # No preview without cv2
+            # Hand the frame to the write-behind queue using the reserved index
+            def on_complete(success: bool):
+                if success:
+                    self._on_frame_stored(active_take_id, current_frame_index, frame_count_after,
+                                          relative_time)
+                else:
+                    # Later indexes may already be reserved, so the count is left as is
+                    print(f"Failed to store frame {current_frame_index}")
             
-            # Save frame to storage using the reserved index
-            print(f"Saving frame {current_frame_index} to take {active_take_id}")
-            stored_frame = self.storage.add_frame(
+            queued = self.frame_writer.submit(
                 take_id=active_take_id,
-                frame=frame,
                 frame_id=current_frame_index,
+                frame=frame,
                 timestamp=relative_time,
                 metadata={
                     'original_resolution': f"{original_shape[1]}x{original_shape[0]}",
                     'capture_resolution': f"{frame.shape[1]}x{frame.shape[0]}",
                     'scene_resolution': self.scene_resolution
-                }
+                },
+                on_complete=on_complete
             )
             
-            if stored_frame:
-                print(f"Frame {current_frame_index} saved successfully, total frames: {frame_count_after}")
-                
-                # Update session if available
-                try:
-                    from CAMF.services.session_management import get_session_manager
-                    session_manager = get_session_manager()
-                    session_manager.update_frame_count(frame_count_after)
-                except:
-                    pass
-                
-                # Send frame update via SSE callbacks with preview
-                for callback in self.sse_callbacks:
-                    try:
-                        callback({
-                            'type': 'frame_captured',
-                            'data': {
-                                'frameIndex': current_frame_index,
-                                'frame_count': frame_count_after,
-                                'take_id': active_take_id,
-                                'timestamp': relative_time,
-                                'preview': f'data:image/jpeg;base64,{preview_b64}'
-                            }
-                        })
-                    except Exception as e:
-                        print(f"Error in SSE callback: {e}")
-                
-                # If in monitoring mode, queue frame pair for detector processing
-                # Only process frames up to reference take's frame count
-                print(f"[CaptureService] Checking monitoring mode: is_monitoring_mode={self.is_monitoring_mode}, reference_take_id={self.reference_take_id}")
-                if self.is_monitoring_mode and self.reference_take_id:
-                    print(f"[CaptureService] In monitoring mode, processing frame {current_frame_index}")
-                    # Get reference take frame count
-                    if hasattr(self, '_reference_frame_count') and self._reference_frame_count is not None:
-                        if current_frame_index < self._reference_frame_count:
-                            print(f"[CaptureService] Frame {current_frame_index} within reference limit ({self._reference_frame_count}), queuing for processing")
-                            self._queue_frame_for_processing(active_take_id, current_frame_index)
-                        else:
-                            print(f"[CaptureService] Frame {current_frame_index} beyond reference limit ({self._reference_frame_count}), skipping processing")
-                    else:
-                        # No reference frame count cached, queue anyway
-                        print(f"[CaptureService] No reference frame count cached, queuing frame {current_frame_index} anyway")
-                        self._queue_frame_for_processing(active_take_id, current_frame_index)
-                else:
-                    print(f"[CaptureService] Not in monitoring mode or no reference take, skipping detector processing")
-            else:
-                print(f"Failed to store frame {current_frame_index}")
-                # Decrement counter since we didn't actually store the frame
-                with self._state_lock:
-                    self._frame_count -= 1
+            if not queued:
+                print(f"Frame {current_frame_index} rejected by write queue")
         
         except Exception as e:
             print(f"Error handling frame {self.frame_count}: {e}")
             import traceback
             traceback.print_exc()
 
+    def _on_frame_stored(self, take_id: int, frame_index: int, frame_count: int,
+                         relative_time: float):
+        """Notify listeners once a frame is on disk and in the database."""
+        print(f"Frame {frame_index} saved successfully, total frames: {frame_count}")
+        
+        # Update session if available
+        try:
+            from CAMF.services.session_management import get_session_manager
+            session_manager = get_session_manager()
+            session_manager.update_frame_count(frame_count)
+        except:
+            pass
+        
+        # Send frame update via SSE callbacks; previews go out on the binary preview stream
+        for callback in self.sse_callbacks:
+            try:
+                callback({
+                    'type': 'frame_captured',
+                    'data': {
+                        'frameIndex': frame_index,
+                        'frame_count': frame_count,
+                        'take_id': take_id,
+                        'timestamp': relative_time
+                    }
+                })
+            except Exception as e:
+                print(f"Error in SSE callback: {e}")
+        
+        # If in monitoring mode, queue frame pair for detector processing
+        # Only process frames up to reference take's frame count
+        if self.is_monitoring_mode and self.reference_take_id:
+            reference_count = getattr(self, '_reference_frame_count', None)
+            if reference_count is None or frame_index < reference_count:
+                self._queue_frame_for_processing(take_id, frame_index)
+            else:
+                print(f"[CaptureService] Frame {frame_index} beyond reference limit ({reference_count}), skipping processing")
+    
     # Removed _delayed_stop_capture - no longer needed since we don't auto-stop
     
     def _queue_frame_for_processing(self, current_take_id: int, frame_id: int):
@@ -1094,40 +1175,6 @@ class CaptureService:
     def remove_websocket_callback(self, callback: Callable[[Dict[str, Any]], None]):
         """Compatibility alias for remove_sse_callback."""
         self.remove_sse_callback(callback)
-    
-    def _send_sse_preview(self, frame: np.ndarray):
-        """Send preview frame via SSE."""
-        try:
-            if not CV2_AVAILABLE:
-                return  # Can't send preview without cv2
-                
-            # Resize frame for preview (to reduce bandwidth)
-            preview_height = 360  # 360p for preview
-            height, width = frame.shape[:2]
-            scale = preview_height / height
-            preview_width = int(width * scale)
-            
-            preview_frame = cv2.resize(frame, (preview_width, preview_height))
-            
-            # Convert to JPEG
-            _, buffer = cv2.imencode('.jpg', preview_frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-            frame_base64 = base64.b64encode(buffer).decode('utf-8')
-            
-            # Send via WebSocket callbacks
-            for callback in self.sse_callbacks:
-                try:
-                    callback({
-                        'type': 'preview_frame',
-                        'data': {
-                            'frame': f"data:image/jpeg;base64,{frame_base64}",
-                            'timestamp': time.time()
-                        }
-                    })
-                except Exception as e:
-                    print(f"Error in WebSocket callback: {e}")
-                    
-        except Exception as e:
-            print(f"Error sending WebSocket preview: {e}")
 
 
 # Singleton instance
@@ -0,0 +1,235 @@
+# CAMF/services/capture/preview.py
+"""
+Live preview encoding, decoupled from capture.
+
+The capture path only hands its latest frame to the ``PreviewEncoder``; a
+frame not yet encoded when the next one arrives is dropped. The encoder's own
+thread resizes and JPEG-encodes the latest frame at the preview frame rate,
+independent of the capture frame rate, and caches the result. Every preview
+consumer reads that cached encode, so the capture path costs the same however
+many clients watch.
+"""
+
+import base64
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .frame_pool import FrameLease, retain_frame
+from .scheduler import FrameScheduler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class EncodedPreview:
+    """One encoded preview frame, shared by all consumers."""
+    sequence: int       # Increases with every encode
+    jpeg: bytes
+    width: int
+    height: int
+    timestamp: float    # Capture time of the frame relative to capture start
+    encoded_at: float   # time.time() of the encode
+
+    @cached_property
+    def data_uri(self) -> str:
+        """Base64 data URI, computed once per preview."""
+        return f"data:image/jpeg;base64,{base64.b64encode(self.jpeg).decode('utf-8')}"
+
+
+class PreviewEncoder:
+    """Encodes the latest submitted frame at a fixed preview rate.
+
+    Listeners are called on the encoder thread with each new preview;
+    other readers poll ``get_latest`` or block in ``wait_for_preview``.
+    """
+
+    def __init__(self, fps: float = 5.0, max_width: int = 320, max_height: int = 240, quality: int = 70):
+        """
+        Args:
+            fps: Preview frames encoded per second at most
+            max_width: Previews are scaled down to fit this width
+            max_height: Previews are scaled down to fit this height
+            quality: JPEG quality
+        """
+        self.fps = fps
+        self.max_width = max_width
+        self.max_height = max_height
+        self.quality = quality
+
+        self._frame: Optional[np.ndarray] = None
+        self._frame_lease: Optional[FrameLease] = None
+        self._frame_timestamp = 0.0
+        self._latest: Optional[EncodedPreview] = None
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._listeners: List[Callable[[EncodedPreview], None]] = []
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Statistics
+        self._submitted = 0
+        self._stale_dropped = 0
+        self._encode_seconds = 0.0
+        self._encoded_bytes = 0
+
+    def start(self):
+        """Start the encoder thread."""
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._encode_loop, name="PreviewEncoder", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the encoder thread and wake blocked readers."""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def submit(self, frame: np.ndarray, timestamp: float = 0.0):
+        """
+        Offer a frame for preview without blocking.
+
+        The frame is referenced, not copied, so it must not be modified afterwards
+        (captured frames are read-only); the encoder leases it until it is
+        encoded or replaced.
+
+        Args:
+            frame: BGR frame
+            timestamp: Capture time of the frame
+        """
+        lease = retain_frame(frame)
+        with self._condition:
+            if self._frame is not None:
+                self._stale_dropped += 1
+            stale, self._frame_lease = self._frame_lease, lease
+            self._frame = frame
+            self._frame_timestamp = timestamp
+            self._submitted += 1
+        if stale is not None:
+            stale.release()
+        if self._thread is None:
+            self.start()
+
+    def add_listener(self, callback: Callable[[EncodedPreview], None]):
+        """Call ``callback`` with every new preview."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[EncodedPreview], None]):
+        """Stop calling ``callback``."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def get_latest(self) -> Optional[EncodedPreview]:
+        """Get the most recent preview."""
+        return self._latest
+
+    def wait_for_preview(self, after_sequence: int = 0, timeout: Optional[float] = None) -> Optional[EncodedPreview]:
+        """
+        Block until a preview newer than ``after_sequence`` is available.
+
+        Args:
+            after_sequence: Sequence of the last preview the caller has seen
+            timeout: Maximum time to wait
+
+        Returns:
+            The newest preview, or None on timeout or stop
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._stop_event.is_set()
+                or (self._latest is not None and self._latest.sequence > after_sequence),
+                timeout
+            )
+            latest = self._latest
+        if latest is None or latest.sequence <= after_sequence:
+            return None
+        return latest
+
+    def clear(self):
+        """Forget the pending frame and the latest preview, e.g. when the source changes."""
+        with self._condition:
+            stale, self._frame_lease = self._frame_lease, None
+            self._frame = None
+            self._latest = None
+        if stale is not None:
+            stale.release()
+
+    def encode(self, frame: np.ndarray) -> Tuple[bytes, int, int]:
+        """
+        Scale a frame to preview size and JPEG-encode it.
+
+        Returns:
+            JPEG bytes, width and height
+        """
+        height, width = frame.shape[:2]
+        scale = min(self.max_width / width, self.max_height / height, 1.0)
+        if scale < 1.0:
+            width, height = max(1, int(width * scale)), max(1, int(height * scale))
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buffer.tobytes(), width, height
+
+    def _encode_loop(self):
+        scheduler = FrameScheduler(self.fps, policy="drop")
+        while True:
+            if scheduler.wait(self._stop_event) is None:
+                break
+
+            with self._condition:
+                frame, lease, timestamp = self._frame, self._frame_lease, self._frame_timestamp
+                self._frame, self._frame_lease = None, None
+            if frame is None:
+                continue
+
+            start = time.perf_counter()
+            try:
+                jpeg, width, height = self.encode(frame)
+            except Exception as e:
+                logger.error(f"Error encoding preview: {e}")
+                continue
+            finally:
+                del frame
+                if lease is not None:
+                    lease.release()
+
+            with self._condition:
+                self._sequence += 1
+                preview = EncodedPreview(self._sequence, jpeg, width, height, timestamp, time.time())
+                self._latest = preview
+                self._encode_seconds += time.perf_counter() - start
+                self._encoded_bytes += len(jpeg)
+                self._condition.notify_all()
+
+            for callback in list(self._listeners):
+                try:
+                    callback(preview)
+                except Exception as e:
+                    logger.error(f"Error in preview listener: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get submission, drop and encode counters."""
+        with self._condition:
+            encoded = self._sequence
+            return {
+                'fps': self.fps,
+                'submitted': self._submitted,
+                'stale_dropped': self._stale_dropped,
+                'encoded': encoded,
+                'avg_encode_ms': self._encode_seconds / encoded * 1000 if encoded else 0.0,
+                'avg_preview_bytes': self._encoded_bytes / encoded if encoded else 0.0,
+            }
@@ -0,0 +1,176 @@
+# CAMF/services/capture/scheduler.py
+"""
+Deadline-driven frame scheduling for capture loops.
+
+Frame deadlines lie on a fixed grid ``start + n * interval`` of the monotonic
+clock, so slow frames do not shift later ones and wall-clock adjustments do
+not disturb the cadence. Between deadlines the loop blocks on its stop event
+rather than polling, so idle capture costs next to no CPU even at fractional
+frame rates.
+
+When a frame overruns its slot, the policy decides what happens to the missed
+deadlines:
+
+- ``catch_up``: missed deadlines fire back to back until the loop is on time
+  again, but at most ``max_catch_up`` of them; older ones are dropped.
+- ``drop``: all missed deadlines are dropped and the next frame fires at the
+  latest deadline already passed.
+
+How late each frame fires relative to its deadline is kept in a jitter
+histogram.
+"""
+
+import bisect
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_POLICIES = ("catch_up", "drop")
+
+# Upper bounds of the jitter histogram buckets in milliseconds
+JITTER_BUCKETS_MS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 50.0, 100.0)
+
+
+class FrameTick(NamedTuple):
+    """A frame deadline the scheduler fired."""
+    index: int         # Position of the deadline on the grid
+    deadline: float    # Monotonic time the frame was due
+    fired_at: float    # Monotonic time the frame fired
+    elapsed: float     # Seconds since the schedule started
+
+    @property
+    def lateness(self) -> float:
+        """Seconds the frame fired after its deadline."""
+        return self.fired_at - self.deadline
+
+
+class FrameScheduler:
+    """
+    Fires frame deadlines at a fixed rate on the monotonic clock.
+
+    Usage::
+
+        scheduler = FrameScheduler(frame_rate)
+        scheduler.start()
+        while (tick := scheduler.wait(stop_event)) is not None:
+            capture(tick)
+    """
+
+    def __init__(self, frame_rate: float, policy: str = "catch_up", max_catch_up: int = 2,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            frame_rate: Frames per second (can be fractional)
+            policy: What to do with missed deadlines, 'catch_up' or 'drop'
+            max_catch_up: Most missed deadlines fired late under 'catch_up'
+            clock: Monotonic clock in seconds
+        """
+        if frame_rate <= 0:
+            raise ValueError(f"frame_rate must be positive, got {frame_rate}")
+        if policy not in SCHEDULE_POLICIES:
+            raise ValueError(f"Unknown schedule policy: {policy}. Must be one of: {', '.join(SCHEDULE_POLICIES)}")
+
+        self.frame_rate = frame_rate
+        self.interval = 1.0 / frame_rate
+        self.policy = policy
+        self.max_catch_up = max(0, max_catch_up)
+        self._clock = clock
+
+        self._started_at: Optional[float] = None
+        self._next_index = 0
+
+        # Statistics
+        self._lock = threading.Lock()
+        self.ticks = 0
+        self.dropped = 0
+        self.late_ticks = 0
+        self._jitter_counts = [0] * (len(JITTER_BUCKETS_MS) + 1)
+        self._jitter_total = 0.0
+        self._jitter_max = 0.0
+
+    @classmethod
+    def from_config(cls, frame_rate: float) -> 'FrameScheduler':
+        """Create a scheduler with the capture service's policy."""
+        from CAMF.common.config import get_config
+        capture_config = get_config().capture
+        return cls(frame_rate, policy=capture_config.schedule_policy,
+                   max_catch_up=capture_config.max_catch_up_frames)
+
+    def start(self, at: Optional[float] = None):
+        """Start the grid; the first deadline is now (or ``at``)."""
+        self._started_at = self._clock() if at is None else at
+        self._next_index = 0
+
+    def wait(self, stop_event: Optional[threading.Event] = None) -> Optional[FrameTick]:
+        """
+        Block until the next deadline.
+
+        Args:
+            stop_event: Event that aborts the wait when set
+
+        Returns:
+            The fired tick, or None if stopped
+        """
+        if self._started_at is None:
+            self.start()
+
+        deadline = self._deadline(self._next_index)
+        while True:
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                break
+            if stop_event is None:
+                time.sleep(remaining)
+            elif stop_event.wait(remaining):
+                return None
+        if stop_event is not None and stop_event.is_set():
+            return None
+
+        now = self._clock()
+        index = self._next_index
+        missed = int((now - deadline) / self.interval)
+        if missed > 0:
+            # Under catch_up the most recent max_catch_up missed deadlines still fire
+            skip = missed if self.policy == "drop" else max(0, missed - self.max_catch_up)
+            index += skip
+            deadline = self._deadline(index)
+            if skip:
+                with self._lock:
+                    self.dropped += skip
+                logger.debug(f"Frame schedule {missed} deadlines behind, dropped {skip}")
+
+        self._next_index = index + 1
+        tick = FrameTick(index, deadline, now, now - self._started_at)
+        self._record(tick.lateness)
+        return tick
+
+    def _deadline(self, index: int) -> float:
+        return self._started_at + index * self.interval
+
+    def _record(self, lateness: float):
+        lateness_ms = max(0.0, lateness * 1000)
+        with self._lock:
+            self.ticks += 1
+            if lateness >= self.interval:
+                self.late_ticks += 1
+            self._jitter_counts[bisect.bisect_left(JITTER_BUCKETS_MS, lateness_ms)] += 1
+            self._jitter_total += lateness_ms
+            self._jitter_max = max(self._jitter_max, lateness_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tick counters and the jitter histogram."""
+        with self._lock:
+            labels = [f"<={bound:g}ms" for bound in JITTER_BUCKETS_MS] + [f">{JITTER_BUCKETS_MS[-1]:g}ms"]
+            return {
+                'frame_rate': self.frame_rate,
+                'policy': self.policy,
+                'ticks': self.ticks,
+                'dropped': self.dropped,
+                'late_ticks': self.late_ticks,
+                'mean_jitter_ms': self._jitter_total / self.ticks if self.ticks else 0.0,
+                'max_jitter_ms': self._jitter_max,
+                'jitter_histogram': dict(zip(labels, self._jitter_counts)),
+            }
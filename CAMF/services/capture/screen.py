@@ -1,7 +1,13 @@
 # screen.py
-import numpy as np
+import threading
+import time
+from collections import deque
 from typing import List, Dict, Any, Optional
 
+import cv2
+import numpy as np
+
+from .frame_pool import FrameLease, FramePool
 from .source import CaptureSource
 
 try:
@@ -11,10 +17,143 @@ try:
 except ImportError:
     MSS_AVAILABLE = False
 
+
+class ScreenGrabber:
+    """Persistent mss grabber writing into recycled BGR frame buffers.
+
+    Opening an mss instance connects to the display server and sets up grab
+    buffers, so a grabber is opened once and reused for every frame. mss
+    handles are bound to the thread that opened them: each capture thread
+    owns its own grabber.
+
+    With a tile size, each grab is compared against the previous one tile by
+    tile and only changed tiles are converted into the frame; ``damage`` then
+    holds the per-tile change mask of the last grab. An unchanged grab returns
+    the previous frame as is. While the previous frame is still leased
+    elsewhere it is copied before being written (copy-on-write).
+    """
+
+    # Above this fraction of changed tiles one full conversion is cheaper
+    FULL_CONVERT_FRACTION = 0.25
+
+    def __init__(self, monitor_id: int, region: Optional[tuple] = None, tile_size: int = 0,
+                 frame_pool: Optional[FramePool] = None):
+        """
+        Args:
+            monitor_id: ID of the monitor to capture
+            region: Region to capture as (left, top, width, height) or None for full monitor
+            tile_size: Edge of the change-detection tiles in pixels, 0 to convert every frame fully
+            frame_pool: Pool frame buffers come from
+        """
+        self._frame: Optional[np.ndarray] = None
+        self._lease: Optional[FrameLease] = None
+        self._previous: Optional[np.ndarray] = None
+        self.damage: Optional[np.ndarray] = None
+
+        self._sct = mss.mss()
+        monitors = self._sct.monitors
+        if monitor_id >= len(monitors):
+            self.close()
+            raise ValueError(f"Monitor {monitor_id} no longer available")
+
+        self.monitor_info = monitors[monitor_id]
+        if region:
+            left, top, width, height = region
+        else:
+            left, top = self.monitor_info["left"], self.monitor_info["top"]
+            width, height = self.monitor_info["width"], self.monitor_info["height"]
+        self.region = {"left": left, "top": top, "width": width, "height": height}
+        self.tile_size = tile_size
+        self.frame_pool = frame_pool or FramePool()
+
+        # Statistics
+        self.tiles_checked = 0
+        self.tiles_changed = 0
+        self.unchanged_frames = 0
+
+    def grab(self) -> np.ndarray:
+        """Grab the region.
+
+        Returns:
+            BGR frame from the frame pool, leased by the grabber until the
+            next grab; holders keeping it longer take their own lease
+        """
+        shot = self._sct.grab(self.region)
+        height, width = shot.height, shot.width
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(height, width, 4)
+
+        if self._frame is None or self._frame.shape[:2] != (height, width):
+            self._use_buffer(self.frame_pool.acquire((height, width, 3)))
+            self._previous = np.empty((height, width), dtype=np.uint32) if self.tile_size else None
+            self._convert_full(bgra)
+        elif self.tile_size:
+            self._convert_changed_tiles(bgra)
+        else:
+            # Let go of the previous frame so it is reused if nobody else holds it
+            self._use_buffer(None)
+            self._use_buffer(self.frame_pool.acquire((height, width, 3)))
+            cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self._frame)
+
+        return self._frame
+
+    def _use_buffer(self, lease: Optional[FrameLease]):
+        """Make a leased buffer the frame, releasing the previous one."""
+        if self._lease is not None:
+            self._lease.release()
+        self._lease = lease
+        self._frame = lease.frame if lease is not None else None
+
+    def _convert_full(self, bgra: np.ndarray):
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self._frame)
+        if self._previous is not None:
+            np.copyto(self._previous, bgra.view(np.uint32)[..., 0])
+            self.damage = None
+
+    def _convert_changed_tiles(self, bgra: np.ndarray):
+        """Convert only the tiles that differ from the previous grab."""
+        tile = self.tile_size
+        pixels = bgra.view(np.uint32)[..., 0]
+        changed = pixels != self._previous
+
+        height, width = pixels.shape
+        damage = np.logical_or.reduceat(changed, np.arange(0, height, tile), axis=0)
+        damage = np.logical_or.reduceat(damage, np.arange(0, width, tile), axis=1)
+        changed_tiles = int(np.count_nonzero(damage))
+
+        self.tiles_checked += damage.size
+        self.tiles_changed += changed_tiles
+        if not changed_tiles:
+            self.unchanged_frames += 1
+        elif changed_tiles > damage.size * self.FULL_CONVERT_FRACTION:
+            if self._lease.shared:
+                self._use_buffer(self.frame_pool.acquire(bgra.shape[:2] + (3,)))
+            self._convert_full(bgra)
+        else:
+            if self._lease.shared:
+                self._use_buffer(self.frame_pool.copy(self._frame))
+            for row, column in zip(*np.nonzero(damage)):
+                rows = slice(row * tile, (row + 1) * tile)
+                columns = slice(column * tile, (column + 1) * tile)
+                self._previous[rows, columns] = pixels[rows, columns]
+                self._frame[rows, columns] = bgra[rows, columns, :3]
+        self.damage = damage
+
+    def close(self):
+        """Close the display connection."""
+        self._use_buffer(None)
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
+
+
 class ScreenSource(CaptureSource):
     """Screen-based capture source with fixed threading support."""
     
-    def __init__(self, monitor_id=1, region=None, frame_rate=24, max_resolution=None):
+    # Grab latencies kept for percentiles
+    LATENCY_WINDOW = 1000
+    
+    def __init__(self, monitor_id=1, region=None, frame_rate=24, max_resolution=None,
+                 persistent_grabber=True, tile_size=0):
         """Initialize a screen source.
         
         Args:
@@ -22,15 +161,27 @@ class ScreenSource(CaptureSource):
             region: Region to capture as (left, top, width, height) or None for full monitor
             frame_rate: Frames per second to capture
             max_resolution: Maximum resolution as (width, height) or None
+            persistent_grabber: Keep one grabber per capture thread instead of opening one per frame
+            tile_size: Edge of change-detection tiles in pixels (persistent grabber only), 0 to disable
         """
         # Call parent WITHOUT name parameter
         super().__init__(frame_rate, max_resolution)
         self.monitor_id = monitor_id
         self.region = region
         self.monitor_info = None
+        self.persistent_grabber = persistent_grabber
+        self.tile_size = tile_size
         # Set name after initialization
         self.name = f"Monitor {monitor_id}"
         
+        # Grabbers by owning thread
+        self._local = threading.local()
+        self._grabbers: List[ScreenGrabber] = []
+        self._grabbers_lock = threading.Lock()
+        self._grab_times = deque(maxlen=self.LATENCY_WINDOW)
+        self._grab_count = 0
+        self._stats_lock = threading.Lock()
+        
         if not MSS_AVAILABLE:
             raise ImportError("mss library is required for screen capture. Install with: pip install mss")
         
@@ -69,8 +220,23 @@ class ScreenSource(CaptureSource):
     def disconnect(self):
         """Disconnect from the screen source."""
         self.stop_capture()
+        with self._grabbers_lock:
+            grabbers, self._grabbers = self._grabbers, []
+        for grabber in grabbers:
+            try:
+                grabber.close()
+            except Exception as e:
+                print(f"Error closing screen grabber: {e}")
+        self._local = threading.local()
         self.monitor_info = None
     
+    def _capture_loop(self):
+        """Run the capture loop, closing this thread's grabber when it ends."""
+        try:
+            super()._capture_loop()
+        finally:
+            self._close_thread_grabber()
+    
     def _capture_frame(self) -> Optional[np.ndarray]:
         """Capture a single frame from the screen.
         
@@ -81,6 +247,50 @@ class ScreenSource(CaptureSource):
             print("No monitor info available")
             return None
         
+        start = time.perf_counter()
+        if self.persistent_grabber:
+            frame = self._grab_persistent()
+        else:
+            frame = self._grab_per_frame()
+        
+        if frame is not None:
+            with self._stats_lock:
+                self._grab_times.append(time.perf_counter() - start)
+                self._grab_count += 1
+        return frame
+    
+    def _grab_persistent(self) -> Optional[np.ndarray]:
+        """Grab with the calling thread's grabber, opening it on first use."""
+        grabber = getattr(self._local, 'grabber', None)
+        try:
+            if grabber is None:
+                grabber = ScreenGrabber(self.monitor_id, self.region, self.tile_size, self._frame_pool)
+                self.monitor_info = grabber.monitor_info
+                self._local.grabber = grabber
+                with self._grabbers_lock:
+                    self._grabbers.append(grabber)
+            return grabber.grab()
+        except Exception as e:
+            print(f"Error capturing screen: {e}")
+            # Monitors may have changed; reopen on the next frame
+            self._close_thread_grabber()
+            return None
+    
+    def _close_thread_grabber(self):
+        grabber = getattr(self._local, 'grabber', None)
+        if grabber is None:
+            return
+        self._local.grabber = None
+        with self._grabbers_lock:
+            if grabber in self._grabbers:
+                self._grabbers.remove(grabber)
+        try:
+            grabber.close()
+        except Exception as e:
+            print(f"Error closing screen grabber: {e}")
+    
+    def _grab_per_frame(self) -> Optional[np.ndarray]:
+        """Grab with a new mss instance, as a baseline for the persistent grabber."""
         try:
             # Create MSS instance in the capture thread
             with mss.mss() as sct:
@@ -110,22 +320,43 @@ class ScreenSource(CaptureSource):
                 # Capture screenshot
                 screenshot = sct.grab(region)
                 
-                # Convert to numpy array
-                frame = np.array(screenshot)
-                
                 # Convert from BGRA to BGR (OpenCV format)
-                import cv2
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-                
-                print(f"Captured frame from monitor {self.monitor_id}: {frame.shape}")
-                
-                return frame
+                return cv2.cvtColor(np.array(screenshot), cv2.COLOR_BGRA2BGR)
         except Exception as e:
             print(f"Error capturing screen: {e}")
-            import traceback
-            traceback.print_exc()
             return None
     
+    def get_grab_stats(self) -> Dict[str, Any]:
+        """Get grab latency percentiles and change-detection counters."""
+        with self._stats_lock:
+            times = np.array(self._grab_times) * 1000
+            grab_count = self._grab_count
+        stats = {
+            "mode": "persistent" if self.persistent_grabber else "per_frame",
+            "grabs": grab_count,
+            "p50_ms": float(np.percentile(times, 50)) if times.size else 0.0,
+            "p95_ms": float(np.percentile(times, 95)) if times.size else 0.0,
+            "p99_ms": float(np.percentile(times, 99)) if times.size else 0.0,
+            "max_ms": float(times.max()) if times.size else 0.0,
+            "tile_size": self.tile_size,
+        }
+        
+        if self.persistent_grabber and self.tile_size:
+            with self._grabbers_lock:
+                grabbers = list(self._grabbers)
+            tiles_checked = sum(g.tiles_checked for g in grabbers)
+            stats["tiles_changed_ratio"] = (
+                sum(g.tiles_changed for g in grabbers) / tiles_checked if tiles_checked else 0.0
+            )
+            stats["unchanged_frames"] = sum(g.unchanged_frames for g in grabbers)
+        return stats
+    
+    def get_status(self) -> dict:
+        """Get capture source status."""
+        status = super().get_status()
+        status["grab"] = self.get_grab_stats()
+        return status
+    
     @staticmethod
     def list_monitors() -> List[Dict[str, Any]]:
         """List available monitors on the system."""
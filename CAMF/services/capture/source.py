@@ -7,6 +7,9 @@ import logging
 
 import numpy as np
 
+from .frame_pool import FrameLease, FramePool, retain_frame, share_frame
+from .scheduler import FrameScheduler
+
 logger = logging.getLogger(__name__)
 
 class CaptureSource(ABC):
@@ -29,10 +32,15 @@ class CaptureSource(ABC):
         self.frame_rate = frame_rate
         self.max_resolution = max_resolution
         self._running = False
+        self._stop_event = threading.Event()
+        self._scheduler: Optional[FrameScheduler] = None
         self._frame_callbacks = []
         self._error_callbacks = []
+        self._frame_pool = FramePool()
         self._thread = None
         self._last_frame = None
+        self._last_lease: Optional[FrameLease] = None
+        self._scaled_lease: Optional[FrameLease] = None
         self._start_time = None
         self._frames_captured = 0
     
@@ -66,7 +74,9 @@ class CaptureSource(ABC):
             return False
         
         self._running = True
+        self._stop_event.clear()
         self._start_time = time.time()
+        self._scheduler = FrameScheduler.from_config(self.frame_rate)
         self._thread = threading.Thread(target=self._capture_loop)
         self._thread.daemon = True
         self._thread.start()
@@ -75,6 +85,7 @@ class CaptureSource(ABC):
     def stop_capture(self):
         """Stop capturing frames immediately."""
         self._running = False  # Set flag first
+        self._stop_event.set()  # Wake the loop from its wait for the next deadline
         
         if self._thread and self._thread != threading.current_thread():
             # Only join if we're not in the same thread (avoids "cannot join current thread" error)
@@ -93,15 +104,37 @@ class CaptureSource(ABC):
     def add_frame_callback(self, callback: Callable[[np.ndarray, float], None]):
         """Add a callback to be called for each new frame.
         
+        Every callback receives the same read-only frame; callbacks that need
+        to modify it take a copy with ``frame_pool.make_writable(frame)``.
+        The frame is only guaranteed intact during the call; callbacks that
+        keep it take a lease with ``retain_frame(frame)`` and release it when
+        done.
+        
         Args:
             callback: Function to call with (frame, relative_time)
         """
         self._frame_callbacks.append(callback)
     
     def get_last_frame(self) -> Optional[np.ndarray]:
-        """Get the most recently captured frame."""
+        """Get the most recently captured frame (read-only).
+        
+        It is kept until the next frame replaces it; take a lease with
+        ``retain_frame`` to keep it longer.
+        """
         return self._last_frame
     
+    def _keep_last_frame(self, frame: np.ndarray):
+        """Hold the newest frame for ``get_last_frame``, releasing the one it replaces."""
+        previous, self._last_lease = self._last_lease, retain_frame(frame)
+        self._last_frame = frame
+        if previous is not None:
+            previous.release()
+    
+    @property
+    def frame_pool(self) -> FramePool:
+        """Pool the source's frame buffers come from."""
+        return self._frame_pool
+    
     def _downscale_if_needed(self, frame: np.ndarray) -> np.ndarray:
         """Downscale the frame if its resolution exceeds the maximum."""
         if self.max_resolution is None:
@@ -119,11 +152,14 @@ class CaptureSource(ABC):
         new_height = int(height * ratio)
         
         import cv2
-        return cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
+        # Holders of the previous downscaled frame have taken their own leases
+        if self._scaled_lease is not None:
+            self._scaled_lease.release()
+        self._scaled_lease = self._frame_pool.acquire((new_height, new_width) + frame.shape[2:], frame.dtype)
+        return cv2.resize(frame, (new_width, new_height), dst=self._scaled_lease.frame, interpolation=cv2.INTER_AREA)
     
     def _capture_loop(self):
-        """Capture loop that runs in a separate thread with accurate timing."""
-        frame_interval = 1.0 / self.frame_rate if self.frame_rate > 0 else float('inf')
+        """Capture loop that runs in a separate thread on the frame scheduler's deadlines."""
         consecutive_failures = 0
         max_consecutive_failures = 10
         frames_captured = 0
@@ -131,106 +167,74 @@ class CaptureSource(ABC):
         logger.info(f"Starting capture loop for {self.__class__.__name__} at {self.frame_rate} FPS")
         logger.debug(f"Frame callbacks registered: {len(self._frame_callbacks)}")
         
-        # Use absolute timing for accurate frame rate
-        next_frame_time = time.time()
+        # Absolute monotonic deadlines; blocks between frames instead of polling
+        scheduler = self._scheduler
+        scheduler.start()
         
         while self._running:
-            # Check at the beginning of each iteration
-            if not self._running:
+            tick = scheduler.wait(self._stop_event)
+            if tick is None or not self._running:
                 break
                 
-            current_time = time.time()
+            # Capture frame
+            frame = self._capture_frame()
             
-            # Wait until it's time for the next frame
-            if current_time >= next_frame_time:
-                # Double-check before capturing
-                if not self._running:
-                    break
-                    
-                # Capture frame
-                capture_start = time.time()
-                frame = self._capture_frame()
-                capture_duration = time.time() - capture_start
+            if frame is not None and self._running:
+                consecutive_failures = 0  # Reset failure counter
+                frames_captured += 1
                 
-                if frame is not None and self._running:
-                    consecutive_failures = 0  # Reset failure counter
-                    frames_captured += 1
-                    
-                    # Downscale if needed
-                    frame = self._downscale_if_needed(frame)
-                    
-                    # Store the frame
-                    self._last_frame = frame
-                    self._frames_captured = frames_captured
-                    
-                    # Calculate relative time from start
-                    relative_time = current_time - self._start_time
-                    
-                    # Debug: log every 30th frame to reduce spam
-                    if frames_captured % 30 == 1:
-                        logger.debug(f"Frame {frames_captured} captured at {relative_time:.2f}s")
+                # Downscale if needed, then share one read-only frame with every callback
+                frame = share_frame(self._downscale_if_needed(frame))
+                
+                # Store the frame
+                self._keep_last_frame(frame)
+                self._frames_captured = frames_captured
+                
+                # Relative time from start of capture
+                relative_time = tick.elapsed
+                
+                # Debug: log every 30th frame to reduce spam
+                if frames_captured % 30 == 1:
+                    logger.debug(f"Frame {frames_captured} captured at {relative_time:.2f}s")
+                
+                # Call all callbacks
+                for idx, callback in enumerate(self._frame_callbacks):
+                    try:
+                        callback(frame, relative_time)
+                        if frames_captured == 1:  # Log first frame callback
+                            logger.debug(f"Callback {idx} executed successfully")
+                    except Exception as e:
+                        logger.error(f"Error in frame callback {idx}: {e}")
+            else:
+                consecutive_failures += 1
+                
+                # Check if too many failures
+                if consecutive_failures >= max_consecutive_failures:
+                    error_msg = f"Source failed after {consecutive_failures} consecutive capture failures"
+                    logger.error(f"CRITICAL: {error_msg}")
                     
-                    # Call all callbacks
-                    callback_start = time.time()
-                    for idx, callback in enumerate(self._frame_callbacks):
+                    # Notify error callbacks
+                    for callback in self._error_callbacks:
                         try:
-                            callback(frame.copy(), relative_time)
-                            if frames_captured == 1:  # Log first frame callback
-                                logger.debug(f"Callback {idx} executed successfully")
+                            callback(error_msg)
                         except Exception as e:
-                            logger.error(f"Error in frame callback {idx}: {e}")
+                            logger.error(f"Error in error callback: {e}")
                     
-                    time.time() - callback_start
+                    # FAILPROOF: Don't stop immediately, try to continue
+                    # Reset counter to give it more chances
+                    if hasattr(self, '_total_failure_resets'):
+                        self._total_failure_resets += 1
+                        if self._total_failure_resets > 3:
+                            # OK, really stop now
+                            break
+                    else:
+                        self._total_failure_resets = 1
                     
-                    # Calculate next frame time based on fixed interval
-                    # This ensures consistent frame rate regardless of processing time
-                    next_frame_time += frame_interval
-                    
-                    # If we're running behind, catch up
-                    if next_frame_time < current_time:
-                        # Skip frames if we're more than 2 intervals behind
-                        frames_behind = int((current_time - next_frame_time) / frame_interval)
-                        if frames_behind > 2:
-                            logger.warning(f"Running {frames_behind} frames behind, skipping to catch up")
-                            next_frame_time = current_time + frame_interval
-                else:
-                    consecutive_failures += 1
-                    
-                    # Check if too many failures
-                    if consecutive_failures >= max_consecutive_failures:
-                        error_msg = f"Source failed after {consecutive_failures} consecutive capture failures"
-                        logger.error(f"CRITICAL: {error_msg}")
-                        
-                        # Notify error callbacks
-                        for callback in self._error_callbacks:
-                            try:
-                                callback(error_msg)
-                            except Exception as e:
-                                logger.error(f"Error in error callback: {e}")
-                        
-                        # FAILPROOF: Don't stop immediately, try to continue
-                        # Reset counter to give it more chances
-                        if hasattr(self, '_total_failure_resets'):
-                            self._total_failure_resets += 1
-                            if self._total_failure_resets > 3:
-                                # OK, really stop now
-                                break
-                        else:
-                            self._total_failure_resets = 1
-                        
-                        consecutive_failures = 0  # Reset to try again
-                        time.sleep(1.0)  # Wait a second before retrying
-                    
-                    elif consecutive_failures % 10 == 1:
-                        logger.warning(f"Frame capture failed ({consecutive_failures} consecutive failures)")
-                            
-                # Check if we should stop after processing
-                if not self._running:
-                    break
-            
-            # Sleep to avoid CPU thrashing
-            sleep_time = min(0.001, frame_interval / 20)  # Check 20x per frame interval
-            time.sleep(sleep_time)
+                    consecutive_failures = 0  # Reset to try again
+                    self._stop_event.wait(1.0)  # Wait a second before retrying
+                
+                elif consecutive_failures % 10 == 1:
+                    logger.warning(f"Frame capture failed ({consecutive_failures} consecutive failures)")
         
         logger.info(f"Capture loop ended for {self.__class__.__name__} - captured {frames_captured} frames")
     
@@ -245,6 +249,13 @@ class CaptureSource(ABC):
             duration = time.time() - self._start_time
             status["duration"] = duration
             status["actual_fps"] = status["frames_captured"] / duration if duration > 0 else 0
+        if self._scheduler:
+            status["schedule"] = self._scheduler.get_stats()
+        pool_stats = self._frame_pool.get_stats()
+        frames = max(status["frames_captured"], 1)
+        pool_stats["allocations_per_frame"] = pool_stats["allocations"] / frames
+        pool_stats["bytes_copied_per_frame"] = pool_stats["bytes_copied"] / frames
+        status["frame_pool"] = pool_stats
         return status
     
     def __enter__(self):
@@ -9,6 +9,9 @@ import threading
 import time
 import numpy as np
 
+from .frame_pool import FramePool, share_frame
+from .scheduler import FrameScheduler
+
 class VideoUploadProcessor:
     """Processes uploaded video files frame by frame."""
     
@@ -22,6 +25,8 @@ class VideoUploadProcessor:
         self._processing_thread: Optional[threading.Thread] = None
         self._stop_processing = threading.Event()
         self._frame_callbacks = []
+        self._scheduler: Optional[FrameScheduler] = None
+        self.frame_pool = FramePool()
         
     def load_video(self, video_path: str) -> Dict[str, Any]:
         """Load a video file and get its metadata."""
@@ -118,39 +123,54 @@ class VideoUploadProcessor:
         return frame if ret else None
     
     def add_frame_callback(self, callback: Callable[[np.ndarray, float], None]):
-        """Add a callback for processed frames."""
+        """Add a callback for processed frames.
+        
+        Every callback receives the same read-only frame; copy it with
+        ``frame_pool.make_writable(frame)`` to modify it, and take a lease
+        with ``retain_frame(frame)`` to keep it beyond the call.
+        """
         self._frame_callbacks.append(callback)
     
     def _process_frames(self, target_fps: float):
         """Process frames at the target frame rate."""
-        frame_interval = 1.0 / target_fps if target_fps > 0 else 0.0
-        time.time()
+        # Without a target rate frames are processed as fast as they decode
+        scheduler = self._scheduler = FrameScheduler.from_config(target_fps) if target_fps > 0 else None
+        frame_shape = None
+        lease = None
         
         while not self._stop_processing.is_set() and self.current_frame_index < self.total_frames:
-            frame_start_time = time.time()
+            if scheduler and scheduler.wait(self._stop_processing) is None:
+                break
             
-            # Read next frame
-            ret, frame = self.video_capture.read()
+            # Read next frame into a free buffer of the previous frame's size;
+            # callbacks that kept the previous frame hold their own leases
+            if lease is not None:
+                lease.release()
+                lease = None
+            if frame_shape is not None:
+                lease = self.frame_pool.acquire(frame_shape)
+                ret, frame = self.video_capture.read(lease.frame)
+            else:
+                ret, frame = self.video_capture.read()
             if not ret:
                 break
+            frame_shape = frame.shape
             
             # Calculate relative timestamp
             relative_time = self.current_frame_index / self.fps if self.fps > 0 else 0
             
-            # Call callbacks
+            # Every callback gets the same read-only frame
+            frame = share_frame(frame)
             for callback in self._frame_callbacks:
                 try:
-                    callback(frame.copy(), relative_time)
+                    callback(frame, relative_time)
                 except Exception as e:
                     print(f"Error in frame callback: {e}")
             
             self.current_frame_index += 1
-            
-            # Control frame rate
-            processing_time = time.time() - frame_start_time
-            if processing_time < frame_interval:
-                time.sleep(frame_interval - processing_time)
         
+        if lease is not None:
+            lease.release()
         self.is_processing = False
     
     def cleanup(self):
@@ -171,7 +191,8 @@ class VideoUploadProcessor:
             'current_frame': self.current_frame_index,
             'total_frames': self.total_frames,
             'progress_percentage': (self.current_frame_index / self.total_frames * 100) if self.total_frames > 0 else 0,
-            'is_processing': self.is_processing
+            'is_processing': self.is_processing,
+            'schedule': self._scheduler.get_stats() if self._scheduler else None
         }
     
     def process_upload(self, take_id: int, video_path: str, storage) -> int:
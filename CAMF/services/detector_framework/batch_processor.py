@@ -9,7 +9,7 @@ import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass
-import hashlib
+from collections import deque
 import cv2
 import numpy as np
 import psutil
@@ -19,6 +19,7 @@ import tempfile
 import shutil
 
 from CAMF.common.models import DetectorResult, ErrorConfidence
+from .change_gate import dhash, hamming_distance
 
 logger = logging.getLogger(__name__)
 
@@ -156,20 +157,19 @@ class ResourceMonitor:
 class FrameDeduplicator:
     """Handles frame deduplication to avoid processing similar frames."""
     
+    HASH_BITS = 64
+    
     def __init__(self, threshold: float = 0.99):
         self.threshold = threshold
+        # Hashes whose share of matching bits reaches the threshold are duplicates
+        self.max_distance = int((1.0 - threshold) * self.HASH_BITS)
         self.frame_hashes = {}
+        self.recent_hashes = deque(maxlen=30)  # (hash, frame_id) of the latest unique frames
         self.similar_frames = {}  # Maps duplicate frames to original
     
-    def compute_frame_hash(self, frame: np.ndarray) -> str:
-        """Compute perceptual hash for frame."""
-        # Resize to small size for faster comparison
-        small_frame = cv2.resize(frame, (32, 32))
-        # Convert to grayscale
-        if len(small_frame.shape) == 3:
-            small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
-        # Compute hash
-        return hashlib.md5(small_frame.tobytes()).hexdigest()
+    def compute_frame_hash(self, frame: np.ndarray) -> int:
+        """Compute perceptual (difference) hash for frame."""
+        return dhash(frame)
     
     def compute_frame_similarity(self, frame1: np.ndarray, frame2: np.ndarray) -> float:
         """Compute similarity between two frames."""
@@ -200,31 +200,20 @@ class FrameDeduplicator:
             self.similar_frames[frame_id] = original_id
             return original_id
         
-        # Check similarity with recent frames (last 30)
-        recent_frames = sorted(self.frame_hashes.items(), 
-                             key=lambda x: x[1], reverse=True)[:30]
-        
-        for stored_hash, stored_id in recent_frames:
-            # Skip if we already compared
-            if stored_id in self.similar_frames:
-                continue
-                
-            # For efficiency, only do detailed comparison if hashes are somewhat similar
+        # Check similarity with recent frames (last 30), newest first
+        for stored_hash, stored_id in reversed(self.recent_hashes):
             if self._hashes_similar(frame_hash, stored_hash):
-                # Load stored frame for comparison (would need frame storage)
-                # For now, we'll just use hash similarity
                 self.similar_frames[frame_id] = stored_id
                 return stored_id
         
         # Not a duplicate, store it
         self.frame_hashes[frame_hash] = frame_id
+        self.recent_hashes.append((frame_hash, frame_id))
         return None
     
-    def _hashes_similar(self, hash1: str, hash2: str) -> bool:
-        """Quick check if two hashes are similar."""
-        # Simple character comparison
-        matches = sum(c1 == c2 for c1, c2 in zip(hash1, hash2))
-        return matches / len(hash1) > 0.8
+    def _hashes_similar(self, hash1: int, hash2: int) -> bool:
+        """Check if two hashes differ in few enough bits to be the same image."""
+        return hamming_distance(hash1, hash2) <= self.max_distance
     
     def get_unique_frames(self, frame_ids: List[int]) -> List[int]:
         """Get list of unique frames from a set of frame IDs."""
@@ -0,0 +1,245 @@
+# CAMF/services/detector_framework/change_gate.py
+"""
+Perceptual change gating of detector invocations.
+
+Each frame pair gets a perceptual signature: a 64-bit difference hash (dHash)
+or DCT hash (pHash) of the current and of the reference frame. Detectors that
+opt in with a threshold are skipped when both hashes are within that many
+bits (Hamming distance) of the last pair the detector actually processed in
+the same take; the previous results are reused instead. On a static lock-off
+shot most frames differ only by sensor noise, so most invocations are saved.
+
+A detector opts in through its detector.json::
+
+    "change_gate": {"threshold": 4}
+
+Threshold 0 only skips pairs whose hashes are identical.
+"""
+
+import threading
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional
+
+import cv2
+import numpy as np
+import logging
+
+from CAMF.common.models import DetectorResult
+
+logger = logging.getLogger(__name__)
+
+
+def _thumbnail(frame: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Area-averaged grayscale thumbnail.
+
+    Channels are averaged with equal weight, so RGB and BGR copies of a frame
+    hash the same.
+    """
+    # Area-averaging a full frame down to a few pixels is slow; averaging
+    # a regular subsample with at least 16x16 pixels per cell is as stable
+    step = max(1, min(frame.shape[0] // (height * 16), frame.shape[1] // (width * 16)))
+    small = cv2.resize(frame[::step, ::step], (width, height), interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        return small.mean(axis=2, dtype=np.float32)
+    return small.astype(np.float32)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), 'big')
+
+
+def dhash(frame: np.ndarray, hash_size: int = 8) -> int:
+    """
+    Difference hash: whether each pixel of a thumbnail is brighter than its right neighbour.
+
+    Args:
+        frame: Grayscale or 3-channel frame
+        hash_size: Hash is hash_size x hash_size bits
+
+    Returns:
+        Hash as an integer
+    """
+    thumbnail = _thumbnail(frame, hash_size + 1, hash_size)
+    return _bits_to_int(thumbnail[:, 1:] > thumbnail[:, :-1])
+
+
+@lru_cache(maxsize=4)
+def _dct_matrix(size: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so ``D @ x @ D.T`` is the 2-D DCT of ``x``."""
+    n = np.arange(size)
+    matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size)) * np.sqrt(2.0 / size)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+
+def phash(frame: np.ndarray, hash_size: int = 8, highfreq_factor: int = 4) -> int:
+    """
+    Perceptual hash: signs of the lowest DCT frequencies of a thumbnail against their median.
+
+    Args:
+        frame: Grayscale or 3-channel frame
+        hash_size: Hash is hash_size x hash_size bits
+        highfreq_factor: Thumbnail is this many times larger than the hash
+
+    Returns:
+        Hash as an integer
+    """
+    size = hash_size * highfreq_factor
+    dct_matrix = _dct_matrix(size)
+    coefficients = (dct_matrix @ _thumbnail(frame, size, size) @ dct_matrix.T)[:hash_size, :hash_size]
+    return _bits_to_int(coefficients > np.median(coefficients))
+
+
+HASH_FUNCTIONS = {
+    'dhash': dhash,
+    'phash': phash,
+}
+
+
+def hamming_distance(hash1: int, hash2: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (hash1 ^ hash2).bit_count()
+
+
+class PairSignature(NamedTuple):
+    """Perceptual hashes of a current/reference frame pair."""
+    current: int
+    reference: int
+
+    def distance(self, other: 'PairSignature') -> int:
+        """The larger Hamming distance of the two frames."""
+        return max(hamming_distance(self.current, other.current),
+                   hamming_distance(self.reference, other.reference))
+
+
+@dataclass
+class GateStats:
+    """Counters of one detector's gate."""
+    checks: int = 0
+    skips: int = 0
+    runs: int = 0
+    saved_seconds: float = 0.0
+
+
+@dataclass
+class _LastRun:
+    context: Hashable
+    signature: PairSignature
+    results: List[DetectorResult]
+    duration: float
+
+
+class ChangeGate:
+    """
+    Skips detectors on frame pairs perceptually unchanged since their last run.
+
+    Detectors are gated only once given a threshold; others always run.
+    Thread-safe: detector workers check and record concurrently.
+    """
+
+    def __init__(self, method: str = 'dhash'):
+        """
+        Args:
+            method: Perceptual hash of frames, 'dhash' or 'phash'
+        """
+        if method not in HASH_FUNCTIONS:
+            raise ValueError(f"Unknown perceptual hash: {method}")
+        self.method = method
+        self._hash = HASH_FUNCTIONS[method]
+        self._thresholds: Dict[str, int] = {}
+        self._last_runs: Dict[str, _LastRun] = {}
+        self._stats: Dict[str, GateStats] = {}
+        self._lock = threading.Lock()
+
+    def set_threshold(self, detector_name: str, threshold: Optional[int]):
+        """
+        Opt a detector in to gating, or out with ``None``.
+
+        Args:
+            detector_name: Detector name
+            threshold: Largest Hamming distance still counted as unchanged
+        """
+        with self._lock:
+            self._last_runs.pop(detector_name, None)
+            if threshold is None:
+                self._thresholds.pop(detector_name, None)
+            else:
+                self._thresholds[detector_name] = max(0, int(threshold))
+                self._stats.setdefault(detector_name, GateStats())
+
+    def is_gated(self, detector_name: str) -> bool:
+        """Whether a detector has opted in."""
+        return detector_name in self._thresholds
+
+    @property
+    def active(self) -> bool:
+        """Whether any detector has opted in."""
+        return bool(self._thresholds)
+
+    def signature(self, current_frame: np.ndarray, reference_frame: np.ndarray) -> PairSignature:
+        """Compute the perceptual signature of a frame pair."""
+        return PairSignature(self._hash(current_frame), self._hash(reference_frame))
+
+    def lookup(self, detector_name: str, signature: PairSignature,
+               context: Hashable = None) -> Optional[List[DetectorResult]]:
+        """
+        Get the results of the detector's last run if this pair is unchanged from it.
+
+        Args:
+            detector_name: Detector name
+            signature: Signature of the pair about to be processed
+            context: Runs only match within the same context (e.g. the take)
+
+        Returns:
+            The last run's results, or None if the detector must run
+        """
+        with self._lock:
+            threshold = self._thresholds.get(detector_name)
+            if threshold is None:
+                return None
+            stats = self._stats[detector_name]
+            stats.checks += 1
+            last_run = self._last_runs.get(detector_name)
+            if (last_run is None or last_run.context != context
+                    or last_run.signature.distance(signature) > threshold):
+                return None
+            stats.skips += 1
+            stats.saved_seconds += last_run.duration
+            return last_run.results
+
+    def record(self, detector_name: str, signature: PairSignature, results: List[DetectorResult],
+               context: Hashable = None, duration: float = 0.0):
+        """
+        Remember a detector run as the reference for later pairs.
+
+        Args:
+            detector_name: Detector name
+            signature: Signature of the processed pair
+            results: Results of the run
+            context: Context the run belongs to
+            duration: Time the run took, counted as saved by each skip
+        """
+        with self._lock:
+            if detector_name not in self._thresholds:
+                return
+            self._stats[detector_name].runs += 1
+            self._last_runs[detector_name] = _LastRun(context, signature, results, duration)
+
+    def reset(self, detector_name: Optional[str] = None):
+        """Forget the last runs, so the next pair always runs."""
+        with self._lock:
+            if detector_name is None:
+                self._last_runs.clear()
+            else:
+                self._last_runs.pop(detector_name, None)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-detector gate counters."""
+        with self._lock:
+            stats = {}
+            for name, counters in self._stats.items():
+                stats[name] = asdict(counters)
+                stats[name]['threshold'] = self._thresholds.get(name)
+                stats[name]['skip_rate'] = counters.skips / counters.checks if counters.checks else 0.0
+            return stats
@@ -1,12 +1,12 @@
 # CAMF/services/detector_framework/deduplication.py
 
-import numpy as np
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from dataclasses import dataclass
 from typing import List, Optional
 
 from CAMF.common.models import DetectorResult
+from CAMF.common.box_matching import boxes_match, boxes_to_array
 
 
 @dataclass
@@ -36,26 +36,6 @@ class BoundingBox:
     def center(self) -> Tuple[float, float]:
         """Get center point of bounding box."""
         return (self.x + self.width / 2, self.y + self.height / 2)
-    
-    def iou(self, other: 'BoundingBox') -> float:
-        """Calculate Intersection over Union."""
-        # Calculate intersection
-        x_left = max(self.x, other.x)
-        y_top = max(self.y, other.y)
-        x_right = min(self.x + self.width, other.x + other.width)
-        y_bottom = min(self.y + self.height, other.y + other.height)
-        
-        if x_right < x_left or y_bottom < y_top:
-            return 0.0
-        
-        intersection_area = (x_right - x_left) * (y_bottom - y_top)
-        
-        # Calculate union
-        self_area = self.width * self.height
-        other_area = other.width * other.height
-        union_area = self_area + other_area - intersection_area
-        
-        return intersection_area / union_area if union_area > 0 else 0.0
 
 class ErrorDeduplicationService:
     """Service for detecting and grouping continuous errors."""
@@ -126,27 +106,12 @@ class ErrorDeduplicationService:
         if not result.bounding_boxes or not error.get('spatial_info'):
             return self._check_description_similarity(error['description'], result.description)
         
-        # Compare bounding boxes
-        error_boxes = [BoundingBox.from_dict(box) for box in error['spatial_info'].get('boxes', [])]
-        result_boxes = [BoundingBox.from_dict(box) for box in result.bounding_boxes]
-        
-        # Check if any boxes have sufficient overlap
-        for e_box in error_boxes:
-            for r_box in result_boxes:
-                iou = e_box.iou(r_box)
-                if iou > self.IOU_THRESHOLD:
-                    return True
-                
-                # Also check relative position (for camera movement)
-                e_center = e_box.center()
-                r_center = r_box.center()
-                distance = np.sqrt((e_center[0] - r_center[0])**2 + 
-                                 (e_center[1] - r_center[1])**2)
-                
-                if distance < self.POSITION_THRESHOLD:
-                    return True
-        
-        return False
+        # Compare every pair of boxes at once: overlap, or nearby position (for camera movement)
+        error_boxes = boxes_to_array(error['spatial_info'].get('boxes', []))
+        result_boxes = boxes_to_array(result.bounding_boxes)
+        return boxes_match(
+            error_boxes, result_boxes, self.IOU_THRESHOLD, self.POSITION_THRESHOLD, inclusive=False
+        )
     
     def _check_description_similarity(self, desc1: str, desc2: str) -> bool:
         """Simple description similarity check."""
@@ -0,0 +1,206 @@
+# CAMF/services/detector_framework/detector_rpc.py
+"""
+Request/response layer for detector containers.
+
+Messages to a container and its replies travel separately (see
+docker_manager's communication loop). DetectorRequestClient tags each
+request with an ID, hands back a Future and resolves it when the reply with
+the same ID arrives, or fails it with TimeoutError once its deadline passes.
+Up to ``max_in_flight`` requests may be outstanding per container, so the
+next frame is already queued when the detector finishes the current one.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingRequest:
+    """A request waiting for its reply."""
+    future: Future
+    sent_at: float
+    deadline: float
+
+
+class DetectorRequestClient:
+    """
+    Correlates requests to one detector container with their replies.
+
+    ``timeout_policy`` is an object with ``get_timeout()`` and
+    ``update(seconds)`` (e.g. AdaptiveTimeout); it supplies the deadline of
+    requests submitted without an explicit timeout and learns from the
+    round-trip time of every reply.
+    """
+
+    def __init__(self, send: Callable[[Dict[str, Any]], None], max_in_flight: int = 4,
+                 timeout_policy: Any = None, default_timeout: float = 30.0):
+        self.send = send
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout_policy = timeout_policy
+        self.default_timeout = default_timeout
+        self._pending: Dict[str, PendingRequest] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._closed = False
+        self._submitted = 0
+        self._completed = 0
+        self._timed_out = 0
+        self._late_replies = 0
+        self._peak_in_flight = 0
+
+    def submit(self, message: Dict[str, Any], timeout: Optional[float] = None) -> Future:
+        """
+        Send a request without waiting for its reply.
+
+        Blocks while ``max_in_flight`` requests are outstanding (up to the
+        request's timeout).
+
+        Args:
+            message: Request fields; an ``id`` is added
+            timeout: Seconds until the request fails (default from the timeout policy)
+
+        Returns:
+            Future resolved with the reply message
+        """
+        if timeout is None:
+            timeout = self.timeout_policy.get_timeout() if self.timeout_policy else self.default_timeout
+
+        future: Future = Future()
+        if self._closed:
+            future.set_exception(ConnectionError("Detector connection closed"))
+            return future
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self._timed_out += 1
+            future.set_exception(TimeoutError(f"No request slot free within {timeout:.1f}s"))
+            return future
+
+        request_id = uuid.uuid4().hex
+        now = time.monotonic()
+        with self._lock:
+            self._pending[request_id] = PendingRequest(future, now, now + timeout)
+            self._submitted += 1
+            self._peak_in_flight = max(self._peak_in_flight, len(self._pending))
+
+        try:
+            self.send({**message, 'id': request_id})
+        except Exception as e:
+            self._finish(request_id, error=e)
+        return future
+
+    def handle_reply(self, reply: Dict[str, Any]) -> bool:
+        """
+        Resolve the request a reply belongs to.
+
+        Returns:
+            False if the reply matches no outstanding request (unknown or expired)
+        """
+        request_id = reply.get('id')
+        if request_id is None or not self._finish(request_id, reply=reply):
+            if request_id is not None:
+                with self._lock:
+                    self._late_replies += 1
+            return False
+        return True
+
+    def expire_overdue(self) -> int:
+        """Fail requests whose deadline has passed.
+
+        Returns:
+            Number of requests expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            overdue = [request_id for request_id, pending in self._pending.items() if pending.deadline <= now]
+        for request_id in overdue:
+            self._finish(request_id, error=TimeoutError("Detector did not reply before the deadline"))
+        return len(overdue)
+
+    def close(self, error: Optional[BaseException] = None):
+        """Fail every outstanding request and refuse new ones."""
+        self._closed = True
+        with self._lock:
+            request_ids = list(self._pending)
+        for request_id in request_ids:
+            self._finish(request_id, error=error or ConnectionError("Detector connection closed"))
+
+    def is_pending(self, request_id: str) -> bool:
+        """Whether a request is still waiting for its reply."""
+        with self._lock:
+            return request_id in self._pending
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get request counters."""
+        with self._lock:
+            return {
+                'in_flight': len(self._pending),
+                'max_in_flight': self.max_in_flight,
+                'peak_in_flight': self._peak_in_flight,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'timed_out': self._timed_out,
+                'late_replies': self._late_replies
+            }
+
+    def _finish(self, request_id: str, reply: Optional[Dict[str, Any]] = None,
+                error: Optional[BaseException] = None) -> bool:
+        with self._lock:
+            pending = self._pending.pop(request_id, None)
+            if pending is None:
+                return False
+            if error is None:
+                self._completed += 1
+            elif isinstance(error, TimeoutError):
+                self._timed_out += 1
+        self._slots.release()
+
+        if error is None and self.timeout_policy is not None:
+            self.timeout_policy.update(time.monotonic() - pending.sent_at)
+        if error is None:
+            pending.future.set_result(reply)
+        else:
+            pending.future.set_exception(error)
+        return True
+
+
+def normalize_results(results: List[Dict[str, Any]], frame_id: int, detector_name: str) -> List[Dict[str, Any]]:
+    """
+    Convert container results to the fields DetectorManager expects.
+
+    Container detectors report ``location`` ({x, y, w, h}) and ``details``
+    (see docker_detector_base.ContinuityError); these become
+    ``bounding_boxes`` and ``metadata``.
+    """
+    normalized = []
+    for result in results or []:
+        location = result.get('location')
+        bounding_boxes = result.get('bounding_boxes')
+        if bounding_boxes is None and location:
+            bounding_boxes = [{
+                'x': location.get('x', 0),
+                'y': location.get('y', 0),
+                'width': location.get('w', location.get('width', 0)),
+                'height': location.get('h', location.get('height', 0))
+            }]
+        normalized.append({
+            **result,
+            'confidence': result.get('confidence', 0.0),
+            'description': result.get('description', ''),
+            'frame_id': result.get('frame_id', frame_id),
+            'detector_name': result.get('detector_name', detector_name),
+            'bounding_boxes': bounding_boxes or [],
+            'metadata': result.get('metadata', result.get('details', {}))
+        })
+    return normalized
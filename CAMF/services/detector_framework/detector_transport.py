@@ -0,0 +1,194 @@
+# CAMF/services/detector_framework/detector_transport.py
+"""
+Host-side transports for talking to detector containers.
+
+SocketTransport sends binary framed messages (see frame_protocol) over a
+Unix domain socket in the container's bind-mounted communication directory
+and delivers replies as soon as they arrive. FileTransport is the original
+one-JSON-file-per-message exchange, with frames as base64 PNG; it is used
+until a detector connects to the socket, and for detector images that never
+do.
+"""
+
+import base64
+import json
+import os
+import select
+import socket
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+import numpy as np
+
+from .frame_protocol import SOCKET_NAME, ProtocolError, recv_message, send_message
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_frame(frame: np.ndarray) -> Dict[str, Any]:
+    """Serialize a frame for the file transport (lossless PNG, base64)."""
+    import cv2
+    _, buffer = cv2.imencode('.png', frame)
+
+    return {
+        'shape': frame.shape,
+        'dtype': str(frame.dtype),
+        'data': base64.b64encode(buffer).decode('utf-8')
+    }
+
+
+class FileTransport:
+    """Message exchange through ``input``/``output`` directories of JSON files."""
+
+    name = "file"
+
+    def __init__(self, comm_dir: Path):
+        self.input_dir = Path(comm_dir) / "input"
+        self.output_dir = Path(comm_dir) / "output"
+
+    def send(self, message: Dict[str, Any]):
+        """Write a message for the detector to pick up."""
+        payload = {
+            key: serialize_frame(value) if isinstance(value, np.ndarray) else value
+            for key, value in message.items()
+        }
+        # Write under a name the detector does not glob for, then publish atomically
+        input_file = self.input_dir / f"{message['id']}.json"
+        temp_file = input_file.with_suffix('.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump(payload, f)
+        os.replace(temp_file, input_file)
+
+    def receive(self) -> List[Dict[str, Any]]:
+        """Collect replies the detector has written since the last call."""
+        results = []
+        for output_file in sorted(self.output_dir.glob("*.json")):
+            try:
+                with open(output_file, 'r') as f:
+                    results.append(json.load(f))
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                # Possibly still being written by an older detector; retried on the next poll
+                logger.debug(f"Output file {output_file} not readable yet: {e}")
+                continue
+            try:
+                output_file.unlink()
+            except FileNotFoundError:
+                pass
+        return results
+
+    def discard(self, message_id: str):
+        """Withdraw a message the detector has not picked up."""
+        input_file = self.input_dir / f"{message_id}.json"
+        if input_file.exists():
+            input_file.unlink()
+
+    @property
+    def connected(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+
+class SocketTransport:
+    """
+    Binary message exchange over a connected Unix domain socket.
+
+    Replies are read on a background thread and passed to ``on_message`` as
+    they arrive, so they do not wait for the communication loop to poll.
+    """
+
+    name = "socket"
+
+    def __init__(self, connection: socket.socket, on_message: Callable[[Dict[str, Any]], None]):
+        self.connection = connection
+        self.on_message = on_message
+        self._send_lock = threading.Lock()
+        self._connected = True
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def send(self, message: Dict[str, Any]):
+        """Send a message to the detector."""
+        with self._send_lock:
+            send_message(self.connection, message)
+
+    def receive(self) -> List[Dict[str, Any]]:
+        """Replies are delivered by the reader thread."""
+        return []
+
+    def discard(self, message_id: str):
+        pass
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    def close(self):
+        self._connected = False
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.connection.close()
+
+    def _read_loop(self):
+        try:
+            while self._connected:
+                message = recv_message(self.connection)
+                if message is None:
+                    break
+                self.on_message(message)
+        except ProtocolError as e:
+            # Unparseable data leaves the stream out of sync; drop the connection
+            logger.error(f"Invalid message from detector, closing socket: {e}")
+            self.close()
+        except (OSError, ConnectionError) as e:
+            if self._connected:
+                logger.warning(f"Detector socket closed: {e}")
+        finally:
+            self._connected = False
+
+
+class SocketListener:
+    """Listening socket a detector container connects to from its side of the bind mount."""
+
+    def __init__(self, comm_dir: Path):
+        self.path = Path(comm_dir) / SOCKET_NAME
+        if self.path.exists():
+            self.path.unlink()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.bind(str(self.path))
+        self._socket.listen(1)
+
+    @classmethod
+    def open(cls, comm_dir: Path) -> Optional['SocketListener']:
+        """Create a listener, or None where Unix sockets are unavailable."""
+        if not hasattr(socket, 'AF_UNIX'):
+            return None
+        try:
+            return cls(comm_dir)
+        except OSError as e:
+            logger.warning(f"Detector socket unavailable, using file transport: {e}")
+            return None
+
+    def accept(self, on_message: Callable[[Dict[str, Any]], None],
+               timeout: float = 0) -> Optional[SocketTransport]:
+        """Accept a waiting detector connection, if any."""
+        readable, _, _ = select.select([self._socket], [], [], timeout)
+        if not readable:
+            return None
+        connection, _ = self._socket.accept()
+        return SocketTransport(connection, on_message)
+
+    def close(self):
+        self._socket.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
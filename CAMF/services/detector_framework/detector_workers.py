@@ -0,0 +1,255 @@
+# CAMF/services/detector_framework/detector_workers.py
+"""
+Per-detector worker pool for take processing.
+
+Each active detector gets a long-lived worker thread fed by its own bounded
+queue, so a fast detector never waits for a slow one to finish a frame. A
+detector that falls more than ``max_lag`` frames behind has its oldest queued
+frames skipped. Detectors that accept several outstanding requests (Docker
+containers) get one thread per request slot on the same queue.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Queued after the last frame to let a worker exit once it has drained its queue
+_STOP = object()
+
+
+@dataclass
+class DetectorWorkerStats:
+    """Counters of a single detector worker."""
+    submitted: int = 0
+    processed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    cancelled: int = 0
+    peak_lag: int = 0
+    busy_seconds: float = 0.0
+
+    @property
+    def done(self) -> int:
+        """Frames the detector is finished with, whatever the outcome."""
+        return self.processed + self.failed + self.skipped + self.cancelled
+
+    @property
+    def lag(self) -> int:
+        """Frames submitted but not yet finished (queued or in flight)."""
+        return self.submitted - self.done
+
+
+class DetectorWorker:
+    """
+    Long-lived thread(s) running one detector over a stream of frames.
+
+    Frames are handed over through a bounded queue. With ``max_lag`` set,
+    submitting a frame while the detector is already ``max_lag`` frames
+    behind drops the oldest queued frames instead of blocking; otherwise a
+    full queue blocks the submitter (backpressure). With ``concurrency``
+    above 1, that many threads take frames from the queue, keeping up to
+    ``concurrency`` frames in flight; results may then finish out of order.
+    """
+
+    def __init__(self, name: str, handler: Callable[[Any], None],
+                 queue_size: int = 32, max_lag: int = 0, concurrency: int = 1):
+        self.name = name
+        self.handler = handler
+        self.max_lag = max_lag
+        self.concurrency = max(1, concurrency)
+        self.stats = DetectorWorkerStats()
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"detector-worker-{name}-{index}", daemon=True)
+            for index in range(self.concurrency)
+        ]
+
+    def start(self):
+        """Start the worker threads."""
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, item: Any) -> bool:
+        """
+        Queue a frame for the detector.
+
+        Args:
+            item: Frame passed to the handler
+
+        Returns:
+            False if the worker was stopped before the frame could be queued
+        """
+        if self._stopped.is_set():
+            return False
+
+        with self._lock:
+            self.stats.submitted += 1
+            if self.max_lag:
+                # Catch up by dropping the oldest frames still waiting
+                while self.stats.lag > self.max_lag:
+                    try:
+                        self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    self.stats.skipped += 1
+            self.stats.peak_lag = max(self.stats.peak_lag, self.stats.lag)
+
+        if self._put(item):
+            return True
+        with self._lock:
+            self.stats.cancelled += 1
+        return False
+
+    def close(self):
+        """Let the worker exit once every queued frame has been processed."""
+        self._put(_STOP)
+
+    def stop(self):
+        """Stop the worker, discarding frames that have not started."""
+        self._stopped.set()
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                with self._lock:
+                    self.stats.cancelled += 1
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the worker to exit.
+
+        Returns:
+            True if every worker thread has exited
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in self._threads)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker counters."""
+        with self._lock:
+            stats = asdict(self.stats)
+            stats['lag'] = self.stats.lag
+            stats['max_lag'] = self.max_lag
+            stats['concurrency'] = self.concurrency
+            stats['queued'] = self._queue.qsize()
+            stats['avg_time'] = (
+                self.stats.busy_seconds / (self.stats.processed + self.stats.failed)
+                if self.stats.processed + self.stats.failed else 0.0
+            )
+            return stats
+
+    def _put(self, item: Any) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                # Pass the sentinel on to sibling threads; taking it freed a slot
+                if len(self._threads) > 1:
+                    self._queue.put(_STOP)
+                break
+            if self._stopped.is_set():
+                with self._lock:
+                    self.stats.cancelled += 1
+                continue
+
+            start = time.perf_counter()
+            failed = False
+            try:
+                self.handler(item)
+            except Exception as e:
+                failed = True
+                logger.error(f"Detector worker {self.name} failed on a frame: {e}")
+
+            with self._lock:
+                self.stats.busy_seconds += time.perf_counter() - start
+                if failed:
+                    self.stats.failed += 1
+                else:
+                    self.stats.processed += 1
+
+
+class DetectorWorkerPool:
+    """One DetectorWorker per detector, fed the same frames."""
+
+    def __init__(self, handlers: Dict[str, Callable[[Any], None]],
+                 queue_size: int = 32, max_lag: int = 0,
+                 concurrency: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            handlers: Detector name -> callable processing one frame
+            queue_size: Frames each worker can hold before the feeder blocks
+            max_lag: Frames a detector may fall behind before its oldest
+                queued frames are skipped (0 never skips)
+            concurrency: Detector name -> frames it may have in flight (default 1)
+        """
+        concurrency = concurrency or {}
+        self.workers: Dict[str, DetectorWorker] = {
+            name: DetectorWorker(name, handler, queue_size, max_lag, concurrency.get(name, 1))
+            for name, handler in handlers.items()
+        }
+
+    def start(self):
+        """Start all workers."""
+        for worker in self.workers.values():
+            worker.start()
+
+    def submit(self, item: Any):
+        """Queue a frame for every detector."""
+        for worker in self.workers.values():
+            worker.submit(item)
+
+    def close(self):
+        """Let workers exit once they have drained their queues."""
+        for worker in self.workers.values():
+            worker.close()
+
+    def stop(self):
+        """Stop all workers, discarding frames that have not started."""
+        for worker in self.workers.values():
+            worker.stop()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to ``timeout`` for all workers to exit.
+
+        Returns:
+            True if every worker has exited
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in self.workers.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not worker.join(remaining):
+                return False
+        return True
+
+    def completed_frames(self) -> int:
+        """Frames every detector is finished with."""
+        if not self.workers:
+            return 0
+        return min(worker.stats.done for worker in self.workers.values())
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get counters of every worker."""
+        return {name: worker.get_stats() for name, worker in self.workers.items()}
@@ -4,6 +4,7 @@ Provides secure communication interface for detector implementations
 """
 
 import json
+import os
 import sys
 import time
 import logging
@@ -15,6 +16,17 @@ from abc import ABC, abstractmethod
 import numpy as np
 import cv2
 from datetime import datetime
+import socket
+
+try:
+    from .frame_protocol import SOCKET_NAME, recv_message, send_message
+except ImportError:
+    try:
+        # Copied into the detector image next to this file
+        from frame_protocol import SOCKET_NAME, recv_message, send_message
+    except ImportError:
+        # Without the protocol the detector falls back to file polling
+        SOCKET_NAME = recv_message = send_message = None
 
 
 logging.basicConfig(
@@ -28,7 +40,8 @@ class DockerDetector(ABC):
     """
     Base class for Docker-based detectors
     
-    Handles secure communication with the framework through filesystem-based IPC
+    Handles secure communication with the framework through a Unix socket in the
+    communication directory, or filesystem-based IPC when the socket is unavailable
     Detectors should inherit from this class and implement process_frame_pair()
     """
     
@@ -69,54 +82,19 @@ class DockerDetector(ABC):
         logger.info(f"Initializing {self.name} v{self.version} in Docker mode")
         
     def run(self):
-        """Main detector loop - polls for input and processes frames"""
+        """Main detector loop - serves the framework's socket, or polls for input files"""
         try:
             # Initialize detector
             self.initialize()
             self.initialized = True
             logger.info("Detector initialized successfully")
             
-            # Main processing loop
-            while True:
-                try:
-                    # Check for input files
-                    input_files = sorted(self.input_dir.glob("*.json"))
-                    
-                    for input_file in input_files:
-                        try:
-                            # Read and process message
-                            with open(input_file, 'r') as f:
-                                message = json.load(f)
-                                
-                            # Process based on message type
-                            if message.get('type') == 'process_frame_pair':
-                                self._handle_frame_pair(message)
-                            elif message.get('type') == 'shutdown':
-                                logger.info("Received shutdown signal")
-                                return
-                            else:
-                                logger.warning(f"Unknown message type: {message.get('type')}")
-                                
-                            # Remove processed input file
-                            input_file.unlink()
-                            
-                        except Exception as e:
-                            logger.error(f"Error processing input file {input_file}: {e}")
-                            # Remove corrupted file
-                            try:
-                                input_file.unlink()
-                            except Exception as unlink_error:
-                                logger.debug(f"Failed to remove corrupted file {input_file}: {unlink_error}")
-                                
-                    # Brief sleep to prevent CPU spinning
-                    time.sleep(0.1)
-                    
-                except KeyboardInterrupt:
-                    logger.info("Detector interrupted")
-                    break
-                except Exception as e:
-                    logger.error(f"Error in main loop: {e}")
-                    time.sleep(1)
+            connection = self._connect_socket()
+            if connection is not None:
+                logger.info("Connected to framework socket")
+                self._run_socket(connection)
+            else:
+                self._run_file_polling()
                     
         finally:
             # Cleanup
@@ -126,12 +104,110 @@ class DockerDetector(ABC):
                 logger.error(f"Error during cleanup: {e}")
             logger.info("Detector shutdown complete")
             
-    def _handle_frame_pair(self, message: Dict[str, Any]):
-        """Handle frame pair processing request"""
+    def _connect_socket(self, attempts: int = 10) -> Optional[socket.socket]:
+        """Connect to the framework's socket in the communication directory, if it has one"""
+        if send_message is None or not hasattr(socket, 'AF_UNIX'):
+            return None
+            
+        socket_path = self.input_dir.parent / SOCKET_NAME
+        for _ in range(attempts):
+            if socket_path.exists():
+                connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    connection.connect(str(socket_path))
+                    return connection
+                except OSError as e:
+                    connection.close()
+                    logger.debug(f"Socket connect failed: {e}")
+            time.sleep(0.1)
+        return None
+        
+    def _run_socket(self, connection: socket.socket):
+        """Process binary messages from the socket until shutdown or disconnect"""
+        try:
+            while True:
+                try:
+                    message = recv_message(connection)
+                except (OSError, ConnectionError) as e:
+                    logger.error(f"Socket error: {e}")
+                    return
+                    
+                if message is None:
+                    logger.info("Framework closed the socket")
+                    return
+                    
+                if message.get('type') == 'process_frame_pair':
+                    send_message(connection, self._handle_frame_pair(message))
+                elif message.get('type') == 'shutdown':
+                    logger.info("Received shutdown signal")
+                    return
+                else:
+                    logger.warning(f"Unknown message type: {message.get('type')}")
+                    
+        except KeyboardInterrupt:
+            logger.info("Detector interrupted")
+        finally:
+            connection.close()
+            
+    def _run_file_polling(self):
+        """Poll the input directory for JSON messages"""
+        while True:
+            try:
+                # Check for input files
+                input_files = sorted(self.input_dir.glob("*.json"))
+                
+                for input_file in input_files:
+                    try:
+                        # Read and process message
+                        with open(input_file, 'r') as f:
+                            message = json.load(f)
+                            
+                        # Process based on message type
+                        if message.get('type') == 'process_frame_pair':
+                            response = self._handle_frame_pair(message)
+                            # Write under a name the framework does not glob for, then publish atomically
+                            output_file = self.output_dir / f"{response['id']}.json"
+                            temp_file = output_file.with_suffix('.tmp')
+                            with open(temp_file, 'w') as f:
+                                json.dump(response, f)
+                            os.replace(temp_file, output_file)
+                        elif message.get('type') == 'shutdown':
+                            logger.info("Received shutdown signal")
+                            return
+                        else:
+                            logger.warning(f"Unknown message type: {message.get('type')}")
+                            
+                        # Remove processed input file
+                        input_file.unlink()
+                        
+                    except Exception as e:
+                        logger.error(f"Error processing input file {input_file}: {e}")
+                        # Remove corrupted file
+                        try:
+                            input_file.unlink()
+                        except Exception as unlink_error:
+                            logger.debug(f"Failed to remove corrupted file {input_file}: {unlink_error}")
+                            
+                # Brief sleep to prevent CPU spinning
+                time.sleep(0.1)
+                
+            except KeyboardInterrupt:
+                logger.info("Detector interrupted")
+                break
+            except Exception as e:
+                logger.error(f"Error in main loop: {e}")
+                time.sleep(1)
+            
+    def _handle_frame_pair(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle frame pair processing request
+        
+        Returns:
+            Result or error response for the message
+        """
         message_id = message.get('id', 'unknown')
         
         try:
-            # Deserialize frames
+            # Frames arrive raw over the socket and PNG-encoded in files
             current_frame = self._deserialize_frame(message['current_frame'])
             reference_frame = self._deserialize_frame(message['reference_frame'])
             metadata = message.get('metadata', {})
@@ -142,7 +218,7 @@ class DockerDetector(ABC):
             processing_time = time.time() - start_time
             
             # Prepare response
-            response = {
+            return {
                 'id': message_id,
                 'type': 'result',
                 'timestamp': time.time(),
@@ -151,30 +227,24 @@ class DockerDetector(ABC):
                 'detector_version': self.version,
                 'results': results
             }
-            
-            # Write response
-            output_file = self.output_dir / f"{message_id}.json"
-            with open(output_file, 'w') as f:
-                json.dump(response, f)
                 
         except Exception as e:
             logger.error(f"Error processing frame pair: {e}")
             
             # Send error response
-            error_response = {
+            return {
                 'id': message_id,
                 'type': 'error',
                 'timestamp': time.time(),
                 'error': str(e),
                 'detector_name': self.name
             }
-            
-            output_file = self.output_dir / f"{message_id}.json"
-            with open(output_file, 'w') as f:
-                json.dump(error_response, f)
                 
-    def _deserialize_frame(self, frame_data: Dict[str, Any]) -> np.ndarray:
-        """Deserialize frame from base64 PNG data"""
+    def _deserialize_frame(self, frame_data: Any) -> np.ndarray:
+        """Deserialize frame from base64 PNG data (raw frames pass through)"""
+        if isinstance(frame_data, np.ndarray):
+            return frame_data
+            
         # Decode base64
         png_bytes = base64.b64decode(frame_data['data'])
         
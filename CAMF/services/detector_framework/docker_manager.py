@@ -12,15 +12,18 @@ import queue
 import logging
 import shutil
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from datetime import datetime
 import subprocess
-import base64
 
 import docker
 import numpy as np
 
+from .detector_rpc import DetectorRequestClient, normalize_results
+from .detector_transport import FileTransport, SocketListener, serialize_frame
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,6 +60,8 @@ class DockerDetector:
     error_count: int = 0
     frame_count: int = 0
     communication_volume: Optional[Path] = None
+    transport: str = "file"
+    request_client: Optional[DetectorRequestClient] = None
     
 
 class SecureDockerManager:
@@ -186,6 +191,9 @@ class SecureDockerManager:
         with open(dockerfile_path, 'w') as f:
             f.write(dockerfile_content)
             
+        # Ship the socket protocol so docker_detector_base can use it in the container
+        shutil.copy2(Path(__file__).parent / "frame_protocol.py", detector_dir / "frame_protocol.py")
+            
         # Build image with security scanning
         image_tag = f"camf-detector-{detector_name}:latest"
         
@@ -312,6 +320,9 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
         (comm_dir / "output").mkdir(exist_ok=True)
         os.chmod(comm_dir, 0o700)
         
+        # Detectors that support it connect here instead of polling for files
+        listener = SocketListener.open(comm_dir)
+        
         # Prepare security options
         security_opt = [
             "no-new-privileges:true",
@@ -410,7 +421,7 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
             
             comm_thread = threading.Thread(
                 target=self._communication_loop,
-                args=(detector_name, comm_dir, stop_event)
+                args=(detector_name, comm_dir, stop_event, listener)
             )
             comm_thread.daemon = True
             comm_thread.start()
@@ -422,82 +433,106 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
         except Exception as e:
             logger.error(f"Failed to start detector container: {e}")
             # Cleanup
+            if listener is not None:
+                listener.close()
             if comm_dir.exists():
                 shutil.rmtree(comm_dir)
             return False
             
-    def _communication_loop(self, detector_name: str, comm_dir: Path, stop_event: threading.Event):
-        """Handle secure communication with detector container"""
-        input_dir = comm_dir / "input"
-        output_dir = comm_dir / "output"
+    def _communication_loop(self, detector_name: str, comm_dir: Path, stop_event: threading.Event,
+                            listener: Optional[SocketListener] = None):
+        """Handle secure communication with detector container
+        
+        Messages go through JSON files in the communication directory until
+        the detector connects to the socket in the same directory; from then
+        on they are sent as binary frames over the socket.
+        
+        Replies to requests made through the detector's request client
+        resolve that request's future; other replies go to the output queue.
+        """
+        from CAMF.common.config import get_config
         
         # Input/output queues for this detector
         input_queue = queue.Queue(maxsize=100)
         output_queue = queue.Queue(maxsize=100)
+        request_client = DetectorRequestClient(
+            send=lambda message: input_queue.put(message, timeout=1.0),
+            max_in_flight=get_config().detector.max_in_flight
+        )
         
         # Store queues for external access
         self.detectors[detector_name].input_queue = input_queue
         self.detectors[detector_name].output_queue = output_queue
+        self.detectors[detector_name].request_client = request_client
         
         sequence = 0
         pending_requests = {}
+        pending_lock = threading.Lock()
+        
+        def deliver(result: Dict[str, Any]):
+            # Validate result
+            with pending_lock:
+                if "id" not in result or pending_requests.pop(result["id"], None) is None:
+                    return
+            if not request_client.handle_reply(result):
+                output_queue.put(result)
+        
+        transport = FileTransport(comm_dir)
         
         while not stop_event.is_set():
             try:
-                # Check for input messages
+                # Switch to the socket once the detector connects
+                if listener is not None and transport.name == "file":
+                    socket_transport = listener.accept(deliver)
+                    if socket_transport is not None:
+                        transport = socket_transport
+                        self.detectors[detector_name].transport = transport.name
+                        logger.info(f"Detector {detector_name} connected over socket")
+                elif not transport.connected:
+                    logger.warning(f"Detector {detector_name} socket disconnected, falling back to files")
+                    transport = FileTransport(comm_dir)
+                    self.detectors[detector_name].transport = transport.name
+                
+                # Check for input messages; send everything queued so pipelined requests go out together
                 try:
                     message = input_queue.get(timeout=0.1)
-                    
-                    # Create unique message file
-                    message_id = f"{sequence:08d}_{uuid.uuid4().hex[:8]}"
-                    sequence += 1
-                    
-                    # Write message to input directory
-                    input_file = input_dir / f"{message_id}.json"
-                    with open(input_file, 'w') as f:
-                        json.dump({
-                            "id": message_id,
-                            "timestamp": time.time(),
-                            **message
-                        }, f)
+                    while True:
+                        # Keep the request client's ID so the reply can be matched to it
+                        message_id = message.get("id") or f"{sequence:08d}_{uuid.uuid4().hex[:8]}"
+                        sequence += 1
                         
-                    pending_requests[message_id] = time.time()
+                        with pending_lock:
+                            pending_requests[message_id] = time.time()
+                        transport.send({
+                            "timestamp": time.time(),
+                            **message,
+                            "id": message_id
+                        })
+                        message = input_queue.get_nowait()
                     
                 except queue.Empty:
                     pass
                     
-                # Check for output messages
-                for output_file in output_dir.glob("*.json"):
-                    try:
-                        with open(output_file, 'r') as f:
-                            result = json.load(f)
-                            
-                        # Validate result
-                        if "id" in result and result["id"] in pending_requests:
-                            # Process result
-                            output_queue.put(result)
-                            del pending_requests[result["id"]]
-                            
-                        # Remove processed file
-                        output_file.unlink()
+                # Check for output messages (socket replies arrive on their own)
+                for result in transport.receive():
+                    deliver(result)
                         
-                    except Exception as e:
-                        logger.error(f"Error processing output file {output_file}: {e}")
-                        output_file.unlink()  # Remove corrupted file
+                # Fail client requests past their deadline
+                request_client.expire_overdue()
                         
-                # Clean up old pending requests (timeout after 60s)
+                # Clean up old pending requests (timeout after 60s, or once the client gave up)
                 current_time = time.time()
-                expired = [
-                    msg_id for msg_id, timestamp in pending_requests.items()
-                    if current_time - timestamp > 60
-                ]
+                with pending_lock:
+                    expired = [
+                        msg_id for msg_id, timestamp in pending_requests.items()
+                        if current_time - timestamp > 60 and not request_client.is_pending(msg_id)
+                    ]
+                    for msg_id in expired:
+                        del pending_requests[msg_id]
                 for msg_id in expired:
                     logger.warning(f"Request {msg_id} timed out")
-                    del pending_requests[msg_id]
                     # Clean up input file if still exists
-                    input_file = input_dir / f"{msg_id}.json"
-                    if input_file.exists():
-                        input_file.unlink()
+                    transport.discard(msg_id)
                         
                 # Check container health
                 try:
@@ -514,7 +549,11 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
             except Exception as e:
                 logger.error(f"Communication loop error for {detector_name}: {e}")
                 time.sleep(1)
-                
+        
+        request_client.close()
+        transport.close()
+        if listener is not None:
+            listener.close()
         logger.info(f"Communication loop ended for {detector_name}")
         
     def process_frame_pair(self, detector_name: str, current_frame: np.ndarray,
@@ -535,11 +574,11 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
             return False
             
         try:
-            # Prepare message with frames
+            # Frames are encoded by the transport: raw over the socket, PNG in files
             message = {
                 "type": "process_frame_pair",
-                "current_frame": self._serialize_frame(current_frame),
-                "reference_frame": self._serialize_frame(reference_frame),
+                "current_frame": current_frame,
+                "reference_frame": reference_frame,
                 "metadata": metadata,
                 "timestamp": time.time()
             }
@@ -569,18 +608,16 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
         results = []
         
         try:
-            end_time = time.time() + timeout
-            while True:
-                remaining = max(0, end_time - time.time()) if timeout > 0 else 0
-                
-                try:
-                    result = detector.output_queue.get(timeout=remaining)
-                    results.append(result)
-                except queue.Empty:
-                    break
-                    
-                if timeout <= 0:
-                    break
+            # Wait up to timeout for the first result, then take whatever else is ready
+            try:
+                if timeout > 0:
+                    results.append(detector.output_queue.get(timeout=timeout))
+                else:
+                    results.append(detector.output_queue.get_nowait())
+                while True:
+                    results.append(detector.output_queue.get_nowait())
+            except queue.Empty:
+                pass
                     
         except Exception as e:
             logger.error(f"Failed to get results from {detector_name}: {e}")
@@ -640,16 +677,8 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
             self.stop_detector(name)
             
     def _serialize_frame(self, frame: np.ndarray) -> Dict[str, Any]:
-        """Serialize frame for secure transmission"""
-        # Convert to PNG bytes for lossless compression
-        import cv2
-        _, buffer = cv2.imencode('.png', frame)
-        
-        return {
-            'shape': frame.shape,
-            'dtype': str(frame.dtype),
-            'data': base64.b64encode(buffer).decode('utf-8')
-        }
+        """Serialize frame for the file transport"""
+        return serialize_frame(frame)
         
     def get_detector_status(self, detector_name: str) -> Dict[str, Any]:
         """Get status information for a detector"""
@@ -683,6 +712,8 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
             "frame_count": detector.frame_count,
             "error_count": detector.error_count,
             "last_heartbeat": detector.last_heartbeat,
+            "transport": detector.transport,
+            "requests": detector.request_client.get_stats() if detector.request_client else None,
             "stats": stats
         }
         
@@ -701,8 +732,17 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
             logger.debug(f"Failed to calculate CPU percentage: {e}")
         return 0.0
     
-    def get_detector_process(self, detector_name: str):
-        """Get detector process wrapper for compatibility."""
+    def get_detector_process(self, detector_name: str,
+                             frame_loader: Optional[Callable[[int, int], Any]] = None):
+        """Get detector process wrapper for compatibility.
+        
+        Args:
+            detector_name: Running detector
+            frame_loader: ``(take_id, frame_id) -> (current, reference, metadata)``
+                or None; containers have no access to footage, so frames for
+                ``process_frame`` requests are loaded on the host and sent along,
+                unless the request already carries them in ``frames``
+        """
         if not self.docker_available:
             logger.warning("Docker not available - returning None for detector process")
             return None
@@ -714,26 +754,77 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
         
         # Create a process-like wrapper for the Docker container
         class DockerDetectorProcess:
-            def __init__(self, detector, docker_manager):
+            def __init__(self, detector, docker_manager, frame_loader):
                 self.detector = detector
                 self.docker_manager = docker_manager
+                self.frame_loader = frame_loader
                 
-            def send_request(self, method: str, params: Dict[str, Any], timeout: float = 30) -> Optional[Dict[str, Any]]:
-                """Send request to detector container."""
-                if method == 'initialize':
-                    return {'success': True}
-                elif method == 'process_frame':
-                    # Queue frame for processing
-                    frame_id = params.get('frame_id')
-                    take_id = params.get('take_id')
-                    # In a real implementation, this would send to the container
-                    return {
+            @property
+            def max_in_flight(self) -> int:
+                """Requests the container may have outstanding at once."""
+                client = self.detector.request_client
+                return client.max_in_flight if client else 1
+                
+            def submit_request(self, method: str, params: Dict[str, Any], timeout: float = 30) -> Future:
+                """Send a request to the container without waiting for the reply.
+                
+                Returns:
+                    Future resolved with the response dict (``success``, ``data``/``error``)
+                """
+                response: Future = Future()
+                if method != 'process_frame':
+                    # The container needs no setup or teardown messages
+                    response.set_result({'success': True} if method in ('initialize', 'cleanup') else None)
+                    return response
+                    
+                client = self.detector.request_client
+                if client is None:
+                    response.set_result({'success': False, 'error': 'Detector container not connected'})
+                    return response
+                    
+                frame_id = params.get('frame_id')
+                take_id = params.get('take_id')
+                frames = params.get('frames')
+                if frames is None and self.frame_loader:
+                    frames = self.frame_loader(take_id, frame_id)
+                if frames is None:
+                    response.set_result({'success': False, 'error': f'Frame {frame_id} of take {take_id} not available'})
+                    return response
+                current_frame, reference_frame, metadata = frames
+                
+                request = client.submit({
+                    "type": "process_frame_pair",
+                    "current_frame": current_frame,
+                    "reference_frame": reference_frame,
+                    "metadata": {**metadata, 'frame_id': frame_id, 'take_id': take_id}
+                }, timeout=timeout)
+                self.detector.frame_count += 1
+                
+                def convert(reply: Future):
+                    try:
+                        message = reply.result()
+                    except TimeoutError:
+                        response.set_result({'success': False, 'error': f'Timed out after {timeout:.1f}s'})
+                        return
+                    except Exception as e:
+                        response.set_result({'success': False, 'error': str(e)})
+                        return
+                    if message.get('type') == 'error':
+                        self.detector.error_count += 1
+                        response.set_result({'success': False, 'error': message.get('error', 'Detector error')})
+                        return
+                    response.set_result({
                         'success': True,
-                        'data': []
-                    }
-                elif method == 'cleanup':
-                    return {'success': True}
-                return None
+                        'data': normalize_results(message.get('results', []), frame_id, self.detector.name)
+                    })
+                    
+                request.add_done_callback(convert)
+                return response
+                
+            def send_request(self, method: str, params: Dict[str, Any], timeout: float = 30) -> Optional[Dict[str, Any]]:
+                """Send request to detector container and wait for the reply."""
+                # The client fails the request at its deadline; the margin covers the callback
+                return self.submit_request(method, params, timeout).result(timeout=timeout + 5)
                 
             def is_alive(self) -> bool:
                 """Check if container is running."""
@@ -745,7 +836,7 @@ ENTRYPOINT ["python", "-u", "detector.py", "--docker-mode", "/comm/input", "/com
                     pass
                 return False
                 
-        return DockerDetectorProcess(detector, self)
+        return DockerDetectorProcess(detector, self, frame_loader)
     
     def get_all_detector_status(self) -> Dict[str, Dict[str, Any]]:
         """Get status for all detectors."""
@@ -0,0 +1,122 @@
+# CAMF/services/detector_framework/frame_prefetcher.py
+"""
+Prefetch stage for take processing.
+
+Frames are read and decoded on a small thread pool up to ``depth`` items
+ahead of the consumer, and handed back in their original order, so
+detectors do not sit idle while the next frame pair is loaded.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchedItem(NamedTuple):
+    """An item with the result of loading it."""
+    item: Any
+    result: Any
+    error: Optional[BaseException]
+    load_seconds: float
+
+
+class FramePrefetcher:
+    """
+    Runs a load function over a sequence of items ahead of the consumer.
+
+    At most ``depth`` items are loading or loaded but not yet consumed. With
+    a depth of 0, items are loaded synchronously in the consumer's thread.
+    """
+
+    def __init__(self, load: Callable[[Any], Any], depth: int = 4, workers: int = 2):
+        self.load = load
+        self.depth = depth
+        self.workers = max(1, min(workers, depth)) if depth else 0
+        self._lock = threading.Lock()
+        self._loaded = 0
+        self._failed = 0
+        self._load_seconds = 0.0
+        self._wait_seconds = 0.0
+
+    def iter(self, items: Iterable[Any]) -> Iterator[PrefetchedItem]:
+        """
+        Load items ahead of consumption.
+
+        Leaving the loop early cancels loads that have not started.
+
+        Args:
+            items: Items to load, in consumption order
+
+        Yields:
+            PrefetchedItem for each item, in the given order
+        """
+        if not self.depth:
+            for item in items:
+                start = time.perf_counter()
+                prefetched = self._timed_load(item)
+                self._record(prefetched, time.perf_counter() - start)
+                yield prefetched
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="frame-prefetch")
+        pending: Deque[Tuple[Any, Future]] = deque()
+        source = iter(items)
+        try:
+            while True:
+                # Keep the ring full
+                while len(pending) < self.depth:
+                    try:
+                        item = next(source)
+                    except StopIteration:
+                        break
+                    pending.append((item, executor.submit(self._timed_load, item)))
+                if not pending:
+                    return
+
+                item, future = pending.popleft()
+                start = time.perf_counter()
+                prefetched = future.result()
+                self._record(prefetched, time.perf_counter() - start)
+                yield prefetched
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get load counters.
+
+        ``load_seconds`` is time spent loading across all workers;
+        ``wait_seconds`` is time the consumer spent waiting for a load.
+        """
+        with self._lock:
+            return {
+                'depth': self.depth,
+                'workers': self.workers,
+                'loaded': self._loaded,
+                'failed': self._failed,
+                'load_seconds': self._load_seconds,
+                'avg_load_time': self._load_seconds / self._loaded if self._loaded else 0.0,
+                'wait_seconds': self._wait_seconds
+            }
+
+    def _timed_load(self, item: Any) -> PrefetchedItem:
+        start = time.perf_counter()
+        try:
+            result, error = self.load(item), None
+        except Exception as e:
+            result, error = None, e
+        return PrefetchedItem(item, result, error, time.perf_counter() - start)
+
+    def _record(self, prefetched: PrefetchedItem, waited: float):
+        with self._lock:
+            self._loaded += 1
+            if prefetched.error is not None:
+                self._failed += 1
+            self._load_seconds += prefetched.load_seconds
+            self._wait_seconds += waited
@@ -0,0 +1,155 @@
+# CAMF/services/detector_framework/frame_protocol.py
+"""
+Binary framed protocol for messages between the framework and detector containers.
+
+Each message is a fixed prefix, a JSON header and the raw bytes of any NumPy
+arrays in the message:
+
+    "CAMF" | u32 header length | u64 body length | JSON header | array bytes
+
+Arrays at the top level of a message are described in the header (shape,
+dtype, offset) instead of being image-encoded and base64'd, so frames cross
+the socket as raw pixels. Only the standard library and NumPy are used so the
+module can be copied into detector images next to docker_detector_base.py.
+"""
+
+import json
+import socket
+import struct
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+MAGIC = b"CAMF"
+PREFIX = struct.Struct("!4sIQ")
+MAX_HEADER_BYTES = 16 * 1024 * 1024
+# The largest legal body is a frame pair at up to 8K with four 8-bit channels
+MAX_FRAME_WIDTH, MAX_FRAME_HEIGHT, MAX_FRAME_CHANNELS = 7680, 4320, 4
+MAX_BODY_BYTES = 2 * MAX_FRAME_WIDTH * MAX_FRAME_HEIGHT * MAX_FRAME_CHANNELS
+SOCKET_NAME = "detector.sock"
+
+Buffer = Union[bytes, memoryview]
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends something that is not a valid message."""
+
+
+def _json_default(value: Any):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_message(message: Dict[str, Any]) -> List[Buffer]:
+    """
+    Encode a message into buffers to be written in order.
+
+    Array buffers are views of the (contiguous) arrays, not copies.
+
+    Args:
+        message: JSON-serialisable fields; top-level NumPy arrays are sent raw
+
+    Returns:
+        Prefix and header as one buffer, followed by one buffer per array
+
+    Raises:
+        ProtocolError: If the arrays exceed ``MAX_BODY_BYTES``
+    """
+    header: Dict[str, Any] = {}
+    arrays: Dict[str, Dict[str, Any]] = {}
+    buffers: List[Buffer] = []
+    offset = 0
+
+    for key, value in message.items():
+        if isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value)
+            arrays[key] = {
+                'shape': list(array.shape),
+                'dtype': array.dtype.str,
+                'offset': offset,
+                'nbytes': array.nbytes
+            }
+            buffers.append(memoryview(array.reshape(-1).view(np.uint8)))
+            offset += array.nbytes
+        else:
+            header[key] = value
+    header['__arrays__'] = arrays
+    if offset > MAX_BODY_BYTES:
+        raise ProtocolError(f"Message body too large ({offset} bytes)")
+
+    header_bytes = json.dumps(header, default=_json_default).encode('utf-8')
+    return [PREFIX.pack(MAGIC, len(header_bytes), offset) + header_bytes] + buffers
+
+
+def decode_message(header_bytes: bytes, body: Union[bytes, bytearray, memoryview]) -> Dict[str, Any]:
+    """
+    Rebuild a message from its header and body; arrays are views of ``body``.
+
+    Raises:
+        ProtocolError: If the header is not a JSON object or describes arrays
+            that do not fit the body
+    """
+    try:
+        message = json.loads(header_bytes)
+        if not isinstance(message, dict):
+            raise ValueError("header is not an object")
+        arrays = message.pop('__arrays__', {})
+        for key, spec in arrays.items():
+            dtype = np.dtype(spec['dtype'])
+            if dtype.hasobject:
+                raise ValueError(f"object dtype for array '{key}'")
+            count = spec['nbytes'] // dtype.itemsize if dtype.itemsize else 0
+            message[key] = np.frombuffer(body, dtype=dtype, count=count, offset=spec['offset']).reshape(spec['shape'])
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise ProtocolError(f"Malformed message: {e}") from e
+    return message
+
+
+def send_message(sock: socket.socket, message: Dict[str, Any]):
+    """Write one message to a connected stream socket."""
+    for buffer in encode_message(message):
+        sock.sendall(buffer)
+
+
+def _recv_into(sock: socket.socket, view: memoryview, allow_eof: bool = False) -> bool:
+    received = 0
+    while received < len(view):
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            if allow_eof and received == 0:
+                return False
+            raise ConnectionError("Connection closed in the middle of a message")
+        received += count
+    return True
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """
+    Read one message from a connected stream socket.
+
+    Returns:
+        The message, or None if the peer closed the connection between messages
+
+    Raises:
+        ProtocolError: If the data is not a message
+        ConnectionError: If the connection closed part-way through a message
+    """
+    prefix = bytearray(PREFIX.size)
+    if not _recv_into(sock, memoryview(prefix), allow_eof=True):
+        return None
+    magic, header_length, body_length = PREFIX.unpack(prefix)
+    if magic != MAGIC:
+        raise ProtocolError(f"Bad message magic {bytes(magic)!r}")
+    if header_length > MAX_HEADER_BYTES:
+        raise ProtocolError(f"Message header too large ({header_length} bytes)")
+    if body_length > MAX_BODY_BYTES:
+        raise ProtocolError(f"Message body too large ({body_length} bytes)")
+
+    header = bytearray(header_length)
+    _recv_into(sock, memoryview(header))
+    body = bytearray(body_length)
+    _recv_into(sock, memoryview(body))
+    return decode_message(bytes(header), body)
@@ -19,8 +19,7 @@ import logging
 import time
 
 from CAMF.common.models import (
-    BaseDetector, DetectorInfo, DetectorResult, 
-    ErrorConfidence
+    BaseDetector, DetectorInfo, DetectorResult
 )
 
 
@@ -87,7 +86,17 @@ class FalsePositive:
 
 
 class QueueBasedDetector(BaseDetector):
-    """Base class for queue-based detectors with push-based frame processing."""
+    """Base class for queue-based detectors with push-based frame processing.
+    
+    Detectors that run more efficiently on several frames at once (ML models)
+    can override process_frame_pairs_batch; the worker then collects up to
+    ``max_batch_size`` queued frame pairs, waiting at most ``max_batch_wait``
+    seconds for a batch to fill, and still emits results per frame.
+    """
+    
+    # Batching defaults, overridable per detector class or with set_batching()
+    max_batch_size = 8
+    max_batch_wait = 0.02
     
     def __init__(self):
         super().__init__()
@@ -107,6 +116,10 @@ class QueueBasedDetector(BaseDetector):
         self._error_count = 0
         self._consecutive_errors = 0
         
+        # Batch tracking
+        self._batch_count = 0
+        self._batched_frames = 0
+        
         # Take tracking for frame count info
         self._take_frame_counts = {}
         self._current_take_id = None
@@ -120,6 +133,37 @@ class QueueBasedDetector(BaseDetector):
         This method should be implemented by each detector.
         """
     
+    def process_frame_pairs_batch(self, frame_pairs: List[FramePair]) -> List[List[DetectorResult]]:
+        """Process several frame pairs in one call.
+        
+        Optional: override to run the model on a whole batch. Must return one
+        result list (or result dict) per frame pair, in the same order.
+        
+        Args:
+            frame_pairs: Frame pairs taken from the queue, highest priority first
+            
+        Returns:
+            Results for each frame pair
+        """
+        raise NotImplementedError
+    
+    @property
+    def supports_batching(self) -> bool:
+        """Whether the worker hands this detector batches of frame pairs."""
+        overridden = type(self).process_frame_pairs_batch is not QueueBasedDetector.process_frame_pairs_batch
+        return overridden and self.max_batch_size > 1
+    
+    def set_batching(self, max_batch_size: int, max_batch_wait: Optional[float] = None):
+        """Set the batch limits of this detector.
+        
+        Args:
+            max_batch_size: Most frame pairs per batch (1 disables batching)
+            max_batch_wait: Longest wait in seconds for a batch to fill
+        """
+        self.max_batch_size = max(1, max_batch_size)
+        if max_batch_wait is not None:
+            self.max_batch_wait = max(0.0, max_batch_wait)
+    
     def start_processing(self):
         """Start the processing thread."""
         if not self._processing:
@@ -210,6 +254,16 @@ class QueueBasedDetector(BaseDetector):
             'last_process_time': self._last_process_time
         }
         
+        # Batch occupancy: how full batches were on average
+        avg_batch_size = self._batched_frames / self._batch_count if self._batch_count else 0.0
+        base_stats.update({
+            'batching': self.supports_batching,
+            'max_batch_size': self.max_batch_size,
+            'batches_processed': self._batch_count,
+            'avg_batch_size': avg_batch_size,
+            'batch_occupancy': avg_batch_size / self.max_batch_size if self.supports_batching else 0.0
+        })
+        
         # Add intelligent queue stats
         queue_stats = self._frame_queue.get_stats()
         base_stats.update({
@@ -234,6 +288,15 @@ class QueueBasedDetector(BaseDetector):
         
         while self._processing:
             try:
+                if self.supports_batching:
+                    # Collect a micro-batch: wait for one frame, then briefly for more
+                    frame_pairs = self._frame_queue.get_batch(
+                        self.max_batch_size, timeout=0.5, max_wait=self.max_batch_wait
+                    )
+                    if frame_pairs:
+                        self._process_batch(frame_pairs)
+                    continue
+                
                 # Get frame pair from intelligent queue with timeout
                 frame_pair = self._frame_queue.get(timeout=0.5)
                 
@@ -251,56 +314,11 @@ class QueueBasedDetector(BaseDetector):
                     )
                     process_time = time.time() - start_time
                     self._last_process_time = process_time
-                    
-                    # Extract results from the returned dictionary
-                    if isinstance(result_dict, dict):
-                        results = result_dict.get('results', [])
-                    else:
-                        # Backward compatibility - if detector returns list directly
-                        results = result_dict if isinstance(result_dict, list) else []
-                    
-                    # Add timing metadata to results
-                    for result in results:
-                        if not result.metadata:
-                            result.metadata = {}
-                        result.metadata['process_time'] = process_time
-                    
-                    # Add results to result queue
-                    if results:
-                        self._result_queue.put(results)
-                    
-                    self._processed_count += 1
-                    self._consecutive_errors = 0  # Reset error counter on success
-                    
+                    self._emit_results(result_dict, process_time)
                     self.logger.debug(f"Processed frame pair in {process_time:.3f}s")
                     
-                    # Log stats periodically
-                    if self._processed_count % 100 == 0:
-                        stats = self._frame_queue.get_stats()
-                        self.logger.info(f"Queue stats after {self._processed_count} frames: "
-                                       f"size={stats['current_size']}/{stats['max_size']}, "
-                                       f"dropped={stats['frames_dropped']} ({stats['drop_rate']:.1%})")
-                    
                 except Exception as e:
-                    self._error_count += 1
-                    self._consecutive_errors += 1
-                    
-                    self.logger.error(f"Error processing frame pair: {e}", exc_info=True)
-                    
-                    # Create error result
-                    error_result = DetectorResult(
-                        confidence=ErrorConfidence.DETECTOR_FAILED,
-                        description=f"Processing error: {str(e)}",
-                        frame_id=frame_pair.current_frame_id,
-                        detector_name=self.get_info().name if hasattr(self, 'get_info') else self.__class__.__name__,
-                        metadata={'error': str(e), 'error_type': type(e).__name__}
-                    )
-                    self._result_queue.put([error_result])
-                    
-                    # If too many consecutive errors, pause briefly
-                    if self._consecutive_errors > 5:
-                        self.logger.warning(f"Too many consecutive errors ({self._consecutive_errors}), pausing...")
-                        time.sleep(1.0)
+                    self._emit_errors([frame_pair], e)
                 
             except queue.Empty:
                 # No frames to process, continue
@@ -314,6 +332,81 @@ class QueueBasedDetector(BaseDetector):
         # Log final statistics
         final_stats = self._frame_queue.get_stats()
         self.logger.info(f"Final queue statistics: {final_stats}")
+    
+    def _process_batch(self, frame_pairs: List[FramePair]):
+        """Run one batch through the detector and emit results per frame."""
+        start_time = time.time()
+        try:
+            batch_results = self.process_frame_pairs_batch(frame_pairs)
+            if len(batch_results) != len(frame_pairs):
+                raise ValueError(f"Batch of {len(frame_pairs)} frame pairs returned "
+                                 f"{len(batch_results)} results")
+        except Exception as e:
+            self._emit_errors(frame_pairs, e)
+            return
+        
+        # Each frame is charged its share of the batch time
+        process_time = (time.time() - start_time) / len(frame_pairs)
+        self._last_process_time = process_time
+        self._batch_count += 1
+        self._batched_frames += len(frame_pairs)
+        for result_dict in batch_results:
+            self._emit_results(result_dict, process_time)
+        self.logger.debug(f"Processed batch of {len(frame_pairs)} frame pairs "
+                          f"in {process_time * len(frame_pairs):.3f}s")
+    
+    def _emit_results(self, result_dict, process_time: float):
+        """Queue the results of one frame pair."""
+        # Extract results from the returned dictionary
+        if isinstance(result_dict, dict):
+            results = result_dict.get('results', [])
+        else:
+            # Backward compatibility - if detector returns list directly
+            results = result_dict if isinstance(result_dict, list) else []
+        
+        # Add timing metadata to results
+        for result in results:
+            if not result.metadata:
+                result.metadata = {}
+            result.metadata['process_time'] = process_time
+        
+        # Add results to result queue
+        if results:
+            self._result_queue.put(results)
+        
+        self._processed_count += 1
+        self._consecutive_errors = 0  # Reset error counter on success
+        
+        # Log stats periodically
+        if self._processed_count % 100 == 0:
+            stats = self._frame_queue.get_stats()
+            self.logger.info(f"Queue stats after {self._processed_count} frames: "
+                           f"size={stats['current_size']}/{stats['max_size']}, "
+                           f"dropped={stats['frames_dropped']} ({stats['drop_rate']:.1%})")
+    
+    def _emit_errors(self, frame_pairs: List[FramePair], error: Exception):
+        """Queue a failure result for each frame pair that could not be processed."""
+        self._error_count += 1
+        self._consecutive_errors += 1
+        
+        self.logger.error(f"Error processing {len(frame_pairs)} frame pair(s): {error}", exc_info=True)
+        
+        # Create error results
+        detector_name = self.get_info().name if hasattr(self, 'get_info') else self.__class__.__name__
+        for frame_pair in frame_pairs:
+            error_result = DetectorResult(
+                confidence=-1.0,  # Special value for detector failures
+                description=f"Processing error: {str(error)}",
+                frame_id=frame_pair.current_frame_id,
+                detector_name=detector_name,
+                metadata={'error': str(error), 'error_type': type(error).__name__}
+            )
+            self._result_queue.put([error_result])
+        
+        # If too many consecutive errors, pause briefly
+        if self._consecutive_errors > 5:
+            self.logger.warning(f"Too many consecutive errors ({self._consecutive_errors}), pausing...")
+            time.sleep(1.0)
 
 
 class DetectorRegistry:
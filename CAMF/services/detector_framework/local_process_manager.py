@@ -16,6 +16,9 @@ from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, field
 import multiprocessing as mp
 from datetime import datetime
+import numpy as np
+
+from .shared_frames import FrameSlotRef, SharedFrameReader, SharedFrameRing
 
 logger = logging.getLogger(__name__)
 
@@ -39,13 +42,24 @@ class LocalProcessManager:
     Provides basic isolation and resource management.
     """
     
-    def __init__(self, detectors_path: Path = None, workspace_path: Path = None):
+    def __init__(self, detectors_path: Path = None, workspace_path: Path = None, frame_slots: int = 8):
         self.detectors_dir = Path(detectors_path or Path.cwd() / "detectors")
         self.workspace_dir = Path(workspace_path or Path.cwd() / "workspaces")
         self.detectors: Dict[str, LocalDetectorProcess] = {}
         self._stop_events: Dict[str, threading.Event] = {}
         self._monitor_threads: Dict[str, threading.Thread] = {}
         
+        # Frame pairs are shared with detector processes through one ring of slots,
+        # created on first use and sized for the first pair
+        self.frame_slots = frame_slots
+        self._frame_ring: Optional[SharedFrameRing] = None
+        self._ring_lock = threading.Lock()
+        self._release_queue: mp.Queue = mp.Queue()
+        self._release_thread: Optional[threading.Thread] = None
+        # detector_name -> slots (slot, generation) it has not released yet
+        self._held_slots: Dict[str, set] = {}
+        self._request_id = 0
+        
         # Create workspace directory
         self.workspace_dir.mkdir(parents=True, exist_ok=True)
         
@@ -82,7 +96,8 @@ class LocalProcessManager:
             # Start detector process
             process = mp.Process(
                 target=self._run_detector,
-                args=(detector_name, detector_dir, workspace, input_queue, output_queue, config or {})
+                args=(detector_name, detector_dir, workspace, input_queue, output_queue,
+                      self._release_queue, config or {})
             )
             process.daemon = True
             process.start()
@@ -90,6 +105,7 @@ class LocalProcessManager:
             detector.process = process
             detector.status = "running"
             self.detectors[detector_name] = detector
+            self._held_slots[detector_name] = set()
             
             # Start monitor thread
             stop_event = threading.Event()
@@ -111,8 +127,10 @@ class LocalProcessManager:
             return False
     
     def _run_detector(self, detector_name: str, detector_dir: Path, workspace: Path,
-                      input_queue: mp.Queue, output_queue: mp.Queue, config: Dict[str, Any]):
+                      input_queue: mp.Queue, output_queue: mp.Queue, release_queue: mp.Queue,
+                      config: Dict[str, Any]):
         """Run detector in isolated process."""
+        frame_reader = SharedFrameReader()
         try:
             # Add detector directory to Python path
             sys.path.insert(0, str(detector_dir))
@@ -138,15 +156,25 @@ class LocalProcessManager:
                     if message.get('type') == 'process_frame':
                         # Process frame
                         results = []
-                        if hasattr(detector, 'process_frame'):
-                            frame_id = message.get('frame_id')
-                            take_id = message.get('take_id')
-                            
-                            # In real implementation, would load actual frame data
-                            detector_results = detector.process_frame(frame_id, take_id)
-                            
-                            if detector_results:
-                                results.extend(detector_results)
+                        frame_slot = message.get('frame_slot')
+                        try:
+                            if frame_slot is not None and hasattr(detector, 'process_frame_pair'):
+                                # Zero-copy views of the pair the parent already decoded
+                                detector_results = detector.process_frame_pair(
+                                    self._frame_pair_from_slot(frame_reader, frame_slot, message)
+                                )
+                            elif hasattr(detector, 'process_frame'):
+                                detector_results = detector.process_frame(
+                                    message.get('frame_id'), message.get('take_id')
+                                )
+                            else:
+                                detector_results = None
+                        finally:
+                            if frame_slot is not None:
+                                release_queue.put((detector_name, frame_slot.slot, frame_slot.generation))
+                        
+                        if detector_results:
+                            results.extend(detector_results)
                         
                         # Send results back
                         output_queue.put({
@@ -170,6 +198,28 @@ class LocalProcessManager:
                 
         except Exception as e:
             logger.error(f"Fatal error in detector {detector_name}: {e}")
+        finally:
+            frame_reader.close()
+    
+    @staticmethod
+    def _frame_pair_from_slot(frame_reader: SharedFrameReader, frame_slot: FrameSlotRef,
+                              message: Dict[str, Any]):
+        """Build a FramePair over a shared slot inside a detector process."""
+        from .interface import FramePair
+        
+        current, reference = frame_reader.views(frame_slot)
+        metadata = message.get('metadata') or {}
+        return FramePair(
+            current_frame=current,
+            reference_frame=reference,
+            current_frame_id=message.get('frame_id'),
+            reference_frame_id=metadata.get('reference_frame_id', 0),
+            take_id=message.get('take_id'),
+            scene_id=metadata.get('scene_id', 0),
+            angle_id=metadata.get('angle_id', 0),
+            project_id=metadata.get('project_id', 0),
+            metadata=metadata
+        )
     
     def _monitor_detector(self, detector_name: str, stop_event: threading.Event):
         """Monitor detector health and handle failures."""
@@ -223,6 +273,9 @@ class LocalProcessManager:
                 if detector.process.is_alive():
                     detector.process.kill()
             
+            # Slots the detector never released would otherwise stay taken
+            self._release_held_slots(detector_name)
+            
             # Cleanup
             del self.detectors[detector_name]
             if detector_name in self._stop_events:
@@ -240,6 +293,16 @@ class LocalProcessManager:
         detector_names = list(self.detectors.keys())
         for name in detector_names:
             self.stop_detector(name)
+        
+        # Free the shared frame ring
+        with self._ring_lock:
+            ring, self._frame_ring = self._frame_ring, None
+            release_thread, self._release_thread = self._release_thread, None
+        if release_thread:
+            self._release_queue.put(None)
+            release_thread.join(timeout=5)
+        if ring:
+            ring.close()
     
     def get_detector_status(self, detector_name: str) -> Dict[str, Any]:
         """Get status information for a detector."""
@@ -338,6 +401,7 @@ class LocalProcessManager:
         for detector_name in self.detectors:
             status["detectors"][detector_name] = self.get_detector_status(detector_name)
         
+        status["frame_transport"] = self.get_frame_transport_stats()
         return status
     
     def build_detector_image(self, detector_name: str) -> Tuple[bool, str]:
@@ -355,12 +419,132 @@ class LocalProcessManager:
     
     def process_frame_pair(self, detector_name: str, current_frame, reference_frame, metadata: Dict[str, Any]) -> bool:
         """Send frame pair to detector for processing."""
-        # This would be implemented similarly to Docker version
-        # For now, return True to indicate success
-        return True
+        return self.submit_frame_pair(current_frame, reference_frame, metadata, [detector_name]).get(detector_name, False)
+    
+    def submit_frame_pair(self, current_frame: np.ndarray, reference_frame: np.ndarray,
+                          metadata: Dict[str, Any], detector_names: Optional[List[str]] = None,
+                          timeout: float = 1.0) -> Dict[str, bool]:
+        """Send one frame pair to several detectors, copying the pixels once.
+        
+        The pair is written to a shared memory slot that each detector
+        process maps read-only; the slot is reused once all of them have
+        released it. If no slot is free within ``timeout`` (or the pair is
+        larger than a slot) detectors are sent frame IDs only and load the
+        frames themselves.
+        
+        Args:
+            current_frame: Decoded current frame
+            reference_frame: Decoded reference frame
+            metadata: Frame metadata; frame_id and take_id identify the frame
+            detector_names: Detectors to send to (default: all running)
+            timeout: Seconds to wait for a free slot
+            
+        Returns:
+            Detector name -> whether the request was queued
+        """
+        names = [
+            name for name in (detector_names if detector_names is not None else list(self.detectors))
+            if name in self.detectors
+        ]
+        sent = {name: False for name in (detector_names or names)}
+        if not names:
+            return sent
+        
+        frame_slot = None
+        ring = self._get_frame_ring(current_frame, reference_frame)
+        if ring is not None:
+            frame_slot = ring.write_pair(current_frame, reference_frame, len(names), timeout=timeout)
+        
+        for name in names:
+            with self._ring_lock:
+                self._request_id += 1
+                request_id = f"req_{self._request_id}"
+                if frame_slot is not None:
+                    self._held_slots.setdefault(name, set()).add((frame_slot.slot, frame_slot.generation))
+            
+            message = {
+                'id': request_id,
+                'type': 'process_frame',
+                'frame_id': metadata.get('frame_id'),
+                'take_id': metadata.get('take_id'),
+                'metadata': metadata,
+                'frame_slot': frame_slot,
+                'timestamp': time.time()
+            }
+            try:
+                self.detectors[name].input_queue.put(message, timeout=timeout)
+                self.detectors[name].frame_count += 1
+                sent[name] = True
+            except Exception as e:
+                logger.warning(f"Could not queue frame for detector {name}: {e}")
+                if frame_slot is not None:
+                    self._release_slot(name, frame_slot.slot, frame_slot.generation)
+        
+        return sent
     
     def get_results(self, detector_name: str, timeout: float = 0) -> List[Dict[str, Any]]:
         """Get available results from a detector."""
-        # This would collect results from output queue
-        # For now, return empty list
-        return []
\ No newline at end of file
+        detector = self.detectors.get(detector_name)
+        if not detector or not detector.output_queue:
+            return []
+        
+        results = []
+        try:
+            results.append(detector.output_queue.get(timeout=timeout) if timeout else detector.output_queue.get_nowait())
+            while True:
+                results.append(detector.output_queue.get_nowait())
+        except queue.Empty:
+            pass
+        return results
+    
+    def get_frame_transport_stats(self) -> Dict[str, Any]:
+        """Get shared frame ring statistics."""
+        with self._ring_lock:
+            ring = self._frame_ring
+            held = {name: len(slots) for name, slots in self._held_slots.items()}
+        return {
+            'ring': ring.get_stats() if ring else None,
+            'held_slots': held
+        }
+    
+    def _get_frame_ring(self, current_frame: np.ndarray, reference_frame: np.ndarray) -> Optional[SharedFrameRing]:
+        """Get the shared frame ring, creating it for the first frame pair."""
+        with self._ring_lock:
+            if self._frame_ring is None:
+                try:
+                    self._frame_ring = SharedFrameRing.for_frames(current_frame, reference_frame, self.frame_slots)
+                except Exception as e:
+                    logger.warning(f"Shared memory frame transport unavailable: {e}")
+                    return None
+                self._release_thread = threading.Thread(target=self._release_worker, daemon=True)
+                self._release_thread.start()
+            return self._frame_ring
+    
+    def _release_worker(self):
+        """Return slots to the ring as detector processes finish with them."""
+        while True:
+            try:
+                item = self._release_queue.get()
+            except (EOFError, OSError):
+                break
+            if item is None:
+                break
+            self._release_slot(*item)
+    
+    def _release_slot(self, detector_name: str, slot: int, generation: int):
+        with self._ring_lock:
+            held = self._held_slots.get(detector_name)
+            if held is None or (slot, generation) not in held:
+                return
+            held.discard((slot, generation))
+            ring = self._frame_ring
+        if ring:
+            ring.release(slot, generation)
+    
+    def _release_held_slots(self, detector_name: str):
+        with self._ring_lock:
+            held = list(self._held_slots.get(detector_name, ()))
+        for slot, generation in held:
+            self._release_slot(detector_name, slot, generation)
+        with self._ring_lock:
+            self._held_slots.pop(detector_name, None)
\ No newline at end of file
@@ -7,11 +7,13 @@ Orchestrates detector system with Docker container isolation and security.
 import json
 import time
 import threading
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Callable, Tuple
 from datetime import datetime
 import logging
 import numpy as np
+import cv2
 
 from .validation import ConfigurationValidator
 from .deduplication import ErrorDeduplicationService
@@ -21,11 +23,16 @@ from .validation import DetectorValidator
 from .documentation import DocumentationGenerator
 from .recovery import DetectorRecoveryManager
 from .version_control import DetectorVersionControl, VersionedDetectorLoader, VersionChange
+from .detector_workers import DetectorWorkerPool
+from .frame_prefetcher import FramePrefetcher, PrefetchedItem
+from .change_gate import ChangeGate, PairSignature
 
 from CAMF.common.models import (
     DetectorConfigurationSchema, DetectorResult, DetectorStatus, ErrorConfidence, DetectorInfo
 )
 from CAMF.services.storage import get_storage_service
+from CAMF.services.storage.frame_cache import get_frame_cache
+from CAMF.services.storage.frame_fingerprint import fingerprint_frame, pair_fingerprint
 from .interface import (
     FramePair
 )
@@ -217,7 +224,6 @@ from .docker_installer import DockerDetectorInstaller
 from .result_cache import get_result_cache, CacheKey
 from .batch_processor import BatchProcessingConfig, create_batch_processor
 from .batch_progress import get_progress_aggregator
-from PIL import Image
 
 logger = logging.getLogger(__name__)
 
@@ -234,6 +240,9 @@ class DetectorManager:
         )
         self.skip_frames_until = None
         self.processing_times = []
+        # Containers accept several outstanding requests; in-process detectors one
+        self.max_in_flight = getattr(detector_process, 'max_in_flight', 1)
+        self.in_flight = 0
         self.lock = threading.RLock()
         self.is_initialized = False
         self.adaptive_timeout = AdaptiveTimeout()
@@ -268,8 +277,16 @@ class DetectorManager:
     
     def process_frame(self, frame_id: int, take_id: int, frame_hash: Optional[str] = None, 
                       cache: Optional['ResultCache'] = None, scene_context: Optional[str] = None,
-                      timeout: Optional[float] = None) -> List[DetectorResult]:
-        """Process a frame with the detector, using cache if available."""
+                      timeout: Optional[float] = None, signature: Optional[PairSignature] = None,
+                      gate: Optional[ChangeGate] = None,
+                      frames: Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]] = None) -> List[DetectorResult]:
+        """Process a frame with the detector, using cache if available.
+        
+        With a change gate and the pair's perceptual signature, a pair
+        unchanged since the detector's last run in this take reuses that
+        run's results instead of invoking the detector. ``frames`` is the
+        pair already loaded by the caller, sent instead of loading it again.
+        """
 
         frame_start_time = time.time()
         
@@ -283,7 +300,23 @@ class DetectorManager:
                 # Update status for cached result
                 with self.lock:
                     self.status.total_processed += 1
-                return cached_results
+                # Identical frames share an entry; report its results against this frame
+                return [
+                    result.model_copy(update={'id': None, 'frame_id': frame_id})
+                    for result in cached_results
+                ]
+        
+        # Skip pairs perceptually unchanged since the last run
+        gated = gate is not None and signature is not None
+        if gated:
+            previous_results = gate.lookup(self.info.name, signature, context=take_id)
+            if previous_results is not None:
+                with self.lock:
+                    self.status.total_processed += 1
+                return [
+                    result.model_copy(update={'id': None, 'frame_id': frame_id})
+                    for result in previous_results
+                ]
         
         # Track frame timestamp for FPS calculation
         if not hasattr(self, '_frame_timestamps'):
@@ -302,23 +335,24 @@ class DetectorManager:
             return []
 
         with self.lock:
-            if not self.status.enabled or self.status.running or not self.is_initialized:
+            if not self.status.enabled or self.in_flight >= self.max_in_flight or not self.is_initialized:
                 return []
             
+            self.in_flight += 1
             self.status.running = True
         
         # Use adaptive timeout if no specific timeout provided
         if timeout is None:
             timeout = self.adaptive_timeout.get_timeout()
         
+        slot_held = True
         try:
             start_time = time.time()
             
-            response = self.process.send_request(
-                'process_frame', 
-                {'frame_id': frame_id, 'take_id': take_id}, 
-                timeout=timeout
-            )
+            params = {'frame_id': frame_id, 'take_id': take_id}
+            if frames is not None:
+                params['frames'] = frames
+            response = self.process.send_request('process_frame', params, timeout=timeout)
             
             processing_time = time.time() - start_time
             
@@ -326,7 +360,9 @@ class DetectorManager:
             self.adaptive_timeout.update(processing_time)
             
             with self.lock:
-                self.status.running = False
+                self.in_flight -= 1
+                slot_held = False
+                self.status.running = self.in_flight > 0
                 self.status.total_processed += 1
                 
                 # Update current timeout in status
@@ -400,18 +436,26 @@ class DetectorManager:
             with self.lock:
                 self.status.total_errors_found += len(error_results)
             
-            # Cache results if successful
-            if cache and frame_hash and results:
-                cache.put(
-                    frame_hash, self.info.name, self.version,
-                    self.config, results, scene_context
-                )
+            # Cache results if successful; "no errors" is worth caching too
+            if not any(r.confidence == -1.0 for r in results):
+                if cache and frame_hash:
+                    cache.put(
+                        frame_hash, self.info.name, self.version,
+                        self.config, [result.model_copy() for result in results], scene_context
+                    )
+                if gated:
+                    gate.record(
+                        self.info.name, signature, [result.model_copy() for result in results],
+                        context=take_id, duration=processing_time
+                    )
             
             return results
             
         except Exception as e:
             with self.lock:
-                self.status.running = False
+                if slot_held:
+                    self.in_flight -= 1
+                self.status.running = self.in_flight > 0
                 self.status.last_error = str(e)
                 self.status.last_error_time = datetime.now()
             
@@ -492,6 +536,10 @@ class DetectorFrameworkService:
         cache_dir = project_root / "detector_cache"
         self.result_cache = get_result_cache(str(cache_dir))
         
+        # Skips opted-in detectors on frame pairs unchanged since their last run
+        from CAMF.common.config import get_config
+        self.change_gate = ChangeGate(get_config().detector.change_hash)
+        
         # Initialize batch processor
         self.batch_config = BatchProcessingConfig(
             max_parallel_segments=4,
@@ -543,9 +591,12 @@ class DetectorFrameworkService:
         self.is_processing = False
         self.current_processing_take_id: Optional[int] = None
         self.reference_take_id: Optional[int] = None
+        self._reference_fingerprints: Dict[int, Dict[int, str]] = {}
         self.current_frame_index = 0
         self.processing_thread: Optional[threading.Thread] = None
         self._stop_requested = False
+        self._detector_pool: Optional[DetectorWorkerPool] = None
+        self._frame_prefetcher: Optional[FramePrefetcher] = None
         
         # Processing progress tracking
         self.total_frames = 0
@@ -560,9 +611,8 @@ class DetectorFrameworkService:
         self.processing_start_time: Optional[float] = None
         self.processing_end_time: Optional[float] = None
         
-        # Frame cache for processing efficiency
-        self._frame_cache: Dict[int, np.ndarray] = {}
-        self._cache_size = 100  # Keep last 100 frames in memory
+        # Decoded frames, shared with storage; the reference take is pinned while processing
+        self.frame_cache = get_frame_cache()
         
         # Processing thread lock
         self._processing_lock = threading.RLock()
@@ -953,7 +1003,9 @@ class DetectorFrameworkService:
                     return False
                 
                 # Get the Docker process wrapper
-                detector_process = self.docker_manager.get_detector_process(dir_name)
+                detector_process = self.docker_manager.get_detector_process(
+                    dir_name, frame_loader=self._load_container_frames
+                )
             
                 if not detector_process:
                     logger.error(f"Could not get detector process: {detector_name}")
@@ -997,6 +1049,12 @@ class DetectorFrameworkService:
             # Create enhanced manager
             manager = DetectorManager(detector_info, detector_process)
             
+            # Detectors opt in to change gating in their detector.json
+            metadata = self.loader.registry.get_detector_metadata(dir_name) or {}
+            self.change_gate.set_threshold(
+                detector_info.name, (metadata.get('change_gate') or {}).get('threshold')
+            )
+            
             # Initialize detector
             if manager.initialize(config):
                 self.active_detectors[detector_name] = manager
@@ -1099,14 +1157,10 @@ class DetectorFrameworkService:
             # Get frame metadata to find path
             frame_meta = self.storage.get_frame_metadata(take_id, frame_id)
             if frame_meta:
-                # Try to get the frame path directly from frame storage
-                frame_path_str = self.storage.frame_storage.get_frame_path(take_id, frame_id)
-                if frame_path_str:
-                    frame_path = Path(frame_path_str)
-                    if frame_path.exists():
-                        with open(frame_path, 'rb') as f:
-                            frame_data = f.read()
-                        frame_hash = CacheKey.generate_frame_hash(frame_data)
+                # Hash the encoded frame bytes, wherever the backend keeps them
+                frame_data = self.storage.frame_storage.get_frame_bytes(take_id, frame_id)
+                if frame_data:
+                    frame_hash = CacheKey.generate_frame_hash(frame_data)
             
             # Generate scene context for cache key
             if scene:
@@ -1429,6 +1483,13 @@ class DetectorFrameworkService:
         """Get cache performance statistics."""
         return self.result_cache.get_stats()
     
+    def get_change_gate_stats(self) -> Dict[str, Any]:
+        """Get per-detector counts of invocations skipped by the change gate."""
+        return {
+            'method': self.change_gate.method,
+            'detectors': self.change_gate.get_stats()
+        }
+    
     def warm_detector_cache(self, detector_name: str, frame_ids: List[int], take_id: int):
         """Pre-warm cache for a detector with specific frames."""
         if detector_name not in self.active_detectors:
@@ -1439,29 +1500,25 @@ class DetectorFrameworkService:
         
         for frame_id in frame_ids:
             try:
-                # Get frame path
-                frame_path_str = self.storage.frame_storage.get_frame_path(take_id, frame_id)
-                if frame_path_str:
-                    frame_path = Path(frame_path_str)
-                    if frame_path.exists():
-                        with open(frame_path, 'rb') as f:
-                            frame_data = f.read()
-                        frame_hash = CacheKey.generate_frame_hash(frame_data)
-                        
-                        # Check if already cached
-                        cached = self.result_cache.get(
-                            frame_hash, manager.info.name, manager.version,
-                            manager.config
+                # Get encoded frame bytes
+                frame_data = self.storage.frame_storage.get_frame_bytes(take_id, frame_id)
+                if frame_data:
+                    frame_hash = CacheKey.generate_frame_hash(frame_data)
+                    
+                    # Check if already cached
+                    cached = self.result_cache.get(
+                        frame_hash, manager.info.name, manager.version,
+                        manager.config
+                    )
+                    
+                    if cached is None:
+                        # Process frame to populate cache
+                        manager.process_frame(
+                            frame_id, take_id,
+                            frame_hash=frame_hash,
+                            cache=self.result_cache
                         )
-                        
-                        if cached is None:
-                            # Process frame to populate cache
-                            manager.process_frame(
-                                frame_id, take_id,
-                                frame_hash=frame_hash,
-                                cache=self.result_cache
-                            )
-                            warmed += 1
+                        warmed += 1
             except Exception as e:
                 logger.warning(f"Failed to warm cache for frame {frame_id}: {e}")
         
@@ -1707,11 +1764,13 @@ class DetectorFrameworkService:
             self.processed_frames = 0
             self.failed_frames = 0
             self._stop_requested = False
+            self._detector_pool = None
+            self._frame_prefetcher = None
             self.processing_start_time = time.time()
             self.processing_end_time = None
             
-            # Clear frame cache
-            self._frame_cache.clear()
+            # Every current frame is compared against the reference take
+            self.frame_cache.pin_take(reference_take_id)
             
             # Initialize per-detector progress tracking
             active_detectors = self.get_active_detectors()
@@ -1774,158 +1833,121 @@ class DetectorFrameworkService:
             logger.info(f"Processing frames up to frame number {max_frame_to_process} " +
                        f"(current: {max_current_frame_number}, reference: {max_reference_frame_number})")
             
-            for frame in frames:
+            # Each detector consumes frames on its own long-lived worker
+            from CAMF.common.config import get_config
+            detector_config = get_config().detector
+            active_detectors = {
+                name: manager for name, manager in self.get_active_detectors().items()
+                if name in self.detector_progress
+            }
+            # Content fingerprints of each frame pair, keying the result cache, and
+            # perceptual signatures when a detector is change-gated
+            pair_hashes: Dict[int, Optional[str]] = {}
+            pair_signatures: Optional[Dict[int, PairSignature]] = None
+            if any(self.change_gate.is_gated(manager.info.name) for manager in active_detectors.values()):
+                pair_signatures = {}
+            pool = DetectorWorkerPool(
+                {
+                    name: partial(self._process_frame_with_detector, name, manager, take, scene, angle,
+                                  pair_hashes, pair_signatures)
+                    for name, manager in active_detectors.items()
+                },
+                queue_size=detector_config.worker_queue_size,
+                max_lag=detector_config.max_lag_frames,
+                # Containers take several requests at once; keep that many frames in flight
+                concurrency={name: manager.max_in_flight for name, manager in active_detectors.items()}
+            )
+            with self._processing_lock:
+                self._detector_pool = pool
+            pool.start()
+            dispatched_frames = 0
+            
+            # Skip frames beyond the minimum of both takes
+            frames_to_process = [f for f in frames if f.frame_number <= max_frame_to_process]
+            unfingerprinted = [
+                (take.id, f) for f in frames_to_process if f.fingerprint is None
+            ] + [
+                (self.reference_take_id, f) for f in reference_frames if f.fingerprint is None
+            ]
+            if len(frames_to_process) < len(frames):
+                logger.info(f"Skipping {len(frames) - len(frames_to_process)} frames beyond processing limit ({max_frame_to_process})")
+            
+            # Read and decode upcoming frame pairs while detectors work on earlier ones
+            prefetcher = FramePrefetcher(
+                partial(self._load_frame_pair, reference_frame_map, pair_signatures),
+                depth=detector_config.prefetch_depth,
+                workers=detector_config.prefetch_workers
+            )
+            with self._processing_lock:
+                self._frame_prefetcher = prefetcher
+            
+            for prefetched in prefetcher.iter(frames_to_process):
                 if self._stop_requested:
                     break
                     
-                # Skip frames beyond the minimum of both takes
-                if frame.frame_number > max_frame_to_process:
-                    logger.info(f"Skipping frame {frame.frame_number} - beyond processing limit ({max_frame_to_process})")
+                frame = prefetched.item
+                if prefetched.error is not None:
+                    logger.error(f"Error processing frame {frame.id}: {prefetched.error}")
+                    self.failed_frames += 1
+                    continue
+                if not prefetched.result:
+                    self.failed_frames += 1
                     continue
                     
                 try:
-                    # Get corresponding reference frame
-                    reference_frame = reference_frame_map.get(frame.frame_number)
-                    if not reference_frame:
-                        # Use first reference frame as fallback
-                        reference_frame = reference_frames[0] if reference_frames else None
-                        
-                    if not reference_frame:
-                        logger.warning(f"No reference frame for frame {frame.frame_number}")
-                        self.failed_frames += 1
-                        continue
-                        
-                    # Load frame data
-                    current_frame_data = self._load_frame(frame)
-                    reference_frame_data = self._load_frame(reference_frame)
-                    
-                    if current_frame_data is None or reference_frame_data is None:
-                        logger.error(f"Failed to load frame data for frame {frame.id}")
-                        self.failed_frames += 1
-                        continue
-                        
-                    # Create frame pair
-                    frame_pair = FramePair(
-                        current_frame=current_frame_data,
-                        reference_frame=reference_frame_data,
-                        current_frame_id=frame.id,
-                        reference_frame_id=reference_frame.id,
-                        take_id=take.id,
-                        scene_id=scene.id if scene else 0,
-                        angle_id=angle.id if angle else 0,
-                        project_id=project.id if project else 0,
-                        metadata={
-                            'frame_number': frame.frame_number,
-                            'timestamp': frame.timestamp,
-                            'reference_frame_number': reference_frame.frame_number
-                        }
+                    reference_frame = self._reference_frame_for(reference_frame_map, reference_frames, frame)
+                    pair_hashes[frame.frame_number] = pair_fingerprint(
+                        frame.fingerprint, getattr(reference_frame, 'fingerprint', None)
                     )
                     
-                    # Process frame pair with all active detectors
-                    active_detectors = self.get_active_detectors()
-                    
-                    # Process frame with each detector in parallel using threads
-                    detector_threads = []
-                    
-                    def process_with_detector(detector_name, detector_manager, frame_obj, take_obj, scene_obj, angle_obj):
-                        try:
-                            # Process frame with detector
-                            results = detector_manager.process_frame(
-                                frame_obj.id, take_obj.id,
-                                frame_hash=None,
-                                cache=self.result_cache,
-                                scene_context=f"scene_{scene_obj.id}_angle_{angle_obj.id}" if scene_obj and angle_obj else None
-                            )
-                            
-                            # Save results
-                            for result in results:
-                                self._save_detector_result(result, take_obj.id)
-                            
-                            # Notify callbacks with take_id added
-                            if results:
-                                # Add take_id and frame_index to results for SSE
-                                for result in results:
-                                    result.take_id = take_obj.id
-                                    result.frame_index = frame_obj.frame_number
-                                self._notify_result_callbacks(results)
-                                
-                            # Update per-detector progress
-                            with self._processing_lock:
-                                if detector_name in self.detector_progress:
-                                    self.detector_progress[detector_name]['processed'] += 1
-                                    self.detector_progress[detector_name]['last_frame'] = frame_obj.frame_number
-                                    self.detector_progress[detector_name]['status'] = 'processing'
-                                    
-                                    # Check if this detector is done
-                                    if self.detector_progress[detector_name]['processed'] >= self.detector_progress[detector_name]['total']:
-                                        self.detector_progress[detector_name]['status'] = 'completed'
-                                        self._detector_completion_status[detector_name] = True
-                                
-                        except Exception as e:
-                            logger.error(f"Error processing frame {frame_obj.id} with detector {detector_name}: {e}")
-                            with self._processing_lock:
-                                if detector_name in self.detector_progress:
-                                    self.detector_progress[detector_name]['status'] = f'error: {str(e)}'
-                    
-                    # Start threads for each detector
-                    for detector_name, detector_manager in active_detectors.items():
-                        thread = threading.Thread(
-                            target=process_with_detector,
-                            args=(detector_name, detector_manager, frame, take, scene, angle)
-                        )
-                        thread.start()
-                        detector_threads.append(thread)
+                    # The decoded pair travels with the frame to every detector;
+                    # blocks only while a detector without a lag limit has a full queue
+                    pool.submit(prefetched)
+                    dispatched_frames += 1
                     
-                    # Wait for all detector threads to complete for this frame
-                    for thread in detector_threads:
-                        thread.join(timeout=30)  # 30 second timeout per detector
-                            
-                    # Update progress
                     with self._processing_lock:
-                        self.processed_frames += 1
                         self.current_frame_index = frame.frame_number
-                        
-                    # Log progress periodically
-                    if self.processed_frames % 10 == 0:
-                        progress = (self.processed_frames / self.total_frames) * 100
-                        logger.info(f"Processing progress: {progress:.1f}% ({self.processed_frames}/{self.total_frames})")
-                        
-                    # Small delay to prevent overwhelming detectors
-                    time.sleep(0.01)
                     
                 except Exception as e:
                     logger.error(f"Error processing frame {frame.id}: {e}")
                     self.failed_frames += 1
                     
-            # Wait for all detectors to finish processing
+            # Keep fingerprints computed while loading frames stored without one
+            backfill: Dict[int, Dict[int, str]] = {}
+            for frame_take_id, stored_frame in unfingerprinted:
+                if stored_frame.fingerprint is not None:
+                    backfill.setdefault(frame_take_id, {})[stored_frame.frame_number] = stored_frame.fingerprint
+            for frame_take_id, fingerprints in backfill.items():
+                self.storage.set_frame_fingerprints(frame_take_id, fingerprints)
+                    
+            # Let each detector drain its queue at its own pace
             logger.info("Waiting for all detectors to finish processing...")
-            
-            # Check for completion with timeout
-            completion_timeout = time.time() + 60  # 60 second timeout
-            while time.time() < completion_timeout:
-                with self._processing_lock:
-                    all_complete = all(self._detector_completion_status.get(name, False) 
-                                     for name in active_detectors.keys())
-                    if all_complete:
-                        logger.info("All detectors have completed processing")
-                        break
+            pool.close()
+            while not pool.join(timeout=0.5):
+                if self._stop_requested:
+                    pool.stop()
+                    pool.join(timeout=detector_config.cleanup_timeout)
+                    break
                     
-                    # Log detector status
-                    for detector_name in active_detectors:
-                        if detector_name in self.detector_progress:
-                            progress = self.detector_progress[detector_name]
-                            logger.debug(f"Detector {detector_name}: {progress['processed']}/{progress['total']} frames, status: {progress['status']}")
-                
-                time.sleep(0.5)
+                for detector_name, stats in pool.get_stats().items():
+                    logger.debug(f"Detector {detector_name}: {stats['processed']}/{self.total_frames} frames, lag: {stats['lag']}")
             
             # Final check and log completion status
             with self._processing_lock:
-                for detector_name in active_detectors:
-                    if detector_name in self.detector_progress:
-                        progress = self.detector_progress[detector_name]
-                        logger.info(f"Detector {detector_name} final status: {progress['processed']}/{progress['total']} frames processed")
-                        if not self._detector_completion_status.get(detector_name, False):
-                            logger.warning(f"Detector {detector_name} did not complete all frames")
+                self.processed_frames = pool.completed_frames() if pool.workers else dispatched_frames
+                for detector_name, stats in pool.get_stats().items():
+                    progress = self.detector_progress.get(detector_name)
+                    if progress is None:
+                        continue
+                    if not self._stop_requested and stats['lag'] == 0:
+                        progress['status'] = 'completed'
+                        self._detector_completion_status[detector_name] = True
+                    logger.info(
+                        f"Detector {detector_name} final status: {stats['processed']}/{progress['total']} frames processed, "
+                        f"{stats['skipped']} skipped, {stats['failed']} failed"
+                    )
+                    if not self._detector_completion_status.get(detector_name, False):
+                        logger.warning(f"Detector {detector_name} did not complete all frames")
                     
         except Exception as e:
             logger.error(f"Processing worker error: {e}", exc_info=True)
@@ -1933,9 +1955,13 @@ class DetectorFrameworkService:
             with self._processing_lock:
                 self.is_processing = False
                 self.processing_end_time = time.time()
+                if self._detector_pool is not None:
+                    # No-op for workers that have drained; stops them after an error
+                    self._detector_pool.stop()
                 
-            # Clear frame cache
-            self._frame_cache.clear()
+            # Release the reference take's frames to normal eviction
+            if self.reference_take_id is not None:
+                self.frame_cache.unpin_take(self.reference_take_id)
             
             # Calculate and log statistics
             duration = 0
@@ -1969,44 +1995,146 @@ class DetectorFrameworkService:
             else:
                 logger.warning("No processing_complete callback registered!")
                 
-    def _load_frame(self, frame) -> Optional[np.ndarray]:
-        """Load frame data from storage."""
-        # Check cache first
-        if frame.id in self._frame_cache:
-            return self._frame_cache[frame.id]
-            
+    def _process_frame_with_detector(self, detector_name: str, detector_manager: 'DetectorManager',
+                                     take: Any, scene: Any, angle: Any,
+                                     pair_hashes: Dict[int, Optional[str]],
+                                     pair_signatures: Optional[Dict[int, PairSignature]],
+                                     prefetched: PrefetchedItem):
+        """Run one detector on one frame of the take being processed.
+        
+        Called on the detector's worker thread with the frame and the pair
+        the prefetcher loaded for it; errors are recorded in the detector's
+        progress and re-raised so the worker counts the failure.
+        """
+        frame = prefetched.item
         try:
-            # Load from file
-            if hasattr(frame, 'path') and frame.path:
-                frame_path = Path(frame.path)
-                if frame_path.exists():
-                    # Load image and convert to numpy array
-                    image = Image.open(frame_path)
-                    frame_data = np.array(image)
-                    
-                    # Update cache
-                    self._frame_cache[frame.id] = frame_data
+            results = detector_manager.process_frame(
+                frame.id, take.id,
+                frame_hash=pair_hashes.get(frame.frame_number),
+                cache=self.result_cache,
+                scene_context=f"scene_{scene.id}_angle_{angle.id}" if scene and angle else None,
+                signature=pair_signatures.get(frame.frame_number) if pair_signatures is not None else None,
+                gate=self.change_gate,
+                frames=prefetched.result
+            )
+            
+            # Save results
+            for result in results:
+                self._save_detector_result(result, take.id)
+            
+            # Notify callbacks with take_id added
+            if results:
+                # Add take_id and frame_index to results for SSE
+                for result in results:
+                    result.take_id = take.id
+                    result.frame_index = frame.frame_number
+                self._notify_result_callbacks(results)
+                
+            # Update per-detector progress
+            with self._processing_lock:
+                progress = self.detector_progress.get(detector_name)
+                if progress is not None:
+                    progress['processed'] += 1
+                    progress['last_frame'] = frame.frame_number
+                    progress['status'] = 'processing'
                     
-                    # Limit cache size
-                    if len(self._frame_cache) > self._cache_size:
-                        # Remove oldest entries
-                        oldest_keys = list(self._frame_cache.keys())[:10]
-                        for key in oldest_keys:
-                            del self._frame_cache[key]
-                            
-                    return frame_data
+                    # A fast detector can finish long before the others
+                    if progress['processed'] >= progress['total']:
+                        progress['status'] = 'completed'
+                        self._detector_completion_status[detector_name] = True
                     
-            logger.error(f"Frame file not found: {frame.path if hasattr(frame, 'path') else 'No path'}")
+        except Exception as e:
+            with self._processing_lock:
+                if detector_name in self.detector_progress:
+                    self.detector_progress[detector_name]['status'] = f'error: {str(e)}'
+            raise
+    
+    def _load_frame_pair(self, reference_frame_map: Dict[int, Any],
+                         pair_signatures: Optional[Dict[int, PairSignature]],
+                         frame: Any) -> Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]]:
+        """Load the frame pair detectors are sent for a frame.
+        
+        Runs on the prefetch pool ahead of the detectors and loads exactly
+        what ``_load_container_frames`` does, so the pair is decoded once and
+        handed to the detector requests. Frames stored before fingerprints
+        were recorded get one from the decoded pixels; with
+        ``pair_signatures`` the pair's perceptual signature is added too.
+        
+        Returns:
+            (current, reference, metadata), or None if either frame is missing
+        """
+        reference_frame = reference_frame_map.get(frame.frame_number)
+        if not reference_frame:
+            logger.warning(f"No reference frame for frame {frame.frame_number}")
             return None
             
-        except Exception as e:
-            logger.error(f"Failed to load frame {frame.id}: {e}")
+        frames = self._load_container_frames(frame.take_id, frame.id)
+        if frames is None:
+            logger.error(f"Failed to load frame data for frame {frame.id}")
+            return None
+            
+        current_frame_data, reference_frame_data, _ = frames
+        if frame.fingerprint is None:
+            frame.fingerprint = fingerprint_frame(current_frame_data)
+        if reference_frame.fingerprint is None:
+            reference_frame.fingerprint = fingerprint_frame(reference_frame_data)
+        if pair_signatures is not None:
+            pair_signatures[frame.frame_number] = self.change_gate.signature(current_frame_data, reference_frame_data)
+        return frames
+    
+    def _get_reference_fingerprint(self, reference_take_id: int, frame_id: int,
+                                   reference_frame: np.ndarray) -> Optional[str]:
+        """Get a reference frame's fingerprint, loading the take's stored fingerprints once."""
+        fingerprints = self._reference_fingerprints.get(reference_take_id)
+        if fingerprints is None:
+            fingerprints = self.storage.get_frame_fingerprints(reference_take_id)
+            # Only the active reference take is kept
+            self._reference_fingerprints = {reference_take_id: fingerprints}
+        if frame_id not in fingerprints:
+            fingerprints[frame_id] = fingerprint_frame(reference_frame)
+        return fingerprints[frame_id]
+    
+    @staticmethod
+    def _reference_frame_for(reference_frame_map: Dict[int, Any], reference_frames: List[Any],
+                             frame: Any) -> Optional[Any]:
+        """Get the reference frame a frame is compared against."""
+        reference_frame = reference_frame_map.get(frame.frame_number)
+        if not reference_frame:
+            # Use first reference frame as fallback
+            reference_frame = reference_frames[0] if reference_frames else None
+        return reference_frame
+    
+    def _load_container_frames(self, take_id: int, frame_id: int) -> Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]]:
+        """Load the frame pair a detector container is sent for a frame.
+        
+        Containers cannot read footage, so both frames travel with the request (BGR,
+        as docker_detector_base expects).
+        
+        Returns:
+            (current, reference, metadata), or None if either frame is missing
+        """
+        if take_id == self.current_processing_take_id and self.reference_take_id is not None:
+            reference_take_id = self.reference_take_id
+        else:
+            take = self.storage.get_take(take_id)
+            angle = self.storage.get_angle(take.angle_id) if take else None
+            reference_take_id = getattr(angle, 'reference_take_id', None)
+        if reference_take_id is None:
             return None
             
+        current_frame = self.storage.get_frame_array(take_id, frame_id)
+        reference_frame = self.storage.get_reference_take_frame(reference_take_id, frame_id)
+        if current_frame is None or reference_frame is None:
+            return None
+        return current_frame, reference_frame, {'reference_take_id': reference_take_id}
+    
     def stop_processing(self):
         """Stop processing frames."""
         with self._processing_lock:
             self._stop_requested = True
+            # Unblocks the feeder if it is waiting on a full detector queue
+            if self._detector_pool is not None:
+                self._detector_pool.stop()
             
         if self.processing_thread and self.processing_thread.is_alive():
             logger.info("Stopping processing...")
@@ -2021,18 +2149,39 @@ class DetectorFrameworkService:
     def get_processing_status(self) -> Dict[str, Any]:
         """Get current processing status."""
         with self._processing_lock:
+            detector_progress = {name: dict(info) for name, info in self.detector_progress.items()}
+            processed_frames = self.processed_frames
+            
+            # Each detector runs at its own pace; report how far behind the feeder it is
+            if self._detector_pool is not None:
+                for detector_name, stats in self._detector_pool.get_stats().items():
+                    if detector_name in detector_progress:
+                        detector_progress[detector_name].update({
+                            'lag': stats['lag'],
+                            'peak_lag': stats['peak_lag'],
+                            'max_lag': stats['max_lag'],
+                            'skipped': stats['skipped'],
+                            'failed': stats['failed'],
+                            'busy_time': stats['busy_seconds'],
+                            'avg_time': stats['avg_time']
+                        })
+                if self.is_processing and self._detector_pool.workers:
+                    processed_frames = self._detector_pool.completed_frames()
+            
             # Calculate overall progress based on all detectors
             total_detector_progress = 0
-            active_detector_count = len(self.detector_progress)
+            active_detector_count = len(detector_progress)
             
             if active_detector_count > 0:
-                for detector_info in self.detector_progress.values():
+                for detector_info in detector_progress.values():
                     if detector_info['total'] > 0:
-                        detector_percentage = (detector_info['processed'] / detector_info['total']) * 100
+                        # Skipped and failed frames are finished with too
+                        done = detector_info['processed'] + detector_info.get('skipped', 0) + detector_info.get('failed', 0)
+                        detector_percentage = min(done / detector_info['total'], 1.0) * 100
                         total_detector_progress += detector_percentage
                 overall_progress = total_detector_progress / active_detector_count
             else:
-                overall_progress = (self.processed_frames / self.total_frames * 100) if self.total_frames > 0 else 0
+                overall_progress = (processed_frames / self.total_frames * 100) if self.total_frames > 0 else 0
             
             status = {
                 'is_processing': self.is_processing,
@@ -2040,24 +2189,43 @@ class DetectorFrameworkService:
                 'reference_take_id': self.reference_take_id,
                 'current_frame_index': self.current_frame_index,
                 'total_frames': self.total_frames,
-                'processed_frames': self.processed_frames,
+                'processed_frames': processed_frames,
                 'failed_frames': self.failed_frames,
                 'progress_percentage': overall_progress,
-                'detector_progress': dict(self.detector_progress),  # Include per-detector progress
+                'detector_progress': detector_progress,  # Include per-detector progress and lag
                 'all_detectors_complete': all(self._detector_completion_status.values()) if self._detector_completion_status else False
             }
             
+            # Decode and detector time are reported separately to show which stage limits throughput
+            if self._frame_prefetcher is not None:
+                decode = self._frame_prefetcher.get_stats()
+                slowest_detector_time = max(
+                    (info.get('avg_time', 0.0) for info in detector_progress.values()), default=0.0
+                )
+                # Decode runs on several workers, detectors run side by side
+                decode_time_per_frame = decode['avg_load_time'] / max(decode['workers'], 1)
+                status['pipeline'] = {
+                    'prefetch_depth': decode['depth'],
+                    'prefetch_workers': decode['workers'],
+                    'decode_time': decode['load_seconds'],
+                    'avg_decode_time': decode['avg_load_time'],
+                    'decode_wait_time': decode['wait_seconds'],
+                    'detector_time': {name: info.get('busy_time', 0.0) for name, info in detector_progress.items()},
+                    'avg_detector_time': {name: info.get('avg_time', 0.0) for name, info in detector_progress.items()},
+                    'bottleneck': 'decode' if decode_time_per_frame > slowest_detector_time else 'detectors'
+                }
+            
             # Add timing info
             if self.processing_start_time:
                 elapsed = (self.processing_end_time or time.time()) - self.processing_start_time
                 status['elapsed_time'] = elapsed
                 
                 if elapsed > 0:
-                    status['frames_per_second'] = self.processed_frames / elapsed
+                    status['frames_per_second'] = processed_frames / elapsed
                     
-                    if self.processed_frames < self.total_frames and self.is_processing:
-                        remaining_frames = self.total_frames - self.processed_frames
-                        fps = self.processed_frames / elapsed
+                    if processed_frames < self.total_frames and self.is_processing:
+                        remaining_frames = self.total_frames - processed_frames
+                        fps = processed_frames / elapsed
                         status['estimated_time_remaining'] = remaining_frames / fps if fps > 0 else 0
                         
             return status
@@ -2113,20 +2281,35 @@ class DetectorFrameworkService:
                 logger.info(f"No detectors enabled for scene {scene.id}")
                 return True
             
-            # Load frames
-            current_frame = self.storage.get_frame(current_take_id, frame_id)
-            reference_frame = self.storage.get_frame(reference_take_id, frame_id)
+            # Load frames; the reference take is normally preloaded in memory while monitoring
+            current_frame = self.storage.get_frame_array(current_take_id, frame_id)
+            reference_frame = self.storage.get_reference_take_frame(reference_take_id, frame_id)
             
             if current_frame is None or reference_frame is None:
                 logger.error(f"Failed to load frames for pair ({reference_take_id}, {current_take_id}, {frame_id})")
                 return False
             
+            # Key cached results by the pair's content; the live frame's row may not be written yet
+            frame_hash = pair_fingerprint(
+                fingerprint_frame(current_frame),
+                self._get_reference_fingerprint(reference_take_id, frame_id, reference_frame)
+            )
+            
+            # Perceptual signature, only needed when a detector is change-gated
+            signature = None
+            if self.change_gate.active:
+                signature = self.change_gate.signature(current_frame, reference_frame)
+            
             # Create frame pair
             frame_pair = FramePair(
-                take_id=current_take_id,
-                frame_id=frame_id,
                 current_frame=current_frame,
-                reference_frame=reference_frame
+                reference_frame=reference_frame,
+                current_frame_id=frame_id,
+                reference_frame_id=frame_id,
+                take_id=current_take_id,
+                scene_id=scene.id,
+                angle_id=angle.id,
+                project_id=scene.project_id
             )
             
             # Queue to each enabled detector
@@ -2150,8 +2333,6 @@ class DetectorFrameworkService:
                         logger.info(f"[DetectorFramework] Processing frame {frame_id} with detector {detector_name}")
                         
                         # For Docker-based detectors, we process frames directly
-                        # Calculate frame hash for caching if available
-                        frame_hash = None
                         scene_context = f"scene_{scene.id}_angle_{angle.id}"
                         
                         try:
@@ -2160,7 +2341,9 @@ class DetectorFrameworkService:
                                 frame_id, current_take_id,
                                 frame_hash=frame_hash,
                                 cache=self.result_cache,
-                                scene_context=scene_context
+                                scene_context=scene_context,
+                                signature=signature,
+                                gate=self.change_gate
                             )
                             
                             # Save results
@@ -2194,7 +2377,8 @@ class DetectorFrameworkService:
         """Clean up all active detectors and processes."""
         # Stop any processing first
         self.stop_processing()
-        self._frame_cache.clear()
+        if self.reference_take_id is not None:
+            self.frame_cache.unpin_take(self.reference_take_id)
         
         # Stop recovery manager first
         if hasattr(self, 'recovery_manager'):
@@ -4,10 +4,12 @@ Implements intelligent frame dropping based on importance.
 """
 import logging
 import queue
+import random
 import threading
 from typing import Optional, List, Tuple
 from dataclasses import dataclass, field
 import heapq
+import itertools
 import time
 
 from CAMF.services.detector_framework.interface import FramePair
@@ -24,6 +26,12 @@ class PrioritizedFramePair:
     take_frame_count: int = 0  # Total frames in the take
     is_first_frame: bool = False
     is_last_frame: bool = False
+    removed: bool = False  # Popped or dropped; still referenced by the other heap until discarded
+    
+    @property
+    def droppable(self) -> bool:
+        """First and last frames of a take are never dropped."""
+        return not self.is_first_frame and not self.is_last_frame
     
     def __lt__(self, other):
         """For priority queue comparison - lower priority value = higher priority."""
@@ -39,6 +47,12 @@ class IntelligentFrameQueue:
     - Drops middle frames first when queue approaches capacity
     - Maintains minimum frame coverage for reliable detection
     - Adapts dropping strategy based on processing speed
+    
+    Frames are held in two heaps over the same entries: a min-heap by priority
+    value to take the most important frame, and a max-heap of droppable frames
+    to find the least important one. An entry taken through one heap is only
+    marked removed and discarded when it surfaces in the other, so both get
+    and drop are O(log n).
     """
     
     def __init__(self, maxsize: int = 100, high_water_mark: float = 0.8):
@@ -52,8 +66,12 @@ class IntelligentFrameQueue:
         self.maxsize = maxsize
         self.high_water_mark = int(maxsize * high_water_mark)
         
-        # Priority queue for frame management
+        # Priority queue for frame management, and the droppable frames by
+        # (-priority, sequence) so the least important one is on top
         self._queue: List[PrioritizedFramePair] = []
+        self._droppable: List[Tuple[float, int, PrioritizedFramePair]] = []
+        self._sequence = itertools.count()
+        self._size = 0
         self._lock = threading.RLock()
         self._not_empty = threading.Condition(self._lock)
         
@@ -143,7 +161,7 @@ class IntelligentFrameQueue:
             )
             
             # Check if we need to drop frames
-            current_size = len(self._queue)
+            current_size = self._size
             
             if current_size >= self.maxsize:
                 # Queue is full - must drop something
@@ -165,7 +183,7 @@ class IntelligentFrameQueue:
                         return True  # Return True as frame was "handled"
                 
             # Add frame to queue
-            heapq.heappush(self._queue, prioritized_frame)
+            self._push(prioritized_frame)
             self.frames_added += 1
             self._not_empty.notify()
             
@@ -188,7 +206,7 @@ class IntelligentFrameQueue:
         with self._lock:
             end_time = time.time() + timeout if timeout else None
             
-            while not self._queue:
+            while not self._size:
                 if timeout is None:
                     self._not_empty.wait()
                 else:
@@ -199,10 +217,69 @@ class IntelligentFrameQueue:
                         return None
             
             # Get highest priority (lowest value) frame
-            prioritized_frame = heapq.heappop(self._queue)
+            prioritized_frame = self._pop_best()
             self.frames_processed += 1
             
             return prioritized_frame.frame_pair
+
+    def get_batch(self, max_items: int, timeout: Optional[float] = None,
+                  max_wait: float = 0.0) -> List[FramePair]:
+        """
+        Get up to ``max_items`` frame pairs (highest priority first).
+
+        Waits up to ``timeout`` for the first frame, then up to ``max_wait``
+        more for the batch to fill; whatever has arrived by then is returned.
+
+        Args:
+            max_items: Maximum frame pairs to return
+            timeout: Maximum time to wait for the first frame
+            max_wait: Maximum time to wait for further frames once one is available
+
+        Returns:
+            Frame pairs, empty if timeout
+        """
+        first = self.get(timeout=timeout)
+        if first is None:
+            return []
+
+        batch = [first]
+        with self._lock:
+            deadline = time.time() + max_wait
+            while len(batch) < max_items:
+                if not self._size:
+                    remaining = deadline - time.time()
+                    if remaining <= 0 or not self._not_empty.wait(remaining):
+                        break
+                    continue
+                batch.append(self._pop_best().frame_pair)
+                self.frames_processed += 1
+
+        return batch
+
+    def _push(self, entry: PrioritizedFramePair):
+        """Add an entry to both heaps."""
+        heapq.heappush(self._queue, entry)
+        if entry.droppable:
+            heapq.heappush(self._droppable, (-entry.priority, next(self._sequence), entry))
+        self._size += 1
+        
+        # Removed entries sinking to the bottom of a heap are never popped;
+        # rebuild once they outnumber the live ones (amortised O(1) per put)
+        if len(self._queue) + len(self._droppable) > 4 * self._size + 32:
+            self._queue = [e for e in self._queue if not e.removed]
+            heapq.heapify(self._queue)
+            self._droppable = [item for item in self._droppable if not item[2].removed]
+            heapq.heapify(self._droppable)
+    
+    def _pop_best(self) -> Optional[PrioritizedFramePair]:
+        """Remove and return the highest priority (lowest value) entry."""
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            if not entry.removed:
+                entry.removed = True
+                self._size -= 1
+                return entry
+        return None
     
     def _drop_lowest_priority_frame(self, new_frame: PrioritizedFramePair) -> bool:
         """
@@ -210,33 +287,23 @@ class IntelligentFrameQueue:
         
         Returns True if a frame was dropped, False if all frames are higher priority.
         """
-        if not self._queue:
-            return False
-        
-        # Find frame with highest priority value (lowest importance)
-        max_priority_idx = -1
-        max_priority = new_frame.priority
+        # Discard entries already taken from the main heap
+        while self._droppable and self._droppable[0][2].removed:
+            heapq.heappop(self._droppable)
         
-        for i, frame in enumerate(self._queue):
-            # Don't drop first/last frames or recent frames
-            if not frame.is_first_frame and not frame.is_last_frame:
-                if frame.priority > max_priority:
-                    max_priority = frame.priority
-                    max_priority_idx = i
+        # Don't drop first/last frames (they are not in the droppable heap)
+        # or frames at least as important as the new one
+        if not self._droppable or -self._droppable[0][0] <= new_frame.priority:
+            return False
         
-        if max_priority_idx >= 0:
-            # Remove the frame
-            dropped_frame = self._queue[max_priority_idx]
-            self._queue[max_priority_idx] = self._queue[-1]
-            self._queue.pop()
-            heapq.heapify(self._queue)  # Restore heap property
-            
-            self.frames_dropped += 1
-            logger.debug(f"Dropped frame {dropped_frame.frame_pair.current_frame_id} "
-                       f"with priority {dropped_frame.priority:.2f}")
-            return True
+        _, _, dropped_frame = heapq.heappop(self._droppable)
+        dropped_frame.removed = True
+        self._size -= 1
         
-        return False
+        self.frames_dropped += 1
+        logger.debug(f"Dropped frame {dropped_frame.frame_pair.current_frame_id} "
+                   f"with priority {dropped_frame.priority:.2f}")
+        return True
     
     def _should_drop_frame(self, priority: float, queue_size: int) -> bool:
         """
@@ -255,36 +322,37 @@ class IntelligentFrameQueue:
                 return False
         
         # Make drop decision based on probability
-        import random
         return random.random() < drop_probability
     
     def qsize(self) -> int:
         """Get current queue size."""
         with self._lock:
-            return len(self._queue)
+            return self._size
     
     def empty(self) -> bool:
         """Check if queue is empty."""
         with self._lock:
-            return len(self._queue) == 0
+            return self._size == 0
     
     def get_stats(self) -> dict:
         """Get queue statistics."""
         with self._lock:
             return {
-                'current_size': len(self._queue),
+                'current_size': self._size,
                 'max_size': self.maxsize,
                 'high_water_mark': self.high_water_mark,
                 'frames_added': self.frames_added,
                 'frames_dropped': self.frames_dropped,
                 'frames_processed': self.frames_processed,
                 'drop_rate': self.frames_dropped / max(self.frames_added, 1),
-                'utilization': len(self._queue) / self.maxsize
+                'utilization': self._size / self.maxsize
             }
     
     def clear(self) -> int:
         """Clear all frames from queue."""
         with self._lock:
-            count = len(self._queue)
+            count = self._size
             self._queue.clear()
+            self._droppable.clear()
+            self._size = 0
             return count
\ No newline at end of file
@@ -6,17 +6,16 @@ Implements multi-level caching with LRU in-memory and disk-based storage.
 
 import hashlib
 import json
+import sqlite3
 import time
-import pickle
 import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from collections import OrderedDict
 from datetime import timedelta
-import shutil
 import logging
 
-from CAMF.common.models import DetectorResult, ErrorConfidence
+from CAMF.common.models import DetectorResult
 
 logger = logging.getLogger(__name__)
 
@@ -151,7 +150,45 @@ class LRUCache:
 
 
 class DiskCache:
-    """Disk-based cache with size management."""
+    """
+    Disk cache in a single SQLite file.
+    
+    Entries are rows keyed by cache key with the results as a JSON blob;
+    an index on last access time gives the LRU order and triggers keep the
+    entry count and total size in a stats row, so get, put and eviction are
+    index operations regardless of how many entries are stored. Every put is
+    its own transaction in a write-ahead log, so a crash loses at most the
+    write in progress.
+    """
+    
+    DB_NAME = "results.db"
+    
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            created REAL NOT NULL,
+            last_access REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access);
+        CREATE INDEX IF NOT EXISTS idx_entries_created ON entries(created);
+        CREATE TABLE IF NOT EXISTS totals (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            entries INTEGER NOT NULL,
+            size INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO totals (id, entries, size) VALUES (0, 0, 0);
+        CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+            UPDATE totals SET entries = entries + 1, size = size + NEW.size WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+            UPDATE totals SET entries = entries - 1, size = size - OLD.size WHERE id = 0;
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_resize AFTER UPDATE OF size ON entries BEGIN
+            UPDATE totals SET size = size - OLD.size + NEW.size WHERE id = 0;
+        END;
+    """
     
     def __init__(self, cache_dir: str, max_entries: int = 10000, 
                  max_size_mb: int = 1000):
@@ -159,232 +196,194 @@ class DiskCache:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.max_entries = max_entries
         self.max_size_bytes = max_size_mb * 1024 * 1024
-        
-        self.index_file = self.cache_dir / "cache_index.json"
-        self.index = self._load_index()
         self.lock = threading.RLock()
         
+        self._remove_legacy_files()
+        self.db_path = self.cache_dir / self.DB_NAME
+        self._conn = self._connect()
+        
         # Stats
         self.hits = 0
         self.misses = 0
         self.writes = 0
+        self.evictions = 0
     
-    def _load_index(self) -> Dict[str, Dict[str, Any]]:
-        """Load cache index from disk."""
-        if self.index_file.exists():
-            try:
-                with open(self.index_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load cache index: {e}")
-                return {}
-        return {}
-    
-    def _save_index(self):
-        """Save cache index to disk."""
-        with open(self.index_file, 'w') as f:
-            json.dump(self.index, f)
-    
-    def _get_cache_path(self, key: str) -> Path:
-        """Get file path for cache key."""
-        # Use first 2 chars for directory sharding
-        shard = key[:2]
-        shard_dir = self.cache_dir / shard
-        shard_dir.mkdir(exist_ok=True)
-        return shard_dir / f"{key}.pkl"
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database, creating its tables if needed."""
+        # Autocommit mode: each statement (or explicit BEGIN block) is its own transaction
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(self._SCHEMA)
+        return conn
+    
+    def _remove_legacy_files(self):
+        """Drop the pickle files and JSON index of the previous cache layout."""
+        index_file = self.cache_dir / "cache_index.json"
+        if not index_file.exists():
+            return
+        index_file.unlink(missing_ok=True)
+        for pickle_file in self.cache_dir.glob("*/*.pkl"):
+            pickle_file.unlink(missing_ok=True)
+        for shard_dir in self.cache_dir.iterdir():
+            if shard_dir.is_dir() and not any(shard_dir.iterdir()):
+                shard_dir.rmdir()
+    
+    @staticmethod
+    def _serialize(value: List[DetectorResult]) -> bytes:
+        return json.dumps([result.model_dump(mode='json') for result in value]).encode('utf-8')
+    
+    @staticmethod
+    def _deserialize(data: bytes) -> List[DetectorResult]:
+        return [DetectorResult.model_validate(result_data) for result_data in json.loads(data)]
     
     def get(self, key: str) -> Optional[List[DetectorResult]]:
         """Get item from disk cache."""
         with self.lock:
-            if key not in self.index:
-                self.misses += 1
-                return None
-            
-            cache_path = self._get_cache_path(key)
-            if not cache_path.exists():
-                # Index out of sync
-                del self.index[key]
-                self._save_index()
+            row = self._conn.execute("SELECT data FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
                 self.misses += 1
                 return None
             
             try:
-                with open(cache_path, 'rb') as f:
-                    data = pickle.load(f)
-                
-                # Update access time
-                self.index[key]['last_access'] = time.time()
-                self.hits += 1
-                
-                # Deserialize results
-                results = []
-                for result_data in data:
-                    result = DetectorResult(
-                        confidence=ErrorConfidence(result_data['confidence']),
-                        description=result_data['description'],
-                        frame_id=result_data['frame_id'],
-                        detector_name=result_data['detector_name'],
-                        bounding_boxes=result_data.get('bounding_boxes', []),
-                        metadata=result_data.get('metadata', {}),
-                        timestamp=result_data.get('timestamp', time.time())
-                    )
-                    results.append(result)
-                
-                return results
-                
+                results = self._deserialize(row[0])
             except Exception as e:
-                print(f"Error reading cache file {cache_path}: {e}")
-                # Remove corrupted entry
-                del self.index[key]
-                cache_path.unlink(missing_ok=True)
-                self._save_index()
+                logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
                 self.misses += 1
                 return None
+            
+            # Update access time
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return results
     
     def put(self, key: str, value: List[DetectorResult]):
         """Put item in disk cache."""
+        data = self._serialize(value)
+        now = time.time()
         with self.lock:
-            # Serialize results
-            data = []
-            for result in value:
-                data.append({
-                    'confidence': result.confidence if isinstance(result.confidence, (int, float)) else result.confidence.value,
-                    'description': result.description,
-                    'frame_id': result.frame_id,
-                    'detector_name': result.detector_name,
-                    'bounding_boxes': result.bounding_boxes,
-                    'metadata': result.metadata,
-                    'timestamp': result.timestamp
-                })
-            
-            cache_path = self._get_cache_path(key)
-            
             try:
-                with open(cache_path, 'wb') as f:
-                    pickle.dump(data, f)
-                
-                file_size = cache_path.stat().st_size
-                
-                self.index[key] = {
-                    'size': file_size,
-                    'created': time.time(),
-                    'last_access': time.time()
-                }
-                
-                self.writes += 1
-                
-                # Check if we need to evict
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(
+                    "INSERT INTO entries (key, data, size, created, last_access) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET data = excluded.data, size = excluded.size, "
+                    "created = excluded.created, last_access = excluded.last_access",
+                    (key, data, len(data), now, now)
+                )
                 self._evict_if_needed()
-                
-                # Save index periodically
-                if self.writes % 100 == 0:
-                    self._save_index()
-                
+                self._conn.execute("COMMIT")
+                self.writes += 1
             except Exception as e:
-                print(f"Error writing cache file {cache_path}: {e}")
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.error(f"Error writing cache entry {key}: {e}")
+    
+    def _totals(self) -> Tuple[int, int]:
+        """Entry count and total size in bytes."""
+        return self._conn.execute("SELECT entries, size FROM totals WHERE id = 0").fetchone()
     
     def _evict_if_needed(self):
-        """Evict old entries if over limits."""
-        # Check entry count
-        if len(self.index) > self.max_entries:
-            self._evict_lru(len(self.index) - self.max_entries)
+        """Evict least recently used entries while over a limit."""
+        entries, total_size = self._totals()
+        if entries > self.max_entries:
+            self._evict_lru(entries - self.max_entries)
+            entries, total_size = self._totals()
         
-        # Check total size
-        total_size = sum(entry['size'] for entry in self.index.values())
         if total_size > self.max_size_bytes:
             self._evict_until_size(self.max_size_bytes * 0.9)  # 90% target
     
     def _evict_lru(self, count: int):
-        """Evict least recently used entries."""
-        # Sort by last access time
-        sorted_keys = sorted(self.index.keys(), 
-                           key=lambda k: self.index[k]['last_access'])
-        
-        for key in sorted_keys[:count]:
-            cache_path = self._get_cache_path(key)
-            cache_path.unlink(missing_ok=True)
-            del self.index[key]
-    
-    def _evict_until_size(self, target_size: int):
-        """Evict until total size is below target."""
-        sorted_keys = sorted(self.index.keys(), 
-                           key=lambda k: self.index[k]['last_access'])
-        
-        total_size = sum(entry['size'] for entry in self.index.values())
-        
-        for key in sorted_keys:
-            if total_size <= target_size:
+        """Evict the ``count`` least recently used entries."""
+        cursor = self._conn.execute(
+            "DELETE FROM entries WHERE key IN "
+            "(SELECT key FROM entries ORDER BY last_access LIMIT ?)", (count,)
+        )
+        self.evictions += cursor.rowcount
+    
+    def _evict_until_size(self, target_size: float):
+        """Evict least recently used entries until the total size is below target."""
+        _, total_size = self._totals()
+        while total_size > target_size:
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
                 break
-            
-            entry_size = self.index[key]['size']
-            cache_path = self._get_cache_path(key)
-            cache_path.unlink(missing_ok=True)
-            del self.index[key]
-            total_size -= entry_size
+            victims = []
+            for key, size in rows:
+                if total_size <= target_size:
+                    break
+                victims.append((key,))
+                total_size -= size
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+            self.evictions += len(victims)
+    
+    def expire(self, max_age_seconds: float) -> int:
+        """Remove entries created more than ``max_age_seconds`` ago.
+        
+        Returns:
+            Number of entries removed
+        """
+        with self.lock:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE created < ?", (time.time() - max_age_seconds,)
+            )
+            return cursor.rowcount
     
     def invalidate(self, key: str) -> bool:
         """Remove specific key from cache."""
         with self.lock:
-            if key in self.index:
-                cache_path = self._get_cache_path(key)
-                cache_path.unlink(missing_ok=True)
-                del self.index[key]
-                return True
-            return False
+            cursor = self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return cursor.rowcount > 0
     
     def invalidate_pattern(self, pattern: str) -> int:
-        """Invalidate all keys matching pattern."""
+        """Invalidate all keys containing pattern."""
         with self.lock:
-            keys_to_remove = [k for k in self.index.keys() if pattern in k]
-            for key in keys_to_remove:
-                cache_path = self._get_cache_path(key)
-                cache_path.unlink(missing_ok=True)
-                del self.index[key]
-            
-            if keys_to_remove:
-                self._save_index()
-            
-            return len(keys_to_remove)
+            cursor = self._conn.execute("DELETE FROM entries WHERE instr(key, ?) > 0", (pattern,))
+            return cursor.rowcount
     
     def clear(self):
         """Clear entire disk cache."""
         with self.lock:
-            # Remove all cache files
-            shutil.rmtree(self.cache_dir, ignore_errors=True)
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Reset index
-            self.index = {}
-            self._save_index()
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("VACUUM")
             
             # Reset stats
             self.hits = 0
             self.misses = 0
             self.writes = 0
+            self.evictions = 0
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         with self.lock:
-            total_size = sum(entry['size'] for entry in self.index.values())
+            entries, total_size = self._totals()
             total_requests = self.hits + self.misses
             hit_rate = self.hits / total_requests if total_requests > 0 else 0
             
             return {
-                'entries': len(self.index),
+                'entries': entries,
                 'max_entries': self.max_entries,
                 'total_size_mb': total_size / (1024 * 1024),
                 'max_size_mb': self.max_size_bytes / (1024 * 1024),
                 'hits': self.hits,
                 'misses': self.misses,
                 'writes': self.writes,
+                'evictions': self.evictions,
                 'hit_rate': hit_rate,
                 'total_requests': total_requests
             }
     
     def cleanup(self):
-        """Clean up resources and save index."""
+        """Fold the write-ahead log into the database file."""
         with self.lock:
-            self._save_index()
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    def close(self):
+        """Close the database."""
+        with self.lock:
+            self._conn.close()
 
 
 class ResultCache:
@@ -415,6 +414,8 @@ class ResultCache:
         
         # Performance tracking
         self.lookup_times = []
+        self.hits = 0
+        self.misses = 0
         self.lock = threading.RLock()
         
         # Start background cleanup
@@ -435,7 +436,7 @@ class ResultCache:
         # Check memory cache first
         results = self.memory_cache.get(cache_key)
         if results is not None:
-            self._record_lookup_time(time.time() - start_time)
+            self._record_lookup_time(time.time() - start_time, hit=True)
             return results
         
         # Check disk cache
@@ -443,10 +444,10 @@ class ResultCache:
         if results is not None:
             # Promote to memory cache
             self.memory_cache.put(cache_key, results)
-            self._record_lookup_time(time.time() - start_time)
+            self._record_lookup_time(time.time() - start_time, hit=True)
             return results
         
-        self._record_lookup_time(time.time() - start_time)
+        self._record_lookup_time(time.time() - start_time, hit=False)
         return None
     
     def put(self, frame_hash: str, detector_name: str, detector_version: str,
@@ -513,25 +514,32 @@ class ResultCache:
         if self.lookup_times:
             avg_lookup_time = sum(self.lookup_times) / len(self.lookup_times) * 1000  # ms
         
-        # Overall hit rate
-        total_hits = memory_stats['hits'] + disk_stats['hits']
-        total_requests = memory_stats['total_requests'] + disk_stats['total_requests']
-        overall_hit_rate = total_hits / total_requests if total_requests > 0 else 0
+        # Overall hit rate; a disk lookup only follows a memory miss, so count lookups here
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        total_requests = hits + misses
+        overall_hit_rate = hits / total_requests if total_requests > 0 else 0
         
         return {
             'memory': memory_stats,
             'disk': disk_stats,
             'overall': {
                 'hit_rate': overall_hit_rate,
+                'hits': hits,
+                'misses': misses,
                 'avg_lookup_time_ms': avg_lookup_time,
                 'total_requests': total_requests,
                 'detector_versions': len(self.detector_versions)
             }
         }
     
-    def _record_lookup_time(self, time_seconds: float):
-        """Record lookup time for performance tracking."""
+    def _record_lookup_time(self, time_seconds: float, hit: bool):
+        """Record lookup time and outcome for performance tracking."""
         with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
             self.lookup_times.append(time_seconds)
             # Keep last 1000 lookups
             if len(self.lookup_times) > 1000:
@@ -552,21 +560,10 @@ class ResultCache:
     
     def _cleanup_expired(self):
         """Remove expired entries based on TTL."""
-        current_time = time.time()
-        ttl_seconds = self.ttl.total_seconds()
-        
         # Clean disk cache
-        with self.disk_cache.lock:
-            expired_keys = []
-            for key, info in self.disk_cache.index.items():
-                if current_time - info['created'] > ttl_seconds:
-                    expired_keys.append(key)
-            
-            for key in expired_keys:
-                self.disk_cache.invalidate(key)
-            
-            if expired_keys:
-                print(f"Cleaned up {len(expired_keys)} expired cache entries")
+        expired = self.disk_cache.expire(self.ttl.total_seconds())
+        if expired:
+            logger.info(f"Cleaned up {expired} expired cache entries")
     
     def warm_cache(self, frame_hashes: List[str], detector_name: str,
                    detector_version: str, config: Dict[str, Any],
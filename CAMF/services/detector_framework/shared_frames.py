@@ -0,0 +1,221 @@
+# CAMF/services/detector_framework/shared_frames.py
+"""
+Shared-memory frame transport for local detector processes.
+
+The parent writes each decoded current/reference frame pair once into a slot
+of a SharedFrameRing and sends detector processes only a small FrameSlotRef.
+Children map the same memory with SharedFrameReader and get read-only NumPy
+views without copying or unpickling pixels. A slot is reused once every
+detector it was sent to has released it.
+"""
+
+import sys
+import threading
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Any, Deque, Dict, NamedTuple, Optional, Tuple
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SLOT_ALIGNMENT = 64
+
+
+def _aligned(size: int) -> int:
+    return (size + SLOT_ALIGNMENT - 1) // SLOT_ALIGNMENT * SLOT_ALIGNMENT
+
+
+class FrameSlotRef(NamedTuple):
+    """Location of a frame pair in a SharedFrameRing, sent to detector processes."""
+    ring: str
+    slot: int
+    generation: int
+    offset: int
+    current_shape: Tuple[int, ...]
+    reference_shape: Tuple[int, ...]
+    reference_offset: int
+    dtype: str
+
+
+class SharedFrameRing:
+    """
+    Fixed number of frame pair slots in one shared memory block (parent side).
+
+    Each slot carries a reference count set to the number of detectors the
+    pair is sent to and a generation that changes on every write, so a late
+    or duplicate release cannot free a slot that has since been reused.
+    """
+
+    def __init__(self, slot_count: int, slot_bytes: int):
+        self.slot_count = slot_count
+        self.slot_bytes = _aligned(slot_bytes)
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_count * self.slot_bytes)
+        self._refcounts = [0] * slot_count
+        self._generations = [0] * slot_count
+        self._free: Deque[int] = deque(range(slot_count))
+        self._cond = threading.Condition()
+        self._closed = False
+        self._writes = 0
+        self._releases = 0
+        self._full_waits = 0
+        self._rejected = 0
+        self._bytes_written = 0
+
+    @classmethod
+    def for_frames(cls, current: np.ndarray, reference: np.ndarray, slot_count: int) -> 'SharedFrameRing':
+        """Create a ring whose slots fit frame pairs of the given size."""
+        return cls(slot_count, _aligned(current.nbytes) + _aligned(reference.nbytes))
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def fits(self, current: np.ndarray, reference: np.ndarray) -> bool:
+        """Check whether a frame pair fits in one slot."""
+        return _aligned(current.nbytes) + reference.nbytes <= self.slot_bytes
+
+    def write_pair(self, current: np.ndarray, reference: np.ndarray, subscribers: int,
+                   timeout: Optional[float] = None) -> Optional[FrameSlotRef]:
+        """
+        Copy a frame pair into a free slot.
+
+        Args:
+            current: Current frame
+            reference: Reference frame (same dtype as current)
+            subscribers: Number of detectors that will release the slot
+            timeout: Seconds to wait for a free slot (None waits indefinitely)
+
+        Returns:
+            Reference to the slot, or None if the pair does not fit, no slot
+            was freed in time or the ring is closed
+        """
+        if subscribers < 1 or current.dtype != reference.dtype or not self.fits(current, reference):
+            with self._cond:
+                self._rejected += 1
+            return None
+
+        with self._cond:
+            if not self._free and not self._closed:
+                self._full_waits += 1
+                self._cond.wait_for(lambda: self._free or self._closed, timeout)
+            if self._closed or not self._free:
+                self._rejected += 1
+                return None
+            slot = self._free.popleft()
+            self._refcounts[slot] = subscribers
+            self._generations[slot] += 1
+            generation = self._generations[slot]
+
+        # The slot is ours until it is released, so the copy needs no lock
+        offset = slot * self.slot_bytes
+        reference_offset = offset + _aligned(current.nbytes)
+        np.ndarray(current.shape, current.dtype, buffer=self._shm.buf, offset=offset)[...] = current
+        np.ndarray(reference.shape, reference.dtype, buffer=self._shm.buf, offset=reference_offset)[...] = reference
+
+        with self._cond:
+            self._writes += 1
+            self._bytes_written += current.nbytes + reference.nbytes
+
+        return FrameSlotRef(
+            self.name, slot, generation, offset,
+            tuple(current.shape), tuple(reference.shape), reference_offset, current.dtype.str
+        )
+
+    def release(self, slot: int, generation: int, count: int = 1) -> bool:
+        """
+        Drop references to a slot; the slot is freed when none are left.
+
+        Returns:
+            False if the slot has already been freed or reused
+        """
+        with self._cond:
+            if (not 0 <= slot < self.slot_count or self._generations[slot] != generation
+                    or self._refcounts[slot] <= 0):
+                return False
+            self._refcounts[slot] = max(0, self._refcounts[slot] - count)
+            self._releases += 1
+            if self._refcounts[slot] == 0:
+                self._free.append(slot)
+                self._cond.notify()
+            return True
+
+    def close(self):
+        """Free the shared memory block. Waiting writers give up."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get ring counters."""
+        with self._cond:
+            return {
+                'name': self.name,
+                'slots': self.slot_count,
+                'slot_bytes': self.slot_bytes,
+                'free_slots': len(self._free),
+                'writes': self._writes,
+                'releases': self._releases,
+                'full_waits': self._full_waits,
+                'rejected': self._rejected,
+                'bytes_written': self._bytes_written
+            }
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without letting this process unlink it on exit."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the block with the resource tracker, which
+    # then unlinks it when this process exits. Unregistering afterwards is not
+    # an option: a forked child shares the parent's tracker and registration.
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedFrameReader:
+    """Child-side, read-only access to frame pairs in SharedFrameRings."""
+
+    def __init__(self):
+        self._segments: Dict[str, shared_memory.SharedMemory] = {}
+
+    def views(self, ref: FrameSlotRef) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Map a frame pair without copying.
+
+        The views are only valid until the slot is released.
+
+        Returns:
+            (current, reference) read-only arrays
+        """
+        shm = self._segments.get(ref.ring)
+        if shm is None:
+            shm = self._segments[ref.ring] = _attach(ref.ring)
+        dtype = np.dtype(ref.dtype)
+        current = np.ndarray(ref.current_shape, dtype, buffer=shm.buf, offset=ref.offset)
+        reference = np.ndarray(ref.reference_shape, dtype, buffer=shm.buf, offset=ref.reference_offset)
+        current.flags.writeable = False
+        reference.flags.writeable = False
+        return current, reference
+
+    def close(self):
+        """Detach from all rings."""
+        for shm in self._segments.values():
+            try:
+                shm.close()
+            except BufferError:
+                # A view is still alive; the mapping goes away with the process
+                pass
+        self._segments.clear()
@@ -3,13 +3,13 @@ Database schema for CAMF storage.
 Clean implementation without legacy suffixes.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, ForeignKey, JSON, DateTime, Text, text, Index, CheckConstraint, UniqueConstraint
+from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, ForeignKey, JSON, DateTime, Text, text, Index, CheckConstraint, UniqueConstraint, and_, or_, inspect
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship, Session
 from sqlalchemy.pool import QueuePool, StaticPool
 import datetime
 import logging
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
 import time
 from CAMF.common.ensure_db_path import ensure_db_directory
 
@@ -199,6 +199,7 @@ class FrameDB(Base):
     frame_number = Column(Integer, nullable=False)
     timestamp = Column(Float, nullable=False)
     path = Column(String(512), nullable=False)
+    fingerprint = Column(String(32), nullable=True)  # Pixel hash, see frame_fingerprint
 
     take = relationship("TakeDB", back_populates="frames")
     
@@ -233,6 +234,8 @@ class DetectorResultDB(Base):
     
     __table_args__ = (
         Index('idx_take_frame_detector', 'take_id', 'frame_id', 'detector_name'),
+        # Serves keyset listings ordered by (frame_id, id); SQLite appends the rowid
+        Index('idx_result_take_frame', 'take_id', 'frame_id'),
         Index('idx_confidence', 'confidence'),
         CheckConstraint('confidence >= -1.0 AND confidence <= 1.0', name='check_confidence_range'),
     )
@@ -245,6 +248,12 @@ def init_db():
     # Create all tables
     Base.metadata.create_all(bind=engine)
     
+    # create_all skips existing tables; add columns and indexes introduced since they were created
+    _add_missing_columns(engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
     # Test the connection
     SessionLocal = get_session_factory()
     with SessionLocal() as session:
@@ -255,6 +264,22 @@ def init_db():
             logger.error(f"Database initialization error: {e}")
             raise
 
+def _add_missing_columns(engine):
+    """Add nullable columns that are in the schema but not in existing tables."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                logger.info(f"Added column {table.name}.{column.name}")
+
 def drop_all_tables():
     """Drop all tables - use with caution!"""
     engine = get_engine()
@@ -268,17 +293,27 @@ def reset_database():
     logger.info("Database reset complete")
 
 # Batch insert functions
-def bulk_insert_frames(frames: list) -> bool:
-    """Bulk insert frames for better performance."""
+def bulk_insert_frames(frames: list, session: Session = None) -> bool:
+    """Bulk insert frames for better performance.
+    
+    When a session is passed the rows join its transaction and the caller commits.
+    """
+    own_session = session is None
     try:
-        session = get_session()
+        if own_session:
+            session = get_session()
         session.bulk_insert_mappings(FrameDB, frames)
-        session.commit()
-        session.close()
+        if own_session:
+            session.commit()
         return True
     except Exception as e:
         logger.error(f"Bulk frame insert failed: {e}")
+        if own_session and session is not None:
+            session.rollback()
         return False
+    finally:
+        if own_session and session is not None:
+            session.close()
 
 def bulk_insert_detector_results(results: list) -> bool:
     """Bulk insert detector results."""
@@ -292,6 +327,134 @@ def bulk_insert_detector_results(results: list) -> bool:
         logger.error(f"Bulk detector results insert failed: {e}")
         return False
 
+# Projected listings
+#
+# Listings select only the columns they return and page with keyset
+# conditions on indexed columns instead of OFFSET, so the cost of a page does
+# not grow with its position in a long take. Each page runs in its own short
+# session; iterators never hold a transaction open while callers consume rows.
+
+DEFAULT_LISTING_BATCH_SIZE = 500
+
+class FrameRow(NamedTuple):
+    """Frame columns returned by frame listings."""
+    take_id: int
+    frame_number: int
+    timestamp: float
+    path: str
+    fingerprint: Optional[str] = None
+
+    @property
+    def id(self) -> int:
+        # Frames are addressed by their number within the take
+        return self.frame_number
+
+class DetectorResultRow(NamedTuple):
+    """Detector result columns returned by result listings.
+
+    ``bounding_boxes`` and ``meta_data`` are only loaded when details are requested.
+    """
+    id: int
+    take_id: int
+    frame_id: int
+    detector_name: str
+    confidence: float
+    description: Optional[str]
+    error_group_id: Optional[str]
+    is_false_positive: bool
+    bounding_boxes: Optional[list] = None
+    meta_data: Optional[dict] = None
+
+_FRAME_ROW_COLUMNS = (FrameDB.take_id, FrameDB.frame_number, FrameDB.timestamp, FrameDB.path, FrameDB.fingerprint)
+_RESULT_ROW_COLUMNS = (
+    DetectorResultDB.id, DetectorResultDB.take_id, DetectorResultDB.frame_id,
+    DetectorResultDB.detector_name, DetectorResultDB.confidence, DetectorResultDB.description,
+    DetectorResultDB.error_group_id, DetectorResultDB.is_false_positive
+)
+_RESULT_DETAIL_COLUMNS = (DetectorResultDB.bounding_boxes, DetectorResultDB.meta_data)
+
+def get_frame_rows_page(take_id: int, after: int = -1, limit: int = DEFAULT_LISTING_BATCH_SIZE,
+                        end: Optional[int] = None) -> List[FrameRow]:
+    """Get the next page of a take's frames in frame order.
+
+    Args:
+        take_id: Take ID
+        after: Keyset cursor; only frames numbered above it are returned
+        limit: Maximum number of rows
+        end: Last frame number to include
+
+    Returns:
+        Frame rows
+    """
+    session = get_session()
+    try:
+        query = session.query(*_FRAME_ROW_COLUMNS).filter(
+            FrameDB.take_id == take_id,
+            FrameDB.frame_number > after
+        )
+        if end is not None:
+            query = query.filter(FrameDB.frame_number <= end)
+        rows = query.order_by(FrameDB.frame_number).limit(limit).all()
+        return [FrameRow(*row) for row in rows]
+    finally:
+        session.close()
+
+def iter_frame_rows(take_id: int, start: int = 0, end: Optional[int] = None,
+                    batch_size: int = DEFAULT_LISTING_BATCH_SIZE) -> Iterator[FrameRow]:
+    """Stream a take's frames in frame order, one keyset page at a time."""
+    after = start - 1
+    while True:
+        rows = get_frame_rows_page(take_id, after, batch_size, end)
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        after = rows[-1].frame_number
+
+def get_detector_result_rows_page(take_id: int, after: Optional[Tuple[int, int]] = None,
+                                  limit: int = DEFAULT_LISTING_BATCH_SIZE,
+                                  frame_id: Optional[int] = None,
+                                  include_details: bool = False) -> List[DetectorResultRow]:
+    """Get the next page of a take's detector results ordered by (frame_id, id).
+
+    Args:
+        take_id: Take ID
+        after: Keyset cursor (frame_id, id) of the last row already returned
+        limit: Maximum number of rows
+        frame_id: Only return results for this frame
+        include_details: Also load the bounding box and metadata JSON columns
+
+    Returns:
+        Detector result rows
+    """
+    columns = _RESULT_ROW_COLUMNS + (_RESULT_DETAIL_COLUMNS if include_details else ())
+    session = get_session()
+    try:
+        query = session.query(*columns).filter(DetectorResultDB.take_id == take_id)
+        if frame_id is not None:
+            query = query.filter(DetectorResultDB.frame_id == frame_id)
+        if after is not None:
+            after_frame, after_id = after
+            query = query.filter(or_(
+                DetectorResultDB.frame_id > after_frame,
+                and_(DetectorResultDB.frame_id == after_frame, DetectorResultDB.id > after_id)
+            ))
+        rows = query.order_by(DetectorResultDB.frame_id, DetectorResultDB.id).limit(limit).all()
+        return [DetectorResultRow(*row) for row in rows]
+    finally:
+        session.close()
+
+def iter_detector_result_rows(take_id: int, frame_id: Optional[int] = None,
+                              include_details: bool = False,
+                              batch_size: int = DEFAULT_LISTING_BATCH_SIZE) -> Iterator[DetectorResultRow]:
+    """Stream a take's detector results ordered by (frame_id, id), one keyset page at a time."""
+    after = None
+    while True:
+        rows = get_detector_result_rows_page(take_id, after, batch_size, frame_id, include_details)
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        after = (rows[-1].frame_id, rows[-1].id)
+
 # Maintenance functions
 def vacuum_database():
     """Run VACUUM on the database (SQLite only)."""
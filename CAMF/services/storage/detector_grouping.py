@@ -7,6 +7,8 @@ from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
+from CAMF.common.box_matching import BoxGridIndex, boxes_match, boxes_to_array
+
 logger = logging.getLogger(__name__)
 
 class DetectorResultGrouping:
@@ -150,18 +152,13 @@ class DetectorResultGrouping:
             # No spatial data, match by description only
             return True
             
-        # Check if any boxes match
-        for box1 in boxes1:
-            for box2 in boxes2:
-                # Check IoU
-                if cls.calculate_iou(box1, box2) >= cls.IOU_THRESHOLD:
-                    return True
-                    
-                # Check position distance
-                if cls.calculate_position_distance(box1, box2) <= cls.POSITION_THRESHOLD:
-                    return True
-                    
-        return False
+        # Check if any boxes match, scoring all pairs at once
+        return cls._boxes_match(boxes_to_array(boxes1), boxes_to_array(boxes2))
+    
+    @classmethod
+    def _boxes_match(cls, boxes1, boxes2) -> bool:
+        """Check whether any pair of box arrays overlaps or lies close enough."""
+        return boxes_match(boxes1, boxes2, cls.IOU_THRESHOLD, cls.POSITION_THRESHOLD)
     
     @classmethod
     def _mark_continuous_ends(cls, grouped_results: List[Dict[str, Any]]):
@@ -254,4 +251,261 @@ class DetectorResultGrouping:
             summaries.append(group)
         
         # Sort by first frame
-        return sorted(summaries, key=lambda x: x['first_frame_id'])
\ No newline at end of file
+        return sorted(summaries, key=lambda x: x['first_frame_id'])
+
+class TakeErrorGroups:
+    """
+    Continuous error groups of one take, maintained incrementally.
+    
+    Produces the same groups and summary as running
+    DetectorResultGrouping.group_detector_results and
+    get_continuous_error_summary over all results of the take, but folds in
+    each result as it is saved. Per detector only the groups that a later
+    frame can still extend are kept open, so a result in frame order costs
+    O(open groups of its detector). A result arriving out of frame order, or a
+    change to a result's description or boxes, regroups only that detector.
+    Summaries are rebuilt only for groups that changed.
+    """
+    
+    def __init__(self, use_spatial: bool = True):
+        self.use_spatial = use_spatial
+        self._results: Dict[Any, Dict[str, Any]] = {}  # result id -> result
+        self._order: Dict[Any, int] = {}  # result id -> arrival order, breaks frame ties
+        self._seq = 0
+        self._max_id: Optional[int] = None
+        
+        self._groups: Dict[str, List[Dict[str, Any]]] = {}  # group id -> instances in frame order
+        self._group_detector: Dict[str, str] = {}
+        self._group_seq: Dict[str, int] = {}
+        self._open: Dict[str, List[str]] = {}  # detector -> extendable group ids, oldest first
+        self._last_frame: Dict[str, int] = {}  # detector -> highest frame folded in
+        # Boxes of each open group's latest instance, indexed per detector
+        self._group_boxes: Dict[str, Any] = {}
+        self._box_index: Dict[str, BoxGridIndex] = {}
+        self._boxless: Dict[str, set] = {}  # detector -> open groups whose latest instance has no boxes
+        
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        self._dirty_groups: set = set()
+        self._dirty_detectors: set = set()
+        self._summary: Optional[List[Dict[str, Any]]] = None
+        
+        self.folds = 0
+        self.regroups = 0
+    
+    @property
+    def result_count(self) -> int:
+        return len(self._results)
+    
+    @property
+    def max_result_id(self) -> Optional[int]:
+        return self._max_id
+    
+    @property
+    def group_count(self) -> int:
+        return len(self._groups)
+    
+    def add_result(self, result: Dict[str, Any]):
+        """
+        Fold a new or updated result into the groups.
+        
+        Args:
+            result: Result dict with id, frame_id, detector_name, description,
+                confidence, bounding_boxes, is_false_positive and metadata
+        """
+        result_id = result.get('id')
+        if result_id is None:
+            result_id = ('new', self._seq)
+        
+        existing = self._results.get(result_id)
+        if existing is not None:
+            self._update_result(existing, result)
+            return
+        
+        result = dict(result)
+        self._results[result_id] = result
+        self._order[result_id] = self._seq
+        self._seq += 1
+        if isinstance(result_id, int):
+            self._max_id = result_id if self._max_id is None else max(self._max_id, result_id)
+        
+        detector = result['detector_name']
+        if detector in self._dirty_detectors:
+            pass
+        elif result['frame_id'] < self._last_frame.get(detector, result['frame_id']):
+            # Earlier than frames already grouped; regroup this detector on next read
+            self._dirty_detectors.add(detector)
+        else:
+            self._fold(result)
+        self._summary = None
+    
+    def set_false_positive(self, result_ids: List[Any], is_false_positive: bool) -> int:
+        """
+        Update the false positive flag of results.
+        
+        Returns:
+            Number of known results updated
+        """
+        updated = 0
+        for result_id in result_ids:
+            result = self._results.get(result_id)
+            if result is None:
+                continue
+            result['is_false_positive'] = is_false_positive
+            if result.get('error_group_id') in self._groups:
+                self._dirty_groups.add(result['error_group_id'])
+            updated += 1
+        if updated:
+            self._summary = None
+        return updated
+    
+    def get_summary(self) -> List[Dict[str, Any]]:
+        """Get the continuous error summary, rebuilding only what changed."""
+        if self._summary is not None:
+            return self._summary
+        
+        for detector in list(self._dirty_detectors):
+            self._regroup(detector)
+        self._dirty_detectors.clear()
+        
+        for group_id in self._dirty_groups:
+            if group_id in self._groups:
+                self._summaries[group_id] = self._summarize(group_id)
+            else:
+                self._summaries.pop(group_id, None)
+        self._dirty_groups.clear()
+        
+        # Same order as the batch summary: first frame, then detector, then creation
+        self._summary = sorted(
+            self._summaries.values(),
+            key=lambda s: (s['first_frame_id'], s['detector_name'], self._group_seq[s['error_group_id']])
+        )
+        return self._summary
+    
+    def _update_result(self, existing: Dict[str, Any], result: Dict[str, Any]):
+        regroup = (
+            existing['frame_id'] != result['frame_id'] or
+            existing.get('description') != result.get('description') or
+            (existing.get('bounding_boxes') or []) != (result.get('bounding_boxes') or [])
+        )
+        for key, value in result.items():
+            if key not in ('error_group_id', 'is_continuous_start', 'is_continuous_end'):
+                existing[key] = value
+        
+        if regroup:
+            self._dirty_detectors.add(existing['detector_name'])
+        elif existing.get('error_group_id') in self._groups:
+            self._dirty_groups.add(existing['error_group_id'])
+        self._summary = None
+    
+    def _fold(self, result: Dict[str, Any]):
+        """Assign a result that is not earlier than its detector's grouped frames."""
+        detector = result['detector_name']
+        frame_id = result['frame_id']
+        grouping = DetectorResultGrouping
+        index = self._box_index.setdefault(detector, BoxGridIndex(
+            cell_size=grouping.POSITION_THRESHOLD, search_radius=grouping.POSITION_THRESHOLD
+        ))
+        boxless = self._boxless.setdefault(detector, set())
+        
+        # Groups whose last frame is too far back can never be extended again
+        open_groups = []
+        for group_id in self._open.get(detector, []):
+            if frame_id - self._groups[group_id][-1]['frame_id'] <= grouping.FRAME_GAP_THRESHOLD:
+                open_groups.append(group_id)
+            else:
+                self._close_group(detector, group_id)
+        
+        # None when the result has no spatial data and matches by description only
+        boxes = boxes_to_array(result['bounding_boxes']) if result.get('bounding_boxes') else None
+        if self.use_spatial and boxes is not None:
+            # Only groups with a box nearby, or without boxes, can match spatially
+            candidates = index.query(boxes) | boxless
+        else:
+            candidates = None
+        
+        matched_group_id = None
+        for group_id in open_groups:
+            if candidates is not None and group_id not in candidates:
+                continue
+            last = self._groups[group_id][-1]
+            if last.get('description') != result.get('description'):
+                continue
+            group_boxes = self._group_boxes[group_id]
+            if candidates is None or group_boxes is None or grouping._boxes_match(boxes, group_boxes):
+                matched_group_id = group_id
+                break
+        
+        if matched_group_id:
+            instances = self._groups[matched_group_id]
+            instances[-1]['is_continuous_end'] = False
+            result['error_group_id'] = matched_group_id
+            result['is_continuous_start'] = False
+            instances.append(result)
+        else:
+            matched_group_id = str(uuid.uuid4())
+            result['error_group_id'] = matched_group_id
+            result['is_continuous_start'] = True
+            self._groups[matched_group_id] = [result]
+            self._group_detector[matched_group_id] = detector
+            self._group_seq[matched_group_id] = len(self._group_seq)
+            open_groups.append(matched_group_id)
+        result['is_continuous_end'] = True
+        
+        # The group is now matched against this result's boxes
+        self._group_boxes[matched_group_id] = boxes
+        if boxes is not None:
+            index.insert(matched_group_id, boxes)
+            boxless.discard(matched_group_id)
+        else:
+            index.remove(matched_group_id)
+            boxless.add(matched_group_id)
+        
+        self._open[detector] = open_groups
+        self._last_frame[detector] = max(frame_id, self._last_frame.get(detector, frame_id))
+        self._dirty_groups.add(matched_group_id)
+        self.folds += 1
+    
+    def _close_group(self, detector: str, group_id: str):
+        """Drop a group that can no longer be extended from the match structures."""
+        self._group_boxes.pop(group_id, None)
+        if detector in self._box_index:
+            self._box_index[detector].remove(group_id)
+        if detector in self._boxless:
+            self._boxless[detector].discard(group_id)
+    
+    def _regroup(self, detector: str):
+        """Regroup all results of one detector from scratch."""
+        for group_id in [g for g, d in self._group_detector.items() if d == detector]:
+            del self._groups[group_id]
+            del self._group_detector[group_id]
+            self._group_boxes.pop(group_id, None)
+            self._dirty_groups.add(group_id)
+        self._open.pop(detector, None)
+        self._last_frame.pop(detector, None)
+        self._box_index.pop(detector, None)
+        self._boxless.pop(detector, None)
+        
+        results = sorted(
+            (r_id for r_id, r in self._results.items() if r['detector_name'] == detector),
+            key=lambda r_id: (self._results[r_id]['frame_id'], self._order[r_id])
+        )
+        for result_id in results:
+            self._fold(self._results[result_id])
+        self.regroups += 1
+    
+    def _summarize(self, group_id: str) -> Dict[str, Any]:
+        instances = self._groups[group_id]
+        first, last = instances[0]['frame_id'], instances[-1]['frame_id']
+        summary = {
+            'error_group_id': group_id,
+            'detector_name': instances[0]['detector_name'],
+            'description': instances[0].get('description', ''),
+            'first_frame_id': first,
+            'last_frame_id': last,
+            'instances': list(instances),
+            'is_false_positive': all(inst.get('is_false_positive', False) for inst in instances),
+            'frame_count': len(instances),
+            'average_confidence': sum(inst.get('confidence', 0) for inst in instances) / len(instances),
+            'frame_range': str(first) if first == last else f"{first}-{last}"
+        }
+        return summary
@@ -1,126 +1,115 @@
 """
 Caching layer for continuous error grouping.
-Prevents recalculation of error groups on every request.
+Keeps each take's error groups in memory and folds in results as they are
+saved, so polling for grouped errors does not regroup the whole take.
 """
 import time
-import hashlib
-import json
-from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Callable, Iterable
 from threading import RLock
 
+from .detector_grouping import TakeErrorGroups
+
+# (result count, highest result id) of a take's stored results
+ResultFingerprint = Tuple[int, Optional[int]]
+
+
 class ContinuousErrorCache:
     """
-    Caches continuous error groupings to avoid recalculation.
-    Uses content-based cache keys to detect when data changes.
+    Holds incrementally maintained error groups for recently viewed takes.
+
+    Writers that go through the storage service fold their changes in with
+    ``add_result`` and ``set_false_positive``. Readers pass a fingerprint of
+    the stored results; a take whose groups do not match it (e.g. results
+    written elsewhere) is rebuilt from storage.
     """
-    
-    def __init__(self, ttl_seconds: int = 300):  # 5 minute cache
-        self.ttl = ttl_seconds
-        self._cache: Dict[str, Tuple[Any, float, str]] = {}  # key -> (data, timestamp, content_hash)
+
+    def __init__(self, max_takes: int = 32):
+        self.max_takes = max_takes
+        self._takes: "OrderedDict[int, TakeErrorGroups]" = OrderedDict()
         self._lock = RLock()
-    
-    def _compute_content_hash(self, results: List[Dict[str, Any]]) -> str:
-        """Compute hash of results to detect changes."""
-        # Create a stable representation
-        content = []
-        for r in sorted(results, key=lambda x: (x.get('frame_id', 0), x.get('detector_name', ''), x.get('id', 0) or 0)):
-            content.append({
-                'id': r.get('id'),
-                'frame_id': r.get('frame_id'),
-                'detector_name': r.get('detector_name'),
-                'description': r.get('description'),
-                'confidence': r.get('confidence'),
-                'is_false_positive': r.get('is_false_positive', False)
-            })
-        
-        content_str = json.dumps(content, sort_keys=True)
-        return hashlib.md5(content_str.encode()).hexdigest()
-    
-    def get(self, take_id: int, results: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        self._hits = 0
+        self._rebuilds = 0
+        self._last_rebuild: Dict[int, float] = {}
+
+    def get_summary(self, take_id: int, fingerprint: ResultFingerprint,
+                    load_results: Callable[[], Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
         """
-        Get cached grouped results if available and content hasn't changed.
-        
+        Get the continuous error summary of a take.
+
         Args:
             take_id: Take ID
-            results: Current detector results
-            
+            fingerprint: (count, max id) of the take's stored results
+            load_results: Loads all stored results, used when the take is rebuilt
+
         Returns:
-            Cached grouped results or None if cache miss
+            Continuous error groups with instances
         """
         with self._lock:
-            cache_key = f"take_{take_id}_errors"
-            
-            if cache_key not in self._cache:
-                return None
-                
-            cached_data, timestamp, cached_hash = self._cache[cache_key]
-            
-            # Check if expired
-            if time.time() - timestamp > self.ttl:
-                del self._cache[cache_key]
-                return None
-                
-            # Check if content changed
-            current_hash = self._compute_content_hash(results)
-            if current_hash != cached_hash:
-                del self._cache[cache_key]
-                return None
-                
-            return cached_data
-    
-    def set(self, take_id: int, results: List[Dict[str, Any]], grouped_results: List[Dict[str, Any]]):
-        """
-        Cache grouped results.
-        
-        Args:
-            take_id: Take ID
-            results: Original detector results
-            grouped_results: Grouped/processed results
-        """
+            groups = self._takes.get(take_id)
+            if groups is not None and (groups.result_count, groups.max_result_id) == tuple(fingerprint):
+                self._takes.move_to_end(take_id)
+                self._hits += 1
+                return groups.get_summary()
+
+            groups = TakeErrorGroups()
+            for result in load_results():
+                groups.add_result(result)
+            self._takes[take_id] = groups
+            self._takes.move_to_end(take_id)
+            self._rebuilds += 1
+            self._last_rebuild[take_id] = time.time()
+
+            while len(self._takes) > self.max_takes:
+                evicted, _ = self._takes.popitem(last=False)
+                self._last_rebuild.pop(evicted, None)
+
+            return groups.get_summary()
+
+    def add_result(self, take_id: int, result: Dict[str, Any]):
+        """Fold a saved result into the take's groups if they are held."""
         with self._lock:
-            cache_key = f"take_{take_id}_errors"
-            content_hash = self._compute_content_hash(results)
-            self._cache[cache_key] = (grouped_results, time.time(), content_hash)
-            
-            # Clean old entries
-            self._clean_expired()
-    
+            groups = self._takes.get(take_id)
+            if groups is not None:
+                groups.add_result(result)
+
+    def set_false_positive(self, take_id: int, result_ids: List[int], is_false_positive: bool):
+        """Update false positive flags of results in the take's groups if they are held."""
+        with self._lock:
+            groups = self._takes.get(take_id)
+            if groups is not None:
+                groups.set_false_positive(result_ids, is_false_positive)
+
     def invalidate(self, take_id: int):
         """Invalidate cache for a specific take."""
         with self._lock:
-            cache_key = f"take_{take_id}_errors"
-            if cache_key in self._cache:
-                del self._cache[cache_key]
-    
+            self._takes.pop(take_id, None)
+            self._last_rebuild.pop(take_id, None)
+
     def clear(self):
         """Clear entire cache."""
         with self._lock:
-            self._cache.clear()
-    
-    def _clean_expired(self):
-        """Remove expired entries."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, timestamp, _) in self._cache.items()
-            if current_time - timestamp > self.ttl
-        ]
-        
-        for key in expired_keys:
-            del self._cache[key]
-    
+            self._takes.clear()
+            self._last_rebuild.clear()
+
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         with self._lock:
             return {
-                'size': len(self._cache),
-                'ttl_seconds': self.ttl,
+                'size': len(self._takes),
+                'max_takes': self.max_takes,
+                'hits': self._hits,
+                'rebuilds': self._rebuilds,
                 'entries': [
                     {
-                        'key': key,
-                        'age_seconds': int(time.time() - timestamp),
-                        'content_hash': content_hash
+                        'take_id': take_id,
+                        'results': groups.result_count,
+                        'groups': groups.group_count,
+                        'folds': groups.folds,
+                        'regroups': groups.regroups,
+                        'age_seconds': int(time.time() - self._last_rebuild.get(take_id, time.time()))
                     }
-                    for key, (_, timestamp, content_hash) in self._cache.items()
+                    for take_id, groups in self._takes.items()
                 ]
             }
 
@@ -129,4 +118,4 @@ _error_cache = ContinuousErrorCache()
 
 def get_error_cache() -> ContinuousErrorCache:
     """Get the global error cache instance."""
-    return _error_cache
\ No newline at end of file
+    return _error_cache
@@ -10,6 +10,7 @@ from sqlalchemy import or_, and_
 from CAMF.services.storage.database import (
     get_session, DetectorResultDB, TakeDB, AngleDB, SceneDB
 )
+from CAMF.services.storage.error_cache import get_error_cache
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +84,7 @@ class FalsePositiveManager:
                     updated_count += 1
                         
                 session.commit()
+                get_error_cache().set_false_positive(take_id, [r.id for r in detector_results], True)
                 
                 self.logger.info(
                     f"Marked {updated_count} detections as false positive "
@@ -159,6 +161,7 @@ class FalsePositiveManager:
                     updated_count += 1
                         
                 session.commit()
+                get_error_cache().set_false_positive(take_id, [r.id for r in detector_results], False)
                 
                 return {
                     "success": True,
@@ -21,6 +21,7 @@ from pathlib import Path
 from CAMF.common.utils import ensure_directory
 from CAMF.common.config import get_config
 from .file_utils import safe_json_update, safe_folder_rename
+from .path_cache import invalidates_take_paths
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -321,6 +322,7 @@ def find_take_folder(angle_path: Path, take_id: int) -> Optional[Path]:
     return None
 
 
+@invalidates_take_paths('project')
 def rename_project_folder(project_id: int, new_name: str) -> bool:
     """Rename a project folder."""
     logger.debug(f"Starting rename for project {project_id} to '{new_name}'")
@@ -388,6 +390,7 @@ def rename_project_folder(project_id: int, new_name: str) -> bool:
         return False
 
 
+@invalidates_take_paths('scene')
 def rename_scene_folder(project_id: int, scene_id: int, new_name: str) -> bool:
     """Rename a scene folder."""
     project_path = find_project_folder(project_id)
@@ -436,6 +439,7 @@ def rename_scene_folder(project_id: int, scene_id: int, new_name: str) -> bool:
         return False
 
 
+@invalidates_take_paths('angle')
 def rename_angle_folder(project_id: int, scene_id: int, angle_id: int, new_name: str) -> bool:
     """Rename an angle folder."""
     project_path = find_project_folder(project_id)
@@ -488,6 +492,7 @@ def rename_angle_folder(project_id: int, scene_id: int, angle_id: int, new_name:
         return False
 
 
+@invalidates_take_paths('take')
 def rename_take_folder(project_id: int, scene_id: int, angle_id: int, take_id: int, new_name: str) -> bool:
     """Rename a take folder."""
     project_path = find_project_folder(project_id)
@@ -550,6 +555,7 @@ def rename_take_folder(project_id: int, scene_id: int, angle_id: int, take_id: i
 # Frame loading functions removed - now using video storage system
 
 
+@invalidates_take_paths('project')
 def delete_project(project_id: int) -> bool:
     """Delete a project and all its data."""
     project_path = find_project_folder(project_id)
@@ -559,6 +565,7 @@ def delete_project(project_id: int) -> bool:
     return False
 
 
+@invalidates_take_paths('scene')
 def delete_scene(project_id: int, scene_id: int) -> bool:
     """Delete a scene directory and all its contents."""
     project_path = find_project_folder(project_id)
@@ -572,6 +579,7 @@ def delete_scene(project_id: int, scene_id: int) -> bool:
     return False
 
 
+@invalidates_take_paths('angle')
 def delete_angle(project_id: int, scene_id: int, angle_id: int) -> bool:
     """Delete an angle directory and all its contents."""
     project_path = find_project_folder(project_id)
@@ -589,6 +597,7 @@ def delete_angle(project_id: int, scene_id: int, angle_id: int) -> bool:
     return False
 
 
+@invalidates_take_paths('take')
 def delete_take(project_id: int, scene_id: int, angle_id: int, take_id: int) -> bool:
     """Delete a take directory and all its contents."""
     project_path = find_project_folder(project_id)
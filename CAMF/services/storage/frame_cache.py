@@ -0,0 +1,239 @@
+"""
+Shared cache of decoded frames.
+Keeps recently used frames in memory within a byte budget so storage, the
+detector framework and the API do not decode the same PNG repeatedly.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from threading import RLock
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (take_id, frame_id, variant)
+FrameCacheKey = Tuple[int, int, str]
+
+DEFAULT_FRAME_CACHE_BYTES = 1024 * 1024 * 1024
+
+
+class FrameCache:
+    """
+    Byte-bounded LRU cache of decoded frames keyed by take and frame ID.
+
+    Frames are stored read-only and handed out without copying; callers that
+    draw on a frame must copy it first. ``variant`` separates different decodes
+    of the same frame (e.g. BGR from OpenCV and RGB from PIL).
+
+    Takes can be pinned, e.g. the active reference take, which is read for every
+    frame of every comparison. Pinned frames count towards the budget but are
+    never evicted, so only unpinned frames compete for the remaining space.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_FRAME_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[FrameCacheKey, np.ndarray]" = OrderedDict()
+        self._lock = RLock()
+        self._pinned_takes: Set[int] = set()
+        self._bytes = 0
+        self._pinned_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejected = 0
+        self._over_budget = False
+
+    def get(self, take_id: int, frame_id: int, variant: str = "bgr") -> Optional[np.ndarray]:
+        """
+        Get a cached frame and mark it most recently used.
+
+        Args:
+            take_id: Take ID
+            frame_id: Frame number within the take
+            variant: Decode variant
+
+        Returns:
+            Read-only frame array or None on cache miss
+        """
+        key = (take_id, frame_id, variant)
+        with self._lock:
+            frame = self._entries.get(key)
+            if frame is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return frame
+
+    def put(self, take_id: int, frame_id: int, frame: np.ndarray, variant: str = "bgr") -> np.ndarray:
+        """
+        Cache a decoded frame, evicting least recently used frames as needed.
+
+        Args:
+            take_id: Take ID
+            frame_id: Frame number within the take
+            frame: Decoded frame; the cache takes ownership and marks it read-only
+            variant: Decode variant
+
+        Returns:
+            The cached (read-only) frame
+        """
+        frame.setflags(write=False)
+        size = frame.nbytes
+        key = (take_id, frame_id, variant)
+
+        with self._lock:
+            pinned = take_id in self._pinned_takes
+            if not pinned and size > self.max_bytes - self._pinned_bytes:
+                # Would never fit next to the pinned frames
+                self._rejected += 1
+                return frame
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = frame
+            self._bytes += size
+            if pinned:
+                self._pinned_bytes += size
+            self._evict()
+            return frame
+
+    def get_or_load(self, take_id: int, frame_id: int,
+                    loader: Callable[[], Optional[np.ndarray]],
+                    variant: str = "bgr") -> Optional[np.ndarray]:
+        """
+        Get a frame from the cache, decoding and caching it on a miss.
+
+        The loader runs outside the cache lock, so concurrent misses of the same
+        frame may both decode it; the later one simply replaces the entry.
+        """
+        frame = self.get(take_id, frame_id, variant)
+        if frame is not None:
+            return frame
+
+        frame = loader()
+        if frame is None:
+            return None
+        return self.put(take_id, frame_id, frame, variant)
+
+    def pin_take(self, take_id: int):
+        """Exempt a take's frames from eviction."""
+        with self._lock:
+            if take_id in self._pinned_takes:
+                return
+            self._pinned_takes.add(take_id)
+            self._pinned_bytes += sum(
+                frame.nbytes for key, frame in self._entries.items() if key[0] == take_id
+            )
+
+    def unpin_take(self, take_id: int):
+        """Make a take's frames evictable again."""
+        with self._lock:
+            if take_id not in self._pinned_takes:
+                return
+            self._pinned_takes.discard(take_id)
+            self._pinned_bytes -= sum(
+                frame.nbytes for key, frame in self._entries.items() if key[0] == take_id
+            )
+            self._evict()
+
+    def is_pinned(self, take_id: int) -> bool:
+        """Check whether a take is pinned."""
+        with self._lock:
+            return take_id in self._pinned_takes
+
+    def invalidate_frame(self, take_id: int, frame_id: int):
+        """Drop every variant of a cached frame, e.g. after it is overwritten."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == take_id and key[1] == frame_id]:
+                self._remove(key)
+
+    def invalidate_take(self, take_id: int) -> int:
+        """
+        Drop every cached frame of a take, e.g. after it is deleted or rewritten.
+
+        Returns:
+            Number of frames dropped
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == take_id]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """Drop all cached frames. Pins are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._pinned_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'utilization': self._bytes / self.max_bytes if self.max_bytes else 0.0,
+                'pinned_takes': sorted(self._pinned_takes),
+                'pinned_bytes': self._pinned_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'rejected': self._rejected
+            }
+
+    def _remove(self, key: FrameCacheKey):
+        frame = self._entries.pop(key)
+        self._bytes -= frame.nbytes
+        if key[0] in self._pinned_takes:
+            self._pinned_bytes -= frame.nbytes
+
+    def _evict(self):
+        """Evict least recently used unpinned frames until within budget."""
+        if self._bytes <= self.max_bytes:
+            self._over_budget = False
+            return
+
+        victims: List[FrameCacheKey] = []
+        excess = self._bytes - self.max_bytes
+        for key, frame in self._entries.items():
+            if excess <= 0:
+                break
+            if key[0] in self._pinned_takes:
+                continue
+            victims.append(key)
+            excess -= frame.nbytes
+
+        for key in victims:
+            self._remove(key)
+        self._evictions += len(victims)
+
+        if self._bytes > self.max_bytes and not self._over_budget:
+            self._over_budget = True
+            logger.warning(
+                f"Pinned frames ({self._pinned_bytes / 1024 / 1024:.0f} MB) exceed "
+                f"frame cache budget ({self.max_bytes / 1024 / 1024:.0f} MB)"
+            )
+
+
+# Global cache instance
+_frame_cache: Optional[FrameCache] = None
+_frame_cache_lock = RLock()
+
+
+def get_frame_cache() -> FrameCache:
+    """Get the global frame cache instance."""
+    global _frame_cache
+    if _frame_cache is None:
+        with _frame_cache_lock:
+            if _frame_cache is None:
+                from CAMF.common.config import get_config
+                max_bytes = get_config().storage.frame_cache_size_mb * 1024 * 1024
+                _frame_cache = FrameCache(max_bytes)
+    return _frame_cache
@@ -1,9 +1,14 @@
 """
 Direct frame storage system for CAMF.
-Stores frames as lossless PNG files within the hierarchical project/scene/angle/take structure.
+Stores frames losslessly within the hierarchical project/scene/angle/take structure,
+either appended to per-take segment files or as one PNG file per frame.
+Optionally, frames of a take being captured go to an uncompressed raw frame
+file first and are archived as PNG when the take is finalized.
 """
 
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime
@@ -13,8 +18,20 @@ from pathlib import Path
 import logging
 import threading
 
+from .segment_store import (
+    SegmentFrameStore, DEFAULT_SEGMENT_MAX_BYTES, list_png_frames, migrate_png_frames
+)
+from .path_cache import ResolvedTakePath, get_take_path_cache
+from .frame_cache import get_frame_cache
+from .raw_frames import RawFrameFile, RAW_FILENAME
+
 logger = logging.getLogger(__name__)
 
+# Frame storage backends
+FRAME_BACKEND_SEGMENT = "segment"  # Append-only segment files with a binary offset index
+FRAME_BACKEND_PNG = "png"  # One PNG file plus JSON sidecar per frame
+FRAME_BACKENDS = (FRAME_BACKEND_SEGMENT, FRAME_BACKEND_PNG)
+
 
 @dataclass
 class FrameInfo:
@@ -31,14 +48,36 @@ class FrameInfo:
 class FrameStorage:
     """Direct frame storage system with hierarchical structure."""
     
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, backend: str = FRAME_BACKEND_SEGMENT,
+                 segment_max_bytes: int = DEFAULT_SEGMENT_MAX_BYTES, raw_frames: bool = False):
         self.base_path = base_path
         # Remove the separate frames directory - we'll use the hierarchical structure
         
+        if backend not in FRAME_BACKENDS:
+            raise ValueError(f"Unknown frame storage backend '{backend}', expected one of {FRAME_BACKENDS}")
+        self.backend = backend
+        self.segment_max_bytes = segment_max_bytes
+        
         # Frame tracking
         self.frame_info: Dict[int, Dict[int, FrameInfo]] = {}  # take_id -> frame_id -> FrameInfo
         self.write_lock = threading.Lock()
         
+        # Open segment stores, each with its own lock
+        self._segment_stores: Dict[int, SegmentFrameStore] = {}
+        self._segment_lock = threading.Lock()
+        
+        # Uncompressed frames of live (and kept reference) takes
+        self.raw_frames = raw_frames
+        self._raw_files: Dict[int, RawFrameFile] = {}
+        self._raw_lock = threading.Lock()
+        
+        # Resolved take directories; renames and deletes drop entries and close stores
+        self._path_cache = get_take_path_cache()
+        self._path_cache.add_listener(self._on_take_paths_invalidated)
+        
+        # Decoded frames shared with the storage service and detector framework
+        self._frame_cache = get_frame_cache()
+        
         # Storage service reference will be set by storage main
         self._storage_service = None
         
@@ -60,6 +99,10 @@ class FrameStorage:
     
     def get_take_directory(self, take_id: int) -> Optional[Path]:
         """Get the directory for a take's frames using hierarchical structure."""
+        cached = self._path_cache.get(take_id)
+        if cached:
+            return cached.frames_dir
+        
         if not self._storage_service:
             logger.error("Storage service not set - cannot determine take directory")
             return None
@@ -106,8 +149,111 @@ class FrameStorage:
             
         # Create frames subdirectory within the take folder
         frames_dir = take_path / "frames"
+        self._path_cache.put(ResolvedTakePath(
+            take_id=take.id,
+            angle_id=angle.id,
+            scene_id=scene.id,
+            project_id=project.id,
+            frames_dir=frames_dir
+        ))
         return frames_dir
     
+    def _on_take_paths_invalidated(self, take_ids: List[int]):
+        """Release segment files and decoded frames of takes whose folders are being moved or removed."""
+        for take_id in take_ids:
+            self._close_segment_store(take_id)
+            self._close_raw_file(take_id)
+            self._frame_cache.invalidate_take(take_id)
+    
+    def get_path_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics of take directory resolution."""
+        return self._path_cache.get_stats()
+    
+    def _get_segment_store(self, take_id: int, take_dir: Path,
+                           create: bool = False) -> Optional[SegmentFrameStore]:
+        """Get the open segment store of a take.
+        
+        Args:
+            take_id: Take ID
+            take_dir: Current frames directory of the take
+            create: Open a new store if the take has none on disk yet
+            
+        Returns:
+            Segment store, or None if the take has no segment data
+        """
+        with self._segment_lock:
+            store = self._segment_stores.get(take_id)
+            if store and store.frames_dir != take_dir:
+                # Take folder moved since the store was opened
+                store.close()
+                store = None
+                del self._segment_stores[take_id]
+            
+            if store is None:
+                if not create and not SegmentFrameStore.exists(take_dir):
+                    return None
+                store = SegmentFrameStore(take_dir, self.segment_max_bytes)
+                self._segment_stores[take_id] = store
+            
+            return store
+    
+    def _close_segment_store(self, take_id: int):
+        """Release the file handles of a take's segment store."""
+        with self._segment_lock:
+            store = self._segment_stores.pop(take_id, None)
+        if store:
+            store.close()
+    
+    def _get_raw_file(self, take_id: int, take_dir: Path,
+                      template: Optional[np.ndarray] = None) -> Optional[RawFrameFile]:
+        """Get the open raw frame file of a take.
+        
+        Args:
+            take_id: Take ID
+            take_dir: Current frames directory of the take
+            template: Frame whose geometry a new file should use; without it no file is created
+            
+        Returns:
+            Raw frame file, or None if the take has none
+        """
+        with self._raw_lock:
+            raw = self._raw_files.get(take_id)
+            if raw and raw.path.parent != take_dir:
+                # Take folder moved since the file was opened
+                raw.close()
+                raw = None
+                del self._raw_files[take_id]
+            
+            if raw is None:
+                if RawFrameFile.exists(take_dir):
+                    raw = RawFrameFile(take_dir / RAW_FILENAME)
+                elif template is not None:
+                    raw = RawFrameFile(take_dir / RAW_FILENAME, template.shape, template.dtype)
+                else:
+                    return None
+                self._raw_files[take_id] = raw
+            
+            return raw
+    
+    def _close_raw_file(self, take_id: int):
+        """Release the file handle of a take's raw frame file."""
+        with self._raw_lock:
+            raw = self._raw_files.pop(take_id, None)
+        if raw:
+            raw.close()
+    
+    def get_raw_frame(self, take_id: int, frame_id: int) -> Optional[np.ndarray]:
+        """Get a frame from the take's raw frame file as a read-only zero-copy view.
+        
+        Returns:
+            Frame view, or None if the frame is not held in raw form
+        """
+        take_dir = self.get_take_directory(take_id)
+        if not take_dir:
+            return None
+        raw = self._get_raw_file(take_id, take_dir)
+        return raw.read(frame_id) if raw else None
+    
     def store_frame(self, take_id: int, frame_id: int, frame: np.ndarray, 
                    timestamp: float, metadata: Dict[str, Any] = None) -> bool:
         """Store a frame with lossless compression."""
@@ -117,7 +263,58 @@ class FrameStorage:
             if not take_dir:
                 logger.error(f"Could not determine directory for take {take_id}")
                 return False
+            
+            # A decoded copy of a frame being overwritten would be stale
+            self._frame_cache.invalidate_frame(take_id, frame_id)
+            
+            if self.raw_frames and self._store_frame_raw(take_id, take_dir, frame_id, frame, timestamp, metadata):
+                return True
+            
+            return self._store_frame_archival(take_id, take_dir, frame_id, frame, timestamp, metadata)
                 
+        except Exception as e:
+            logger.error(f"Error storing frame {frame_id} for take {take_id}: {e}")
+            return False
+    
+    def _store_frame_raw(self, take_id: int, take_dir: Path, frame_id: int,
+                         frame: np.ndarray, timestamp: float,
+                         metadata: Optional[Dict[str, Any]]) -> bool:
+        """Write a frame uncompressed into the take's raw frame file.
+        
+        Returns:
+            False if the frame cannot go into the raw file (e.g. its size changed
+            mid-take), in which case it should be archived directly
+        """
+        raw = self._get_raw_file(take_id, take_dir, template=frame)
+        if raw.sealed:
+            return False
+        try:
+            raw.write(frame_id, frame, timestamp)
+        except ValueError as e:
+            logger.warning(f"Archiving frame {frame_id} of take {take_id} directly: {e}")
+            return False
+        
+        frame_info = FrameInfo(
+            frame_id=frame_id,
+            take_id=take_id,
+            filepath=f"{raw.path}#{frame_id}",
+            timestamp=timestamp,
+            metadata=metadata or {},
+            created_at=datetime.now().isoformat(),
+            file_size=raw.frame_bytes
+        )
+        with self.write_lock:
+            self.frame_info.setdefault(take_id, {})[frame_id] = frame_info
+        return True
+    
+    def _store_frame_archival(self, take_id: int, take_dir: Path, frame_id: int,
+                              frame: np.ndarray, timestamp: float,
+                              metadata: Optional[Dict[str, Any]]) -> bool:
+        """Store a frame losslessly in the configured archival backend."""
+        try:
+            if self.backend == FRAME_BACKEND_SEGMENT:
+                return self._store_frame_segment(take_id, take_dir, frame_id, frame, timestamp, metadata)
+            
             # Create frames directory if needed
             take_dir.mkdir(parents=True, exist_ok=True)
             
@@ -174,26 +371,110 @@ class FrameStorage:
             logger.error(f"Error storing frame {frame_id} for take {take_id}: {e}")
             return False
     
-    def get_frame(self, take_id: int, frame_id: int) -> Optional[np.ndarray]:
-        """Retrieve a frame."""
-        # Get take directory
+    def _store_frame_segment(self, take_id: int, take_dir: Path, frame_id: int,
+                             frame: np.ndarray, timestamp: float,
+                             metadata: Optional[Dict[str, Any]]) -> bool:
+        """Append a frame to the take's segment files."""
+        # Encode outside any lock so concurrent writers only serialise on the append
+        success, buffer = cv2.imencode('.png', frame, [cv2.IMWRITE_PNG_COMPRESSION, 3])
+        if not success:
+            logger.error(f"Failed to encode frame {frame_id}")
+            return False
+        
+        store = self._get_segment_store(take_id, take_dir, create=True)
+        entry = store.append(frame_id, timestamp, buffer.tobytes(), metadata)
+        
+        frame_info = FrameInfo(
+            frame_id=frame_id,
+            take_id=take_id,
+            filepath=self._segment_locator(store, entry.segment, frame_id),
+            timestamp=timestamp,
+            metadata=metadata or {},
+            created_at=datetime.now().isoformat(),
+            file_size=entry.payload_size
+        )
+        with self.write_lock:
+            self.frame_info.setdefault(take_id, {})[frame_id] = frame_info
+        
+        logger.debug(f"Stored frame {frame_id} for take {take_id} ({entry.payload_size / 1024:.1f} KB)")
+        return True
+    
+    @staticmethod
+    def _segment_locator(store: SegmentFrameStore, segment: int, frame_id: int) -> str:
+        """Build the path recorded for a frame held in a segment file."""
+        return f"{store.segment_path(segment)}#{frame_id}"
+    
+    def get_frame_bytes(self, take_id: int, frame_id: int) -> Optional[bytes]:
+        """Get the encoded (PNG) bytes of a frame without decoding it."""
         take_dir = self.get_take_directory(take_id)
         if not take_dir:
-            logger.error(f"Could not determine directory for take {take_id}")
             return None
-            
-        # Check if frame exists
+        
+        store = self._get_segment_store(take_id, take_dir)
+        if store and frame_id in store:
+            return store.read(frame_id)
+        
         frame_path = take_dir / f'frame_{frame_id:06d}.png'
-        if not frame_path.exists():
-            logger.error(f"Frame {frame_id} not found for take {take_id} at {frame_path}")
+        if frame_path.exists():
+            with open(frame_path, 'rb') as f:
+                return f.read()
+        
+        # Not archived yet; encode the raw frame on demand
+        raw = self._get_raw_file(take_id, take_dir)
+        frame = raw.read(frame_id) if raw else None
+        if frame is not None:
+            success, buffer = cv2.imencode('.png', frame, [cv2.IMWRITE_PNG_COMPRESSION, 3])
+            if success:
+                return buffer.tobytes()
+        
+        return None
+    
+    def get_frame(self, take_id: int, frame_id: int, use_cache: bool = True) -> Optional[np.ndarray]:
+        """Retrieve a frame.
+        
+        Decoded frames come from the shared frame cache and are read-only;
+        copy before drawing on them. Bulk readers pass ``use_cache=False`` to
+        get a private decode without evicting other frames. Frames still held
+        in a raw frame file are returned as read-only views into it and never
+        enter the cache.
+        """
+        raw_frame = self.get_raw_frame(take_id, frame_id)
+        if raw_frame is not None:
+            return raw_frame
+        if not use_cache:
+            return self._decode_frame(take_id, frame_id)
+        return self._frame_cache.get_or_load(
+            take_id, frame_id, lambda: self._decode_frame(take_id, frame_id)
+        )
+    
+    def _decode_frame(self, take_id: int, frame_id: int) -> Optional[np.ndarray]:
+        """Read and decode a frame from disk."""
+        # Get take directory
+        take_dir = self.get_take_directory(take_id)
+        if not take_dir:
+            logger.error(f"Could not determine directory for take {take_id}")
             return None
         
         try:
-            # Read frame
-            frame = cv2.imread(str(frame_path), cv2.IMREAD_UNCHANGED)
-            if frame is None:
-                logger.error(f"Failed to read frame from {frame_path}")
-                return None
+            store = self._get_segment_store(take_id, take_dir)
+            if store and frame_id in store:
+                data = store.read(frame_id)
+                frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+                if frame is None:
+                    logger.error(f"Failed to decode frame {frame_id} for take {take_id}")
+                    return None
+            else:
+                # Check if frame exists
+                frame_path = take_dir / f'frame_{frame_id:06d}.png'
+                if not frame_path.exists():
+                    logger.error(f"Frame {frame_id} not found for take {take_id} at {take_dir}")
+                    return None
+                
+                # Read frame
+                frame = cv2.imread(str(frame_path), cv2.IMREAD_UNCHANGED)
+                if frame is None:
+                    logger.error(f"Failed to read frame from {frame_path}")
+                    return None
                 
             # Ensure BGR format (PNG might have alpha channel)
             if frame.shape[2] == 4:
@@ -214,6 +495,37 @@ class FrameStorage:
         take_dir = self.get_take_directory(take_id)
         if not take_dir:
             return None
+        
+        raw = self._get_raw_file(take_id, take_dir)
+        if raw and frame_id in raw and not self._is_archived(take_id, take_dir, frame_id):
+            return FrameInfo(
+                frame_id=frame_id,
+                take_id=take_id,
+                filepath=f"{raw.path}#{frame_id}",
+                timestamp=raw.read_timestamp(frame_id) or 0.0,
+                metadata={},
+                created_at=datetime.fromtimestamp(raw.path.stat().st_mtime).isoformat(),
+                file_size=raw.frame_bytes
+            )
+        
+        store = self._get_segment_store(take_id, take_dir)
+        if store and frame_id in store:
+            entry = store.get_entry(frame_id)
+            try:
+                metadata = store.read_metadata(frame_id)
+            except Exception as e:
+                logger.error(f"Error loading frame metadata: {e}")
+                metadata = {}
+            created_at = datetime.fromtimestamp(store.segment_path(entry.segment).stat().st_mtime)
+            return FrameInfo(
+                frame_id=frame_id,
+                take_id=take_id,
+                filepath=self._segment_locator(store, entry.segment, frame_id),
+                timestamp=entry.timestamp,
+                metadata=metadata or {},
+                created_at=created_at.isoformat(),
+                file_size=entry.payload_size
+            )
             
         # Try to load from metadata file
         meta_path = take_dir / f'frame_{frame_id:06d}.json'
@@ -235,13 +547,13 @@ class FrameStorage:
         # Get take directory
         take_dir = self.get_take_directory(take_id)
         if take_dir and take_dir.exists():
-            frames = []
-            for f in take_dir.glob('frame_*.png'):
-                try:
-                    frame_id = int(f.stem.split('_')[1])
-                    frames.append(frame_id)
-                except (ValueError, IndexError):
-                    continue
+            frames = set(frame_id for frame_id, _ in list_png_frames(take_dir))
+            store = self._get_segment_store(take_id, take_dir)
+            if store:
+                frames.update(store.frame_ids())
+            raw = self._get_raw_file(take_id, take_dir)
+            if raw:
+                frames.update(raw.frame_ids())
             return sorted(frames)
             
         return []
@@ -251,17 +563,63 @@ class FrameStorage:
         return len(self.get_take_frames(take_id))
     
     def get_frame_path(self, take_id: int, frame_id: int) -> Optional[str]:
-        """Get the path to a frame file."""
+        """Get the path to a frame file.
+        
+        Frames held in segment storage are reported as ``<segment file>#<frame_id>``
+        and frames not yet archived as ``<raw frame file>#<frame_id>``; use
+        get_frame_bytes to read their encoded data.
+        """
         take_dir = self.get_take_directory(take_id)
         if not take_dir:
             return None
         
+        store = self._get_segment_store(take_id, take_dir)
+        if store and frame_id in store:
+            return self._segment_locator(store, store.get_entry(frame_id).segment, frame_id)
+        
         frame_file = take_dir / f'frame_{frame_id:06d}.png'
         if frame_file.exists():
             return str(frame_file)
         
+        raw = self._get_raw_file(take_id, take_dir)
+        if raw and frame_id in raw:
+            return f"{raw.path}#{frame_id}"
+        
         return None
     
+    def _is_archived(self, take_id: int, take_dir: Path, frame_id: int) -> bool:
+        """Check whether a frame exists in archival (PNG) form."""
+        store = self._get_segment_store(take_id, take_dir)
+        if store and frame_id in store:
+            return True
+        return (take_dir / f'frame_{frame_id:06d}.png').exists()
+    
+    def migrate_take(self, take_id: int, remove_source: bool = True) -> int:
+        """Move a take stored as PNG-per-frame into segment storage.
+        
+        Args:
+            take_id: Take to migrate
+            remove_source: Delete the PNG and JSON files once migrated
+            
+        Returns:
+            Number of frames migrated
+        """
+        take_dir = self.get_take_directory(take_id)
+        if not take_dir or not take_dir.exists():
+            return 0
+        
+        if not list_png_frames(take_dir):
+            return 0
+        
+        store = self._get_segment_store(take_id, take_dir, create=True)
+        count = migrate_png_frames(take_dir, store, remove_source=remove_source)
+        
+        # Cached info still points at the PNG files
+        with self.write_lock:
+            self.frame_info.pop(take_id, None)
+        
+        return count
+    
     def _update_frame_index(self, take_id: int):
         """Update the frame index file for a take."""
         if take_id not in self.frame_info:
@@ -285,11 +643,94 @@ class FrameStorage:
         except Exception as e:
             logger.error(f"Error updating frame index: {e}")
     
-    def finalize_take(self, take_id: int):
-        """Finalize a take (update index and cleanup)."""
+    def finalize_take(self, take_id: int, keep_raw: bool = False) -> int:
+        """Finalize a take (update index and cleanup).
+        
+        Frames captured into the raw frame file are encoded to the archival
+        backend here, off the capture path.
+        
+        Args:
+            take_id: Take to finalize
+            keep_raw: Keep the raw frame file (sealed) for zero-decode reads,
+                e.g. for reference takes; otherwise it is deleted once archived
+            
+        Returns:
+            Number of frames archived from the raw frame file
+        """
+        archived = self._archive_raw_frames(take_id, keep_raw)
+        
+        # Segment stores carry their own binary index; sync it and release handles
+        self._close_segment_store(take_id)
+        
         if take_id in self.frame_info:
-            self._update_frame_index(take_id)
+            if self.backend == FRAME_BACKEND_PNG:
+                self._update_frame_index(take_id)
             logger.info(f"Finalized take {take_id} with {len(self.frame_info[take_id])} frames")
+        
+        return archived
+    
+    def _archive_raw_frames(self, take_id: int, keep_raw: bool) -> int:
+        """Encode a take's raw frames into the archival backend."""
+        take_dir = self.get_take_directory(take_id)
+        if not take_dir:
+            return 0
+        raw = self._get_raw_file(take_id, take_dir)
+        if raw is None:
+            return 0
+        
+        with self.write_lock:
+            captured = dict(self.frame_info.get(take_id, {}))
+        pending = [
+            frame_id for frame_id in raw.frame_ids()
+            if not self._is_archived(take_id, take_dir, frame_id)
+        ]
+        
+        def archive(frame_id: int) -> bool:
+            info = captured.get(frame_id)
+            return self._store_frame_archival(
+                take_id, take_dir, frame_id, raw.read(frame_id),
+                raw.read_timestamp(frame_id),
+                info.metadata if info else None
+            )
+        
+        archived = 0
+        if pending:
+            workers = min(len(pending), os.cpu_count() or 1)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"ArchiveTake-{take_id}") as pool:
+                archived = sum(pool.map(archive, pending))
+            logger.info(f"Archived {archived} raw frames of take {take_id}")
+        
+        if archived < len(pending):
+            # Leave the file unsealed so the failed frames survive and the next finalize retries them
+            logger.error(f"Failed to archive {len(pending) - archived} frames of take {take_id}")
+            self._close_raw_file(take_id)
+        elif keep_raw:
+            raw.seal()
+        else:
+            raw.delete()
+            with self._raw_lock:
+                self._raw_files.pop(take_id, None)
+        
+        return archived
+    
+    def discard_raw_frames(self, take_id: int) -> bool:
+        """Delete a finalized take's kept raw frame file, e.g. when it stops being the reference.
+        
+        Returns:
+            True if a raw frame file was deleted
+        """
+        take_dir = self.get_take_directory(take_id)
+        if not take_dir:
+            return False
+        raw = self._get_raw_file(take_id, take_dir)
+        if raw is None or not raw.sealed:
+            # Unsealed files still hold frames that were never archived
+            return False
+        
+        with self._raw_lock:
+            self._raw_files.pop(take_id, None)
+        raw.delete()
+        return True
     
     def get_storage_stats(self, take_id: int) -> Dict[str, Any]:
         """Get storage statistics for a take."""
@@ -311,11 +752,14 @@ class FrameStorage:
             'frame_count': len(frames),
             'total_size_mb': total_size / (1024 * 1024),
             'avg_frame_size_kb': avg_size / 1024,
-            'compression_type': 'PNG (lossless)'
+            'compression_type': 'PNG segments (lossless)' if self.backend == FRAME_BACKEND_SEGMENT else 'PNG (lossless)'
         }
     
     def delete_take(self, take_id: int):
         """Delete all frames for a take."""
+        self._close_segment_store(take_id)
+        self._close_raw_file(take_id)
+        self._frame_cache.invalidate_take(take_id)
         take_dir = self.get_take_directory(take_id)
         
         if take_dir and take_dir.exists():
@@ -324,4 +768,4 @@ class FrameStorage:
             logger.info(f"Deleted frame directory for take {take_id}: {take_dir}")
             
         if take_id in self.frame_info:
-            del self.frame_info[take_id]
\ No newline at end of file
+            del self.frame_info[take_id]
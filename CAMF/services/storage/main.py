@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator
 import datetime
 import json
 import cv2
@@ -7,7 +7,7 @@ import time
 from contextlib import contextmanager
 import logging
 
-from sqlalchemy import desc
+from sqlalchemy import desc, func
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -24,7 +24,15 @@ from .database import (
     TakeDB, 
     FrameDB, 
     DetectorResultDB, 
-    bulk_insert_detector_results
+    bulk_insert_frames,
+    bulk_insert_detector_results,
+    FrameRow,
+    DetectorResultRow,
+    DEFAULT_LISTING_BATCH_SIZE,
+    get_frame_rows_page,
+    iter_frame_rows,
+    get_detector_result_rows_page,
+    iter_detector_result_rows
 )
 
 from .filesystem_names import (
@@ -50,9 +58,12 @@ from .filesystem_names import (
 )
 
 from .frame_storage import FrameStorage
+from .frame_fingerprint import fingerprint_frame
 from .maintenance import get_maintenance_scheduler
-from .detector_grouping import DetectorResultGrouping
+from .detector_grouping import DetectorResultGrouping, TakeErrorGroups
 from .error_cache import get_error_cache
+from .frame_cache import get_frame_cache
+from .reference_preload import ReferenceTakePreloader
 
 import numpy as np
 import threading
@@ -61,6 +72,18 @@ from enum import Enum
 from dataclasses import dataclass
 
 
+class FrameRecordOutcome(Enum):
+    """What became of one frame row passed to ``insert_frame_records``."""
+    INSERTED = "inserted"
+    EXISTING = "existing"  # The take already had a row for the frame
+    FAILED = "failed"
+    
+    @property
+    def stored(self) -> bool:
+        """Whether the frame has its row, inserted now or earlier."""
+        return self is not FrameRecordOutcome.FAILED
+
+
 # Note Management Classes (simplified from the archived service)
 class NoteType(Enum):
     """Types of notes that can be created."""
@@ -179,6 +202,9 @@ class NoteParser:
 class StorageService:
     """Service for managing storage of projects, scenes, angles, takes, and frames."""
     
+    # Minimum seconds between ProjectDB.last_modified writes while frames stream in
+    LAST_MODIFIED_DEBOUNCE_SECONDS = 5.0
+    
     def __init__(self):
         """Initialize the storage service."""
         # Initialize database
@@ -191,18 +217,30 @@ class StorageService:
         self.storage_dir = Path(get_config().storage.base_dir)
         
         # Initialize frame storage
-        self.frame_storage = FrameStorage(str(self.storage_dir))
+        storage_config = get_config().storage
+        self.frame_storage = FrameStorage(
+            str(self.storage_dir),
+            backend=storage_config.frame_backend,
+            segment_max_bytes=storage_config.segment_max_size_mb * 1024 * 1024,
+            raw_frames=storage_config.raw_frames
+        )
         # Set storage service reference for hierarchical paths
         self.frame_storage.set_storage_service(self)
         
+        # Reference take held in memory while a take is monitored
+        self.reference_preloader = ReferenceTakePreloader(
+            self.frame_storage,
+            use_memmap=storage_config.reference_preload_memmap,
+            memmap_dir=Path(storage_config.temp_dir) / "reference_frames",
+            max_bytes=storage_config.reference_preload_max_mb * 1024 * 1024
+        )
+        
         # Start maintenance scheduler
         self.maintenance_scheduler = get_maintenance_scheduler()
         self.maintenance_scheduler.start()
         
-        # Frame provider integration
-        self._frame_cache: Dict[str, np.ndarray] = {}
-        self._cache_size = 100
-        self._cache_lock = threading.RLock()
+        # Frame provider integration; decoded frames are shared with the detector framework
+        self.frame_cache = get_frame_cache()
         
         # Frame provider context
         self._current_project_id = None
@@ -211,6 +249,10 @@ class StorageService:
         self._current_take_id = None
         self._context_lock = threading.RLock()
         
+        # Debounced project last_modified updates during frame ingest
+        self._project_touch_times: Dict[int, float] = {}
+        self._touch_lock = threading.Lock()
+        
         # Initialize note parser
         self.note_parser = NoteParser()
     
@@ -255,6 +297,9 @@ class StorageService:
             session.query(FrameDB).filter_by(take_id=take_id).delete()
             session.commit()
             
+            # Frames captured again under the same numbers must not hit stale decodes
+            self.frame_cache.invalidate_take(take_id)
+            
             # Video segments will be deleted when take is deleted
             # No individual frame files to remove with video storage
             
@@ -268,6 +313,7 @@ class StorageService:
             # Delete all detector results
             session.query(DetectorResultDB).filter_by(take_id=take_id).delete()
             session.commit()
+            get_error_cache().invalidate(take_id)
             
             # You might also want to delete detector result images
             # This would be similar to frame file deletion
@@ -345,6 +391,7 @@ class StorageService:
             width=0,  # Not stored in current schema
             height=0,  # Not stored in current schema
             file_size=0,  # Not stored in current schema
+            fingerprint=db_frame.fingerprint,
             metadata={}
         )
     
@@ -753,6 +800,7 @@ class StorageService:
                     db_angle.name = name
             
             # Update reference take ID if provided
+            demoted_take_ids = []
             if reference_take_id is not None:
                 # First, unset is_reference flag on any existing reference take
                 existing_ref_take = session.query(TakeDB).filter(
@@ -761,6 +809,7 @@ class StorageService:
                 ).first()
                 if existing_ref_take and existing_ref_take.id != reference_take_id:
                     existing_ref_take.is_reference = False
+                    demoted_take_ids.append(existing_ref_take.id)
                 
                 # Set the new reference take
                 new_ref_take = session.query(TakeDB).filter(
@@ -783,6 +832,7 @@ class StorageService:
                     db_project.last_modified = datetime.datetime.now()
             
             session.commit()
+            self._discard_reference_raw_frames(demoted_take_ids)
             return self._db_angle_to_model(db_angle)
         finally:
             session.close()
@@ -845,6 +895,7 @@ class StorageService:
             
             # If this is the first take for the angle, make it the reference
             existing_takes = session.query(TakeDB).filter(TakeDB.angle_id == angle_id).count()
+            demoted_take_ids = []
             if existing_takes == 0:
                 is_reference = True
             elif is_reference:
@@ -855,6 +906,7 @@ class StorageService:
                 ).all()
                 for ref_take in existing_ref_takes:
                     ref_take.is_reference = False
+                    demoted_take_ids.append(ref_take.id)
             
             # Create database entry
             db_take = TakeDB(
@@ -866,6 +918,7 @@ class StorageService:
             )
             session.add(db_take)
             session.commit()
+            self._discard_reference_raw_frames(demoted_take_ids)
             
             # Find angle folder and create take directory
             project_path = find_project_folder(db_scene.project_id)
@@ -948,6 +1001,7 @@ class StorageService:
                             logger.warning(f"Failed to rename take folder for take {take_id}")
                         db_take.name = name
             
+            demoted_take_ids = []
             if is_reference is not None:
                 if is_reference and not db_take.is_reference:
                     # If setting as reference, unmark any existing reference takes
@@ -957,6 +1011,9 @@ class StorageService:
                     ).all()
                     for ref_take in existing_ref_takes:
                         ref_take.is_reference = False
+                        demoted_take_ids.append(ref_take.id)
+                elif not is_reference and db_take.is_reference:
+                    demoted_take_ids.append(db_take.id)
                 
                 db_take.is_reference = is_reference
             
@@ -973,6 +1030,7 @@ class StorageService:
                     db_project.last_modified = datetime.datetime.now()
             
             session.commit()
+            self._discard_reference_raw_frames(demoted_take_ids)
             return self._db_take_to_model(db_take)
         finally:
             session.close()
@@ -1043,24 +1101,13 @@ class StorageService:
         
         session = get_session()
         try:
-            # Verify take exists
-            db_take = session.query(TakeDB).filter(TakeDB.id == take_id).first()
-            if db_take is None:
+            # Verify take exists and resolve its project in one query
+            hierarchy = self._resolve_take_hierarchy(session, take_id)
+            if hierarchy is None:
                 logger.error(f"Take {take_id} not found")
                 return None
             
-            # Get angle, scene, and project
-            db_angle = session.query(AngleDB).filter(AngleDB.id == db_take.angle_id).first()
-            if db_angle is None:
-                return None
-            
-            db_scene = session.query(SceneDB).filter(SceneDB.id == db_angle.scene_id).first()
-            if db_scene is None:
-                return None
-            
-            project_id = db_scene.project_id
-            db_scene.id
-            db_angle.id
+            project_id = hierarchy[2]
             
             # Check if frame already exists in database
             existing_frame = session.query(FrameDB).filter(
@@ -1088,14 +1135,13 @@ class StorageService:
                 take_id=take_id,
                 frame_number=frame_id,  # Use frame_number field
                 timestamp=timestamp,
-                path=frame_path  # Store the actual file path
+                path=frame_path,  # Store the actual file path
+                fingerprint=fingerprint_frame(frame)
             )
             session.add(db_frame)
             
             # Update project last_modified
-            db_project = session.query(ProjectDB).filter(ProjectDB.id == project_id).first()
-            if db_project:
-                db_project.last_modified = datetime.datetime.now()
+            self._touch_project(session, project_id)
             
             session.commit()
             
@@ -1104,6 +1150,117 @@ class StorageService:
         finally:
             session.close()
     
+    def _resolve_take_hierarchy(self, session, take_id: int) -> Optional[Tuple[int, int, int]]:
+        """Get (angle_id, scene_id, project_id) of a take with a single query."""
+        row = session.query(
+            TakeDB.angle_id, AngleDB.scene_id, SceneDB.project_id
+        ).join(
+            AngleDB, AngleDB.id == TakeDB.angle_id
+        ).join(
+            SceneDB, SceneDB.id == AngleDB.scene_id
+        ).filter(TakeDB.id == take_id).first()
+        
+        return tuple(row) if row else None
+    
+    def _touch_project(self, session, project_id: int, force: bool = False):
+        """Update a project's last_modified, at most once per debounce interval."""
+        now = time.monotonic()
+        with self._touch_lock:
+            last = self._project_touch_times.get(project_id)
+            if not force and last is not None and now - last < self.LAST_MODIFIED_DEBOUNCE_SECONDS:
+                return
+            self._project_touch_times[project_id] = now
+        
+        session.query(ProjectDB).filter(ProjectDB.id == project_id).update(
+            {ProjectDB.last_modified: datetime.datetime.now()},
+            synchronize_session=False
+        )
+    
+    def _existing_frame_numbers(self, session, take_id: int, frame_numbers: List[int]) -> set:
+        """Get which of the given frame numbers already have rows for a take."""
+        if not frame_numbers:
+            return set()
+        rows = session.query(FrameDB.frame_number).filter(
+            FrameDB.take_id == take_id,
+            FrameDB.frame_number >= min(frame_numbers),
+            FrameDB.frame_number <= max(frame_numbers)
+        ).all()
+        return {row[0] for row in rows}
+    
+    def insert_frame_records(self, records: List[Dict[str, Any]],
+                             batch_size: int = 500) -> List[FrameRecordOutcome]:
+        """Insert frame rows for frames already written to frame storage.
+        
+        The hierarchy of each take is resolved once, rows already present are
+        skipped, and rows are committed in transactions of ``batch_size``.
+        A frame recaptured into a take keeps its existing row.
+        
+        Args:
+            records: Dictionaries with take_id, frame_number, timestamp and path
+            batch_size: Number of rows per transaction
+            
+        Returns:
+            Outcome of each record, in the order given
+        """
+        outcomes = [FrameRecordOutcome.FAILED] * len(records)
+        if not records:
+            return outcomes
+        
+        by_take: Dict[int, List[int]] = {}
+        for index, record in enumerate(records):
+            by_take.setdefault(record['take_id'], []).append(index)
+        
+        session = get_session()
+        try:
+            take_projects: Dict[int, int] = {}
+            rows: List[Dict[str, Any]] = []
+            row_indexes: List[int] = []
+            
+            for take_id, indexes in by_take.items():
+                hierarchy = self._resolve_take_hierarchy(session, take_id)
+                if hierarchy is None:
+                    logger.error(f"Take {take_id} not found, skipping {len(indexes)} frames")
+                    continue
+                take_projects[take_id] = hierarchy[2]
+                
+                seen = self._existing_frame_numbers(
+                    session, take_id, [records[index]['frame_number'] for index in indexes]
+                )
+                for index in indexes:
+                    record = records[index]
+                    if record['frame_number'] in seen:
+                        logger.debug(f"Frame {record['frame_number']} already exists for take {take_id}, skipping")
+                        outcomes[index] = FrameRecordOutcome.EXISTING
+                        continue
+                    seen.add(record['frame_number'])
+                    rows.append({
+                        'take_id': take_id,
+                        'frame_number': record['frame_number'],
+                        'timestamp': record['timestamp'],
+                        'path': record['path'],
+                        'fingerprint': record.get('fingerprint')
+                    })
+                    row_indexes.append(index)
+            
+            for start in range(0, len(rows), batch_size):
+                chunk = rows[start:start + batch_size]
+                if not bulk_insert_frames(chunk, session=session):
+                    session.rollback()
+                    break
+                for project_id in {take_projects[row['take_id']] for row in chunk}:
+                    self._touch_project(session, project_id)
+                session.commit()
+                for index in row_indexes[start:start + batch_size]:
+                    outcomes[index] = FrameRecordOutcome.INSERTED
+            
+            return outcomes
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Frame record insertion failed: {e}")
+            return outcomes
+        finally:
+            session.close()
+    
     def get_frame(self, take_id: int, frame_id: int) -> Optional[Frame]:
         """Get a frame metadata by take ID and frame ID."""
         # Get frame metadata from database
@@ -1133,45 +1290,17 @@ class StorageService:
             logger.warning(f"Take directory not found for take {take_id}")
             return None
         
-        # Find all frame files in the directory
-        frame_files = list(take_dir.glob('frame_*.png'))
-        if not frame_files:
-            logger.debug(f"No frame files found in {take_dir}")
-            return None
-        
-        # Sort by frame number to get the latest
+        # Frame IDs come from the segment index or the PNG files on disk
         try:
-            # Extract frame numbers and sort
-            frame_files_with_numbers = []
-            for f in frame_files:
-                try:
-                    # Extract frame number from filename (frame_XXXXXX.png)
-                    frame_num = int(f.stem.split('_')[1])
-                    frame_files_with_numbers.append((frame_num, f))
-                except (ValueError, IndexError):
-                    logger.warning(f"Invalid frame filename: {f}")
-                    continue
-            
-            if not frame_files_with_numbers:
+            frame_ids = self.frame_storage.get_take_frames(take_id)
+            if not frame_ids:
+                logger.debug(f"No frame files found in {take_dir}")
                 return None
             
-            # Sort by frame number and get the latest
-            frame_files_with_numbers.sort(key=lambda x: x[0])
-            latest_frame_num, latest_frame_path = frame_files_with_numbers[-1]
+            latest_frame_num = frame_ids[-1]
+            logger.debug(f"Latest frame for take {take_id}: frame {latest_frame_num}")
             
-            logger.debug(f"Latest frame for take {take_id}: frame {latest_frame_num} at {latest_frame_path}")
-            
-            # Read the frame directly
-            frame = cv2.imread(str(latest_frame_path), cv2.IMREAD_UNCHANGED)
-            if frame is None:
-                logger.error(f"Failed to read frame from {latest_frame_path}")
-                return None
-            
-            # Ensure BGR format (PNG might have alpha channel)
-            if len(frame.shape) == 3 and frame.shape[2] == 4:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
-            
-            return frame
+            return self.frame_storage.get_frame(take_id, latest_frame_num)
             
         except Exception as e:
             logger.error(f"Error getting latest frame for take {take_id}: {e}")
@@ -1256,20 +1385,41 @@ class StorageService:
         """Alias for get_frame_count for API compatibility."""
         return self.get_frame_count(take_id)
     
-    def get_frames_in_range(self, take_id: int, start: int, end: Optional[int] = None) -> List[Frame]:
+    def get_frames_in_range(self, take_id: int, start: int, end: Optional[int] = None) -> List[FrameRow]:
         """Get frames in the specified range."""
-        with self.session_scope() as session:
-            query = session.query(FrameDB).filter(
-                FrameDB.take_id == take_id,
-                FrameDB.frame_number >= start
-            )
-            
-            if end is not None:
-                query = query.filter(FrameDB.frame_number <= end)
-            
-            db_frames = query.order_by(FrameDB.frame_number).all()
+        return list(self.iter_frames(take_id, start, end))
+    
+    def iter_frames(self, take_id: int, start: int = 0, end: Optional[int] = None,
+                    batch_size: int = DEFAULT_LISTING_BATCH_SIZE) -> Iterator[FrameRow]:
+        """Stream a take's frames in frame order.
+        
+        Rows carry only the frame columns and the stored path; nothing is
+        resolved on the filesystem. Pages are fetched lazily by keyset.
+        """
+        return iter_frame_rows(take_id, start, end, batch_size)
+    
+    def list_frames(self, take_id: int, cursor: Optional[int] = None,
+                    limit: int = DEFAULT_LISTING_BATCH_SIZE, start: int = 0,
+                    end: Optional[int] = None) -> Dict[str, Any]:
+        """Get one page of a take's frames.
+        
+        Args:
+            take_id: Take ID
+            cursor: ``next_cursor`` of the previous page; None for the first page
+            limit: Maximum number of frames
+            start: First frame number of the listing
+            end: Last frame number of the listing
             
-            return [self._db_frame_to_model(db_frame) for db_frame in db_frames]
+        Returns:
+            Dictionary with 'frames' and 'next_cursor' (None on the last page)
+        """
+        after = cursor if cursor is not None else start - 1
+        rows = get_frame_rows_page(take_id, after, limit + 1, end)
+        page = rows[:limit]
+        return {
+            'frames': page,
+            'next_cursor': page[-1].frame_number if len(rows) > limit else None
+        }
     
     def get_latest_frame_id(self, take_id: int) -> Optional[int]:
         """Get the ID of the latest frame in a take."""
@@ -1344,6 +1494,7 @@ class StorageService:
             ).first()
             
             if existing_result:
+                db_result = existing_result
                 # Update existing result
                 existing_result.confidence = confidence if isinstance(confidence, (int, float)) else confidence.value
                 existing_result.description = description
@@ -1401,9 +1552,17 @@ class StorageService:
             
             session.commit()
             
-            # Invalidate cache for this take
-            cache = get_error_cache()
-            cache.invalidate(take_id)
+            # Fold the result into the take's continuous error groups
+            get_error_cache().add_result(take_id, {
+                'id': db_result.id,
+                'frame_id': frame_id,
+                'detector_name': detector_name,
+                'description': description,
+                'confidence': db_result.confidence,
+                'bounding_boxes': bounding_boxes,
+                'is_false_positive': bool(db_result.is_false_positive),
+                'metadata': metadata
+            })
             
             return True
         finally:
@@ -1423,6 +1582,37 @@ class StorageService:
         finally:
             session.close()
     
+    def iter_detector_results(self, take_id: int, frame_id: Optional[int] = None,
+                              include_details: bool = False,
+                              batch_size: int = DEFAULT_LISTING_BATCH_SIZE) -> Iterator[DetectorResultRow]:
+        """Stream a take's detector results ordered by frame.
+        
+        Bounding boxes and metadata are only loaded with ``include_details``.
+        """
+        return iter_detector_result_rows(take_id, frame_id, include_details, batch_size)
+    
+    def list_detector_results(self, take_id: int, cursor: Optional[Tuple[int, int]] = None,
+                              limit: int = DEFAULT_LISTING_BATCH_SIZE, frame_id: Optional[int] = None,
+                              include_details: bool = False) -> Dict[str, Any]:
+        """Get one page of a take's detector results.
+        
+        Args:
+            take_id: Take ID
+            cursor: ``next_cursor`` of the previous page; None for the first page
+            limit: Maximum number of results
+            frame_id: Only list results for this frame
+            include_details: Also load bounding boxes and metadata
+            
+        Returns:
+            Dictionary with 'results' and 'next_cursor' (None on the last page)
+        """
+        rows = get_detector_result_rows_page(take_id, cursor, limit + 1, frame_id, include_details)
+        page = rows[:limit]
+        return {
+            'results': page,
+            'next_cursor': (page[-1].frame_id, page[-1].id) if len(rows) > limit else None
+        }
+    
     def get_detector_result_image(self, take_id: int, frame_id: int, detector_name: str) -> Optional[np.ndarray]:
         """Get a detector result image."""
         session = get_session()
@@ -1480,6 +1670,9 @@ class StorageService:
         """
         Get detector results grouped into continuous errors.
         
+        Groups are kept per take and updated as results are saved; the take is
+        only regrouped in full when its stored results changed behind the cache.
+        
         Args:
             take_id: Take ID
             use_cache: Whether to use caching (default: True)
@@ -1487,54 +1680,37 @@ class StorageService:
         Returns:
             List of continuous error groups with instances
         """
-        # Get all detector results for the take
-        results = self.get_detector_results(take_id)
+        if not use_cache:
+            groups = TakeErrorGroups()
+            for result in self._iter_grouping_results(take_id):
+                groups.add_result(result)
+            return groups.get_summary()
         
-        if not results:
-            return []
-            
-        # Convert to dict format
-        result_dicts = []
-        false_positive_count = 0
-        for r in results:
-            is_fp = getattr(r, 'is_false_positive', False)
-            if is_fp:
-                false_positive_count += 1
-            result_dicts.append({
-                'id': getattr(r, 'id', None),
-                'frame_id': r.frame_id,
-                'detector_name': r.detector_name,
-                'description': r.description,
-                'confidence': r.confidence,
-                'bounding_boxes': r.bounding_boxes or [],
-                'is_false_positive': is_fp,
-                'metadata': getattr(r, 'metadata', {}) or {}
-            })
-        
-        logger.debug(f"Take {take_id}: {len(results)} total results, {false_positive_count} marked as false positive")
+        with self.session_scope() as session:
+            count, max_id = session.query(
+                func.count(DetectorResultDB.id), func.max(DetectorResultDB.id)
+            ).filter(DetectorResultDB.take_id == take_id).one()
         
-        # Check cache if enabled
-        cache = get_error_cache()
-        if use_cache:
-            cached_results = cache.get(take_id, result_dicts)
-            if cached_results is not None:
-                logger.debug(f"Using cached grouped results for take {take_id}")
-                return cached_results
+        if not count:
+            return []
         
-        # Group the results
-        grouped_results = DetectorResultGrouping.group_detector_results(
-            result_dicts, 
-            use_spatial=True  # Use sophisticated spatial grouping
+        return get_error_cache().get_summary(
+            take_id, (count, max_id), lambda: self._iter_grouping_results(take_id)
         )
-        
-        # Get summary
-        summary = DetectorResultGrouping.get_continuous_error_summary(grouped_results)
-        
-        # Cache the results
-        if use_cache:
-            cache.set(take_id, result_dicts, summary)
-            
-        return summary
+    
+    def _iter_grouping_results(self, take_id: int) -> Iterator[Dict[str, Any]]:
+        """Stream a take's results in the dict form used by error grouping."""
+        for row in self.iter_detector_results(take_id, include_details=True):
+            yield {
+                'id': row.id,
+                'frame_id': row.frame_id,
+                'detector_name': row.detector_name,
+                'description': row.description,
+                'confidence': row.confidence,
+                'bounding_boxes': row.bounding_boxes or [],
+                'is_false_positive': bool(row.is_false_positive),
+                'metadata': row.meta_data or {}
+            }
     
     def get_detector_results_summary(self, take_id: int) -> Dict[str, Any]:
         """Get a summary of detector results for a take."""
@@ -1608,6 +1784,7 @@ class StorageService:
             ).delete()
             
             session.commit()
+            get_error_cache().invalidate(take_id)
             return True
         finally:
             session.close()
@@ -1649,6 +1826,7 @@ class StorageService:
                 db_result.is_false_positive = True
                 db_result.false_positive_reason = f"Marked by {marked_by}" if marked_by else "User marked"
                 session.commit()
+                get_error_cache().set_false_positive(db_result.take_id, [db_result.id], True)
         finally:
             session.close()
 
@@ -1661,7 +1839,7 @@ class StorageService:
         return get_project_location(project_id)
     
     # Batch operations for better performance
-    def add_frames_batch(self, frames_data: List[Dict[str, Any]]) -> bool:
+    def add_frames_batch(self, frames_data: List[Dict[str, Any]], batch_size: int = 500) -> bool:
         """Add multiple frames in a single batch operation.
         
         Args:
@@ -1671,82 +1849,62 @@ class StorageService:
                 - frame_id: int  
                 - timestamp: float
                 - metadata: dict (optional)
+            batch_size: Number of frame rows per database transaction
                 
         Returns:
             bool: True if successful, False otherwise
         """
         session = get_session()
         try:
-            # Get take info for validation
-            take_ids = set(f['take_id'] for f in frames_data)
-            takes_info = {}
+            # Resolve each take once and skip frames that already exist
+            by_take: Dict[int, List[Dict[str, Any]]] = {}
+            for frame_data in frames_data:
+                by_take.setdefault(frame_data['take_id'], []).append(frame_data)
             
-            for take_id in take_ids:
-                db_take = session.query(TakeDB).filter(TakeDB.id == take_id).first()
-                if not db_take:
+            to_store = []
+            for take_id, take_frames in by_take.items():
+                if self._resolve_take_hierarchy(session, take_id) is None:
                     raise ValueError(f"Take {take_id} not found")
-                    
-                db_angle = session.query(AngleDB).filter(AngleDB.id == db_take.angle_id).first()
-                db_scene = session.query(SceneDB).filter(SceneDB.id == db_angle.scene_id).first()
-                
-                takes_info[take_id] = {
-                    'project_id': db_scene.project_id,
-                    'scene_id': db_scene.id,
-                    'angle_id': db_angle.id,
-                    'quality': db_scene.image_quality
-                }
-            
-            # Process and save frames using hybrid storage
-            db_frames = []
-            for frame_data in frames_data:
-                take_id = frame_data['take_id']
-                takes_info[take_id]
-                
-                # Save frame using direct frame storage
-                success = self.frame_storage.store_frame(
-                    take_id,
-                    frame_data['frame_id'],
-                    frame_data['frame'],
-                    frame_data['timestamp'],
-                    frame_data.get('metadata', {})
+                existing = self._existing_frame_numbers(
+                    session, take_id, [f['frame_id'] for f in take_frames]
                 )
-                
-                if not success:
-                    logger.error(f"Failed to store frame {frame_data['frame_id']} for take {take_id}")
-                    continue
-                
-                # Prepare database entry with dummy segment info (will be updated after conversion)
-                db_frames.append({
-                    'take_id': take_id,
-                    'frame_id': frame_data['frame_id'],
-                    'timestamp': frame_data['timestamp'],
-                    'segment_id': 0,  # Will be updated after conversion
-                    'segment_offset': frame_data['timestamp']
-                })
-            
-            # Bulk insert to database using optimized schema
-            if db_frames:
-                session = get_session()
-                try:
-                    for frame in db_frames:
-                        db_frame = FrameDB(**frame)
-                        session.add(db_frame)
-                    session.commit()
-                    return True
-                except Exception as e:
-                    session.rollback()
-                    logger.error(f"Failed to insert frame records: {e}")
-                    return False
-                finally:
-                    session.close()
-            
-            return True
-            
+                for frame_data in take_frames:
+                    if frame_data['frame_id'] in existing:
+                        logger.warning(f"Frame {frame_data['frame_id']} already exists for take {take_id}, skipping")
+                        continue
+                    to_store.append(frame_data)
         except Exception as e:
             logger.error(f"Batch frame insertion failed: {e}")
             return False
         finally:
             session.close()
+        
+        # Write frame files, then record them in batched transactions
+        records = []
+        for frame_data in to_store:
+            take_id = frame_data['take_id']
+            success = self.frame_storage.store_frame(
+                take_id,
+                frame_data['frame_id'],
+                frame_data['frame'],
+                frame_data['timestamp'],
+                frame_data.get('metadata', {})
+            )
+            
+            if not success:
+                logger.error(f"Failed to store frame {frame_data['frame_id']} for take {take_id}")
+                continue
+            
+            records.append({
+                'take_id': take_id,
+                'frame_number': frame_data['frame_id'],
+                'timestamp': frame_data['timestamp'],
+                'path': self.frame_storage.get_frame_path(take_id, frame_data['frame_id']),
+                'fingerprint': fingerprint_frame(frame_data['frame'])
+            })
+        
+        outcomes = self.insert_frame_records(records, batch_size=batch_size)
+        return sum(outcome.stored for outcome in outcomes) == len(to_store)
     
     def add_detector_results_batch(self, results_data: List[Dict[str, Any]]) -> bool:
         """Add multiple detector results in a single batch operation.
@@ -1945,14 +2103,67 @@ class StorageService:
             'mode': 'direct_frames',
             'status': 'active' if frame_count > 0 else 'empty',
             'frame_count': frame_count,
-            'storage_type': 'PNG (lossless)',
-            'stats': stats
+            'storage_type': stats.get('compression_type', 'PNG (lossless)'),
+            'stats': stats,
+            'path_cache': self.frame_storage.get_path_cache_stats(),
+            'frame_cache': self.get_frame_cache_stats(),
+            'reference_preload': self.get_reference_preload_status()
         }
     
     def finalize_take(self, take_id: int):
-        """Finalize a take (update frame index)."""
+        """Finalize a take (update frame index).
+        
+        Frames captured in raw form are archived here; reference takes keep
+        their raw frame file for zero-decode reads while monitoring. The
+        project's last_modified is brought up to date, since updates during
+        ingest are debounced and the last frames may not have touched it.
+        """
+        take = self.get_take(take_id)
+        keep_raw = bool(take and take.is_reference)
+        if self.frame_storage.finalize_take(take_id, keep_raw=keep_raw):
+            # Frame rows still point into the raw frame file
+            self._refresh_frame_paths(take_id)
+        
+        with self.session_scope() as session:
+            hierarchy = self._resolve_take_hierarchy(session, take_id)
+            if hierarchy is not None:
+                self._touch_project(session, hierarchy[2], force=True)
+
+    def _refresh_frame_paths(self, take_id: int):
+        """Point a take's frame rows at where frame storage now holds the frames."""
+        with self.session_scope() as session:
+            db_frames = session.query(FrameDB).filter(FrameDB.take_id == take_id).all()
+            for db_frame in db_frames:
+                path = self.frame_storage.get_frame_path(take_id, db_frame.frame_number)
+                if path:
+                    db_frame.path = path
+
+    def _discard_reference_raw_frames(self, take_ids: List[int]):
+        """Drop the raw frame files kept for takes that are no longer references."""
+        for take_id in take_ids:
+            if self.frame_storage.discard_raw_frames(take_id):
+                logger.info(f"Discarded raw frames of former reference take {take_id}")
+
+    def migrate_take_frames(self, take_id: int, remove_source: bool = True) -> int:
+        """Migrate a PNG-per-frame take into segment storage and update frame paths.
+
+        Args:
+            take_id: Take to migrate
+            remove_source: Delete the PNG and JSON files once migrated
+
+        Returns:
+            Number of frames migrated
+        """
+        count = self.frame_storage.migrate_take(take_id, remove_source=remove_source)
+        if not count:
+            return 0
+
+        self._refresh_frame_paths(take_id)
+
         self.frame_storage.finalize_take(take_id)
-    
+        logger.info(f"Migrated {count} frames of take {take_id} to segment storage")
+        return count
+
     # ==================== FRAME PROVIDER INTEGRATION ====================
     
     def set_frame_context(self, project_id: Optional[int] = None, scene_id: Optional[int] = None, 
@@ -1967,9 +2178,6 @@ class StorageService:
                 self._current_angle_id = angle_id
             if take_id is not None:
                 self._current_take_id = take_id
-                
-            # Clear cache when context changes
-            self._clear_frame_cache()
     
     def get_frame_context(self) -> Dict[str, Optional[int]]:
         """Get the current frame context."""
@@ -1983,35 +2191,11 @@ class StorageService:
     
     def _get_cached_frame(self, take_id: int, frame_id: int) -> Optional[np.ndarray]:
         """Get frame from cache or storage."""
-        cache_key = f"{take_id}_{frame_id}"
-        
-        # Try cache first
-        with self._cache_lock:
-            if cache_key in self._frame_cache:
-                return self._frame_cache[cache_key]
-        
-        # Load from storage - get_frame already returns numpy array
-        frame_data = self.get_frame(take_id, frame_id)
-        if frame_data is not None:
-            # Cache it
-            with self._cache_lock:
-                self._frame_cache[cache_key] = frame_data
-                
-                # Limit cache size
-                if len(self._frame_cache) > self._cache_size:
-                    # Remove oldest entries
-                    oldest_keys = list(self._frame_cache.keys())[:10]
-                    for key in oldest_keys:
-                        del self._frame_cache[key]
-            
-            return frame_data
-        
-        return None
+        return self.frame_storage.get_frame(take_id, frame_id)
     
     def _clear_frame_cache(self):
         """Clear the frame cache."""
-        with self._cache_lock:
-            self._frame_cache.clear()
+        self.frame_cache.clear()
     
     def get_current_frame(self) -> Optional[np.ndarray]:
         """Get the latest captured frame from current take."""
@@ -2112,32 +2296,108 @@ class StorageService:
         return loaded
     
     def get_frames_for_take(self, take_id: int) -> List[Any]:
-        """Get all frames for a take."""
-        with self.session_scope() as session:
-            db_frames = session.query(FrameDB).filter(
-                FrameDB.take_id == take_id
-            ).order_by(FrameDB.frame_number).all()
-            
-            # Convert to Frame objects with frame_number attribute
-            frames = []
-            for db_frame in db_frames:
-                frame = self._db_frame_to_model(db_frame)
-                # Add frame_number attribute (same as frame_id for now)
-                frame.frame_number = db_frame.frame_number
-                frame.id = db_frame.frame_number
-                frame.path = self.frame_storage.get_frame_path(take_id, db_frame.frame_number)
-                frames.append(frame)
+        """Get all frames for a take.
+        
+        Paths come from the frame rows, which frame storage keeps current on
+        finalize and migration, so no per-frame filesystem lookup is needed.
+        """
+        return [
+            Frame(
+                id=row.frame_number,  # Use frame_number as the id
+                take_id=row.take_id,
+                timestamp=row.timestamp,
+                filepath=row.path,
+                frame_number=row.frame_number,
+                path=row.path,
+                fingerprint=row.fingerprint
+            )
+            for row in self.iter_frames(take_id)
+        ]
+    
+    def get_frame_fingerprints(self, take_id: int) -> Dict[int, str]:
+        """Get the stored fingerprints of a take's frames by frame number."""
+        session = get_session()
+        try:
+            rows = session.query(FrameDB.frame_number, FrameDB.fingerprint).filter(
+                FrameDB.take_id == take_id,
+                FrameDB.fingerprint.isnot(None)
+            ).all()
+            return {frame_number: fingerprint for frame_number, fingerprint in rows}
+        finally:
+            session.close()
+    
+    def set_frame_fingerprints(self, take_id: int, fingerprints: Dict[int, str]) -> int:
+        """Store fingerprints for frames recorded without one.
+        
+        Args:
+            take_id: Take ID
+            fingerprints: Frame number -> fingerprint
             
-            return frames
+        Returns:
+            Number of frames updated
+        """
+        if not fingerprints:
+            return 0
+        session = get_session()
+        try:
+            rows = session.query(FrameDB.id, FrameDB.frame_number).filter(
+                FrameDB.take_id == take_id,
+                FrameDB.frame_number.in_(list(fingerprints)),
+                FrameDB.fingerprint.is_(None)
+            ).all()
+            session.bulk_update_mappings(FrameDB, [
+                {'id': row_id, 'fingerprint': fingerprints[frame_number]}
+                for row_id, frame_number in rows
+            ])
+            session.commit()
+            return len(rows)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Failed to store frame fingerprints for take {take_id}: {e}")
+            return 0
+        finally:
+            session.close()
     
     def get_frame_cache_stats(self) -> Dict[str, Any]:
         """Get frame cache statistics."""
-        with self._cache_lock:
-            return {
-                'size': len(self._frame_cache),
-                'max_size': self._cache_size,
-                'hit_rate': 0.0  # Could track this if needed
-            }
+        return self.frame_cache.get_stats()
+    
+    def preload_reference_take(self, take_id: int, target_resolution: Optional[str] = None,
+                               progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> bool:
+        """Decode a reference take into memory in the background.
+        
+        Args:
+            take_id: Reference take ID
+            target_resolution: Resolution name to downscale frames to (scene resolution)
+            progress_callback: Receives the preload status while loading and when done
+            
+        Returns:
+            True if the preload was started or is already in place
+        """
+        return self.reference_preloader.start(take_id, target_resolution, progress_callback)
+    
+    def release_reference_preload(self):
+        """Free the preloaded reference take."""
+        self.reference_preloader.release()
+    
+    def get_reference_preload_status(self) -> Dict[str, Any]:
+        """Get progress and lookup statistics of the reference preload."""
+        return self.reference_preloader.get_status()
+    
+    def get_reference_take_frame(self, take_id: int, frame_id: int) -> Optional[np.ndarray]:
+        """Get a reference frame from the preloaded set, falling back to frame storage."""
+        frame = self.reference_preloader.get_frame(take_id, frame_id)
+        if frame is not None:
+            return frame
+        return self.frame_storage.get_frame(take_id, frame_id)
+    
+    def pin_take_frames(self, take_id: int):
+        """Keep a take's decoded frames cached, e.g. the active reference take."""
+        self.frame_cache.pin_take(take_id)
+    
+    def unpin_take_frames(self, take_id: int):
+        """Let a pinned take's decoded frames be evicted again."""
+        self.frame_cache.unpin_take(take_id)
     
     # Note Management Methods
     
@@ -0,0 +1,162 @@
+"""
+Caching layer for resolved take directories.
+Avoids repeating the database lookups and folder scans of hierarchical path
+resolution for every frame read or write.
+"""
+import functools
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from threading import RLock
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ResolvedTakePath:
+    """A take's position in the project hierarchy and its frames directory."""
+    take_id: int
+    angle_id: int
+    scene_id: int
+    project_id: int
+    frames_dir: Path
+
+
+class TakePathCache:
+    """
+    Caches resolved take directories keyed by take ID.
+    Entries are dropped when any folder above the take is renamed or deleted.
+    """
+
+    def __init__(self):
+        self._cache: Dict[int, ResolvedTakePath] = {}
+        self._lock = RLock()
+        self._listeners: List[Callable[[List[int]], None]] = []
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, take_id: int) -> Optional[ResolvedTakePath]:
+        """
+        Get the cached path of a take.
+
+        An entry whose take folder has vanished (e.g. moved outside CAMF) counts
+        as a miss and is dropped.
+
+        Args:
+            take_id: Take ID
+
+        Returns:
+            Resolved path or None on cache miss
+        """
+        with self._lock:
+            entry = self._cache.get(take_id)
+            if entry is not None and not entry.frames_dir.parent.is_dir():
+                del self._cache[take_id]
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return entry
+
+    def put(self, entry: ResolvedTakePath):
+        """Cache a resolved take path."""
+        with self._lock:
+            self._cache[entry.take_id] = entry
+
+    def invalidate(self, project_id: Optional[int] = None, scene_id: Optional[int] = None,
+                   angle_id: Optional[int] = None, take_id: Optional[int] = None) -> List[int]:
+        """
+        Drop every cached take below the given hierarchy level.
+
+        Args:
+            project_id: Drop all takes of this project
+            scene_id: Drop all takes of this scene
+            angle_id: Drop all takes of this angle
+            take_id: Drop this take
+
+        Returns:
+            IDs of the takes that were dropped
+        """
+        with self._lock:
+            dropped = [
+                entry.take_id for entry in self._cache.values()
+                if (project_id is not None and entry.project_id == project_id)
+                or (scene_id is not None and entry.scene_id == scene_id)
+                or (angle_id is not None and entry.angle_id == angle_id)
+                or (take_id is not None and entry.take_id == take_id)
+            ]
+            for key in dropped:
+                del self._cache[key]
+            self._invalidations += len(dropped)
+            listeners = list(self._listeners)
+
+        # Listeners may release resources tied to the old paths (e.g. open files)
+        if dropped:
+            for listener in listeners:
+                try:
+                    listener(dropped)
+                except Exception as e:
+                    logger.error(f"Take path invalidation listener failed: {e}")
+
+        return dropped
+
+    def add_listener(self, listener: Callable[[List[int]], None]):
+        """Register a callback that receives the take IDs of invalidated entries."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def clear(self):
+        """Clear all cached paths."""
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._cache),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'invalidations': self._invalidations
+            }
+
+
+def invalidates_take_paths(level: str):
+    """
+    Decorator for filesystem operations that move or remove hierarchy folders.
+
+    The wrapped function must take the hierarchy IDs as leading positional
+    arguments (project_id, scene_id, angle_id, take_id), down to ``level``.
+    Affected entries are invalidated both before the operation, so listeners can
+    release handles on the old folder, and after it, in case a concurrent lookup
+    re-cached the old path in between.
+    """
+    position = {'project': 0, 'scene': 1, 'angle': 2, 'take': 3}[level]
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_take_path_cache()
+            scope = {f"{level}_id": args[position]}
+            cache.invalidate(**scope)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                cache.invalidate(**scope)
+        return wrapper
+    return decorator
+
+
+# Global cache instance
+_take_path_cache = TakePathCache()
+
+
+def get_take_path_cache() -> TakePathCache:
+    """Get the global take path cache instance."""
+    return _take_path_cache
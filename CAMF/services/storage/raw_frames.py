@@ -0,0 +1,219 @@
+"""
+Raw frame files for zero-decode frame access.
+Stores a take's frames uncompressed in fixed-size slots after a header that
+records the frame geometry, so readers get frames as numpy memmap views
+without decoding anything.
+"""
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RAW_MAGIC = b"CAMFRAW1"
+RAW_VERSION = 1
+RAW_FILENAME = "frames.raw"
+
+# magic, version, width, height, channels, flags, dtype, slot size
+RAW_HEADER = struct.Struct("<8sIIIII8sQ")
+RAW_HEADER_SIZE = 64
+# frame_id + 1 (0 marks an empty slot), timestamp
+SLOT_HEADER = struct.Struct("<qd")
+SLOT_ALIGNMENT = 64
+# Slots added whenever the file has to grow
+GROWTH_SLOTS = 64
+
+FLAG_SEALED = 0x1
+
+
+def _slot_size(frame_bytes: int) -> int:
+    size = SLOT_HEADER.size + frame_bytes
+    return (size + SLOT_ALIGNMENT - 1) // SLOT_ALIGNMENT * SLOT_ALIGNMENT
+
+
+class RawFrameFile:
+    """
+    Fixed-geometry raw frame file of one take.
+
+    Slot ``n`` holds frame number ``n``. Writes go through a regular file
+    handle; reads return read-only views into a memory map of the file, which
+    stay valid after the file is closed or replaced.
+    """
+
+    def __init__(self, path: Path, shape: Optional[Tuple[int, ...]] = None,
+                 dtype: np.dtype = np.uint8):
+        """
+        Open a raw frame file, creating it when ``shape`` is given and it does not exist.
+
+        Args:
+            path: File path
+            shape: Frame shape (height, width[, channels]) for a new file
+            dtype: Frame dtype for a new file
+        """
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._map: Optional[np.memmap] = None
+        self._frame_ids: Set[int] = set()
+
+        if self.path.exists():
+            self._file = open(self.path, 'r+b')
+            self._read_header()
+            self._scan_slots()
+        else:
+            if shape is None:
+                raise FileNotFoundError(f"Raw frame file {self.path} does not exist")
+            self.shape = tuple(shape)
+            self.dtype = np.dtype(dtype)
+            self.frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+            self.slot_size = _slot_size(self.frame_bytes)
+            self.flags = 0
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'w+b')
+            self._write_header()
+
+    @staticmethod
+    def exists(frames_dir: Path) -> bool:
+        """Check whether a frames directory has a raw frame file."""
+        return (Path(frames_dir) / RAW_FILENAME).exists()
+
+    @property
+    def sealed(self) -> bool:
+        """Whether the take was finalized and the file is kept only for fast reads."""
+        return bool(self.flags & FLAG_SEALED)
+
+    def _write_header(self):
+        height, width = self.shape[:2]
+        channels = self.shape[2] if len(self.shape) > 2 else 1
+        header = RAW_HEADER.pack(
+            RAW_MAGIC, RAW_VERSION, width, height, channels, self.flags,
+            self.dtype.str.encode('ascii'), self.slot_size
+        )
+        self._file.seek(0)
+        self._file.write(header.ljust(RAW_HEADER_SIZE, b"\0"))
+        self._file.flush()
+
+    def _read_header(self):
+        data = self._file.read(RAW_HEADER_SIZE)
+        if len(data) < RAW_HEADER.size:
+            raise ValueError(f"Truncated raw frame file header in {self.path}")
+        magic, version, width, height, channels, flags, dtype, slot_size = RAW_HEADER.unpack_from(data)
+        if magic != RAW_MAGIC or version != RAW_VERSION:
+            raise ValueError(f"{self.path} is not a raw frame file")
+        self.shape = (height, width, channels) if channels > 1 else (height, width)
+        self.dtype = np.dtype(dtype.rstrip(b"\0").decode('ascii'))
+        self.frame_bytes = height * width * channels * self.dtype.itemsize
+        self.slot_size = slot_size
+        self.flags = flags
+
+    def _scan_slots(self):
+        """Find the occupied slots of an existing file."""
+        size = os.path.getsize(self.path)
+        slots = (size - RAW_HEADER_SIZE) // self.slot_size
+        for slot in range(max(0, slots)):
+            self._file.seek(self._slot_offset(slot))
+            marker, _ = SLOT_HEADER.unpack(self._file.read(SLOT_HEADER.size))
+            if marker == slot + 1:
+                self._frame_ids.add(slot)
+
+    def _slot_offset(self, frame_id: int) -> int:
+        return RAW_HEADER_SIZE + frame_id * self.slot_size
+
+    def write(self, frame_id: int, frame: np.ndarray, timestamp: float):
+        """
+        Write a frame into its slot.
+
+        Raises:
+            ValueError: If the frame does not match the file's geometry
+        """
+        if frame.shape != self.shape or frame.dtype != self.dtype:
+            raise ValueError(
+                f"Frame {frame_id} is {frame.shape} {frame.dtype}, raw file expects {self.shape} {self.dtype}"
+            )
+        data = memoryview(np.ascontiguousarray(frame)).cast('B')
+        offset = self._slot_offset(frame_id)
+
+        with self._lock:
+            end = offset + self.slot_size
+            if os.fstat(self._file.fileno()).st_size < end:
+                # Grow in steps so the read mapping is rarely replaced
+                self._file.truncate(end + (GROWTH_SLOTS - 1) * self.slot_size)
+
+            # Payload first, then the slot marker, so a torn write leaves the slot empty
+            self._file.seek(offset + SLOT_HEADER.size)
+            self._file.write(data)
+            self._file.seek(offset)
+            self._file.write(SLOT_HEADER.pack(frame_id + 1, timestamp))
+            self._file.flush()
+            self._frame_ids.add(frame_id)
+
+    def _mapping(self, end: int) -> Optional[np.memmap]:
+        """Get a read mapping covering ``end`` bytes, remapping if the file grew."""
+        if self._map is None or self._map.size < end:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < end:
+                return None
+            self._map = np.memmap(self.path, dtype=np.uint8, mode='r', shape=(size,))
+        return self._map
+
+    def read(self, frame_id: int) -> Optional[np.ndarray]:
+        """Get a frame as a read-only zero-copy view, or None if its slot is empty."""
+        with self._lock:
+            if frame_id not in self._frame_ids:
+                return None
+            offset = self._slot_offset(frame_id) + SLOT_HEADER.size
+            mapping = self._mapping(offset + self.frame_bytes)
+            if mapping is None:
+                return None
+            return mapping[offset:offset + self.frame_bytes].view(self.dtype).reshape(self.shape)
+
+    def read_timestamp(self, frame_id: int) -> Optional[float]:
+        """Get the capture timestamp recorded with a frame."""
+        with self._lock:
+            if frame_id not in self._frame_ids:
+                return None
+            mapping = self._mapping(self._slot_offset(frame_id) + SLOT_HEADER.size)
+            if mapping is None:
+                return None
+            _, timestamp = SLOT_HEADER.unpack_from(mapping, self._slot_offset(frame_id))
+            return timestamp
+
+    def frame_ids(self) -> List[int]:
+        with self._lock:
+            return sorted(self._frame_ids)
+
+    def __contains__(self, frame_id: int) -> bool:
+        with self._lock:
+            return frame_id in self._frame_ids
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frame_ids)
+
+    def seal(self):
+        """Mark the file as kept after its take was archived."""
+        with self._lock:
+            self.flags |= FLAG_SEALED
+            self._write_header()
+
+    def close(self):
+        """Close the file; views already handed out remain valid."""
+        with self._lock:
+            self._map = None
+            if not self._file.closed:
+                self._file.close()
+
+    def delete(self):
+        """Close and remove the file."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # Windows refuses while views are still mapped
+            logger.warning(f"Could not delete raw frame file {self.path}: {e}")
@@ -0,0 +1,347 @@
+"""
+Preloading of reference takes for live monitoring.
+While a take is monitored every captured frame is compared against the
+same-numbered reference frame, so the whole reference take is decoded once into
+a contiguous, optionally memory-mapped buffer and served from there.
+"""
+import os
+import tempfile
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+import cv2
+import numpy as np
+
+from CAMF.common.resolution_utils import downscale_frame
+
+logger = logging.getLogger(__name__)
+
+PRELOAD_LOADING = "loading"
+PRELOAD_COMPLETE = "complete"
+PRELOAD_CANCELLED = "cancelled"
+PRELOAD_FAILED = "failed"
+
+# Minimum seconds between progress callbacks while loading
+PROGRESS_INTERVAL = 0.25
+
+
+def _remove_buffer_file(path: str):
+    try:
+        os.unlink(path)
+    except OSError as e:
+        logger.warning(f"Could not remove reference frame buffer {path}: {e}")
+
+
+class ReferenceFrameSet:
+    """
+    Decoded frames of one take in a single (N, H, W, C) buffer.
+
+    Frames are looked up by frame number and returned as read-only views into
+    the buffer. Frames that are not loaded yet return None.
+    """
+
+    def __init__(self, take_id: int, frame_ids: List[int], frame_shape: Tuple[int, ...],
+                 memmap_dir: Optional[Path] = None):
+        self.take_id = take_id
+        self.frame_ids = list(frame_ids)
+        self.frame_shape = tuple(frame_shape)
+        self._index = {frame_id: i for i, frame_id in enumerate(self.frame_ids)}
+        self._loaded = np.zeros(len(self.frame_ids), dtype=bool)
+        self._memmap_path: Optional[str] = None
+
+        shape = (len(self.frame_ids),) + self.frame_shape
+        if memmap_dir is not None:
+            memmap_dir.mkdir(parents=True, exist_ok=True)
+            fd, self._memmap_path = tempfile.mkstemp(
+                prefix=f"reference_take_{take_id}_", suffix=".frames", dir=str(memmap_dir)
+            )
+            os.close(fd)
+            self._buffer = np.memmap(self._memmap_path, dtype=np.uint8, mode='w+', shape=shape)
+            # Views handed out keep the mapping alive; the file goes with the last of them
+            weakref.finalize(self._buffer, _remove_buffer_file, self._memmap_path)
+        else:
+            self._buffer = np.empty(shape, dtype=np.uint8)
+
+    @property
+    def memory_mapped(self) -> bool:
+        return self._memmap_path is not None
+
+    @property
+    def nbytes(self) -> int:
+        return self._buffer.nbytes
+
+    @property
+    def loaded_count(self) -> int:
+        return int(self._loaded.sum())
+
+    def __len__(self) -> int:
+        return len(self.frame_ids)
+
+    def store(self, position: int, frame: np.ndarray):
+        """Copy a decoded frame into its slot, resizing it to the set's frame shape."""
+        if frame.shape != self.frame_shape:
+            height, width = self.frame_shape[:2]
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            if frame.shape != self.frame_shape:
+                frame = frame.reshape(self.frame_shape)
+        self._buffer[position] = frame
+        self._loaded[position] = True
+
+    def get(self, frame_id: int) -> Optional[np.ndarray]:
+        """Get a loaded frame as a read-only view, or None."""
+        position = self._index.get(frame_id)
+        if position is None or not self._loaded[position]:
+            return None
+        view = self._buffer[position]
+        view.flags.writeable = False
+        return view
+
+    def release(self):
+        """Drop the buffer; a memory-mapped file is deleted once no views remain."""
+        self._buffer = np.empty((0,) + self.frame_shape, dtype=np.uint8)
+        self._loaded = np.zeros(0, dtype=bool)
+        self._index = {}
+        self._memmap_path = None
+
+
+class ReferenceTakePreloader:
+    """
+    Loads one reference take at a time on a background thread.
+
+    Starting a preload for a different take cancels and releases the previous
+    one. Progress is reported through an optional callback receiving the same
+    dictionary as ``get_status``.
+    """
+
+    def __init__(self, frame_storage, use_memmap: bool = True,
+                 memmap_dir: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.frame_storage = frame_storage
+        self.use_memmap = use_memmap
+        self.memmap_dir = Path(memmap_dir) if memmap_dir else Path(tempfile.gettempdir())
+        self.max_bytes = max_bytes
+
+        self._lock = threading.RLock()
+        self._take_id: Optional[int] = None
+        self._frame_set: Optional[ReferenceFrameSet] = None
+        self._thread: Optional[threading.Thread] = None
+        self._cancel = threading.Event()
+        self._state: Optional[str] = None
+        self._total = 0
+        self._started_at = 0.0
+        self._finished_at: Optional[float] = None
+        self._error: Optional[str] = None
+        self._target_resolution: Optional[str] = None
+        self._progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def take_id(self) -> Optional[int]:
+        with self._lock:
+            return self._take_id
+
+    def start(self, take_id: int, target_resolution: Optional[str] = None,
+              progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> bool:
+        """
+        Start preloading a take in the background.
+
+        Args:
+            take_id: Reference take to load
+            target_resolution: Resolution name frames are downscaled to, e.g. the scene resolution
+            progress_callback: Called with the preload status while loading and when done
+
+        Returns:
+            True if a preload is running or already complete for this take
+        """
+        with self._lock:
+            if (self._take_id == take_id
+                    and self._target_resolution == target_resolution
+                    and self._state in (PRELOAD_LOADING, PRELOAD_COMPLETE)):
+                return True
+        self.release()
+
+        frame_ids = self.frame_storage.get_take_frames(take_id)
+        if not frame_ids:
+            logger.warning(f"Reference take {take_id} has no frames to preload")
+            return False
+
+        with self._lock:
+            self._cancel = threading.Event()
+            self._take_id = take_id
+            self._state = PRELOAD_LOADING
+            self._total = len(frame_ids)
+            self._started_at = time.time()
+            self._finished_at = None
+            self._error = None
+            self._target_resolution = target_resolution
+            self._progress_callback = progress_callback
+            self._hits = 0
+            self._misses = 0
+            self._thread = threading.Thread(
+                target=self._load, args=(take_id, frame_ids, target_resolution, self._cancel),
+                daemon=True, name=f"ReferencePreload-{take_id}"
+            )
+            self._thread.start()
+        return True
+
+    def release(self):
+        """Cancel any running preload and free its buffer."""
+        with self._lock:
+            self._cancel.set()
+            thread = self._thread
+            self._thread = None
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5.0)
+
+        with self._lock:
+            if self._frame_set is not None:
+                self._frame_set.release()
+                self._frame_set = None
+            self._take_id = None
+            self._state = None
+            self._total = 0
+
+    def get_frame(self, take_id: int, frame_id: int) -> Optional[np.ndarray]:
+        """Get a preloaded frame, or None if the take or frame is not loaded."""
+        with self._lock:
+            frame_set = self._frame_set
+            if frame_set is None or frame_set.take_id != take_id:
+                return None
+            frame = frame_set.get(frame_id)
+            if frame is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return frame
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the running preload to finish. Returns True if it completed."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._lock:
+            return self._state == PRELOAD_COMPLETE
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get preload progress and lookup statistics."""
+        with self._lock:
+            frame_set = self._frame_set
+            loaded = frame_set.loaded_count if frame_set else 0
+            end = self._finished_at or time.time()
+            return {
+                'take_id': self._take_id,
+                'state': self._state,
+                'loaded': loaded,
+                'total': self._total,
+                'progress': loaded / self._total if self._total else 0.0,
+                'bytes': frame_set.nbytes if frame_set else 0,
+                'frame_shape': list(frame_set.frame_shape) if frame_set else None,
+                'memory_mapped': frame_set.memory_mapped if frame_set else False,
+                'elapsed': end - self._started_at if self._state else 0.0,
+                'hits': self._hits,
+                'misses': self._misses,
+                'error': self._error
+            }
+
+    def _load(self, take_id: int, frame_ids: List[int], target_resolution: Optional[str],
+              cancel: threading.Event):
+        """Decode every frame of the take into the frame set."""
+        frame_set = None
+        try:
+            last_report = 0.0
+            for position, frame_id in enumerate(frame_ids):
+                if cancel.is_set():
+                    break
+
+                # Bypass the shared LRU cache; a whole take would flush it
+                frame = self.frame_storage.get_frame(take_id, frame_id, use_cache=False)
+                if frame is None:
+                    continue
+                if target_resolution:
+                    frame = downscale_frame(frame, target_resolution)
+
+                if frame_set is None:
+                    frame_set = self._allocate(take_id, frame_ids, frame.shape)
+                    if frame_set is None:
+                        break
+                    with self._lock:
+                        if cancel.is_set():
+                            frame_set.release()
+                            return
+                        self._frame_set = frame_set
+
+                if position >= len(frame_set):
+                    # Take exceeded the preload budget; later frames are read from storage
+                    break
+                frame_set.store(position, frame)
+
+                now = time.time()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    self._report()
+
+            with self._lock:
+                if self._cancel is not cancel:
+                    # Superseded by a newer preload
+                    return
+                if cancel.is_set():
+                    self._state = PRELOAD_CANCELLED
+                elif frame_set is None:
+                    self._state = PRELOAD_FAILED
+                    self._error = self._error or "No frames could be decoded"
+                else:
+                    self._state = PRELOAD_COMPLETE
+                self._finished_at = time.time()
+        except Exception as e:
+            logger.error(f"Preloading reference take {take_id} failed: {e}")
+            with self._lock:
+                if self._cancel is not cancel:
+                    return
+                self._state = PRELOAD_FAILED
+                self._error = str(e)
+                self._finished_at = time.time()
+
+        status = self._report()
+        if status['state'] == PRELOAD_COMPLETE:
+            logger.info(
+                f"Preloaded {status['loaded']} frames of reference take {take_id} "
+                f"({status['bytes'] / 1024 / 1024:.1f} MB) in {status['elapsed']:.2f}s"
+            )
+
+    def _allocate(self, take_id: int, frame_ids: List[int],
+                  frame_shape: Tuple[int, ...]) -> Optional[ReferenceFrameSet]:
+        """Create the frame set, keeping it within the byte budget."""
+        frame_bytes = int(np.prod(frame_shape))
+        count = len(frame_ids)
+        if self.max_bytes is not None:
+            count = min(count, self.max_bytes // frame_bytes)
+            if count < len(frame_ids):
+                logger.warning(
+                    f"Reference take {take_id} exceeds the preload budget, "
+                    f"preloading {count} of {len(frame_ids)} frames"
+                )
+        if count == 0:
+            with self._lock:
+                self._error = "Preload budget is smaller than one frame"
+            return None
+
+        with self._lock:
+            self._total = count
+        memmap_dir = self.memmap_dir if self.use_memmap else None
+        return ReferenceFrameSet(take_id, frame_ids[:count], frame_shape, memmap_dir)
+
+    def _report(self) -> Dict[str, Any]:
+        status = self.get_status()
+        callback = self._progress_callback
+        if callback:
+            try:
+                callback(status)
+            except Exception as e:
+                logger.error(f"Reference preload progress callback failed: {e}")
+        return status
@@ -0,0 +1,348 @@
+"""
+Append-only segmented frame store for CAMF.
+
+Frames of a take are appended as length-prefixed records to a small number of
+large segment files, and a fixed-size binary index maps each frame ID to its
+segment and byte offset. Reading a frame is a dictionary lookup followed by a
+single seek, and writing a frame is two appends (record, then index entry).
+
+Layout inside a take's ``frames`` directory::
+
+    frames.idx            index header + fixed-size entries
+    segment_000000.seg    segment header + records
+    segment_000001.seg    ...
+
+The store is agnostic to the payload encoding; FrameStorage writes PNG bytes.
+"""
+
+import json
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_MAGIC = b"CAMFSEG1"
+INDEX_MAGIC = b"CAMFIDX1"
+INDEX_FILENAME = "frames.idx"
+SEGMENT_PATTERN = "segment_{:06d}.seg"
+
+# frame_id, timestamp, payload length, metadata length
+RECORD_HEADER = struct.Struct("<IdII")
+# frame_id, segment number, record offset, payload length, metadata length, timestamp
+INDEX_ENTRY = struct.Struct("<IIQIId")
+
+DEFAULT_SEGMENT_MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass
+class SegmentEntry:
+    """Location of a single frame record inside the segment files."""
+    frame_id: int
+    segment: int
+    offset: int
+    payload_size: int
+    metadata_size: int
+    timestamp: float
+
+    @property
+    def payload_offset(self) -> int:
+        return self.offset + RECORD_HEADER.size
+
+    @property
+    def record_end(self) -> int:
+        return self.payload_offset + self.payload_size + self.metadata_size
+
+
+class SegmentFrameStore:
+    """Append-only segment files plus a binary offset index for one take."""
+
+    def __init__(self, frames_dir: Path, max_segment_bytes: int = DEFAULT_SEGMENT_MAX_BYTES):
+        self.frames_dir = Path(frames_dir)
+        self.max_segment_bytes = max_segment_bytes
+
+        self._entries: Dict[int, SegmentEntry] = {}
+        self._lock = threading.RLock()
+
+        self._current_segment = 0
+        self._current_size = 0
+        self._segment_file = None
+        self._index_file = None
+        self._read_files: Dict[int, Any] = {}
+
+        self._load_index()
+
+    @staticmethod
+    def exists(frames_dir: Path) -> bool:
+        """Check whether a directory contains a segment index."""
+        return (Path(frames_dir) / INDEX_FILENAME).exists()
+
+    def segment_path(self, segment: int) -> Path:
+        """Get the path of a segment file."""
+        return self.frames_dir / SEGMENT_PATTERN.format(segment)
+
+    @property
+    def index_path(self) -> Path:
+        return self.frames_dir / INDEX_FILENAME
+
+    def _load_index(self):
+        """Load the offset index, dropping entries left incomplete by a crash."""
+        if not self.index_path.exists():
+            return
+
+        with open(self.index_path, 'rb') as f:
+            data = f.read()
+
+        if data[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError(f"Invalid frame index: {self.index_path}")
+
+        body = memoryview(data)[len(INDEX_MAGIC):]
+        entry_count = len(body) // INDEX_ENTRY.size
+        valid_bytes = len(INDEX_MAGIC) + entry_count * INDEX_ENTRY.size
+
+        segment_sizes: Dict[int, int] = {}
+        for i in range(entry_count):
+            fields = INDEX_ENTRY.unpack_from(body, i * INDEX_ENTRY.size)
+            entry = SegmentEntry(*fields)
+
+            if entry.segment not in segment_sizes:
+                path = self.segment_path(entry.segment)
+                segment_sizes[entry.segment] = path.stat().st_size if path.exists() else 0
+
+            # Index entries are written after their record, so anything pointing
+            # past the end of the segment is the tail of an interrupted write
+            if entry.record_end > segment_sizes[entry.segment]:
+                logger.warning(f"Dropping truncated frame {entry.frame_id} in {self.frames_dir}")
+                valid_bytes = len(INDEX_MAGIC) + i * INDEX_ENTRY.size
+                break
+
+            self._entries[entry.frame_id] = entry
+            self._current_segment = max(self._current_segment, entry.segment)
+
+        if valid_bytes < len(data):
+            with open(self.index_path, 'r+b') as f:
+                f.truncate(valid_bytes)
+
+        current_path = self.segment_path(self._current_segment)
+        self._current_size = current_path.stat().st_size if current_path.exists() else 0
+
+    def _open_for_append(self):
+        """Open the active segment and the index for appending."""
+        self.frames_dir.mkdir(parents=True, exist_ok=True)
+
+        if self._index_file is None:
+            new_index = not self.index_path.exists()
+            self._index_file = open(self.index_path, 'ab')
+            if new_index:
+                self._index_file.write(INDEX_MAGIC)
+                self._index_file.flush()
+
+        if self._segment_file is None:
+            path = self.segment_path(self._current_segment)
+            self._segment_file = open(path, 'ab')
+            if self._segment_file.tell() == 0:
+                self._segment_file.write(SEGMENT_MAGIC)
+                self._segment_file.flush()
+            self._current_size = self._segment_file.tell()
+
+    def _roll_segment(self):
+        """Close the active segment and start the next one."""
+        if self._segment_file:
+            self._segment_file.close()
+            self._segment_file = None
+        self._current_segment += 1
+        self._current_size = 0
+        self._open_for_append()
+
+    def append(self, frame_id: int, timestamp: float, payload: bytes,
+               metadata: Optional[Dict[str, Any]] = None) -> SegmentEntry:
+        """Append an encoded frame.
+
+        A frame ID that is appended twice resolves to the newest record.
+
+        Args:
+            frame_id: Frame number within the take
+            timestamp: Capture timestamp in seconds
+            payload: Encoded frame bytes
+            metadata: Optional JSON-serialisable frame metadata
+
+        Returns:
+            Index entry of the written record
+        """
+        meta_bytes = json.dumps(metadata, default=str).encode('utf-8') if metadata else b""
+        record_size = RECORD_HEADER.size + len(payload) + len(meta_bytes)
+
+        with self._lock:
+            self._open_for_append()
+            if (self._current_size > len(SEGMENT_MAGIC)
+                    and self._current_size + record_size > self.max_segment_bytes):
+                self._roll_segment()
+
+            entry = SegmentEntry(
+                frame_id=frame_id,
+                segment=self._current_segment,
+                offset=self._current_size,
+                payload_size=len(payload),
+                metadata_size=len(meta_bytes),
+                timestamp=timestamp
+            )
+
+            header = RECORD_HEADER.pack(frame_id, timestamp, len(payload), len(meta_bytes))
+            self._segment_file.write(header + payload + meta_bytes)
+            self._segment_file.flush()
+            self._current_size += record_size
+
+            self._index_file.write(INDEX_ENTRY.pack(
+                entry.frame_id, entry.segment, entry.offset,
+                entry.payload_size, entry.metadata_size, entry.timestamp
+            ))
+            self._index_file.flush()
+
+            self._entries[frame_id] = entry
+            return entry
+
+    def _read_range(self, segment: int, offset: int, size: int) -> bytes:
+        """Read bytes from a segment using a cached read handle."""
+        handle = self._read_files.get(segment)
+        if handle is None:
+            handle = open(self.segment_path(segment), 'rb')
+            self._read_files[segment] = handle
+        handle.seek(offset)
+        return handle.read(size)
+
+    def get_entry(self, frame_id: int) -> Optional[SegmentEntry]:
+        """Get the index entry for a frame."""
+        return self._entries.get(frame_id)
+
+    def read(self, frame_id: int) -> Optional[bytes]:
+        """Read the encoded payload of a frame."""
+        with self._lock:
+            entry = self._entries.get(frame_id)
+            if entry is None:
+                return None
+            return self._read_range(entry.segment, entry.payload_offset, entry.payload_size)
+
+    def read_metadata(self, frame_id: int) -> Optional[Dict[str, Any]]:
+        """Read the metadata stored alongside a frame."""
+        with self._lock:
+            entry = self._entries.get(frame_id)
+            if entry is None:
+                return None
+            if not entry.metadata_size:
+                return {}
+            raw = self._read_range(
+                entry.segment,
+                entry.payload_offset + entry.payload_size,
+                entry.metadata_size
+            )
+        return json.loads(raw.decode('utf-8'))
+
+    def frame_ids(self) -> List[int]:
+        """Get the sorted list of stored frame IDs."""
+        with self._lock:
+            return sorted(self._entries.keys())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, frame_id: int) -> bool:
+        return frame_id in self._entries
+
+    def total_payload_bytes(self) -> int:
+        """Get the total size of all frame payloads."""
+        with self._lock:
+            return sum(e.payload_size for e in self._entries.values())
+
+    def segment_files(self) -> List[Path]:
+        """Get all segment files of the take."""
+        return sorted(self.frames_dir.glob("segment_*.seg"))
+
+    def sync(self):
+        """Flush and fsync the active segment and index."""
+        with self._lock:
+            for handle in (self._segment_file, self._index_file):
+                if handle:
+                    handle.flush()
+                    os.fsync(handle.fileno())
+
+    def close(self):
+        """Sync and release all file handles."""
+        with self._lock:
+            try:
+                self.sync()
+            finally:
+                for handle in (self._segment_file, self._index_file, *self._read_files.values()):
+                    if handle:
+                        handle.close()
+                self._segment_file = None
+                self._index_file = None
+                self._read_files.clear()
+
+
+def list_png_frames(frames_dir: Path) -> List[Tuple[int, Path]]:
+    """List legacy ``frame_XXXXXX.png`` files sorted by frame ID."""
+    frames = []
+    for path in Path(frames_dir).glob('frame_*.png'):
+        try:
+            frames.append((int(path.stem.split('_')[1]), path))
+        except (ValueError, IndexError):
+            continue
+    return sorted(frames)
+
+
+def migrate_png_frames(frames_dir: Path, store: SegmentFrameStore,
+                       remove_source: bool = True) -> int:
+    """Move a take's PNG-per-frame files into segment storage.
+
+    PNG bytes are copied as-is, so no frame is re-encoded. Sidecar JSON files
+    provide timestamps and metadata. Source files are only removed once the
+    segment store has been synced to disk.
+
+    Args:
+        frames_dir: Directory holding the legacy PNG frames
+        store: Segment store to append into
+        remove_source: Delete the PNG, sidecar and index files afterwards
+
+    Returns:
+        Number of frames migrated
+    """
+    frames_dir = Path(frames_dir)
+    migrated: List[Path] = []
+
+    for frame_id, png_path in list_png_frames(frames_dir):
+        if frame_id in store:
+            migrated.append(png_path)
+            continue
+
+        timestamp = 0.0
+        metadata: Dict[str, Any] = {}
+        meta_path = png_path.with_suffix('.json')
+        if meta_path.exists():
+            try:
+                with open(meta_path, 'r') as f:
+                    info = json.load(f)
+                timestamp = float(info.get('timestamp', 0.0))
+                metadata = info.get('metadata') or {}
+            except (ValueError, OSError) as e:
+                logger.warning(f"Ignoring unreadable sidecar {meta_path}: {e}")
+
+        with open(png_path, 'rb') as f:
+            payload = f.read()
+
+        store.append(frame_id, timestamp, payload, metadata)
+        migrated.append(png_path)
+
+    store.sync()
+
+    if remove_source:
+        for png_path in migrated:
+            png_path.unlink(missing_ok=True)
+            png_path.with_suffix('.json').unlink(missing_ok=True)
+        (frames_dir / 'frame_index.json').unlink(missing_ok=True)
+
+    logger.info(f"Migrated {len(migrated)} frames in {frames_dir} to segment storage")
+    return len(migrated)
@@ -0,0 +1,219 @@
+"""
+Tests for the binary live preview stream.
+Tests multipart MJPEG framing, delivery of encoded previews, per-client pacing,
+dropping for slow readers, listener cleanup, and bandwidth and server CPU per
+client against base64 previews in SSE events.
+"""
+
+import asyncio
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from CAMF.services.api_gateway import sse_handler
+from CAMF.services.api_gateway.preview_stream import BOUNDARY, PreviewStreamManager, format_part
+from CAMF.services.api_gateway.sse_handler import SSEConnectionManager, sse_endpoint
+from CAMF.services.capture.preview import EncodedPreview, PreviewEncoder
+
+
+def make_frame(value: int, shape=(360, 640, 3)) -> np.ndarray:
+    # Gradient plus the value, so previews have realistic JPEG sizes
+    frame = (np.indices(shape[:2]).sum(axis=0)[..., None] + value) % 256
+    frame = np.repeat(frame, shape[2], axis=2).astype(np.uint8)
+    frame.flags.writeable = False
+    return frame
+
+
+def parse_part(part: bytes):
+    """Split a multipart part into its headers and JPEG body."""
+    head, body = part.split(b"\r\n\r\n", 1)
+    lines = head.decode('ascii').split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return lines[0], headers, body[:-2]
+
+
+async def feed(encoder: PreviewEncoder, seconds: float, fps: float = 100):
+    """Submit capture frames for a while."""
+    deadline = time.monotonic() + seconds
+    value = 0
+    while time.monotonic() < deadline:
+        encoder.submit(make_frame(value), timestamp=value / fps)
+        value += 1
+        await asyncio.sleep(1 / fps)
+
+
+class TestPreviewStream:
+    """Test MJPEG delivery of encoded previews."""
+
+    @pytest.fixture
+    def encoder(self):
+        encoder = PreviewEncoder(fps=20)
+        yield encoder
+        encoder.stop()
+
+    def test_part_format(self):
+        """Test a part carries the JPEG with boundary, type and length headers."""
+        preview = EncodedPreview(7, b"\xff\xd8jpeg\xff\xd9", 320, 180, 1.5, time.time())
+
+        boundary, headers, body = parse_part(format_part(preview))
+
+        assert boundary == f"--{BOUNDARY}"
+        assert headers['Content-Type'] == "image/jpeg"
+        assert int(headers['Content-Length']) == len(body)
+        assert headers['X-Preview-Sequence'] == "7"
+        assert body == preview.jpeg
+
+    @pytest.mark.asyncio
+    async def test_stream_delivers_previews(self, encoder):
+        """Test a client gets each new preview as a decodable JPEG."""
+        manager = PreviewStreamManager(encoder)
+        stream = manager.stream()
+        feeder = asyncio.create_task(feed(encoder, 1.0))
+
+        parts = [await asyncio.wait_for(anext(stream), 2) for _ in range(3)]
+        await stream.aclose()
+        await feeder
+
+        sequences = [int(parse_part(part)[1]['X-Preview-Sequence']) for part in parts]
+        assert sequences == sorted(set(sequences))
+        image = cv2.imdecode(np.frombuffer(parse_part(parts[-1])[2], np.uint8), cv2.IMREAD_COLOR)
+        assert image.shape == (180, 320, 3)
+
+    @pytest.mark.asyncio
+    async def test_clients_paced_independently(self, encoder):
+        """Test a rate-capped client and a slow reader get fewer previews without holding back others."""
+        manager = PreviewStreamManager(encoder)
+        received = {'full': 0, 'capped': 0, 'slow': 0}
+
+        async def read(name, fps=None, delay=0.0):
+            async for _ in manager.stream(fps):
+                received[name] += 1
+                await asyncio.sleep(delay)
+
+        readers = [
+            asyncio.create_task(read('full')),
+            asyncio.create_task(read('capped', fps=4)),
+            asyncio.create_task(read('slow', delay=0.25)),
+        ]
+        await asyncio.sleep(0.05)
+        await feed(encoder, 1.5)
+        stats = {client['client_id']: client for client in manager.get_stats()['clients']}
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+
+        encoded = encoder.get_stats()['encoded']
+        print(f"\n{encoded} previews encoded in 1.5 s: full {received['full']}, "
+              f"capped at 4 fps {received['capped']}, slow reader {received['slow']}")
+        assert received['full'] >= encoded - 2
+        assert 5 <= received['capped'] <= 8
+        assert 5 <= received['slow'] <= 8
+        capped, slow = stats['preview-2'], stats['preview-3']
+        assert capped['dropped'] > 0 and slow['dropped'] > 0
+        assert stats['preview-1']['dropped'] <= 2
+
+    @pytest.mark.asyncio
+    async def test_listener_removed_with_last_client(self, encoder):
+        """Test the encoder listener only exists while clients are connected."""
+        manager = PreviewStreamManager(encoder)
+        encoder.submit(make_frame(0))
+        encoder.wait_for_preview(timeout=2)
+
+        first, second = manager.stream(), manager.stream()
+        # A new client starts with the latest preview
+        await asyncio.wait_for(anext(first), 1)
+        await asyncio.wait_for(anext(second), 1)
+        assert len(encoder._listeners) == 1
+
+        await first.aclose()
+        assert len(encoder._listeners) == 1
+        await second.aclose()
+        assert encoder._listeners == []
+        assert manager.get_stats()['active_clients'] == 0
+
+
+class TestPreviewTransportCost:
+    """Benchmark preview delivery over SSE JSON against the MJPEG stream."""
+
+    CLIENTS = 20
+    PREVIEWS = 30
+
+    @pytest.fixture
+    def previews(self):
+        encoder = PreviewEncoder()
+        frames = [make_frame(value, (1080, 1920, 3)) for value in range(self.PREVIEWS)]
+        encoded = []
+        for sequence, frame in enumerate(frames, 1):
+            jpeg, width, height = encoder.encode(frame)
+            encoded.append(EncodedPreview(sequence, jpeg, width, height, sequence / 30, time.time()))
+        return encoded
+
+    async def sse_cost(self, previews, monkeypatch):
+        """Bytes and server CPU per client for previews inside frame_captured SSE events."""
+        monkeypatch.setattr(sse_handler, 'sse_manager', SSEConnectionManager())
+        await sse_handler.sse_manager.start()
+        streams = []
+        for i in range(self.CLIENTS):
+            response = await sse_endpoint(None, f"client-{i}", "capture")
+            stream = response.body_iterator
+            await anext(stream)  # Connected event
+            streams.append(stream)
+
+        sent = 0
+        start = time.process_time()
+        for index, preview in enumerate(previews):
+            # frame_captured payload as it was sent with an inline preview
+            await sse_handler.sse_manager.broadcast('frame_captured', {
+                'type': 'frame_captured',
+                'take_id': 1,
+                'frameIndex': index,
+                'frame_count': index + 1,
+                'timestamp': preview.timestamp,
+                'preview': preview.data_uri
+            }, channel='capture')
+            for stream in streams:
+                sent += len((await anext(stream)).encode('utf-8'))
+        cpu = time.process_time() - start
+
+        for stream in streams:
+            await stream.aclose()
+        await sse_handler.sse_manager.cleanup()
+        return sent / self.CLIENTS, cpu / self.CLIENTS
+
+    async def mjpeg_cost(self, previews):
+        """Bytes and server CPU per client for the same previews on the MJPEG stream."""
+        manager = PreviewStreamManager(PreviewEncoder())
+        streams = [manager.stream() for _ in range(self.CLIENTS)]
+        pending = [asyncio.ensure_future(anext(stream)) for stream in streams]
+        await asyncio.sleep(0)  # Clients connect
+
+        sent = 0
+        start = time.process_time()
+        for preview in previews:
+            manager._on_preview(preview)
+            sent += sum(len(part) for part in await asyncio.gather(*pending))
+            pending = [asyncio.ensure_future(anext(stream)) for stream in streams]
+        cpu = time.process_time() - start
+
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        assert manager.get_stats()['active_clients'] == 0
+        return sent / self.CLIENTS, cpu / self.CLIENTS
+
+    @pytest.mark.asyncio
+    async def test_bandwidth_and_cpu_per_client(self, previews, monkeypatch):
+        """Test the MJPEG stream sends fewer bytes for less server CPU per client."""
+        jpeg_bytes = sum(len(preview.jpeg) for preview in previews) / len(previews)
+        sse_bytes, sse_cpu = await self.sse_cost(previews, monkeypatch)
+        mjpeg_bytes, mjpeg_cpu = await self.mjpeg_cost(previews)
+
+        print(f"\n{self.PREVIEWS} previews of {jpeg_bytes / 1000:.1f} kB to {self.CLIENTS} clients, per client:")
+        print(f"  SSE JSON + base64: {sse_bytes / self.PREVIEWS / 1000:.1f} kB per preview, "
+              f"{sse_cpu / self.PREVIEWS * 1e6:.0f} us server CPU per preview")
+        print(f"  MJPEG stream:      {mjpeg_bytes / self.PREVIEWS / 1000:.1f} kB per preview, "
+              f"{mjpeg_cpu / self.PREVIEWS * 1e6:.0f} us server CPU per preview")
+        assert mjpeg_bytes < sse_bytes * 0.8
+        assert mjpeg_cpu < sse_cpu
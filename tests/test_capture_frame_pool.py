@@ -0,0 +1,201 @@
+"""
+Tests for zero-copy frame fan-out and the frame buffer pool.
+Tests read-only shared frames, copy-on-write, buffer leases and recycling
+while frames are held, and allocations and bytes copied per captured frame.
+"""
+
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pytest
+
+from CAMF.services.capture.frame_pool import FramePool, retain_frame, share_frame
+from CAMF.services.capture.source import CaptureSource
+
+
+class TestFramePool:
+    """Test buffer leases, recycling and copy-on-write."""
+
+    @pytest.fixture
+    def pool(self):
+        return FramePool(max_buffers=4)
+
+    def test_released_buffer_reused(self, pool):
+        """Test a buffer is handed out again once its lease is released."""
+        lease = pool.acquire((48, 64, 3))
+        address = lease.frame.ctypes.data
+        lease.release()
+
+        assert pool.acquire((48, 64, 3)).frame.ctypes.data == address
+        stats = pool.get_stats()
+        assert (stats['allocations'], stats['reused']) == (1, 1)
+
+    def test_retained_frames_keep_buffer_in_use(self, pool):
+        """Test a lease taken on a view of a shared frame keeps its buffer from being reused."""
+        lease = pool.acquire((48, 64, 3))
+        held = retain_frame(share_frame(lease.frame)[10:20, ::2])
+        lease.release()
+
+        other = pool.acquire((48, 64, 3))
+        assert not np.shares_memory(other.frame, held.frame)
+        other.release()
+
+        held.release()
+        assert np.shares_memory(pool.acquire((48, 64, 3)).frame, held.frame)
+        assert pool.get_stats()['allocations'] == 2
+
+    def test_release_is_idempotent(self, pool):
+        """Test releasing a lease twice does not free a buffer another lease holds."""
+        lease = pool.acquire((8, 8))
+        with retain_frame(lease.frame) as frame:
+            assert frame is lease.frame
+            lease.release()
+            lease.release()
+            assert pool.get_stats()['leased_buffers'] == 1
+            assert not np.shares_memory(pool.acquire((8, 8)).frame, frame)
+
+    def test_full_pool_allocates_unpooled(self, pool):
+        """Test buffers beyond max_buffers are allocated without being kept."""
+        held = [pool.acquire((8, 8)) for _ in range(6)]
+
+        assert pool.get_stats()['pooled_buffers'] == 4
+        assert pool.get_stats()['allocations'] == 6
+        assert len({lease.frame.ctypes.data for lease in held}) == 6
+
+    def test_size_change_drops_old_buffers(self, pool):
+        """Test buffers of a previous frame size are released."""
+        pool.acquire((8, 8)).release()
+        pool.acquire((16, 16)).release()
+
+        assert pool.get_stats()['pooled_buffers'] == 1
+
+    def test_shared_counts_leases(self, pool):
+        """Test a lease is shared exactly while another lease holds the same buffer."""
+        lease = pool.acquire((8, 8))
+        unleased_view = share_frame(lease.frame)
+        assert not lease.shared
+
+        held = retain_frame(unleased_view)
+        assert lease.shared
+        held.release()
+        assert not lease.shared
+
+    def test_unpooled_frame_lease_holds_nothing(self, pool):
+        """Test a lease on a frame that did not come from a pool is inert."""
+        frame = np.zeros((8, 8), dtype=np.uint8)
+        lease = retain_frame(frame)
+
+        assert lease.frame is frame
+        assert not lease.shared
+        lease.release()
+        assert pool.get_stats()['leased_buffers'] == 0
+
+    def test_shared_frame_is_read_only(self, pool):
+        """Test writing to a fanned-out frame raises and copy-on-write gives a private copy."""
+        frame = share_frame(np.zeros((8, 8, 3), dtype=np.uint8))
+        with pytest.raises(ValueError):
+            frame[0, 0] = 1
+
+        writable = pool.make_writable(frame)
+        writable[0, 0] = 1
+
+        assert frame[0, 0, 0] == 0
+        assert pool.make_writable(writable) is writable
+        stats = pool.get_stats()
+        assert (stats['copies'], stats['bytes_copied']) == (1, frame.nbytes)
+        assert stats['leased_buffers'] == 0
+
+
+class PooledSource(CaptureSource):
+    """Source decoding numbered frames into pooled buffers, as camera and video reads do."""
+
+    def __init__(self, frame_rate, shape):
+        super().__init__(frame_rate)
+        self.shape = shape
+        self.index = 0
+        self.lease = None
+
+    def connect(self) -> bool:
+        return True
+
+    def disconnect(self):
+        self.stop_capture()
+
+    def _capture_frame(self) -> Optional[np.ndarray]:
+        # Subscribers keeping the previous frame have their own leases
+        if self.lease is not None:
+            self.lease.release()
+        self.lease = self.frame_pool.acquire(self.shape)
+        frame = self.lease.frame
+        frame.fill(self.index % 256)
+        self.index += 1
+        return frame
+
+
+class TestFrameFanOut:
+    """Test captured frames fanned out to several callbacks."""
+
+    def run_capture(self, source: CaptureSource, frames: int):
+        deadline = time.monotonic() + 10
+        source.start_capture()
+        while source.get_status()['frames_captured'] < frames and time.monotonic() < deadline:
+            time.sleep(0.005)
+        source.stop_capture()
+
+    def test_callbacks_share_one_frame(self):
+        """Test every callback gets the same read-only frame and held frames stay intact."""
+        source = PooledSource(200, (48, 64, 3))
+        received = [[], [], []]
+        # A writer that keeps the last few frames queued
+        queued = deque()
+
+        def write_behind(frame, t):
+            queued.append((retain_frame(frame), int(frame[0, 0, 0])))
+            if len(queued) > 5:
+                queued.popleft()[0].release()
+
+        for frames in received:
+            source.add_frame_callback(lambda frame, t, frames=frames: frames.append(frame))
+        source.add_frame_callback(write_behind)
+
+        self.run_capture(source, 40)
+
+        assert all(a is b is c for a, b, c in zip(*received))
+        assert not received[0][0].flags.writeable
+        assert all(int(lease.frame[0, 0, 0]) == value for lease, value in queued)
+
+    def test_allocations_and_copies_per_frame(self):
+        """Benchmark 4K fan-out to three callbacks against one copy per callback."""
+        shape = (2160, 3840, 3)
+        frames = 30
+
+        # Previous fan-out: a fresh decode buffer plus one copy per callback
+        callbacks = [lambda frame, t: None] * 3
+        allocations = copied = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            frame = np.empty(shape, dtype=np.uint8)
+            allocations += 1
+            for callback in callbacks:
+                callback(frame.copy(), 0.0)
+                allocations += 1
+                copied += frame.nbytes
+        legacy_time = (time.perf_counter() - start) / frames
+
+        source = PooledSource(120, shape)
+        for callback in callbacks:
+            source.add_frame_callback(callback)
+        self.run_capture(source, frames)
+        pool = source.get_status()['frame_pool']
+
+        print(f"\n4K fan-out to 3 callbacks over {frames} frames:")
+        print(f"  copy per callback: {allocations / frames:.2f} allocations, "
+              f"{copied / frames / 1e6:.1f} MB copied, {legacy_time * 1000:.1f} ms per frame")
+        print(f"  shared + pooled:   {pool['allocations_per_frame']:.2f} allocations, "
+              f"{pool['bytes_copied_per_frame'] / 1e6:.1f} MB copied per frame "
+              f"({pool['allocations']} buffers allocated in total)")
+        assert pool['bytes_copied_per_frame'] == 0
+        assert pool['allocations'] <= 3
+        assert pool['allocations_per_frame'] < 0.2
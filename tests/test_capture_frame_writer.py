@@ -0,0 +1,132 @@
+"""
+Tests for the capture write-behind pipeline.
+Tests off-thread frame writes, frame leases, batched database commits,
+per-frame commit outcomes, backpressure and flushing.
+"""
+
+import pytest
+import threading
+import time
+import numpy as np
+from unittest.mock import Mock
+
+from CAMF.services.capture.frame_pool import FramePool, share_frame
+from CAMF.services.capture.frame_writer import FrameWriteBehind
+from CAMF.services.storage.main import FrameRecordOutcome
+
+
+class TestFrameWriteBehind:
+    """Test write-behind frame persistence."""
+
+    @pytest.fixture
+    def storage(self):
+        """Create a storage service mock with frame storage."""
+        storage = Mock()
+        storage.frame_storage.store_frame.return_value = True
+        storage.frame_storage.get_frame_path.side_effect = lambda take_id, frame_id: f"/takes/{take_id}/{frame_id}"
+        storage.insert_frame_records.side_effect = lambda rows, batch_size=500: [FrameRecordOutcome.INSERTED] * len(rows)
+        return storage
+
+    @pytest.fixture
+    def frame(self):
+        return np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def test_frames_are_written_and_batched(self, storage, frame):
+        """Test frames reach storage and are inserted in batches."""
+        writer = FrameWriteBehind(storage, num_workers=2, batch_size=5)
+        completed = []
+
+        for i in range(10):
+            assert writer.submit(1, i, frame, i / 10.0, on_complete=completed.append)
+        assert writer.flush(timeout=5.0)
+        writer.stop()
+
+        bulk = storage.insert_frame_records
+
+        assert storage.frame_storage.store_frame.call_count == 10
+        rows = [row for call in bulk.call_args_list for row in call.args[0]]
+        assert sorted(row['frame_number'] for row in rows) == list(range(10))
+        assert all(row['path'].startswith('/takes/1/') for row in rows)
+        assert bulk.call_count < 10
+        assert completed == [True] * 10
+
+        stats = writer.get_stats()
+        assert stats['frames_committed'] == 10
+        assert stats['queue_depth'] == 0
+
+    def test_commit_outcomes_reported_per_frame(self, storage, frame):
+        """Test frames recaptured into a take count as stored while a failed row fails alone."""
+        def insert(rows, batch_size=500):
+            # Frames 0-2 already have rows from an earlier capture; frame 3's row fails
+            return [
+                FrameRecordOutcome.EXISTING if row['frame_number'] < 3
+                else FrameRecordOutcome.FAILED if row['frame_number'] == 3
+                else FrameRecordOutcome.INSERTED
+                for row in rows
+            ]
+        storage.insert_frame_records.side_effect = insert
+        writer = FrameWriteBehind(storage, num_workers=1, batch_size=6)
+        completed = {}
+
+        for i in range(6):
+            writer.submit(1, i, frame, 0.0, on_complete=lambda success, i=i: completed.__setitem__(i, success))
+        assert writer.flush(timeout=5.0)
+        writer.stop()
+
+        assert completed == {0: True, 1: True, 2: True, 3: False, 4: True, 5: True}
+        stats = writer.get_stats()
+        assert stats['frames_committed'] == 5
+        assert stats['write_errors'] == 1
+
+    def test_frame_leased_until_written(self, storage):
+        """Test a pooled frame stays leased while queued and is released once written."""
+        release = threading.Event()
+        storage.frame_storage.store_frame.side_effect = lambda *args: release.wait(5.0)
+        pool = FramePool()
+        lease = pool.acquire((48, 64, 3))
+        writer = FrameWriteBehind(storage, num_workers=1)
+
+        assert writer.submit(1, 0, share_frame(lease.frame), 0.0)
+        lease.release()
+        assert pool.get_stats()['leased_buffers'] == 1
+
+        release.set()
+        assert writer.flush(timeout=5.0)
+        writer.stop()
+        assert pool.get_stats()['leased_buffers'] == 0
+
+    def test_full_queue_rejects_without_blocking(self, storage, frame):
+        """Test a saturated queue drops frames instead of blocking the caller."""
+        release = threading.Event()
+        storage.frame_storage.store_frame.side_effect = lambda *args: release.wait(5.0)
+        writer = FrameWriteBehind(storage, num_workers=1, max_queue_size=2)
+
+        results = []
+        start = time.perf_counter()
+        for i in range(6):
+            results.append(writer.submit(1, i, frame, 0.0))
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+        assert results.count(False) >= 3
+        assert not writer.has_capacity()
+        assert writer.get_stats()['backpressure']
+
+        release.set()
+        writer.stop()
+
+        assert writer.get_stats()['frames_dropped'] == results.count(False)
+
+    def test_failed_write_reports_failure(self, storage, frame):
+        """Test storage failures reach the completion callback."""
+        storage.frame_storage.store_frame.return_value = False
+        writer = FrameWriteBehind(storage, num_workers=1)
+        completed = []
+
+        writer.submit(1, 0, frame, 0.0, on_complete=completed.append)
+        writer.flush(timeout=5.0)
+        writer.stop()
+
+        assert completed == [False]
+        storage.insert_frame_records.assert_not_called()
+        assert writer.get_stats()['write_errors'] == 1
@@ -0,0 +1,141 @@
+"""
+Tests for the decoupled live preview encoder.
+Tests latest-frame-only encoding, the preview rate limit, scaling, the shared
+per-tick encode, blocking readers, and capture cost with many preview consumers.
+"""
+
+import base64
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from CAMF.services.capture.preview import PreviewEncoder
+
+
+def make_frame(value: int, shape=(1080, 1920, 3)) -> np.ndarray:
+    frame = np.full(shape, value, dtype=np.uint8)
+    frame.flags.writeable = False
+    return frame
+
+
+class TestPreviewEncoder:
+    """Test preview encoding decoupled from submission."""
+
+    @pytest.fixture
+    def encoder(self):
+        encoder = PreviewEncoder(fps=20, max_width=320, max_height=240, quality=70)
+        yield encoder
+        encoder.stop()
+
+    def test_only_latest_frame_encoded(self, encoder):
+        """Test frames replaced before the next tick are dropped and the newest one is encoded."""
+        frames = [make_frame(value * 20) for value in range(10)]
+        encoder.submit(frames[0])
+        first = encoder.wait_for_preview(timeout=2)
+
+        # A burst right after a tick, well within the 50 ms to the next one
+        for value, frame in enumerate(frames):
+            encoder.submit(frame, timestamp=value)
+        preview = encoder.wait_for_preview(first.sequence, timeout=2)
+
+        assert preview.timestamp == 9
+        decoded = cv2.imdecode(np.frombuffer(preview.jpeg, np.uint8), cv2.IMREAD_COLOR)
+        assert abs(int(decoded.mean()) - 180) <= 2
+        stats = encoder.get_stats()
+        assert stats['encoded'] == 2
+        assert stats['stale_dropped'] == 9
+
+    def test_scaled_to_fit(self, encoder):
+        """Test previews fit the maximum size keeping the aspect ratio, small frames are kept."""
+        encoder.submit(make_frame(0))
+        preview = encoder.wait_for_preview(timeout=2)
+        assert (preview.width, preview.height) == (320, 180)
+
+        encoder.submit(make_frame(0, (100, 120, 3)))
+        preview = encoder.wait_for_preview(preview.sequence, timeout=2)
+        assert (preview.width, preview.height) == (120, 100)
+
+    def test_encode_shared_by_consumers(self, encoder):
+        """Test listeners and readers get the same preview and its base64 is computed once."""
+        received = []
+        encoder.add_listener(received.append)
+        encoder.submit(make_frame(50))
+
+        preview = encoder.wait_for_preview(timeout=2)
+        time.sleep(0.05)
+
+        assert received == [preview]
+        assert encoder.get_latest() is preview
+        assert preview.data_uri is preview.data_uri
+        assert base64.b64decode(preview.data_uri.split(',', 1)[1]) == preview.jpeg
+
+    def test_rate_limited(self):
+        """Test a 100 fps capture is previewed at the preview rate."""
+        encoder = PreviewEncoder(fps=5)
+        deadline = time.monotonic() + 1.0
+        while time.monotonic() < deadline:
+            encoder.submit(make_frame(0, (240, 320, 3)))
+            time.sleep(0.01)
+        encoder.stop()
+
+        assert 4 <= encoder.get_stats()['encoded'] <= 6
+
+    def test_wait_times_out_and_stop_wakes(self, encoder):
+        """Test readers time out without new previews and are released on stop."""
+        assert encoder.wait_for_preview(timeout=0.05) is None
+
+        threading.Timer(0.05, encoder.stop).start()
+        start = time.monotonic()
+        assert encoder.wait_for_preview(timeout=5) is None
+        assert time.monotonic() - start < 1.0
+
+    def test_capture_cost_independent_of_consumers(self):
+        """Benchmark per-frame capture cost: inline encode against submit with 0 and 50 consumers."""
+        frame = make_frame(90)
+
+        def inline_encode():
+            small = cv2.resize(frame, (320, 180), interpolation=cv2.INTER_AREA)
+            _, buffer = cv2.imencode('.jpg', small, [cv2.IMWRITE_JPEG_QUALITY, 70])
+            base64.b64encode(buffer).decode('utf-8')
+
+        def submit_cost(consumers: int) -> float:
+            encoder = PreviewEncoder(fps=10)
+            stop = threading.Event()
+
+            def consume():
+                sequence = 0
+                while not stop.is_set():
+                    preview = encoder.wait_for_preview(sequence, timeout=0.1)
+                    if preview:
+                        sequence = preview.sequence
+                        preview.data_uri
+
+            readers = [threading.Thread(target=consume) for _ in range(consumers)]
+            for reader in readers:
+                reader.start()
+            elapsed = 0.0
+            for i in range(100):
+                start = time.perf_counter()
+                encoder.submit(frame, i)
+                elapsed += time.perf_counter() - start
+                time.sleep(0.004)
+            stop.set()
+            encoder.stop()
+            for reader in readers:
+                reader.join()
+            return elapsed / 100
+
+        start = time.perf_counter()
+        for _ in range(20):
+            inline_encode()
+        inline = (time.perf_counter() - start) / 20
+        alone, watched = submit_cost(0), submit_cost(50)
+
+        print(f"\nPreview cost on the capture path per 1080p frame:")
+        print(f"  inline resize + JPEG + base64: {inline * 1000:.3f} ms")
+        print(f"  submit, no consumers:          {alone * 1000:.3f} ms")
+        print(f"  submit, 50 consumers:          {watched * 1000:.3f} ms")
+        assert watched < inline
@@ -0,0 +1,209 @@
+"""
+Tests for the deadline-driven capture frame scheduler.
+Tests drift-free deadlines, catch-up and drop policies, the jitter histogram,
+stopping, idle CPU of capture sources and scheduled video processing.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+import pytest
+
+from CAMF.services.capture.scheduler import FrameScheduler
+from CAMF.services.capture.source import CaptureSource
+from CAMF.services.capture.upload import VideoUploadProcessor
+
+
+class FakeClock:
+    """Monotonic clock advanced by hand, with a stop event whose waits advance it."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def wait(self, timeout: float) -> bool:
+        self.now += timeout
+        return False
+
+    def is_set(self) -> bool:
+        return False
+
+
+class TestFrameScheduler:
+    """Test deadlines and policies on a simulated clock."""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def test_slow_frames_do_not_drift(self, clock):
+        """Test deadlines stay on the grid whatever each frame costs."""
+        scheduler = FrameScheduler(10, clock=clock)
+        scheduler.start()
+
+        deadlines = []
+        for cost in [0.03, 0.09, 0.0, 0.05, 0.07]:
+            tick = scheduler.wait(clock)
+            deadlines.append(tick.deadline)
+            clock.now += cost
+
+        assert deadlines == pytest.approx([100.0, 100.1, 100.2, 100.3, 100.4])
+        assert scheduler.get_stats()['dropped'] == 0
+
+    def test_catch_up_fires_recent_missed_deadlines(self, clock):
+        """Test catch_up fires up to max_catch_up missed deadlines back to back and drops the rest."""
+        scheduler = FrameScheduler(10, policy="catch_up", max_catch_up=2, clock=clock)
+        scheduler.wait(clock)
+        clock.now += 0.45  # Frame 0 overran deadlines 1-4
+
+        ticks = [scheduler.wait(clock) for _ in range(4)]
+
+        assert [t.index for t in ticks] == [2, 3, 4, 5]
+        assert [t.fired_at for t in ticks[:3]] == [100.45] * 3
+        assert ticks[3].fired_at == pytest.approx(100.5)
+        stats = scheduler.get_stats()
+        assert stats['dropped'] == 1
+        assert stats['late_ticks'] == 2  # Deadlines 2 and 3
+
+    def test_drop_realigns_to_latest_deadline(self, clock):
+        """Test drop skips every missed deadline."""
+        scheduler = FrameScheduler(10, policy="drop", clock=clock)
+        scheduler.wait(clock)
+        clock.now += 0.45
+
+        ticks = [scheduler.wait(clock) for _ in range(2)]
+
+        assert [t.index for t in ticks] == [4, 5]
+        assert ticks[0].lateness == pytest.approx(0.05)
+        assert scheduler.get_stats()['dropped'] == 3
+
+    def test_jitter_histogram(self, clock):
+        """Test lateness is counted in millisecond buckets."""
+        scheduler = FrameScheduler(10, clock=clock)
+        scheduler.wait(clock)
+        for lateness in [0.0003, 0.003, 0.003, 0.03]:
+            clock.now = scheduler._deadline(scheduler._next_index) + lateness
+            scheduler.wait(clock)
+
+        stats = scheduler.get_stats()
+
+        assert stats['ticks'] == 5
+        histogram = stats['jitter_histogram']
+        assert (histogram['<=0.5ms'], histogram['<=5ms'], histogram['<=50ms']) == (2, 2, 1)
+        assert stats['max_jitter_ms'] == pytest.approx(30.0)
+
+    def test_invalid_arguments(self):
+        """Test rates and policies are validated."""
+        with pytest.raises(ValueError):
+            FrameScheduler(0)
+        with pytest.raises(ValueError):
+            FrameScheduler(10, policy="burst")
+
+    def test_stop_event_aborts_wait(self):
+        """Test a long wait returns as soon as the stop event is set."""
+        scheduler = FrameScheduler(0.1)
+        stop = threading.Event()
+        scheduler.wait(stop)
+        threading.Timer(0.05, stop.set).start()
+
+        start = time.monotonic()
+        assert scheduler.wait(stop) is None
+        assert time.monotonic() - start < 1.0
+
+
+class CountingSource(CaptureSource):
+    """Source returning a small frame, optionally slowly."""
+
+    def __init__(self, frame_rate, cost: float = 0.0):
+        super().__init__(frame_rate)
+        self.cost = cost
+
+    def connect(self) -> bool:
+        return True
+
+    def disconnect(self):
+        self.stop_capture()
+
+    def _capture_frame(self) -> Optional[np.ndarray]:
+        if self.cost:
+            time.sleep(self.cost)
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+class TestScheduledCapture:
+    """Test capture sources on the scheduler in real time."""
+
+    def test_cadence_with_slow_frames(self):
+        """Test frames stay on the 50 fps grid when each costs half an interval."""
+        source = CountingSource(50, cost=0.01)
+        times = []
+        source.add_frame_callback(lambda frame, t: times.append(t))
+
+        source.start_capture()
+        time.sleep(1.0)
+        stats = source.get_status()['schedule']
+        source.stop_capture()
+
+        intervals = np.diff(times)
+        print(f"\n50 fps, 10 ms frames: {len(times)} frames, mean interval {intervals.mean() * 1000:.2f} ms, "
+              f"jitter mean {stats['mean_jitter_ms']:.3f} ms, max {stats['max_jitter_ms']:.3f} ms")
+        assert 45 <= len(times) <= 52
+        assert intervals.mean() == pytest.approx(0.02, abs=0.002)
+        assert stats['dropped'] == 0
+
+    def test_idle_capture_uses_no_cpu(self):
+        """Test a 0.2 fps source sleeps between frames instead of polling."""
+        source = CountingSource(0.2)
+        source.start_capture()
+        time.sleep(0.05)
+
+        cpu_start, wall_start = time.process_time(), time.monotonic()
+        time.sleep(1.0)
+        cpu = time.process_time() - cpu_start
+        wall = time.monotonic() - wall_start
+
+        stop_start = time.monotonic()
+        source.stop_capture()
+        stop_time = time.monotonic() - stop_start
+
+        print(f"\nIdle 0.2 fps capture: {cpu / wall * 100:.2f}% CPU, stop took {stop_time * 1000:.1f} ms")
+        assert cpu / wall < 0.05
+        assert stop_time < 0.5
+        assert source.get_status()['frames_captured'] == 1
+
+
+class TestScheduledVideoProcessing:
+    """Test video playback on the scheduler."""
+
+    @pytest.fixture
+    def video_path(self, tmp_path):
+        path = str(tmp_path / "clip.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+        for i in range(12):
+            writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+        writer.release()
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            pytest.skip("OpenCV cannot write test videos here")
+        return path
+
+    def test_frames_follow_target_rate(self, video_path):
+        """Test every frame is processed at the target rate."""
+        processor = VideoUploadProcessor()
+        assert processor.load_video(video_path)['success']
+        arrivals = []
+        processor.add_frame_callback(lambda frame, t: arrivals.append(time.monotonic()))
+
+        processor.start_processing(target_fps=40)
+        processor._processing_thread.join(timeout=5)
+
+        assert len(arrivals) == 12
+        assert np.diff(arrivals).mean() == pytest.approx(0.025, abs=0.003)
+        schedule = processor.get_progress()['schedule']
+        assert schedule['ticks'] == 12
+        processor.cleanup()
@@ -0,0 +1,277 @@
+"""
+Tests for the persistent screen grabber.
+Tests grabber reuse per capture thread, preallocated destination frames,
+tile change detection, grab latency percentiles, and real grabs on a headless
+X server (Xvfb) comparing the persistent grabber with per-frame setup.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from CAMF.services.capture import screen
+from CAMF.services.capture.frame_pool import retain_frame
+from CAMF.services.capture.screen import ScreenGrabber, ScreenSource
+
+
+class FakeShot:
+    """mss screenshot: raw BGRA bytes of the grabbed region."""
+
+    def __init__(self, bgra: np.ndarray):
+        self.raw = bytearray(bgra.tobytes())
+        self.height, self.width = bgra.shape[:2]
+
+
+class FakeMSS:
+    """mss instance grabbing from a shared BGRA screen image."""
+
+    screen = np.zeros((240, 320, 4), dtype=np.uint8)
+    opened = []
+
+    def __init__(self):
+        self.monitors = [
+            {"left": 0, "top": 0, "width": 320, "height": 240},
+            {"left": 0, "top": 0, "width": 320, "height": 240},
+        ]
+        self.thread = threading.current_thread()
+        self.closed = False
+        FakeMSS.opened.append(self)
+
+    def grab(self, region):
+        assert threading.current_thread() is self.thread, "mss used outside its thread"
+        top, left = region["top"], region["left"]
+        return FakeShot(self.screen[top:top + region["height"], left:left + region["width"]])
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+@pytest.fixture
+def fake_mss(monkeypatch):
+    FakeMSS.screen = np.random.default_rng(0).integers(0, 255, (240, 320, 4), dtype=np.uint8)
+    FakeMSS.opened = []
+    monkeypatch.setattr(screen, "mss", SimpleNamespace(mss=FakeMSS), raising=False)
+    monkeypatch.setattr(screen, "MSS_AVAILABLE", True)
+    return FakeMSS
+
+
+def expected_bgr(region=(slice(None), slice(None))):
+    return cv2.cvtColor(np.ascontiguousarray(FakeMSS.screen[region]), cv2.COLOR_BGRA2BGR)
+
+
+class TestScreenGrabber:
+    """Test grabs into preallocated frames."""
+
+    def test_reuses_destination_frame(self, fake_mss):
+        """Test grabs convert BGRA to BGR into a recycled buffer while nothing else leases the last frame."""
+        grabber = ScreenGrabber(1)
+
+        address = grabber.grab().ctypes.data
+        FakeMSS.screen[:] = 7
+        frame = grabber.grab()
+
+        assert frame.ctypes.data == address
+        np.testing.assert_array_equal(frame, expected_bgr())
+        assert grabber.frame_pool.get_stats()['allocations'] == 1
+
+    def test_held_frames_not_overwritten(self, fake_mss):
+        """Test a frame still leased elsewhere is never written by later grabs."""
+        for tile_size in (0, 64):
+            grabber = ScreenGrabber(1, tile_size=tile_size)
+            original = grabber.grab().copy()
+            held = retain_frame(grabber.grab())
+
+            FakeMSS.screen[0:10, 0:10] = 255 - FakeMSS.screen[0:10, 0:10]
+            latest = grabber.grab()
+
+            assert not np.shares_memory(latest, held.frame)
+            np.testing.assert_array_equal(held.frame, original)
+            np.testing.assert_array_equal(latest, expected_bgr())
+            held.release()
+
+    def test_region(self, fake_mss):
+        """Test a region grabs only that part of the monitor."""
+        grabber = ScreenGrabber(1, region=(10, 20, 64, 48))
+
+        np.testing.assert_array_equal(grabber.grab(), expected_bgr((slice(20, 68), slice(10, 74))))
+
+    def test_invalid_monitor(self, fake_mss):
+        """Test a missing monitor raises and closes the grabber."""
+        with pytest.raises(ValueError):
+            ScreenGrabber(5)
+        assert FakeMSS.opened[-1].closed
+
+    def test_only_changed_tiles_converted(self, fake_mss):
+        """Test tile change detection marks and converts only damaged tiles."""
+        grabber = ScreenGrabber(1, tile_size=64)
+        grabber.grab()
+
+        FakeMSS.screen[70:80, 200:210] = 255 - FakeMSS.screen[70:80, 200:210]
+        frame = grabber.grab()
+
+        assert grabber.damage.shape == (4, 5)
+        assert list(zip(*np.nonzero(grabber.damage))) == [(1, 3)]
+        np.testing.assert_array_equal(frame, expected_bgr())
+
+        grabber.grab()
+        assert not grabber.damage.any()
+        assert grabber.unchanged_frames == 1
+        assert (grabber.tiles_checked, grabber.tiles_changed) == (40, 1)
+
+    def test_large_change_converted_fully(self, fake_mss):
+        """Test mostly changed frames, including partial edge tiles, stay exact."""
+        grabber = ScreenGrabber(1, region=(0, 0, 300, 200), tile_size=64)
+        grabber.grab()
+
+        FakeMSS.screen[:] = np.random.default_rng(1).integers(0, 255, FakeMSS.screen.shape, dtype=np.uint8)
+        np.testing.assert_array_equal(grabber.grab(), expected_bgr((slice(0, 200), slice(0, 300))))
+        FakeMSS.screen[195:200, 290:300] = 0
+        np.testing.assert_array_equal(grabber.grab(), expected_bgr((slice(0, 200), slice(0, 300))))
+        assert grabber.damage.sum() == 1
+
+
+class TestScreenSource:
+    """Test grabber lifetime and statistics of the screen source."""
+
+    def capture(self, source: ScreenSource, frames: int = 10):
+        captured = []
+        source.add_frame_callback(lambda frame, t: captured.append(frame))
+        assert source.connect()
+        source.start_capture()
+        deadline = time.monotonic() + 5
+        while len(captured) < frames and time.monotonic() < deadline:
+            time.sleep(0.01)
+        source.disconnect()
+        return captured
+
+    def test_one_grabber_per_capture_thread(self, fake_mss):
+        """Test the capture thread opens one grabber and closes it when capture stops."""
+        source = ScreenSource(frame_rate=200)
+
+        captured = self.capture(source)
+
+        assert len(captured) >= 10
+        # The validating instance of connect() plus one grabber
+        assert len(FakeMSS.opened) == 2
+        assert all(sct.closed for sct in FakeMSS.opened)
+        np.testing.assert_array_equal(captured[-1], expected_bgr())
+
+    def test_per_frame_mode_opens_every_frame(self, fake_mss):
+        """Test the per-frame baseline still opens an instance per grab."""
+        source = ScreenSource(frame_rate=200, persistent_grabber=False)
+
+        captured = self.capture(source)
+
+        assert len(FakeMSS.opened) > len(captured)
+        assert source.get_grab_stats()["mode"] == "per_frame"
+
+    def test_grabber_per_calling_thread(self, fake_mss):
+        """Test direct grabs from another thread use a grabber of their own."""
+        source = ScreenSource()
+        assert source.connect()
+
+        source._capture_frame()
+        worker = threading.Thread(target=source._capture_frame)
+        worker.start()
+        worker.join()
+        source._capture_frame()
+
+        assert len(FakeMSS.opened) == 3
+        source.disconnect()
+        assert all(sct.closed for sct in FakeMSS.opened)
+
+    def test_grab_stats(self, fake_mss):
+        """Test latency percentiles and tile counters are reported."""
+        source = ScreenSource(tile_size=32)
+        assert source.connect()
+        for _ in range(20):
+            source._capture_frame()
+
+        stats = source.get_status()["grab"]
+
+        assert stats["mode"] == "persistent"
+        assert stats["grabs"] == 20
+        assert 0 < stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+        assert stats["unchanged_frames"] == 19
+        assert stats["tiles_changed_ratio"] == 0.0
+        source.disconnect()
+
+    def test_last_frame_not_overwritten(self, fake_mss):
+        """Test the last frame does not change under the caller on the next grab."""
+        source = ScreenSource()
+        assert source.connect()
+        source._keep_last_frame(source._capture_frame())
+        last = source.get_last_frame()
+
+        FakeMSS.screen[:] = 0
+        source._capture_frame()
+
+        assert last.any()
+        source.disconnect()
+
+
+@pytest.fixture(scope="module")
+def x_display():
+    """An X display: $DISPLAY if set, else a private headless Xvfb server."""
+    pytest.importorskip("mss")
+    if not sys.platform.startswith("linux"):
+        pytest.skip("Xvfb capture is Linux-only")
+    if os.environ.get("DISPLAY"):
+        yield os.environ["DISPLAY"]
+        return
+    if not shutil.which("Xvfb"):
+        pytest.skip("No X display and Xvfb not installed")
+
+    display = ":97"
+    server = subprocess.Popen(["Xvfb", display, "-screen", "0", "1920x1080x24", "-nolisten", "tcp"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    os.environ["DISPLAY"] = display
+    try:
+        yield display
+    finally:
+        del os.environ["DISPLAY"]
+        server.terminate()
+        server.wait()
+
+
+class TestXvfbCapture:
+    """Test real grabs on an X server."""
+
+    def grab_stats(self, **kwargs):
+        source = ScreenSource(**kwargs)
+        assert source.connect()
+        for _ in range(50):
+            assert source._capture_frame() is not None
+        stats = source.get_grab_stats()
+        source.disconnect()
+        return stats
+
+    def test_persistent_grabber_is_faster(self, x_display):
+        """Benchmark grab latency of the persistent grabber against per-frame setup."""
+        report = {
+            "per frame": self.grab_stats(persistent_grabber=False),
+            "persistent": self.grab_stats(),
+            "persistent, 64px tiles": self.grab_stats(tile_size=64),
+        }
+
+        print(f"\nScreen grab latency on {x_display}:")
+        for name, stats in report.items():
+            print(f"  {name:24s} p50 {stats['p50_ms']:6.2f} ms  p95 {stats['p95_ms']:6.2f} ms  "
+                  f"p99 {stats['p99_ms']:6.2f} ms")
+        assert report["persistent"]["p50_ms"] < report["per frame"]["p50_ms"]
+        assert report["persistent, 64px tiles"]["unchanged_frames"] > 0
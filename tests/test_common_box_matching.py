@@ -0,0 +1,133 @@
+"""
+Tests for vectorised bounding box matching.
+Tests IoU and distance matrices against the scalar versions, thresholds, the grid index and speed.
+"""
+
+import random
+import time
+
+import pytest
+
+from CAMF.common.box_matching import (
+    BoxGridIndex, boxes_match, boxes_to_array, center_distance_matrix, iou_matrix
+)
+from CAMF.services.storage.detector_grouping import DetectorResultGrouping
+
+
+def random_boxes(count: int, rng: random.Random, origin=(0, 0), spread=1000):
+    return [
+        {
+            'x': origin[0] + rng.randint(0, spread),
+            'y': origin[1] + rng.randint(0, spread),
+            'width': rng.randint(5, 120),
+            'height': rng.randint(5, 120)
+        }
+        for _ in range(count)
+    ]
+
+
+def scalar_match(boxes1, boxes2) -> bool:
+    """Pairwise matching as the grouping code did it before vectorisation."""
+    for box1 in boxes1:
+        for box2 in boxes2:
+            if DetectorResultGrouping.calculate_iou(box1, box2) >= DetectorResultGrouping.IOU_THRESHOLD:
+                return True
+            if DetectorResultGrouping.calculate_position_distance(box1, box2) <= DetectorResultGrouping.POSITION_THRESHOLD:
+                return True
+    return False
+
+
+class TestBoxMatrices:
+    """Test batched box scoring."""
+
+    def test_matrices_match_scalar_math(self):
+        """Test IoU and centre distances agree with the scalar calculations."""
+        rng = random.Random(3)
+        boxes1, boxes2 = random_boxes(20, rng, spread=200), random_boxes(30, rng, spread=200)
+
+        ious = iou_matrix(boxes_to_array(boxes1), boxes_to_array(boxes2))
+        distances = center_distance_matrix(boxes_to_array(boxes1), boxes_to_array(boxes2))
+
+        for i, box1 in enumerate(boxes1):
+            for j, box2 in enumerate(boxes2):
+                assert ious[i, j] == pytest.approx(DetectorResultGrouping.calculate_iou(box1, box2))
+                assert distances[i, j] == pytest.approx(
+                    DetectorResultGrouping.calculate_position_distance(box1, box2)
+                )
+
+    def test_threshold_inclusivity(self):
+        """Test pairs exactly at the distance threshold only match inclusively."""
+        box1 = boxes_to_array([{'x': 0, 'y': 0, 'width': 10, 'height': 10}])
+        box2 = boxes_to_array([{'x': 100, 'y': 0, 'width': 10, 'height': 10}])
+
+        assert boxes_match(box1, box2, 0.5, 100, inclusive=True)
+        assert not boxes_match(box1, box2, 0.5, 100, inclusive=False)
+        assert not boxes_match(box1, boxes_to_array([]), 0.5, 100)
+
+    def test_matching_agrees_with_scalar(self):
+        """Test any-pair matching gives the scalar answer on random detections."""
+        rng = random.Random(5)
+        for _ in range(200):
+            boxes1 = random_boxes(rng.randint(1, 6), rng)
+            boxes2 = random_boxes(rng.randint(1, 6), rng)
+            assert boxes_match(boxes_to_array(boxes1), boxes_to_array(boxes2), 0.5, 100) == scalar_match(boxes1, boxes2)
+
+
+class TestBoxGridIndex:
+    """Test candidate lookup through the grid."""
+
+    def test_query_never_misses_a_match(self):
+        """Test every matching detection is among the candidates."""
+        rng = random.Random(11)
+        index = BoxGridIndex(cell_size=100, search_radius=100)
+        stored = {key: random_boxes(rng.randint(1, 4), rng, spread=3000) for key in range(300)}
+        for key, boxes in stored.items():
+            index.insert(key, boxes_to_array(boxes))
+
+        for _ in range(100):
+            query = random_boxes(rng.randint(1, 4), rng, spread=3000)
+            candidates = index.query(boxes_to_array(query))
+            matches = {key for key, boxes in stored.items() if scalar_match(query, boxes)}
+            assert matches <= candidates
+            assert len(candidates) < len(stored)
+
+    def test_remove_and_reinsert(self):
+        """Test removed detections are no longer returned and reinsertion moves them."""
+        index = BoxGridIndex(cell_size=100, search_radius=50)
+        index.insert('a', boxes_to_array([{'x': 0, 'y': 0, 'width': 20, 'height': 20}]))
+        near_origin = boxes_to_array([{'x': 5, 'y': 5, 'width': 10, 'height': 10}])
+        assert index.query(near_origin) == {'a'}
+
+        index.insert('a', boxes_to_array([{'x': 2000, 'y': 2000, 'width': 20, 'height': 20}]))
+        assert index.query(near_origin) == set()
+        index.remove('a')
+        assert 'a' not in index and len(index) == 0
+
+
+class TestBoxMatchingPerformance:
+    """Micro-benchmark on detectors reporting 100 boxes per frame."""
+
+    def test_vectorised_matching_speedup(self):
+        """Test vectorised matching beats pairwise Python on 100-box frames."""
+        rng = random.Random(1)
+        # Worst case for matching: no pair matches, so every pair is scored
+        frames = [
+            (random_boxes(100, rng, origin=(0, 0), spread=500),
+             random_boxes(100, rng, origin=(2000, 2000), spread=500))
+            for _ in range(5)
+        ]
+
+        start = time.perf_counter()
+        scalar_results = [scalar_match(a, b) for a, b in frames]
+        scalar_time = time.perf_counter() - start
+
+        arrays = [(boxes_to_array(a), boxes_to_array(b)) for a, b in frames]
+        start = time.perf_counter()
+        vector_results = [boxes_match(a, b, 0.5, 100) for a, b in arrays]
+        vector_time = time.perf_counter() - start
+
+        assert scalar_results == vector_results == [False] * len(frames)
+        speedup = scalar_time / vector_time
+        print(f"\n100x100 box matching: scalar {scalar_time / len(frames) * 1000:.2f} ms, "
+              f"vectorised {vector_time / len(frames) * 1000:.3f} ms per frame pair ({speedup:.0f}x)")
+        assert speedup > 5
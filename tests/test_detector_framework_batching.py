@@ -0,0 +1,162 @@
+"""
+Tests for batched inference in queue-based detectors.
+Tests the micro-batch collector of the frame queue, per-frame results from
+batches, batch failures, occupancy statistics and batched throughput.
+"""
+
+import threading
+import time
+from typing import List
+
+import numpy as np
+import pytest
+
+from CAMF.common.models import DetectorConfigurationSchema, DetectorInfo, DetectorResult
+from CAMF.services.detector_framework.interface import FramePair, QueueBasedDetector
+from CAMF.services.detector_framework.priority_queue_manager import IntelligentFrameQueue
+
+
+def make_frame_pair(frame_id: int) -> FramePair:
+    frame = np.zeros((32, 32, 3), dtype=np.uint8)
+    return FramePair(current_frame=frame, reference_frame=frame, current_frame_id=frame_id,
+                     reference_frame_id=frame_id, take_id=1, scene_id=1, angle_id=1, project_id=1)
+
+
+class ModelDetector(QueueBasedDetector):
+    """Detector whose model has a fixed cost per call plus a small cost per frame."""
+
+    call_overhead = 0.004
+    frame_cost = 0.0005
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes: List[int] = []
+
+    def get_info(self) -> DetectorInfo:
+        return DetectorInfo(name="ModelDetector", description="Test detector", version="1.0.0", author="Test")
+
+    def get_configuration_schema(self) -> DetectorConfigurationSchema:
+        return DetectorConfigurationSchema(fields={})
+
+    def initialize(self, config) -> bool:
+        return True
+
+    def process_frame(self, frame_id, take_id):
+        return []
+
+    def _run_model(self, frame_pairs: List[FramePair]) -> List[List[DetectorResult]]:
+        time.sleep(self.call_overhead + self.frame_cost * len(frame_pairs))
+        return [[DetectorResult(confidence=0.6, description="Moved", frame_id=pair.current_frame_id,
+                                detector_name="ModelDetector")] for pair in frame_pairs]
+
+    def process_frame_pair(self, current_frame, reference_frame, frame_pair: FramePair):
+        return self._run_model([frame_pair])[0]
+
+
+class BatchModelDetector(ModelDetector):
+    """The same model run on whole batches."""
+
+    def process_frame_pairs_batch(self, frame_pairs: List[FramePair]) -> List[List[DetectorResult]]:
+        self.batch_sizes.append(len(frame_pairs))
+        return self._run_model(frame_pairs)
+
+
+def collect_results(detector: QueueBasedDetector, count: int, timeout: float = 10.0) -> List[List[DetectorResult]]:
+    collected = []
+    deadline = time.monotonic() + timeout
+    while len(collected) < count and time.monotonic() < deadline:
+        results = detector.get_results(timeout=0.1)
+        if results is not None:
+            collected.append(results)
+    return collected
+
+
+class TestBatchCollector:
+    """Test micro-batches taken from the intelligent queue."""
+
+    def test_takes_available_frames_up_to_limit(self):
+        """Test a batch takes queued frames in priority order up to the size limit."""
+        frame_queue = IntelligentFrameQueue(maxsize=20)
+        for frame_id in (12, 0, 11, 13):
+            frame_queue.put(make_frame_pair(frame_id), take_frame_count=100)
+
+        batch = frame_queue.get_batch(3, timeout=0.1)
+
+        assert [pair.current_frame_id for pair in batch] == [0, 11, 12]
+        assert frame_queue.qsize() == 1
+        assert frame_queue.get_stats()['frames_processed'] == 3
+
+    def test_waits_briefly_for_batch_to_fill(self):
+        """Test the collector picks up frames arriving within the wait window only."""
+        frame_queue = IntelligentFrameQueue(maxsize=20)
+        frame_queue.put(make_frame_pair(20), take_frame_count=100)
+        threading.Timer(0.02, frame_queue.put, args=(make_frame_pair(21), 100)).start()
+
+        assert len(frame_queue.get_batch(4, timeout=0.1, max_wait=0.2)) == 2
+        assert frame_queue.get_batch(4, timeout=0.01, max_wait=0.2) == []
+
+
+class TestBatchedDetector:
+    """Test detectors opting in to batched processing."""
+
+    @pytest.fixture
+    def detector(self):
+        detector = BatchModelDetector()
+        yield detector
+        detector.stop_processing()
+
+    def test_results_emitted_per_frame(self, detector):
+        """Test every frame of a batch gets its own result list."""
+        for frame_id in range(20, 30):
+            detector.add_frame_pair(make_frame_pair(frame_id), take_frame_count=100)
+        detector.start_processing()
+
+        results = collect_results(detector, 10)
+
+        assert sorted(r[0].frame_id for r in results) == list(range(20, 30))
+        assert all(len(r) == 1 and 'process_time' in r[0].metadata for r in results)
+        assert max(detector.batch_sizes) > 1
+        stats = detector.get_stats()
+        assert stats['frames_processed'] == 10
+        assert stats['batches_processed'] == len(detector.batch_sizes)
+        assert stats['batch_occupancy'] == pytest.approx(10 / len(detector.batch_sizes) / detector.max_batch_size)
+
+    def test_batch_failure_reported_per_frame(self, detector):
+        """Test a failing batch produces a failure result for each of its frames."""
+        detector.process_frame_pairs_batch = lambda frame_pairs: []
+        detector.set_batching(4, max_batch_wait=0.05)
+        for frame_id in range(20, 24):
+            detector.add_frame_pair(make_frame_pair(frame_id), take_frame_count=100)
+        detector.start_processing()
+
+        results = collect_results(detector, 4)
+
+        assert sorted(r[0].frame_id for r in results) == [20, 21, 22, 23]
+        assert all(r[0].confidence == -1.0 for r in results)
+
+    def test_batching_is_opt_in(self):
+        """Test detectors without a batch hook, or with batch size 1, are not batched."""
+        detector = BatchModelDetector()
+        assert detector.supports_batching
+        detector.set_batching(1)
+        assert not detector.supports_batching
+        assert not ModelDetector().supports_batching
+        assert ModelDetector().get_stats()['batch_occupancy'] == 0.0
+
+    def test_batching_raises_throughput(self):
+        """Benchmark per-frame calls against batches of 8 for a model with per-call overhead."""
+        report = {}
+        for detector in (ModelDetector(), BatchModelDetector()):
+            for frame_id in range(10, 90):
+                detector.add_frame_pair(make_frame_pair(frame_id), take_frame_count=200)
+            start = time.perf_counter()
+            detector.start_processing()
+            results = collect_results(detector, 80, timeout=30)
+            report[type(detector).__name__] = len(results) / (time.perf_counter() - start)
+            detector.stop_processing()
+            assert len(results) == 80
+
+        print("\nModel detector (4 ms per call + 0.5 ms per frame):")
+        for name, throughput in report.items():
+            print(f"  {name}: {throughput:7.1f} frames/s")
+        assert report['BatchModelDetector'] > 2 * report['ModelDetector']
@@ -0,0 +1,200 @@
+"""
+Tests for perceptual change gating of detectors.
+Tests dHash/pHash behaviour, Hamming-distance gating with per-detector
+thresholds, skip counters, reuse of results in DetectorManager and the batch
+frame deduplicator.
+"""
+
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from CAMF.common.models import DetectorInfo
+from CAMF.services.detector_framework.batch_processor import FrameDeduplicator
+from CAMF.services.detector_framework.change_gate import (
+    ChangeGate, PairSignature, dhash, hamming_distance, phash
+)
+from CAMF.services.detector_framework.main import DetectorManager
+
+
+def make_scene(seed: int, shape=(1080, 1920, 3)) -> np.ndarray:
+    """A smooth synthetic shot: blurred noise, like out-of-focus set dressing."""
+    noise = np.random.default_rng(seed).integers(0, 255, (shape[0] // 40, shape[1] // 40, 3), dtype=np.uint8)
+    return cv2.resize(noise, (shape[1], shape[0]), interpolation=cv2.INTER_CUBIC)
+
+
+def add_sensor_noise(frame: np.ndarray, seed: int, sigma: float = 3.0) -> np.ndarray:
+    noise = np.random.default_rng(seed).normal(0, sigma, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+class TestPerceptualHashes:
+    """Test that hashes follow image content rather than bytes."""
+
+    @pytest.mark.parametrize("hash_function", [dhash, phash])
+    def test_noise_is_near_change_is_far(self, hash_function):
+        """Test sensor noise moves few bits and a different shot moves many."""
+        frame = make_scene(0)
+
+        noisy = hamming_distance(hash_function(frame), hash_function(add_sensor_noise(frame, 1)))
+        different = hamming_distance(hash_function(frame), hash_function(make_scene(2)))
+
+        assert noisy <= 4
+        assert different >= 16
+
+    @pytest.mark.parametrize("hash_function", [dhash, phash])
+    def test_channel_order_ignored(self, hash_function):
+        """Test RGB and BGR copies of a frame hash the same."""
+        frame = make_scene(3, (360, 640, 3))
+
+        assert hash_function(frame) == hash_function(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+    def test_hamming_distance(self):
+        """Test the distance counts differing bits."""
+        assert hamming_distance(0b1011, 0b0010) == 2
+        assert PairSignature(0b1, 0b111).distance(PairSignature(0b0, 0b000)) == 3
+
+    def test_signature_speed(self):
+        """Benchmark the signature of a 1080p frame pair."""
+        gate = ChangeGate()
+        current, reference = make_scene(4), make_scene(5)
+
+        start = time.perf_counter()
+        for _ in range(20):
+            gate.signature(current, reference)
+        elapsed = (time.perf_counter() - start) / 20
+
+        print(f"\n1080p pair dHash signature: {elapsed * 1000:.2f} ms")
+        assert elapsed < 0.01
+
+
+class TestChangeGate:
+    """Test gating decisions and counters."""
+
+    @pytest.fixture
+    def gate(self):
+        gate = ChangeGate()
+        gate.set_threshold('cups', 2)
+        return gate
+
+    def test_only_opted_in_detectors_gated(self, gate):
+        """Test detectors without a threshold always run."""
+        gate.record('lights', PairSignature(1, 1), [], context=1)
+
+        assert gate.lookup('lights', PairSignature(1, 1), context=1) is None
+        assert 'lights' not in gate.get_stats()
+
+    def test_reuses_last_run_within_threshold(self, gate):
+        """Test pairs within the threshold of the last run skip, beyond it run."""
+        results = ['cup moved']
+        assert gate.lookup('cups', PairSignature(0, 0), context=1) is None
+        gate.record('cups', PairSignature(0, 0), results, context=1, duration=0.5)
+
+        assert gate.lookup('cups', PairSignature(0b11, 0), context=1) is results
+        assert gate.lookup('cups', PairSignature(0b111, 0), context=1) is None
+        assert gate.lookup('cups', PairSignature(0, 0), context=2) is None
+
+        stats = gate.get_stats()['cups']
+        assert (stats['checks'], stats['skips'], stats['runs']) == (4, 1, 1)
+        assert stats['saved_seconds'] == pytest.approx(0.5)
+        assert stats['skip_rate'] == pytest.approx(0.25)
+
+    def test_drift_compared_to_last_run(self, gate):
+        """Test slow drift re-runs once it is far from the last processed pair."""
+        gate.record('cups', PairSignature(0, 0), [], context=1)
+
+        assert gate.lookup('cups', PairSignature(0b1, 0), context=1) is not None
+        assert gate.lookup('cups', PairSignature(0b11, 0), context=1) is not None
+        assert gate.lookup('cups', PairSignature(0b111, 0), context=1) is None
+
+    def test_opting_out_forgets_runs(self, gate):
+        """Test clearing a threshold stops gating."""
+        gate.record('cups', PairSignature(0, 0), [], context=1)
+        gate.set_threshold('cups', None)
+
+        assert not gate.is_gated('cups')
+        assert not gate.active
+        assert gate.lookup('cups', PairSignature(0, 0), context=1) is None
+
+
+class CountingProcess:
+    """Detector process reporting one error per frame and counting invocations."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def send_request(self, method, params, timeout=30):
+        if method != 'process_frame':
+            return {'success': True}
+        self.calls += 1
+        return {'success': True, 'data': [{
+            'confidence': 0.8, 'description': 'Cup moved',
+            'frame_id': params['frame_id'], 'detector_name': 'cups'
+        }]}
+
+
+class TestGatedDetection:
+    """Test DetectorManager skipping unchanged frame pairs."""
+
+    @pytest.fixture
+    def manager(self):
+        manager = DetectorManager(
+            DetectorInfo(name='cups', description='', version='1.0', author='test'), CountingProcess()
+        )
+        assert manager.initialize({})
+        return manager
+
+    @pytest.fixture
+    def gate(self):
+        gate = ChangeGate()
+        gate.set_threshold('cups', 4)
+        return gate
+
+    def test_static_shot_runs_once(self, manager, gate):
+        """Test a noisy lock-off shot runs the detector once and reports every frame."""
+        reference = make_scene(10, (360, 640, 3))
+        shot = make_scene(11, (360, 640, 3))
+
+        results = [
+            manager.process_frame(frame_id, 1, signature=gate.signature(add_sensor_noise(shot, frame_id), reference),
+                                  gate=gate)
+            for frame_id in range(12)
+        ]
+
+        assert manager.process.calls == 1
+        assert [r[0].frame_id for r in results] == list(range(12))
+        assert gate.get_stats()['cups']['skips'] == 11
+        assert manager.status.total_processed == 12
+
+    def test_changed_content_runs_again(self, manager, gate):
+        """Test a cut to a different shot invokes the detector."""
+        reference = make_scene(12, (360, 640, 3))
+        for frame_id, shot in enumerate([make_scene(13, (360, 640, 3)), make_scene(14, (360, 640, 3))]):
+            manager.process_frame(frame_id, 1, signature=gate.signature(shot, reference), gate=gate)
+
+        assert manager.process.calls == 2
+
+    def test_failures_not_reused(self, manager, gate):
+        """Test a failed run is not remembered as the last run."""
+        manager.process.send_request = lambda method, params, timeout=30: {'success': False, 'error': 'boom'}
+        signature = PairSignature(0, 0)
+
+        manager.process_frame(0, 1, signature=signature, gate=gate)
+
+        assert gate.lookup('cups', signature, context=1) is None
+
+
+class TestFrameDeduplicator:
+    """Test the batch processor's duplicate detection."""
+
+    def test_noisy_repeats_are_duplicates(self):
+        """Test re-encoded or noisy copies map to the original frame, other shots do not."""
+        deduplicator = FrameDeduplicator(threshold=0.95)
+        shot = make_scene(20, (360, 640, 3))
+
+        assert deduplicator.is_duplicate(shot, 0) is None
+        assert deduplicator.is_duplicate(add_sensor_noise(shot, 1), 1) == 0
+        assert deduplicator.is_duplicate(make_scene(21, (360, 640, 3)), 2) is None
+        assert deduplicator.get_unique_frames([0, 1, 2]) == [0, 2]
@@ -0,0 +1,92 @@
+"""
+Tests for the frame prefetch stage.
+Tests ordering, bounded read-ahead, overlap with the consumer, errors and early exit.
+"""
+
+import threading
+import time
+
+from CAMF.services.detector_framework.frame_prefetcher import FramePrefetcher
+
+
+class TestFramePrefetcher:
+    """Test loading frames ahead of the detectors."""
+
+    def test_results_keep_frame_order(self):
+        """Test items come back in order even when later loads finish first."""
+        def load(n):
+            time.sleep(0.02 if n % 3 == 0 else 0.0)
+            return n * 10
+
+        prefetcher = FramePrefetcher(load, depth=4, workers=3)
+        results = [(p.item, p.result) for p in prefetcher.iter(range(12))]
+
+        assert results == [(n, n * 10) for n in range(12)]
+        assert prefetcher.get_stats()['loaded'] == 12
+
+    def test_read_ahead_is_bounded(self):
+        """Test no more than depth items are started ahead of the consumer."""
+        started = []
+        lock = threading.Lock()
+
+        def load(n):
+            with lock:
+                started.append(n)
+            return n
+
+        prefetcher = FramePrefetcher(load, depth=3, workers=2)
+        items = prefetcher.iter(range(20))
+        next(items)
+        time.sleep(0.1)
+        with lock:
+            assert max(started) <= 3
+
+        items.close()
+
+    def test_loading_overlaps_consumer(self):
+        """Test loads run while the consumer is busy with earlier items."""
+        def load(n):
+            time.sleep(0.02)
+            return n
+
+        def consume(prefetcher):
+            start = time.perf_counter()
+            for _ in prefetcher.iter(range(10)):
+                time.sleep(0.02)
+            return time.perf_counter() - start
+
+        sequential = consume(FramePrefetcher(load, depth=0))
+        overlapped = consume(FramePrefetcher(load, depth=4, workers=2))
+
+        assert overlapped < sequential * 0.75
+
+    def test_errors_are_returned_per_item(self):
+        """Test a failing load is reported on its item without stopping the rest."""
+        def load(n):
+            if n == 2:
+                raise IOError("corrupt frame")
+            return n
+
+        prefetcher = FramePrefetcher(load, depth=2)
+        results = list(prefetcher.iter(range(5)))
+
+        assert [p.result for p in results] == [0, 1, None, 3, 4]
+        assert isinstance(results[2].error, IOError)
+        assert prefetcher.get_stats()['failed'] == 1
+
+    def test_early_exit_cancels_pending_loads(self):
+        """Test leaving the loop does not load the rest of the take."""
+        loaded = []
+
+        def load(n):
+            time.sleep(0.01)
+            loaded.append(n)
+            return n
+
+        prefetcher = FramePrefetcher(load, depth=4, workers=1)
+        for prefetched in prefetcher.iter(range(100)):
+            if prefetched.item == 2:
+                break
+        time.sleep(0.1)
+
+        assert len(loaded) < 10
@@ -0,0 +1,374 @@
+"""
+Tests for content-addressed detector result caching.
+Tests frame fingerprints, their storage on frame rows, cache hits for identical
+frame pairs, the reported hit rate and the SQLite-backed disk cache.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import cv2
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+
+from CAMF.common.models import DetectorInfo, DetectorResult
+from CAMF.services.detector_framework.interface import FramePair
+from CAMF.services.detector_framework.main import DetectorManager
+from CAMF.services.detector_framework.result_cache import DiskCache, ResultCache
+from CAMF.services.storage import database
+from CAMF.services.storage.frame_fingerprint import fingerprint_frame, pair_fingerprint
+from CAMF.services.storage.main import StorageService
+
+
+def make_frame(seed: int, shape=(1080, 1920, 3)) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 255, shape, dtype=np.uint8)
+
+
+class TestFrameFingerprint:
+    """Test fingerprints of frame content."""
+
+    def test_identical_frames_match(self):
+        """Test equal pixels give equal fingerprints and different content does not."""
+        frame = make_frame(0)
+
+        assert fingerprint_frame(frame) == fingerprint_frame(frame.copy())
+        assert fingerprint_frame(frame) != fingerprint_frame(make_frame(1))
+        assert fingerprint_frame(None) is None
+
+    def test_rgb_copy_matches_stored_frame(self):
+        """Test a decoded RGB frame fingerprints like its stored BGR original."""
+        frame = make_frame(2, shape=(360, 640, 3))
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+        assert fingerprint_frame(rgb, rgb=True) == fingerprint_frame(frame)
+
+    def test_local_change_changes_fingerprint(self):
+        """Test a single changed pixel or a different shape changes the fingerprint."""
+        frame = np.full((1080, 1920, 3), 128, dtype=np.uint8)
+        moved = frame.copy()
+        moved[500, 900, 1] = 129
+
+        assert fingerprint_frame(frame) != fingerprint_frame(moved)
+        assert fingerprint_frame(frame) != fingerprint_frame(frame.reshape(1920, 1080, 3))
+
+    def test_pair_needs_both_frames(self):
+        """Test a pair without a fingerprint for either frame is not cacheable."""
+        assert pair_fingerprint("a" * 16, "b" * 16) == "a" * 16 + "b" * 16
+        assert pair_fingerprint("a" * 16, None) is None
+
+    def test_fingerprint_faster_than_pair_hash(self):
+        """Benchmark the fingerprint against MD5 of a full-resolution frame pair."""
+        current, reference = make_frame(3), make_frame(4)
+        pair = FramePair(current_frame=current, reference_frame=reference,
+                         current_frame_id=1, reference_frame_id=1, take_id=1, scene_id=1,
+                         angle_id=1, project_id=1)
+
+        start = time.perf_counter()
+        for _ in range(10):
+            pair_fingerprint(fingerprint_frame(current), fingerprint_frame(reference))
+        fingerprint_time = (time.perf_counter() - start) / 10
+
+        start = time.perf_counter()
+        for _ in range(10):
+            pair.get_hash()
+        md5_time = (time.perf_counter() - start) / 10
+
+        print(f"\n1080p pair: fingerprint {fingerprint_time * 1000:.2f} ms, MD5 {md5_time * 1000:.2f} ms")
+        assert fingerprint_time < md5_time
+
+
+class TestFingerprintStorage:
+    """Test fingerprints kept on frame rows."""
+
+    @pytest.fixture
+    def storage_service(self):
+        """Create a storage service bound to a temporary database with one take."""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+
+        engine = create_engine(f'sqlite:///{db_path}')
+        database.Base.metadata.create_all(engine)
+        saved = (database._engine, database._SessionLocal)
+        database._engine, database._SessionLocal = engine, None
+
+        session = database.get_session()
+        project = database.ProjectDB(name="Fingerprint Test")
+        scene = database.SceneDB(name="Scene 1", project=project)
+        angle = database.AngleDB(name="Angle 1", scene=scene)
+        take = database.TakeDB(name="Take 1", angle=angle)
+        session.add_all([project, scene, angle, take])
+        session.commit()
+        take_id = take.id
+        session.close()
+
+        service = StorageService.__new__(StorageService)
+        service.frame_storage = Mock()
+        service._touch_lock = threading.Lock()
+        service._project_touch_times = {}
+
+        yield service, take_id, engine
+
+        engine.dispose()
+        database._engine, database._SessionLocal = saved
+        os.unlink(db_path)
+
+    def test_records_carry_fingerprints(self, storage_service):
+        """Test inserted frame rows keep their fingerprint and listings return it."""
+        service, take_id, _ = storage_service
+        service.insert_frame_records([
+            {'take_id': take_id, 'frame_number': n, 'timestamp': n / 24.0,
+             'path': f"/frames/{n}.png", 'fingerprint': f"{n:016x}" if n % 2 else None}
+            for n in range(4)
+        ])
+
+        frames = service.get_frames_for_take(take_id)
+
+        assert [frame.fingerprint for frame in frames] == [None, f"{1:016x}", None, f"{3:016x}"]
+        assert service.get_frame_fingerprints(take_id) == {1: f"{1:016x}", 3: f"{3:016x}"}
+
+    def test_backfill_only_fills_missing(self, storage_service):
+        """Test backfilled fingerprints never overwrite stored ones."""
+        service, take_id, _ = storage_service
+        service.insert_frame_records([
+            {'take_id': take_id, 'frame_number': 0, 'timestamp': 0.0, 'path': "/0.png", 'fingerprint': "stored"},
+            {'take_id': take_id, 'frame_number': 1, 'timestamp': 0.1, 'path': "/1.png"}
+        ])
+
+        assert service.set_frame_fingerprints(take_id, {0: "new", 1: "new"}) == 1
+        assert service.get_frame_fingerprints(take_id) == {0: "stored", 1: "new"}
+
+    def test_existing_database_gains_column(self):
+        """Test init_db adds the fingerprint column to a frames table created without it."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            engine = create_engine(f"sqlite:///{temp_dir}/old.db")
+            with engine.begin() as connection:
+                connection.execute(text(
+                    "CREATE TABLE frames (id INTEGER PRIMARY KEY, take_id INTEGER NOT NULL, "
+                    "frame_number INTEGER NOT NULL, timestamp FLOAT NOT NULL, path VARCHAR(512) NOT NULL)"
+                ))
+
+            database._add_missing_columns(engine)
+
+            with engine.connect() as connection:
+                columns = {row[1] for row in connection.execute(text("PRAGMA table_info(frames)"))}
+            assert 'fingerprint' in columns
+            engine.dispose()
+
+
+class CountingProcess:
+    """Detector process reporting one error per frame and counting invocations."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def send_request(self, method, params, timeout=30):
+        if method != 'process_frame':
+            return {'success': True}
+        self.calls += 1
+        return {'success': True, 'data': [{
+            'confidence': 0.8, 'description': 'Cup moved',
+            'frame_id': params['frame_id'], 'detector_name': 'cups'
+        }]}
+
+
+class TestCachedDetection:
+    """Test detectors skipped for frame pairs seen before."""
+
+    @pytest.fixture
+    def cache(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield ResultCache(cache_dir=temp_dir)
+
+    @pytest.fixture
+    def manager(self):
+        manager = DetectorManager(
+            DetectorInfo(name='cups', description='', version='1.0', author='test'), CountingProcess()
+        )
+        assert manager.initialize({'threshold': 0.5})
+        return manager
+
+    def test_static_shot_runs_detector_once(self, manager, cache):
+        """Test identical consecutive frames reuse the first frame's results."""
+        frame_hash = pair_fingerprint(fingerprint_frame(make_frame(5, (90, 160, 3))),
+                                      fingerprint_frame(make_frame(6, (90, 160, 3))))
+
+        results = [
+            manager.process_frame(frame_id, 1, frame_hash=frame_hash, cache=cache, scene_context="scene_1_angle_1")
+            for frame_id in range(10)
+        ]
+
+        assert manager.process.calls == 1
+        assert [r[0].frame_id for r in results] == list(range(10))
+        overall = cache.get_stats()['overall']
+        assert overall['hits'] == 9
+        assert overall['hit_rate'] == pytest.approx(0.9)
+
+    def test_frames_without_errors_are_cached(self, manager, cache):
+        """Test an empty result is cached so clean frames are skipped too."""
+        manager.process.send_request = Mock(return_value={'success': True, 'data': []})
+
+        for frame_id in range(3):
+            assert manager.process_frame(frame_id, 1, frame_hash="f" * 32, cache=cache) == []
+
+        assert manager.process.send_request.call_count == 1
+
+    def test_config_change_misses(self, manager, cache):
+        """Test results cached under one detector config are not reused for another."""
+        manager.process_frame(0, 1, frame_hash="a" * 32, cache=cache)
+        manager.config = {'threshold': 0.9}
+        manager.process_frame(1, 1, frame_hash="a" * 32, cache=cache)
+
+        assert manager.process.calls == 2
+
+
+def make_results(frame_id: int, count: int = 1):
+    return [
+        DetectorResult(confidence=0.75, description=f"Error {n} in frame {frame_id}",
+                       frame_id=frame_id, detector_name='cups',
+                       bounding_boxes=[{'x': n, 'y': 0, 'width': 10, 'height': 10}])
+        for n in range(count)
+    ]
+
+
+class TestDiskCache:
+    """Test the disk tier of the result cache."""
+
+    @pytest.fixture
+    def cache_dir(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield temp_dir
+
+    def test_round_trip(self, cache_dir):
+        """Test stored results come back equal, including float confidences."""
+        cache = DiskCache(cache_dir)
+        results = make_results(1, count=2)
+        cache.put("frame_1", results)
+
+        assert cache.get("frame_1") == results
+        assert cache.get("frame_2") is None
+        stats = cache.get_stats()
+        assert (stats['hits'], stats['misses'], stats['writes']) == (1, 1, 1)
+
+    def test_persists_with_running_totals(self, cache_dir):
+        """Test entries and size totals survive reopening the cache."""
+        cache = DiskCache(cache_dir)
+        for frame_id in range(5):
+            cache.put(f"frame_{frame_id}", make_results(frame_id))
+        results = make_results(0, count=3)
+        cache.put("frame_0", results)
+        size_mb = cache.get_stats()['total_size_mb']
+        cache.close()
+
+        reopened = DiskCache(cache_dir)
+        stats = reopened.get_stats()
+        assert stats['entries'] == 5
+        assert stats['total_size_mb'] == pytest.approx(size_mb)
+        assert reopened.get("frame_0") == results
+
+    def test_evicts_least_recently_used(self, cache_dir):
+        """Test the entry limit evicts the entries read longest ago."""
+        cache = DiskCache(cache_dir, max_entries=3)
+        for frame_id in range(3):
+            cache.put(f"frame_{frame_id}", make_results(frame_id))
+        cache.get("frame_0")
+        cache.put("frame_3", make_results(3))
+
+        assert cache.get("frame_1") is None
+        assert cache.get("frame_0") is not None
+        assert cache.get_stats()['entries'] == 3
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_evicts_to_size_limit(self, cache_dir):
+        """Test exceeding the size limit evicts down to 90% of it."""
+        cache = DiskCache(cache_dir, max_size_mb=1)
+        for frame_id in range(20):
+            cache.put(f"frame_{frame_id}", make_results(frame_id, count=500))
+
+        stats = cache.get_stats()
+        assert stats['total_size_mb'] <= 1
+        assert 0 < stats['entries'] < 20
+        assert cache.get("frame_19") is not None
+
+    def test_expire_and_invalidate(self, cache_dir):
+        """Test TTL expiry, pattern invalidation and clearing."""
+        cache = DiskCache(cache_dir)
+        cache.put("cups_1", make_results(1))
+        time.sleep(0.05)
+        cache.put("cups_2", make_results(2))
+        cache.put("lights_2", make_results(2))
+
+        assert cache.expire(0.03) == 1
+        assert cache.invalidate_pattern("cups_") == 1
+        assert cache.get_stats()['entries'] == 1
+
+        cache.clear()
+        assert cache.get_stats()['entries'] == 0
+        assert cache.get_stats()['total_size_mb'] == 0
+
+    def test_legacy_layout_removed(self, cache_dir):
+        """Test pickle shards and the JSON index of the old layout are removed."""
+        (Path(cache_dir) / "ab").mkdir()
+        (Path(cache_dir) / "ab" / "abcdef.pkl").write_bytes(b"old")
+        (Path(cache_dir) / "cache_index.json").write_text("{}")
+
+        DiskCache(cache_dir)
+
+        assert sorted(p.name for p in Path(cache_dir).iterdir() if not p.name.startswith("results.db")) == []
+
+    def test_put_get_at_scale(self, cache_dir):
+        """Benchmark put and get with 10,000 stored entries."""
+        cache = DiskCache(cache_dir, max_entries=10000)
+        results = make_results(0)
+
+        start = time.perf_counter()
+        for n in range(10000):
+            cache.put(f"frame_{n}", results)
+        put_time = (time.perf_counter() - start) / 10000
+
+        start = time.perf_counter()
+        for n in range(0, 10000, 10):
+            assert cache.get(f"frame_{n}") is not None
+        get_time = (time.perf_counter() - start) / 1000
+
+        # At the limit every put also evicts
+        start = time.perf_counter()
+        for n in range(10000, 11000):
+            cache.put(f"frame_{n}", results)
+        evicting_put_time = (time.perf_counter() - start) / 1000
+
+        print(f"\nDisk cache at 10k entries: put {put_time * 1e6:.0f} us, "
+              f"get {get_time * 1e6:.0f} us, evicting put {evicting_put_time * 1e6:.0f} us")
+        assert cache.get_stats()['entries'] == 10000
+        assert evicting_put_time < 0.01
+
+
+class TestProcessingFingerprints:
+    """Test fingerprints filled in while take processing loads frame pairs."""
+
+    def test_frame_pair_load_fills_fingerprints(self):
+        """Test frames stored without a fingerprint get one from their decoded pixels."""
+        from types import SimpleNamespace
+        from CAMF.services.detector_framework.main import DetectorFrameworkService
+
+        frames = {1: make_frame(7, (36, 64, 3)), 2: make_frame(8, (36, 64, 3))}
+        service = DetectorFrameworkService.__new__(DetectorFrameworkService)
+        service.storage = Mock()
+        service.storage.get_frame_array.side_effect = lambda take_id, frame_id: frames[take_id]
+        service.storage.get_reference_take_frame.side_effect = lambda take_id, frame_id: frames[take_id]
+        service.current_processing_take_id = 1
+        service.reference_take_id = 2
+        current = SimpleNamespace(id=0, take_id=1, frame_number=0, fingerprint=None)
+        reference = SimpleNamespace(id=0, take_id=2, frame_number=0, fingerprint=None)
+
+        pair = service._load_frame_pair({0: reference}, None, current)
+
+        # The pair is what a detector container is sent
+        assert pair[0] is frames[1] and pair[1] is frames[2]
+        assert pair[2] == {'reference_take_id': 2}
+        assert current.fingerprint == fingerprint_frame(frames[1])
+        assert reference.fingerprint == fingerprint_frame(frames[2])
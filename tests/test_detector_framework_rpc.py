@@ -0,0 +1,273 @@
+"""
+Tests for the request/response layer to detector containers.
+Tests reply correlation, deadlines, the in-flight limit, and pipelined frames
+through DetectorManager and the communication loop.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from CAMF.common.config import get_config
+from CAMF.common.models import DetectorInfo
+from CAMF.services.detector_framework import docker_manager
+from CAMF.services.detector_framework.detector_rpc import DetectorRequestClient, normalize_results
+from CAMF.services.detector_framework.detector_transport import SocketListener
+from CAMF.services.detector_framework.detector_workers import DetectorWorkerPool
+from CAMF.services.detector_framework.docker_detector_base import DockerDetector
+from CAMF.services.detector_framework.main import DetectorManager
+
+
+class RecordingTimeout:
+    """Timeout policy recording the round trips it is told about."""
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self.updates: List[float] = []
+
+    def get_timeout(self):
+        return self.timeout
+
+    def update(self, actual_time):
+        self.updates.append(actual_time)
+
+
+class TestDetectorRequestClient:
+    """Test request correlation without a container."""
+
+    @pytest.fixture
+    def sent(self):
+        return []
+
+    @pytest.fixture
+    def client(self, sent):
+        return DetectorRequestClient(sent.append, max_in_flight=3, timeout_policy=RecordingTimeout())
+
+    def test_replies_resolve_their_own_requests(self, client, sent):
+        """Test out-of-order replies reach the futures they belong to."""
+        futures = [client.submit({'frame': n}) for n in range(3)]
+
+        for message in reversed(sent):
+            assert client.handle_reply({'id': message['id'], 'frame': message['frame']})
+
+        assert [future.result(timeout=1)['frame'] for future in futures] == [0, 1, 2]
+        assert len(client.timeout_policy.updates) == 3
+        assert client.get_stats()['completed'] == 3
+        assert client.in_flight == 0
+
+    def test_deadline_fails_request_and_frees_slot(self, client, sent):
+        """Test an overdue request times out and its late reply is ignored."""
+        future = client.submit({'frame': 1}, timeout=0.01)
+        time.sleep(0.02)
+
+        assert client.expire_overdue() == 1
+        with pytest.raises(TimeoutError):
+            future.result(timeout=1)
+        assert not client.handle_reply({'id': sent[0]['id']})
+
+        stats = client.get_stats()
+        assert stats['timed_out'] == 1
+        assert stats['late_replies'] == 1
+        assert stats['in_flight'] == 0
+
+    def test_in_flight_limit(self, client, sent):
+        """Test submitting beyond the limit waits for a reply."""
+        for n in range(3):
+            client.submit({'frame': n})
+        assert client.submit({'frame': 3}, timeout=0.05).exception(timeout=1) is not None
+        assert len(sent) == 3
+
+        threading.Timer(0.05, client.handle_reply, args=({'id': sent[0]['id']},)).start()
+        future = client.submit({'frame': 4}, timeout=2)
+
+        assert not future.done()
+        assert sent[-1]['frame'] == 4
+        assert client.get_stats()['peak_in_flight'] == 3
+
+    def test_close_fails_outstanding_requests(self, client):
+        """Test closing the connection fails pending and new requests."""
+        future = client.submit({'frame': 1})
+        client.close()
+
+        with pytest.raises(ConnectionError):
+            future.result(timeout=1)
+        with pytest.raises(ConnectionError):
+            client.submit({'frame': 2}).result(timeout=1)
+
+    def test_container_results_normalized(self):
+        """Test container result fields map to the DetectorResult fields."""
+        results = normalize_results([{
+            'error_type': 'moved', 'confidence': 0.8, 'description': 'Cup moved',
+            'location': {'x': 1, 'y': 2, 'w': 3, 'h': 4}, 'details': {'delta': 5}
+        }], frame_id=9, detector_name='cups')
+
+        assert results[0]['frame_id'] == 9
+        assert results[0]['detector_name'] == 'cups'
+        assert results[0]['bounding_boxes'] == [{'x': 1, 'y': 2, 'width': 3, 'height': 4}]
+        assert results[0]['metadata'] == {'delta': 5}
+
+
+class SlowEchoDetector(DockerDetector):
+    """Detector taking a fixed time per frame and reporting which frame it saw."""
+
+    delay = 0.002
+
+    def initialize(self):
+        pass
+
+    def process_frame_pair(self, current_frame, reference_frame, metadata) -> List[Dict[str, Any]]:
+        time.sleep(self.delay)
+        return [{
+            'error_type': 'echo',
+            'confidence': 0.7,
+            'description': f"frame {metadata['frame_id']}",
+            'location': {'x': 0, 'y': 0, 'w': 1, 'h': 1},
+            'details': {'pixel': int(current_frame[0, 0, 0])}
+        }]
+
+
+class TestDockerDetectorRequests:
+    """Test frames sent to a detector through DetectorManager and the communication loop."""
+
+    @pytest.fixture
+    def make_link(self, monkeypatch):
+        """Start a communication loop allowing ``max_in_flight`` requests and a detector on its socket."""
+        started = []
+
+        def make(max_in_flight: int):
+            monkeypatch.setattr(get_config().detector, 'max_in_flight', max_in_flight)
+            temp_dir = tempfile.TemporaryDirectory()
+            comm_dir = Path(temp_dir.name)
+            (comm_dir / "input").mkdir()
+            (comm_dir / "output").mkdir()
+
+            manager = docker_manager.SecureDockerManager.__new__(docker_manager.SecureDockerManager)
+            manager.docker_available = True
+            manager.docker_client = MagicMock()
+            manager.docker_client.containers.get.return_value.status = "running"
+            manager.detectors = {
+                'echo': docker_manager.DockerDetector(
+                    name='echo',
+                    config=docker_manager.DockerDetectorConfig(name='echo', image_tag='echo'),
+                    status="running"
+                )
+            }
+
+            stop_event = threading.Event()
+            loop = threading.Thread(
+                target=manager._communication_loop,
+                args=('echo', comm_dir, stop_event, SocketListener.open(comm_dir)),
+                daemon=True
+            )
+            loop.start()
+
+            with patch.object(sys, 'argv', ['detector.py']):
+                detector = SlowEchoDetector({'name': 'echo'})
+            detector.input_dir = comm_dir / "input"
+            detector.output_dir = comm_dir / "output"
+            threading.Thread(target=detector.run, daemon=True).start()
+
+            deadline = time.monotonic() + 5
+            while manager.detectors['echo'].transport != "socket" and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert manager.detectors['echo'].transport == "socket"
+
+            started.append((stop_event, loop, temp_dir))
+            return manager
+
+        yield make
+
+        for stop_event, loop, temp_dir in started:
+            # Closing the socket ends the detector's loop
+            stop_event.set()
+            loop.join(timeout=5)
+            temp_dir.cleanup()
+
+    @staticmethod
+    def load_frames(take_id, frame_id):
+        frame = np.full((72, 128, 3), frame_id % 256, dtype=np.uint8)
+        return frame, frame, {}
+
+    def make_detector_manager(self, manager):
+        process = manager.get_detector_process('echo', frame_loader=self.load_frames)
+        detector_manager = DetectorManager(
+            DetectorInfo(name='echo', description='', version='1.0', author='test'), process
+        )
+        assert detector_manager.initialize({})
+        return detector_manager
+
+    def run_frames(self, detector_manager, frame_ids):
+        results = {}
+        pool = DetectorWorkerPool(
+            {'echo': lambda frame_id: results.setdefault(frame_id, detector_manager.process_frame(frame_id, 1, timeout=10))},
+            concurrency={'echo': detector_manager.max_in_flight}
+        )
+        pool.start()
+        start = time.perf_counter()
+        for frame_id in frame_ids:
+            pool.submit(frame_id)
+        pool.close()
+        assert pool.join(timeout=60)
+        return results, time.perf_counter() - start
+
+    def test_results_match_frames(self, make_link):
+        """Test pipelined frames come back as results for the right frames."""
+        manager = make_link(4)
+        detector_manager = self.make_detector_manager(manager)
+        assert detector_manager.max_in_flight == 4
+        results, _ = self.run_frames(detector_manager, range(24))
+
+        for frame_id, frame_results in results.items():
+            assert len(frame_results) == 1
+            assert frame_results[0].frame_id == frame_id
+            assert frame_results[0].description == f"frame {frame_id}"
+            assert frame_results[0].metadata == {'pixel': frame_id}
+            assert frame_results[0].bounding_boxes == [{'x': 0, 'y': 0, 'width': 1, 'height': 1}]
+        assert len(results) == 24
+        assert manager.detectors['echo'].request_client.get_stats()['peak_in_flight'] > 1
+        assert not detector_manager.status.running
+
+    def test_missing_frames_reported_as_failure(self, make_link):
+        """Test a frame the host cannot load becomes a detector failure result."""
+        detector_manager = self.make_detector_manager(make_link(1))
+        detector_manager.process.frame_loader = lambda take_id, frame_id: None
+
+        results = detector_manager.process_frame(3, 1, timeout=5)
+
+        assert results[0].confidence == -1.0
+        assert "not available" in results[0].description
+
+    def test_prefetched_frames_sent_without_loading(self, make_link):
+        """Test a pair passed with the request is sent as is instead of being loaded again."""
+        detector_manager = self.make_detector_manager(make_link(1))
+        loaded = []
+        detector_manager.process.frame_loader = lambda take_id, frame_id: loaded.append(frame_id)
+
+        results = detector_manager.process_frame(3, 1, timeout=5, frames=self.load_frames(1, 42))
+
+        assert loaded == []
+        assert results[0].frame_id == 3
+        assert results[0].metadata == {'pixel': 42}
+
+    def test_pipelining_raises_throughput(self, make_link):
+        """Benchmark one request in flight against four."""
+        frame_ids = range(200)
+        report = {}
+        for max_in_flight in (1, 4):
+            detector_manager = self.make_detector_manager(make_link(max_in_flight))
+            results, elapsed = self.run_frames(detector_manager, frame_ids)
+            assert len(results) == len(frame_ids)
+            report[max_in_flight] = len(frame_ids) / elapsed
+
+        print("\nDocker detector requests (2 ms per frame in the detector):")
+        for max_in_flight, throughput in report.items():
+            print(f"  {max_in_flight} in flight: {throughput:7.1f} frames/s")
+
+        assert report[4] > report[1]
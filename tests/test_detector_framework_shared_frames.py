@@ -0,0 +1,141 @@
+"""
+Tests for shared-memory frame transport to local detector processes.
+Tests slot reference counting, stale releases, full rings, zero-copy views and the process manager.
+"""
+
+import tempfile
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from CAMF.services.detector_framework.local_process_manager import LocalProcessManager
+from CAMF.services.detector_framework.shared_frames import SharedFrameReader, SharedFrameRing
+
+
+def frame_pair(value: int, shape=(48, 64, 3)):
+    return np.full(shape, value, dtype=np.uint8), np.full(shape, value + 1, dtype=np.uint8)
+
+
+class TestSharedFrameRing:
+    """Test the parent-side ring of frame slots."""
+
+    @pytest.fixture
+    def ring(self):
+        ring = SharedFrameRing.for_frames(*frame_pair(0), slot_count=2)
+        yield ring
+        ring.close()
+
+    def test_slot_freed_after_all_subscribers_release(self, ring):
+        """Test a slot returns to the ring only when every detector released it."""
+        ref = ring.write_pair(*frame_pair(1), subscribers=2)
+
+        assert ring.release(ref.slot, ref.generation)
+        assert ring.get_stats()['free_slots'] == 1
+        assert ring.release(ref.slot, ref.generation)
+        assert ring.get_stats()['free_slots'] == 2
+        # Duplicate release is ignored
+        assert not ring.release(ref.slot, ref.generation)
+
+    def test_stale_release_cannot_free_reused_slot(self, ring):
+        """Test a release for an old generation leaves the reused slot alone."""
+        first = ring.write_pair(*frame_pair(1), subscribers=1)
+        ring.release(first.slot, first.generation)
+        ring.write_pair(*frame_pair(2), subscribers=1)
+        second = ring.write_pair(*frame_pair(3), subscribers=1)
+        assert second.slot == first.slot
+
+        assert not ring.release(first.slot, first.generation)
+        assert ring.get_stats()['free_slots'] == 0
+
+    def test_full_ring_waits_for_release(self, ring):
+        """Test writers time out on a full ring and resume once a slot is released."""
+        held = [ring.write_pair(*frame_pair(n), subscribers=1) for n in range(2)]
+        assert ring.write_pair(*frame_pair(5), subscribers=1, timeout=0.05) is None
+
+        threading.Timer(0.05, ring.release, args=(held[0].slot, held[0].generation)).start()
+        ref = ring.write_pair(*frame_pair(6), subscribers=1, timeout=2)
+
+        assert ref is not None and ref.slot == held[0].slot
+        assert ring.get_stats()['full_waits'] == 2
+
+    def test_reader_views_are_zero_copy_and_read_only(self, ring):
+        """Test readers see the written pixels through read-only views."""
+        current, reference = frame_pair(40)
+        ref = ring.write_pair(current, reference, subscribers=1)
+        reader = SharedFrameReader()
+
+        view_current, view_reference = reader.views(ref)
+        assert np.array_equal(view_current, current)
+        assert np.array_equal(view_reference, reference)
+        assert not view_current.flags.writeable and not view_current.flags.owndata
+        with pytest.raises(ValueError):
+            view_current[0, 0, 0] = 1
+
+        del view_current, view_reference
+        reader.close()
+
+    def test_oversized_pair_is_rejected(self, ring):
+        """Test a pair larger than a slot is not written."""
+        assert ring.write_pair(*frame_pair(1, shape=(480, 640, 3)), subscribers=1) is None
+        assert ring.get_stats()['rejected'] == 1
+
+
+class TestLocalProcessManagerFrames:
+    """Test frame pairs reaching detector processes through shared memory."""
+
+    DETECTOR = textwrap.dedent('''
+        def process_frame_pair(frame_pair):
+            return [{
+                'frame_id': frame_pair.current_frame_id,
+                'current': int(frame_pair.current_frame[0, 0, 0]),
+                'reference': int(frame_pair.reference_frame[0, 0, 0]),
+                'writeable': frame_pair.current_frame.flags.writeable
+            }]
+    ''')
+
+    @pytest.fixture
+    def manager(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            detectors_dir = Path(temp_dir) / "detectors"
+            for name in ("clock", "difference"):
+                (detectors_dir / name).mkdir(parents=True)
+                (detectors_dir / name / "detector.py").write_text(self.DETECTOR)
+
+            manager = LocalProcessManager(detectors_dir, Path(temp_dir) / "workspaces", frame_slots=4)
+            assert manager.start_detector("clock")
+            assert manager.start_detector("difference")
+            yield manager
+            manager.stop_all_detectors()
+
+    def collect(self, manager, name, count, timeout=20):
+        results = []
+        deadline = time.monotonic() + timeout
+        while len(results) < count and time.monotonic() < deadline:
+            for message in manager.get_results(name, timeout=0.1):
+                results.extend(message['results'])
+        return results
+
+    def test_pairs_shared_with_every_detector(self, manager):
+        """Test each pair is written once, read by all detectors and its slot recycled."""
+        for frame_id in range(10):
+            sent = manager.submit_frame_pair(*frame_pair(frame_id * 10), {'frame_id': frame_id, 'take_id': 1})
+            assert sent == {'clock': True, 'difference': True}
+
+        for name in ("clock", "difference"):
+            results = self.collect(manager, name, 10)
+            assert [(r['frame_id'], r['current'], r['reference']) for r in results] == [
+                (n, n * 10, n * 10 + 1) for n in range(10)
+            ]
+            assert not any(r['writeable'] for r in results)
+
+        deadline = time.monotonic() + 5
+        while manager.get_frame_transport_stats()['ring']['free_slots'] < 4 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        stats = manager.get_frame_transport_stats()
+        assert stats['ring']['writes'] == 10
+        assert stats['ring']['free_slots'] == 4
+        assert stats['held_slots'] == {'clock': 0, 'difference': 0}
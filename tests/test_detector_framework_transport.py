@@ -0,0 +1,256 @@
+"""
+Tests for the Docker detector transports.
+Tests the binary frame protocol, socket and file exchange through the communication loop,
+and benchmarks socket against file transport latency and throughput.
+"""
+
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from CAMF.services.detector_framework import docker_manager
+from CAMF.services.detector_framework.detector_transport import FileTransport, SocketListener, SocketTransport
+from CAMF.services.detector_framework.docker_detector_base import DockerDetector
+from CAMF.services.detector_framework.frame_protocol import (
+    MAGIC, MAX_BODY_BYTES, PREFIX, ProtocolError, encode_message, recv_message, send_message
+)
+
+
+class TestFrameProtocol:
+    """Test binary message framing."""
+
+    def test_arrays_round_trip_raw(self):
+        """Test arrays and fields survive a round trip without image encoding."""
+        left, right = socket.socketpair()
+        frame = np.random.randint(0, 255, (72, 128, 3), dtype=np.uint8)
+        depth = np.random.rand(8, 8).astype(np.float32)
+        strided = frame[:, ::2]
+
+        send_message(left, {'id': 'a', 'metadata': {'frame_id': np.int64(7)},
+                            'current_frame': frame, 'depth': depth, 'strided': strided})
+        message = recv_message(right)
+
+        assert message['id'] == 'a'
+        assert message['metadata'] == {'frame_id': 7}
+        assert np.array_equal(message['current_frame'], frame)
+        assert np.array_equal(message['depth'], depth)
+        assert np.array_equal(message['strided'], strided)
+        left.close()
+        assert recv_message(right) is None
+        right.close()
+
+    def test_array_buffers_are_not_copied(self):
+        """Test encoded array buffers are views of the frame memory."""
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        buffers = encode_message({'frame': frame})
+
+        assert len(buffers) == 2
+        frame[0, 0, 0] = 9
+        assert bytes(buffers[1])[0] == 9
+
+    def test_rejects_garbage(self):
+        """Test data without the message prefix is refused."""
+        left, right = socket.socketpair()
+        left.sendall(b"GET / HTTP/1.1\r\n\r\n....")
+        with pytest.raises(ProtocolError):
+            recv_message(right)
+        left.close()
+        right.close()
+
+    def test_rejects_oversized_body(self):
+        """Test a body length beyond the largest frame pair is refused before anything is allocated."""
+        left, right = socket.socketpair()
+        left.sendall(PREFIX.pack(MAGIC, 2, 2 ** 62) + b"{}")
+        with pytest.raises(ProtocolError, match="too large"):
+            recv_message(right)
+        with pytest.raises(ProtocolError):
+            encode_message({'frame': np.zeros(MAX_BODY_BYTES + 1, dtype=np.uint8)})
+        left.close()
+        right.close()
+
+    def test_rejects_malformed_arrays(self):
+        """Test array descriptions that do not fit the body are refused."""
+        left, right = socket.socketpair()
+        header = b'{"__arrays__": {"frame": {"shape": [100], "dtype": "|u1", "offset": 0, "nbytes": 100}}}'
+        left.sendall(PREFIX.pack(MAGIC, len(header), 4) + header + b"abcd")
+        with pytest.raises(ProtocolError, match="Malformed"):
+            recv_message(right)
+        left.close()
+        right.close()
+
+    def test_reader_closes_on_invalid_message(self):
+        """Test the host stops reading and closes a socket that sent an oversized prefix."""
+        left, right = socket.socketpair()
+        received = []
+        transport = SocketTransport(right, received.append)
+        send_message(left, {'id': 'ok'})
+        left.sendall(PREFIX.pack(MAGIC, 2, 2 ** 62) + b"{}")
+
+        transport._reader.join(timeout=2)
+
+        assert not transport._reader.is_alive()
+        assert not transport.connected
+        assert [m['id'] for m in received] == ['ok']
+        assert right.fileno() == -1
+        left.close()
+
+
+class TestFileTransport:
+    """Test the JSON file exchange."""
+
+    def test_partial_reply_retried(self, tmp_path):
+        """Test a reply that does not parse yet is kept and read on the next poll."""
+        (tmp_path / "input").mkdir()
+        (tmp_path / "output").mkdir()
+        transport = FileTransport(tmp_path)
+        reply = tmp_path / "output" / "1.json"
+        reply.write_text('{"id": "1", "resu')
+
+        assert transport.receive() == []
+        assert reply.exists()
+
+        reply.write_text('{"id": "1", "results": []}')
+        assert transport.receive() == [{'id': '1', 'results': []}]
+        assert not reply.exists()
+
+
+class EchoDetector(DockerDetector):
+    """Detector reporting the frames it received."""
+
+    def initialize(self):
+        pass
+
+    def process_frame_pair(self, current_frame, reference_frame, metadata) -> List[Dict[str, Any]]:
+        return [{
+            'frame_id': metadata.get('frame_id'),
+            'shape': list(current_frame.shape),
+            'checksum': int(current_frame[::16, ::16].sum()) + int(reference_frame[::16, ::16].sum())
+        }]
+
+
+class TestDockerTransports:
+    """Test detectors exchanging frames with the manager's communication loop."""
+
+    @pytest.fixture
+    def make_link(self):
+        """Start a communication loop and an in-process detector sharing a comm directory."""
+        started = []
+
+        def make(use_socket: bool):
+            temp_dir = tempfile.TemporaryDirectory()
+            comm_dir = Path(temp_dir.name)
+            (comm_dir / "input").mkdir()
+            (comm_dir / "output").mkdir()
+
+            manager = docker_manager.SecureDockerManager.__new__(docker_manager.SecureDockerManager)
+            manager.docker_available = True
+            manager.docker_client = MagicMock()
+            manager.docker_client.containers.get.return_value.status = "running"
+            manager.detectors = {
+                'echo': docker_manager.DockerDetector(
+                    name='echo',
+                    config=docker_manager.DockerDetectorConfig(name='echo', image_tag='echo'),
+                    status="running"
+                )
+            }
+
+            listener = SocketListener.open(comm_dir) if use_socket else None
+            stop_event = threading.Event()
+            loop = threading.Thread(
+                target=manager._communication_loop,
+                args=('echo', comm_dir, stop_event, listener),
+                daemon=True
+            )
+            loop.start()
+
+            with patch.object(sys, 'argv', ['detector.py']):
+                detector = EchoDetector({'name': 'echo'})
+            detector.input_dir = comm_dir / "input"
+            detector.output_dir = comm_dir / "output"
+            runner = threading.Thread(target=detector.run, daemon=True)
+            runner.start()
+
+            deadline = time.monotonic() + 5
+            while not hasattr(manager.detectors['echo'], 'output_queue') and time.monotonic() < deadline:
+                time.sleep(0.01)
+            if use_socket:
+                while manager.detectors['echo'].transport != "socket" and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            else:
+                # Let the detector give up on the socket and start polling
+                time.sleep(1.2)
+
+            started.append((stop_event, loop, temp_dir, comm_dir))
+            return manager
+
+        yield make
+
+        for stop_event, loop, temp_dir, comm_dir in started:
+            # Shut the detector down over whichever transport it uses
+            stop_event.set()
+            loop.join(timeout=5)
+            (comm_dir / "input" / "zz_shutdown.json").write_text('{"type": "shutdown"}')
+            time.sleep(0.2)
+            temp_dir.cleanup()
+
+    def round_trip(self, manager, frames, pipelined: bool):
+        """Send frame pairs and collect results, returning per-pair latencies and total time."""
+        latencies = []
+        results = []
+        start = time.perf_counter()
+        if pipelined:
+            for frame_id, frame in enumerate(frames):
+                assert manager.process_frame_pair('echo', frame, frame, {'frame_id': frame_id})
+            while len(results) < len(frames) and time.perf_counter() - start < 60:
+                results.extend(manager.get_results('echo', timeout=0.5))
+        else:
+            for frame_id, frame in enumerate(frames):
+                sent = time.perf_counter()
+                assert manager.process_frame_pair('echo', frame, frame, {'frame_id': frame_id})
+                reply = []
+                while not reply and time.perf_counter() - sent < 30:
+                    reply = manager.get_results('echo', timeout=0.5)
+                latencies.append(time.perf_counter() - sent)
+                results.extend(reply)
+        return results, latencies, time.perf_counter() - start
+
+    @pytest.mark.parametrize("use_socket", [True, False], ids=["socket", "file"])
+    def test_frames_reach_detector(self, make_link, use_socket):
+        """Test both transports deliver frame pairs and results intact."""
+        manager = make_link(use_socket)
+        frame = np.random.randint(0, 255, (64, 96, 3), dtype=np.uint8)
+        expected = 2 * int(frame[::16, ::16].sum())
+
+        results, _, _ = self.round_trip(manager, [frame] * 3, pipelined=True)
+
+        assert [r['results'][0]['frame_id'] for r in results] == [0, 1, 2]
+        assert all(r['results'][0]['checksum'] == expected for r in results)
+        assert manager.detectors['echo'].transport == ("socket" if use_socket else "file")
+
+    def test_socket_beats_file_transport(self, make_link):
+        """Benchmark 720p pair latency and throughput over both transports."""
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(8)]
+        report = {}
+
+        for name, use_socket in (("socket", True), ("file", False)):
+            manager = make_link(use_socket)
+            _, latencies, _ = self.round_trip(manager, frames, pipelined=False)
+            results, _, elapsed = self.round_trip(manager, frames, pipelined=True)
+            assert len(results) == len(frames)
+            report[name] = (float(np.median(latencies)), len(frames) / elapsed)
+
+        print("\n720p frame pair round trip:")
+        for name, (latency, throughput) in report.items():
+            print(f"  {name:6s} median latency {latency * 1000:8.2f} ms, throughput {throughput:7.1f} pairs/s")
+
+        assert report["socket"][0] * 5 < report["file"][0]
+        assert report["socket"][1] > report["file"][1] * 2
@@ -0,0 +1,118 @@
+"""
+Tests for the per-detector worker pool.
+Tests independent detector pacing, lag-based skipping, failures and stopping.
+"""
+
+import threading
+import time
+
+from CAMF.services.detector_framework.detector_workers import DetectorWorker, DetectorWorkerPool
+
+
+class TestDetectorWorkerPool:
+    """Test detectors consuming frames on their own workers."""
+
+    def test_fast_detector_does_not_wait_for_slow(self):
+        """Test a fast detector finishes every frame while a slow one is blocked."""
+        release = threading.Event()
+        fast_frames = []
+        slow_frames = []
+
+        def slow(frame):
+            release.wait(5)
+            slow_frames.append(frame)
+
+        pool = DetectorWorkerPool({'clock': fast_frames.append, 'difference': slow}, queue_size=20)
+        pool.start()
+        for frame in range(10):
+            pool.submit(frame)
+
+        deadline = time.monotonic() + 5
+        while len(fast_frames) < 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert fast_frames == list(range(10))
+        assert slow_frames == []
+        assert pool.get_stats()['difference']['lag'] == 10
+        assert pool.completed_frames() == 0
+
+        release.set()
+        pool.close()
+        assert pool.join(timeout=5)
+        assert slow_frames == list(range(10))
+        assert pool.completed_frames() == 10
+
+    def test_lagging_detector_skips_oldest_frames(self):
+        """Test frames beyond the lag limit are skipped for that detector only."""
+        release = threading.Event()
+        started = threading.Event()
+        seen = []
+
+        def slow(frame):
+            started.set()
+            release.wait(5)
+            seen.append(frame)
+
+        worker = DetectorWorker('difference', slow, queue_size=32, max_lag=3)
+        worker.start()
+        worker.submit(0)
+        assert started.wait(5)
+        for frame in range(1, 10):
+            worker.submit(frame)
+
+        stats = worker.get_stats()
+        assert stats['lag'] == 3
+        assert stats['skipped'] == 7
+        assert stats['peak_lag'] == 3
+
+        release.set()
+        worker.close()
+        assert worker.join(timeout=5)
+        # The frame in flight and the newest queued frames are kept
+        assert seen == [0, 8, 9]
+        assert worker.get_stats()['lag'] == 0
+
+    def test_failures_are_counted(self):
+        """Test a raising handler counts as failed and the worker keeps going."""
+        def flaky(frame):
+            if frame % 2:
+                raise RuntimeError("detector crashed")
+
+        worker = DetectorWorker('flaky', flaky)
+        worker.start()
+        for frame in range(6):
+            worker.submit(frame)
+        worker.close()
+        assert worker.join(timeout=5)
+
+        stats = worker.get_stats()
+        assert (stats['processed'], stats['failed']) == (3, 3)
+        assert stats['lag'] == 0
+
+    def test_stop_unblocks_full_queue(self):
+        """Test stopping releases a submitter blocked on a full queue."""
+        release = threading.Event()
+        worker = DetectorWorker('hung', lambda frame: release.wait(5), queue_size=1)
+        worker.start()
+
+        submitted = []
+
+        def feed():
+            for frame in range(5):
+                submitted.append(worker.submit(frame))
+
+        feeder = threading.Thread(target=feed)
+        feeder.start()
+        time.sleep(0.3)
+        assert feeder.is_alive()
+
+        worker.stop()
+        feeder.join(timeout=2)
+        assert not feeder.is_alive()
+        assert False in submitted
+
+        release.set()
+        assert worker.join(timeout=5)
+        stats = worker.get_stats()
+        assert stats['cancelled'] > 0
+        assert stats['lag'] == 0
@@ -189,6 +189,52 @@ class TestIntelligentFrameQueue:
         stats = self.queue.get_stats()
         assert stats['drop_rate'] <= 0.6  # Should not drop more than 60%
     
+    def test_drop_takes_least_important_frame(self):
+        """Test a full queue drops the middle-most frame, never a first/last frame."""
+        queue = IntelligentFrameQueue(maxsize=4, high_water_mark=1.0)
+        for frame_id in (0, 99, 20, 50):
+            queue.put(self.create_frame_pair(frame_id), take_frame_count=100)
+        
+        # Frame 45 is closer to a boundary than 50, so 50 goes
+        assert queue.put(self.create_frame_pair(45), take_frame_count=100) is True
+        # Frame 45 is then the middle-most; frames 0 and 99 are protected
+        assert queue.put(self.create_frame_pair(5), take_frame_count=100) is True
+        
+        remaining = [queue.get(timeout=0.1).current_frame_id for _ in range(queue.qsize())]
+        assert remaining == [0, 5, 99, 20]
+        assert queue.frames_dropped == 2
+    
+    def test_drop_skips_frames_already_taken(self):
+        """Test frames taken by get are never counted or dropped again."""
+        queue = IntelligentFrameQueue(maxsize=3, high_water_mark=1.0)
+        for frame_id in (50, 40, 30):
+            queue.put(self.create_frame_pair(frame_id), take_frame_count=100)
+        assert queue.get(timeout=0.1).current_frame_id == 30
+        assert queue.get(timeout=0.1).current_frame_id == 40
+        
+        for frame_id in (20, 25, 15):
+            queue.put(self.create_frame_pair(frame_id), take_frame_count=100)
+        
+        assert queue.qsize() == 3
+        remaining = [queue.get(timeout=0.1).current_frame_id for _ in range(3)]
+        assert remaining == [15, 20, 25]
+    
+    def test_sustained_overload_keeps_boundaries(self):
+        """Test 10k frames through a small queue keep first/last frames and bounded storage."""
+        queue = IntelligentFrameQueue(maxsize=50)
+        consumed = []
+        for frame_id in range(10000):
+            queue.put(self.create_frame_pair(frame_id), take_frame_count=10000)
+            assert len(queue._queue) + len(queue._droppable) <= 4 * queue.maxsize + 34
+            if frame_id % 10 == 0:
+                consumed.append(queue.get(timeout=0.1).current_frame_id)
+        while not queue.empty():
+            consumed.append(queue.get(timeout=0.1).current_frame_id)
+        
+        assert 0 in consumed
+        assert 9999 in consumed
+        assert len(set(consumed)) == len(consumed)
+    
     def test_queue_statistics(self):
         """Test queue statistics reporting."""
         # Add some frames
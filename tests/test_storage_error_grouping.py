@@ -0,0 +1,141 @@
+"""
+Tests for incremental continuous error grouping.
+Tests equivalence with batch grouping, out-of-order results, updates and cache rebuilds.
+"""
+
+import random
+
+from CAMF.services.storage.detector_grouping import DetectorResultGrouping, TakeErrorGroups
+from CAMF.services.storage.error_cache import ContinuousErrorCache
+
+
+def make_results(count: int, seed: int = 7):
+    """Create results of a few detectors drifting across frames."""
+    rng = random.Random(seed)
+    results = []
+    for result_id in range(1, count + 1):
+        frame_id = result_id // 3 + rng.randint(0, 2)
+        results.append({
+            'id': result_id,
+            'frame_id': frame_id,
+            'detector_name': rng.choice(['clock', 'props']),
+            'description': rng.choice(['moved', 'missing']),
+            'confidence': rng.random(),
+            'bounding_boxes': [{'x': rng.choice([10, 400]), 'y': 20, 'width': 50, 'height': 50}],
+            'is_false_positive': False,
+            'metadata': {}
+        })
+    return results
+
+
+def canonical(summary):
+    """Describe a summary without its random group IDs."""
+    return [
+        (
+            group['detector_name'], group['description'], group['first_frame_id'],
+            group['last_frame_id'], group['frame_count'], group['is_false_positive'],
+            [(inst['id'], inst['is_continuous_start'], inst['is_continuous_end']) for inst in group['instances']]
+        )
+        for group in summary
+    ]
+
+
+def batch_summary(results):
+    grouped = DetectorResultGrouping.group_detector_results([dict(r) for r in results])
+    return DetectorResultGrouping.get_continuous_error_summary(grouped)
+
+
+class TestTakeErrorGroups:
+    """Test incremental grouping against the batch algorithm."""
+
+    def test_in_order_matches_batch(self):
+        """Test results folded in frame order give the batch summary without regrouping."""
+        results = sorted(make_results(300), key=lambda r: (r['frame_id'], r['id']))
+        groups = TakeErrorGroups()
+        for result in results:
+            groups.add_result(result)
+
+        assert canonical(groups.get_summary()) == canonical(batch_summary(results))
+        assert groups.regroups == 0
+
+    def test_out_of_order_matches_batch(self):
+        """Test late results regroup only their detector and still match."""
+        results = make_results(300)
+        groups = TakeErrorGroups()
+        for result in results:
+            groups.add_result(result)
+            if result['id'] % 50 == 0:
+                groups.get_summary()
+
+        assert canonical(groups.get_summary()) == canonical(batch_summary(results))
+        assert groups.regroups > 0
+
+    def test_summary_is_reused_until_changed(self):
+        """Test an unchanged take returns the same summary object."""
+        groups = TakeErrorGroups()
+        for result in sorted(make_results(60), key=lambda r: (r['frame_id'], r['id'])):
+            groups.add_result(result)
+
+        first = groups.get_summary()
+        assert groups.get_summary() is first
+
+        groups.add_result({**make_results(1)[0], 'id': 1000, 'frame_id': 500})
+        assert groups.get_summary() is not first
+
+    def test_updates_and_false_positives(self):
+        """Test updated results and false positive flags reach the summary."""
+        results = sorted(make_results(60), key=lambda r: (r['frame_id'], r['id']))
+        groups = TakeErrorGroups()
+        for result in results:
+            groups.add_result(result)
+        groups.get_summary()
+
+        changed = dict(results[10], description='changed colour')
+        groups.add_result(changed)
+        results[10] = changed
+        fp_ids = [r['id'] for r in results if r['detector_name'] == 'clock']
+        assert groups.set_false_positive(fp_ids, True) == len(fp_ids)
+        for result in results:
+            if result['id'] in fp_ids:
+                result['is_false_positive'] = True
+
+        assert canonical(groups.get_summary()) == canonical(batch_summary(results))
+        assert all(g['is_false_positive'] for g in groups.get_summary() if g['detector_name'] == 'clock')
+
+
+class TestContinuousErrorCache:
+    """Test the per-take cache of error groups."""
+
+    def test_rebuilds_only_when_fingerprint_changes(self):
+        """Test folded results keep the cache valid and foreign writes force a rebuild."""
+        cache = ContinuousErrorCache()
+        stored = sorted(make_results(30), key=lambda r: (r['frame_id'], r['id']))
+        loads = []
+
+        def load():
+            loads.append(1)
+            return [dict(r) for r in stored]
+
+        def fingerprint():
+            return (len(stored), max(r['id'] for r in stored))
+
+        cache.get_summary(1, fingerprint(), load)
+        new = {**stored[-1], 'id': 31, 'frame_id': stored[-1]['frame_id'] + 1}
+        stored.append(new)
+        cache.add_result(1, new)
+        summary = cache.get_summary(1, fingerprint(), load)
+        assert len(loads) == 1
+        assert canonical(summary) == canonical(batch_summary(stored))
+
+        # Written without going through the cache
+        stored.append({**new, 'id': 32, 'frame_id': new['frame_id'] + 1})
+        cache.get_summary(1, fingerprint(), load)
+        assert len(loads) == 2
+
+    def test_evicts_least_recent_take(self):
+        """Test only the most recently viewed takes are held."""
+        cache = ContinuousErrorCache(max_takes=2)
+        for take_id in range(3):
+            cache.get_summary(take_id, (0, None), lambda: [])
+
+        assert [entry['take_id'] for entry in cache.get_stats()['entries']] == [1, 2]
@@ -0,0 +1,107 @@
+"""
+Tests for the shared decoded-frame cache.
+Tests LRU eviction within the byte budget, take pinning, invalidation and statistics.
+"""
+
+import pytest
+import numpy as np
+
+from CAMF.services.storage.frame_cache import FrameCache
+
+
+def make_frame(size: int = 1000) -> np.ndarray:
+    """Create a frame of exactly ``size`` bytes."""
+    return np.zeros(size, dtype=np.uint8)
+
+
+class TestFrameCache:
+    """Test decoded frame caching."""
+
+    def test_lru_eviction_by_bytes(self):
+        """Test the least recently used frames are evicted first."""
+        cache = FrameCache(max_bytes=3000)
+        for frame_id in range(3):
+            cache.put(1, frame_id, make_frame())
+
+        # Touch frame 0 so frame 1 becomes least recently used
+        assert cache.get(1, 0) is not None
+        cache.put(1, 3, make_frame())
+
+        assert cache.get(1, 1) is None
+        assert cache.get(1, 0) is not None
+        stats = cache.get_stats()
+        assert stats['bytes'] == 3000
+        assert stats['evictions'] == 1
+
+    def test_cached_frames_are_read_only(self):
+        """Test shared frames cannot be modified in place."""
+        cache = FrameCache(max_bytes=3000)
+        frame = cache.put(1, 0, make_frame())
+
+        with pytest.raises(ValueError):
+            frame[0] = 1
+        assert cache.get(1, 0) is frame
+
+    def test_pinned_take_survives_eviction(self):
+        """Test pinned frames are never evicted."""
+        cache = FrameCache(max_bytes=3000)
+        cache.pin_take(7)
+        cache.put(7, 0, make_frame())
+        cache.put(7, 1, make_frame())
+        for frame_id in range(5):
+            cache.put(1, frame_id, make_frame())
+
+        assert cache.get(7, 0) is not None
+        assert cache.get(7, 1) is not None
+        assert cache.get_stats()['pinned_bytes'] == 2000
+
+        cache.unpin_take(7)
+        cache.put(1, 10, make_frame())
+        cache.put(1, 11, make_frame())
+        assert cache.get(7, 0) is None
+
+    def test_oversized_frame_is_not_cached(self):
+        """Test a frame that cannot fit next to pinned frames is rejected."""
+        cache = FrameCache(max_bytes=3000)
+        cache.pin_take(7)
+        cache.put(7, 0, make_frame(2500))
+
+        frame = cache.get_or_load(1, 0, lambda: make_frame(1000))
+
+        assert frame is not None
+        assert cache.get(1, 0) is None
+        assert cache.get_stats()['rejected'] == 1
+
+    def test_get_or_load_counts_hits(self):
+        """Test the loader only runs on misses and hit rate is reported."""
+        cache = FrameCache(max_bytes=10000)
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return make_frame()
+
+        for _ in range(4):
+            cache.get_or_load(1, 0, loader)
+
+        assert len(loads) == 1
+        stats = cache.get_stats()
+        assert stats['hits'] == 3
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == pytest.approx(0.75)
+
+    def test_variants_and_invalidation(self):
+        """Test variants are cached separately and dropped together."""
+        cache = FrameCache(max_bytes=10000)
+        cache.put(1, 0, make_frame(), variant="bgr")
+        cache.put(1, 0, make_frame(), variant="rgb")
+        cache.put(1, 1, make_frame())
+        cache.put(2, 0, make_frame())
+
+        cache.invalidate_frame(1, 0)
+        assert cache.get(1, 0, "bgr") is None
+        assert cache.get(1, 0, "rgb") is None
+
+        assert cache.invalidate_take(1) == 1
+        assert cache.get(2, 0) is not None
+        assert cache.get_stats()['bytes'] == 1000
@@ -0,0 +1,154 @@
+"""
+Tests for batched frame row ingest.
+Tests per-frame against batched inserts, per-record outcomes and the batch API.
+"""
+
+import datetime
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+
+from CAMF.services.storage import database
+from CAMF.services.storage.main import FrameRecordOutcome, StorageService
+
+
+class TestFrameIngestPerformance:
+    """Test frame row ingest through the storage service."""
+
+    @pytest.fixture
+    def storage_service(self):
+        """Create a storage service bound to a temporary database."""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+
+        engine = create_engine(f'sqlite:///{db_path}')
+        database.Base.metadata.create_all(engine)
+        saved = (database._engine, database._SessionLocal)
+        database._engine, database._SessionLocal = engine, None
+
+        session = database.get_session()
+        project = database.ProjectDB(name="Ingest Test")
+        scene = database.SceneDB(name="Scene 1", project=project)
+        angle = database.AngleDB(name="Angle 1", scene=scene)
+        takes = [database.TakeDB(name=f"Take {i}", angle=angle, notes="") for i in range(2)]
+        session.add_all([project, scene, angle] + takes)
+        session.commit()
+        take_ids = [take.id for take in takes]
+        session.close()
+
+        # Skip filesystem and scheduler setup; only the database path is measured
+        service = StorageService.__new__(StorageService)
+        service._project_touch_times = {}
+        service._touch_lock = threading.Lock()
+        service.frame_storage = Mock()
+        service.frame_storage.store_frame.return_value = True
+        service.frame_storage.get_frame_path.side_effect = lambda take_id, frame_id: f"/frames/{take_id}/{frame_id}.png"
+
+        yield service, take_ids
+
+        engine.dispose()
+        database._engine, database._SessionLocal = saved
+        os.unlink(db_path)
+
+    def test_batched_ingest_vs_per_frame(self, storage_service):
+        """Test batched frame rows beat one transaction per frame."""
+        service, (per_frame_take, batched_take) = storage_service
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        num_frames = 500
+
+        start = time.perf_counter()
+        for i in range(num_frames):
+            assert service.add_frame(per_frame_take, frame, i, i / 30.0) is not None
+        per_frame_time = time.perf_counter() - start
+
+        records = [
+            {'take_id': batched_take, 'frame_number': i, 'timestamp': i / 30.0,
+             'path': f"/frames/{batched_take}/{i}.png"}
+            for i in range(num_frames)
+        ]
+        start = time.perf_counter()
+        outcomes = service.insert_frame_records(records, batch_size=250)
+        batched_time = time.perf_counter() - start
+
+        assert outcomes == [FrameRecordOutcome.INSERTED] * num_frames
+        # Re-inserting the same rows is a no-op
+        assert service.insert_frame_records(records[:10]) == [FrameRecordOutcome.EXISTING] * 10
+
+        session = database.get_session()
+        try:
+            counts = {
+                take_id: session.query(database.FrameDB).filter_by(take_id=take_id).count()
+                for take_id in (per_frame_take, batched_take)
+            }
+        finally:
+            session.close()
+        assert counts == {per_frame_take: num_frames, batched_take: num_frames}
+
+        assert batched_time * 5 < per_frame_time
+
+        print(f"Frame ingest: per-frame {num_frames / per_frame_time:.0f} frames/s, "
+              f"batched {num_frames / batched_time:.0f} frames/s")
+
+    def test_outcomes_per_record(self, storage_service):
+        """Test each record reports whether it was inserted, already present or failed."""
+        service, (take_id, _) = storage_service
+
+        def record(take, n):
+            return {'take_id': take, 'frame_number': n, 'timestamp': n / 30.0, 'path': f"/{take}/{n}.png"}
+
+        service.insert_frame_records([record(take_id, 0), record(take_id, 1)])
+
+        # A recapture into the take sends frames 0 and 1 again
+        outcomes = service.insert_frame_records([
+            record(take_id, 0), record(9999, 0), record(take_id, 2), record(take_id, 1)
+        ])
+
+        assert outcomes == [
+            FrameRecordOutcome.EXISTING, FrameRecordOutcome.FAILED,
+            FrameRecordOutcome.INSERTED, FrameRecordOutcome.EXISTING
+        ]
+        assert [outcome.stored for outcome in outcomes] == [True, False, True, True]
+
+    def test_add_frames_batch(self, storage_service):
+        """Test the batch API stores files and inserts every row."""
+        service, (take_id, _) = storage_service
+        frames_data = [
+            {'take_id': take_id, 'frame': np.zeros((4, 4, 3), dtype=np.uint8),
+             'frame_id': i, 'timestamp': i / 30.0}
+            for i in range(100)
+        ]
+
+        assert service.add_frames_batch(frames_data, batch_size=40)
+        assert service.frame_storage.store_frame.call_count == 100
+        assert service.add_frames_batch([{'take_id': 9999, 'frame': None, 'frame_id': 0, 'timestamp': 0.0}]) is False
+
+    def test_finalize_updates_debounced_last_modified(self, storage_service):
+        """Test finalizing a take records frames stored within the debounce interval."""
+        service, (take_id, _) = storage_service
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        service.add_frame(take_id, frame, 0, 0.0)
+
+        stale = datetime.datetime(2000, 1, 1)
+        session = database.get_session()
+        session.query(database.ProjectDB).update({database.ProjectDB.last_modified: stale})
+        session.commit()
+        session.close()
+
+        service.add_frame(take_id, frame, 1, 1 / 30.0)
+        assert self.last_modified() == stale
+
+        service.finalize_take(take_id)
+        assert self.last_modified() > stale
+
+    def last_modified(self) -> datetime.datetime:
+        session = database.get_session()
+        try:
+            return session.query(database.ProjectDB.last_modified).scalar()
+        finally:
+            session.close()
@@ -0,0 +1,153 @@
+"""
+Tests for projected frame and detector result listings.
+Tests keyset pagination, range bounds, lazy iteration and column projection.
+"""
+
+import pytest
+import tempfile
+import os
+from unittest.mock import Mock
+
+from sqlalchemy import create_engine
+
+from CAMF.services.storage import database
+from CAMF.services.storage.database import FrameRow, DetectorResultRow
+from CAMF.services.storage.main import StorageService
+
+
+class TestListings:
+    """Test listings against a temporary database."""
+
+    @pytest.fixture
+    def storage_service(self):
+        """Create a storage service bound to a temporary database with one take."""
+        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
+            db_path = f.name
+
+        engine = create_engine(f'sqlite:///{db_path}')
+        database.Base.metadata.create_all(engine)
+        saved = (database._engine, database._SessionLocal)
+        database._engine, database._SessionLocal = engine, None
+
+        session = database.get_session()
+        project = database.ProjectDB(name="Listing Test")
+        scene = database.SceneDB(name="Scene 1", project=project)
+        angle = database.AngleDB(name="Angle 1", scene=scene)
+        take = database.TakeDB(name="Take 1", angle=angle)
+        session.add_all([project, scene, angle, take])
+        session.commit()
+        take_id = take.id
+
+        session.bulk_insert_mappings(database.FrameDB, [
+            {'take_id': take_id, 'frame_number': n, 'timestamp': n / 24.0, 'path': f"/frames/{n}.png"}
+            for n in range(25)
+        ])
+        # Several detectors report on the same frames
+        session.bulk_insert_mappings(database.DetectorResultDB, [
+            {'take_id': take_id, 'frame_id': n, 'detector_name': f"detector_{d}", 'confidence': 0.9,
+             'description': "changed", 'bounding_boxes': [{'x': n, 'y': d}], 'meta_data': {'d': d}}
+            for n in range(10) for d in range(3)
+        ])
+        session.commit()
+        session.close()
+
+        service = StorageService.__new__(StorageService)
+        service.frame_storage = Mock()
+
+        yield service, take_id
+
+        engine.dispose()
+        database._engine, database._SessionLocal = saved
+        os.unlink(db_path)
+
+    def test_frame_pages_follow_cursor(self, storage_service):
+        """Test frame pages chain through next_cursor without gaps."""
+        service, take_id = storage_service
+
+        numbers = []
+        cursor = None
+        pages = 0
+        while True:
+            page = service.list_frames(take_id, cursor=cursor, limit=10)
+            numbers.extend(row.frame_number for row in page['frames'])
+            pages += 1
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        assert numbers == list(range(25))
+        assert pages == 3
+
+    def test_frame_range_bounds(self, storage_service):
+        """Test start and end bounds are inclusive."""
+        service, take_id = storage_service
+
+        rows = service.get_frames_in_range(take_id, 5, 9)
+        assert [row.id for row in rows] == [5, 6, 7, 8, 9]
+        assert rows[0] == FrameRow(take_id, 5, 5 / 24.0, "/frames/5.png")
+
+        page = service.list_frames(take_id, limit=5, start=20)
+        assert [row.frame_number for row in page['frames']] == [20, 21, 22, 23, 24]
+        assert page['next_cursor'] is None
+
+    def test_iteration_is_lazy(self, storage_service):
+        """Test iteration fetches pages only as rows are consumed."""
+        service, take_id = storage_service
+
+        pages = []
+        original = database.get_frame_rows_page
+
+        def counting_page(*args, **kwargs):
+            pages.append(args)
+            return original(*args, **kwargs)
+
+        database.get_frame_rows_page = counting_page
+        try:
+            rows = database.iter_frame_rows(take_id, batch_size=4)
+            first = [next(rows) for _ in range(4)]
+            assert len(pages) == 1
+            rest = list(rows)
+        finally:
+            database.get_frame_rows_page = original
+
+        assert [row.frame_number for row in first + rest] == list(range(25))
+
+    def test_frames_for_take_use_stored_paths(self, storage_service):
+        """Test frame models are built without resolving paths on the filesystem."""
+        service, take_id = storage_service
+
+        frames = service.get_frames_for_take(take_id)
+
+        assert len(frames) == 25
+        assert frames[3].path == "/frames/3.png"
+        assert frames[3].frame_number == 3
+        service.frame_storage.get_frame_path.assert_not_called()
+
+    def test_result_pages_split_within_frame(self, storage_service):
+        """Test result keyset pagination is stable when a page ends inside a frame."""
+        service, take_id = storage_service
+
+        results = []
+        cursor = None
+        while True:
+            page = service.list_detector_results(take_id, cursor=cursor, limit=4)
+            results.extend(page['results'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        assert len(results) == 30
+        assert len({row.id for row in results}) == 30
+        assert [row.frame_id for row in results] == sorted(row.frame_id for row in results)
+        assert all(row.bounding_boxes is None for row in results)
+
+    def test_result_details_are_opt_in(self, storage_service):
+        """Test JSON columns are only loaded when requested."""
+        service, take_id = storage_service
+
+        rows = list(service.iter_detector_results(take_id, frame_id=2, include_details=True))
+
+        assert len(rows) == 3
+        assert isinstance(rows[0], DetectorResultRow)
+        assert rows[0].bounding_boxes == [{'x': 2, 'y': 0}]
+        assert {row.meta_data['d'] for row in rows} == {0, 1, 2}
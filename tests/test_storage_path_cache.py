@@ -0,0 +1,91 @@
+"""
+Tests for the take directory path cache.
+Tests hit/miss accounting, hierarchical invalidation and the filesystem operation hook.
+"""
+
+import pytest
+import tempfile
+import shutil
+from pathlib import Path
+
+from CAMF.services.storage.path_cache import (
+    TakePathCache, ResolvedTakePath, invalidates_take_paths, get_take_path_cache
+)
+
+
+class TestTakePathCache:
+    """Test take path caching."""
+
+    @pytest.fixture
+    def storage_root(self):
+        """Create a project/scene/angle/take folder tree."""
+        temp_dir = tempfile.mkdtemp()
+        root = Path(temp_dir)
+        for take_id, angle_id in [(1, 10), (2, 10), (3, 20)]:
+            (root / f"Project_1/Scene_5/Angle_{angle_id}/Take_{take_id}").mkdir(parents=True)
+        yield root
+        shutil.rmtree(temp_dir)
+
+    def _entry(self, root: Path, take_id: int, angle_id: int, scene_id: int = 5, project_id: int = 1):
+        frames_dir = root / f"Project_{project_id}/Scene_{scene_id}/Angle_{angle_id}/Take_{take_id}/frames"
+        return ResolvedTakePath(take_id, angle_id, scene_id, project_id, frames_dir)
+
+    def test_hit_and_miss_counts(self, storage_root):
+        """Test lookups are counted as hits and misses."""
+        cache = TakePathCache()
+        assert cache.get(1) is None
+
+        cache.put(self._entry(storage_root, 1, 10))
+        assert cache.get(1).frames_dir.name == "frames"
+        assert cache.get(1) is not None
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == pytest.approx(2 / 3)
+
+    def test_invalidate_by_level(self, storage_root):
+        """Test invalidation drops every take below the given level."""
+        cache = TakePathCache()
+        for take_id, angle_id in [(1, 10), (2, 10), (3, 20)]:
+            cache.put(self._entry(storage_root, take_id, angle_id))
+
+        assert sorted(cache.invalidate(angle_id=10)) == [1, 2]
+        assert cache.get(3) is not None
+        assert cache.invalidate(project_id=1) == [3]
+        assert cache.get_stats()['size'] == 0
+
+    def test_missing_folder_is_a_miss(self, storage_root):
+        """Test an entry whose take folder vanished is dropped."""
+        cache = TakePathCache()
+        entry = self._entry(storage_root, 1, 10)
+        cache.put(entry)
+
+        shutil.rmtree(entry.frames_dir.parent)
+
+        assert cache.get(1) is None
+        assert cache.get_stats()['size'] == 0
+
+    def test_listener_receives_dropped_takes(self, storage_root):
+        """Test listeners are told which takes were invalidated."""
+        cache = TakePathCache()
+        cache.put(self._entry(storage_root, 1, 10))
+        received = []
+        cache.add_listener(received.extend)
+
+        cache.invalidate(take_id=1)
+        cache.invalidate(take_id=1)
+
+        assert received == [1]
+
+    def test_decorated_operation_invalidates(self, storage_root):
+        """Test decorated filesystem operations drop cached paths."""
+        cache = get_take_path_cache()
+        cache.put(self._entry(storage_root, 3, 20))
+
+        @invalidates_take_paths('angle')
+        def rename_angle(project_id, scene_id, angle_id, new_name):
+            return True
+
+        assert rename_angle(1, 5, 20, "Wide") is True
+        assert 3 not in [e.take_id for e in cache._cache.values()]
@@ -0,0 +1,136 @@
+"""
+Tests for memory-mapped raw frame files.
+Tests zero-copy reads, reopening, geometry checks, sealing and archiving on take finalization.
+"""
+
+import pytest
+import tempfile
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from CAMF.services.storage.raw_frames import RawFrameFile, RAW_FILENAME
+from CAMF.services.storage.frame_storage import FrameStorage
+
+
+def make_frame(value: int) -> np.ndarray:
+    frame = np.zeros((36, 48, 3), dtype=np.uint8)
+    frame[..., 0] = value
+    frame[5:10, 5:10] = 255 - value
+    return frame
+
+
+class TestRawFrameFile:
+    """Test raw frame file reads and writes."""
+
+    @pytest.fixture
+    def raw_path(self):
+        """Create temporary raw frame file path."""
+        temp_dir = tempfile.mkdtemp()
+        yield Path(temp_dir) / "frames" / RAW_FILENAME
+        shutil.rmtree(temp_dir)
+
+    def test_read_returns_read_only_view(self, raw_path):
+        """Test frames come back unchanged as read-only memmap views."""
+        raw = RawFrameFile(raw_path, (36, 48, 3))
+        for frame_id in range(3):
+            raw.write(frame_id, make_frame(frame_id), frame_id / 24.0)
+
+        frame = raw.read(1)
+        assert np.array_equal(frame, make_frame(1))
+        assert not frame.flags.writeable
+        assert isinstance(frame.base, np.memmap)
+        assert raw.read_timestamp(2) == pytest.approx(2 / 24.0)
+        assert raw.read(7) is None
+        raw.close()
+
+        # Views outlive the file handle
+        assert np.array_equal(frame, make_frame(1))
+
+    def test_reopen_finds_written_frames(self, raw_path):
+        """Test an existing file is reopened with its geometry and frames."""
+        raw = RawFrameFile(raw_path, (36, 48, 3))
+        for frame_id in (0, 2, 70):
+            raw.write(frame_id, make_frame(frame_id), 0.0)
+        raw.close()
+
+        reopened = RawFrameFile(raw_path)
+        assert reopened.shape == (36, 48, 3)
+        assert reopened.frame_ids() == [0, 2, 70]
+        assert 1 not in reopened
+        assert np.array_equal(reopened.read(70), make_frame(70))
+        reopened.close()
+
+    def test_geometry_mismatch_is_rejected(self, raw_path):
+        """Test frames of another size cannot be written."""
+        raw = RawFrameFile(raw_path, (36, 48, 3))
+        with pytest.raises(ValueError):
+            raw.write(0, np.zeros((10, 10, 3), dtype=np.uint8), 0.0)
+        assert len(raw) == 0
+        raw.close()
+
+    def test_seal_persists_and_delete_removes_file(self, raw_path):
+        """Test the sealed flag survives reopening and delete removes the file."""
+        raw = RawFrameFile(raw_path, (36, 48, 3))
+        raw.write(0, make_frame(0), 0.0)
+        raw.seal()
+        raw.close()
+
+        reopened = RawFrameFile(raw_path)
+        assert reopened.sealed
+        reopened.delete()
+        assert not raw_path.exists()
+
+
+class TestRawFrameCapture:
+    """Test raw capture through frame storage."""
+
+    @pytest.fixture
+    def storage(self, monkeypatch):
+        """Create frame storage with raw capture on a temporary take directory."""
+        temp_dir = tempfile.mkdtemp()
+        take_dir = Path(temp_dir) / "frames"
+        storage = FrameStorage(temp_dir, raw_frames=True)
+        monkeypatch.setattr(storage, 'get_take_directory', lambda take_id: take_dir)
+        yield storage
+        storage.delete_take(1)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_frames_are_archived_on_finalize(self, storage):
+        """Test captured frames skip encoding until the take is finalized."""
+        for frame_id in range(4):
+            assert storage.store_frame(1, frame_id, make_frame(frame_id), frame_id / 24.0)
+
+        assert storage.get_frame_path(1, 2).endswith(f"{RAW_FILENAME}#2")
+        assert not storage.get_frame(1, 2).flags.writeable
+        assert storage.get_frame_bytes(1, 2) is not None
+
+        assert storage.finalize_take(1) == 4
+        take_dir = storage.get_take_directory(1)
+        assert not RawFrameFile.exists(take_dir)
+        assert RAW_FILENAME not in storage.get_frame_path(1, 2)
+        assert storage.get_take_frames(1) == [0, 1, 2, 3]
+        assert np.array_equal(storage.get_frame(1, 3, use_cache=False), make_frame(3))
+
+    def test_reference_takes_keep_sealed_raw_frames(self, storage):
+        """Test kept raw frames serve reads until discarded."""
+        for frame_id in range(3):
+            storage.store_frame(1, frame_id, make_frame(frame_id), 0.0)
+
+        storage.finalize_take(1, keep_raw=True)
+        assert storage.get_raw_frame(1, 1) is not None
+        assert storage.finalize_take(1, keep_raw=True) == 0
+
+        assert storage.discard_raw_frames(1)
+        assert storage.get_raw_frame(1, 1) is None
+        assert np.array_equal(storage.get_frame(1, 1, use_cache=False), make_frame(1))
+
+    def test_resized_frame_falls_back_to_archive(self, storage):
+        """Test a frame that does not fit the raw file is archived directly."""
+        storage.store_frame(1, 0, make_frame(0), 0.0)
+        small = np.full((10, 12, 3), 7, dtype=np.uint8)
+        assert storage.store_frame(1, 1, small, 0.0)
+
+        assert storage.get_raw_frame(1, 1) is None
+        assert np.array_equal(storage.get_frame(1, 1, use_cache=False), small)
@@ -0,0 +1,117 @@
+"""
+Tests for reference take preloading.
+Tests the contiguous frame buffer, downscaling, budget limits, progress reporting and release.
+"""
+
+import gc
+import pytest
+import tempfile
+import shutil
+import threading
+from pathlib import Path
+import numpy as np
+from unittest.mock import Mock
+
+from CAMF.services.storage.reference_preload import (
+    ReferenceTakePreloader, PRELOAD_COMPLETE
+)
+
+
+class TestReferenceTakePreloader:
+    """Test preloading reference takes into memory."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        temp_dir = tempfile.mkdtemp()
+        yield Path(temp_dir)
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def frame_storage(self):
+        """Create a frame storage mock holding 10 distinct 1080p frames per take."""
+        storage = Mock()
+        storage.get_take_frames.return_value = list(range(10))
+        storage.get_frame.side_effect = lambda take_id, frame_id, use_cache=True: np.full(
+            (1080, 1920, 3), frame_id, dtype=np.uint8
+        )
+        return storage
+
+    def test_preload_serves_frames_from_memory(self, frame_storage, temp_dir):
+        """Test every frame is loaded once and then served without storage reads."""
+        preloader = ReferenceTakePreloader(frame_storage, memmap_dir=temp_dir)
+        assert preloader.start(5)
+        assert preloader.wait(timeout=10.0)
+
+        assert frame_storage.get_frame.call_count == 10
+        assert all(call.kwargs['use_cache'] is False for call in frame_storage.get_frame.call_args_list)
+
+        frame = preloader.get_frame(5, 7)
+        assert frame.shape == (1080, 1920, 3)
+        assert frame[0, 0, 0] == 7
+        assert not frame.flags.writeable
+        assert preloader.get_frame(6, 7) is None
+        assert frame_storage.get_frame.call_count == 10
+
+        status = preloader.get_status()
+        assert status['state'] == PRELOAD_COMPLETE
+        assert status['loaded'] == 10
+        assert status['memory_mapped']
+        preloader.release()
+
+    def test_downscales_to_target_resolution(self, frame_storage):
+        """Test frames are stored at the scene resolution."""
+        preloader = ReferenceTakePreloader(frame_storage, use_memmap=False)
+        preloader.start(5, target_resolution="720p")
+        preloader.wait(timeout=10.0)
+
+        assert preloader.get_frame(5, 0).shape == (720, 1280, 3)
+        assert preloader.get_status()['bytes'] == 10 * 720 * 1280 * 3
+        preloader.release()
+
+    def test_budget_limits_preloaded_frames(self, frame_storage):
+        """Test a take larger than the budget is only partly preloaded."""
+        frame_bytes = 1080 * 1920 * 3
+        preloader = ReferenceTakePreloader(frame_storage, use_memmap=False, max_bytes=4 * frame_bytes)
+        preloader.start(5)
+        preloader.wait(timeout=10.0)
+
+        assert preloader.get_frame(5, 3) is not None
+        assert preloader.get_frame(5, 4) is None
+        assert preloader.get_status()['total'] == 4
+        preloader.release()
+
+    def test_progress_reported(self, frame_storage):
+        """Test the progress callback ends with a complete status."""
+        updates = []
+        preloader = ReferenceTakePreloader(frame_storage, use_memmap=False)
+        preloader.start(5, progress_callback=updates.append)
+        preloader.wait(timeout=10.0)
+
+        assert updates[-1]['state'] == PRELOAD_COMPLETE
+        assert updates[-1]['progress'] == 1.0
+        preloader.release()
+
+    def test_new_take_replaces_previous(self, frame_storage, temp_dir):
+        """Test starting another take releases the previous buffer and its file."""
+        release = threading.Event()
+        original = frame_storage.get_frame.side_effect
+
+        def slow_get_frame(take_id, frame_id, use_cache=True):
+            if take_id == 1:
+                release.wait(5.0)
+            return original(take_id, frame_id, use_cache)
+
+        frame_storage.get_frame.side_effect = slow_get_frame
+        preloader = ReferenceTakePreloader(frame_storage, memmap_dir=temp_dir)
+        preloader.start(1)
+        release.set()
+        preloader.start(2)
+        preloader.wait(timeout=10.0)
+
+        assert preloader.get_frame(1, 0) is None
+        assert preloader.get_frame(2, 0) is not None
+        assert preloader.get_status()['take_id'] == 2
+
+        preloader.release()
+        gc.collect()
+        assert list(temp_dir.iterdir()) == []
@@ -0,0 +1,144 @@
+"""
+Tests for the append-only segmented frame store.
+Tests record round-trips, index persistence, segment rollover, crash recovery and PNG migration.
+"""
+
+import pytest
+import tempfile
+import shutil
+import json
+from pathlib import Path
+
+from CAMF.services.storage.segment_store import (
+    SegmentFrameStore, migrate_png_frames, INDEX_FILENAME, INDEX_ENTRY
+)
+
+
+class TestSegmentFrameStore:
+    """Test segment store reads and writes."""
+
+    @pytest.fixture
+    def frames_dir(self):
+        """Create temporary frames directory."""
+        temp_dir = tempfile.mkdtemp()
+        yield Path(temp_dir) / "frames"
+        shutil.rmtree(temp_dir)
+
+    def test_append_and_read(self, frames_dir):
+        """Test frames can be read back by ID."""
+        store = SegmentFrameStore(frames_dir)
+        for frame_id in range(5):
+            store.append(frame_id, frame_id / 24.0, bytes([frame_id]) * 100, {'frame': frame_id})
+
+        assert len(store) == 5
+        assert store.read(3) == bytes([3]) * 100
+        assert store.read_metadata(3) == {'frame': 3}
+        assert store.get_entry(3).timestamp == pytest.approx(3 / 24.0)
+        assert store.read(99) is None
+        store.close()
+
+    def test_index_persists_across_reopen(self, frames_dir):
+        """Test a reopened store sees all frames and keeps appending."""
+        store = SegmentFrameStore(frames_dir)
+        store.append(0, 0.0, b"first")
+        store.append(1, 0.1, b"second")
+        store.close()
+
+        reopened = SegmentFrameStore(frames_dir)
+        assert reopened.frame_ids() == [0, 1]
+        reopened.append(2, 0.2, b"third")
+        assert reopened.read(1) == b"second"
+        assert reopened.read(2) == b"third"
+        reopened.close()
+
+    def test_rewritten_frame_resolves_to_latest(self, frames_dir):
+        """Test appending an existing frame ID replaces it."""
+        store = SegmentFrameStore(frames_dir)
+        store.append(7, 0.0, b"old")
+        store.append(7, 0.0, b"new")
+
+        assert len(store) == 1
+        assert store.read(7) == b"new"
+        store.close()
+
+    def test_segment_rollover(self, frames_dir):
+        """Test records spill into new segments past the size limit."""
+        store = SegmentFrameStore(frames_dir, max_segment_bytes=4096)
+        payload = b"x" * 1500
+        for frame_id in range(6):
+            store.append(frame_id, 0.0, payload)
+
+        assert len(store.segment_files()) >= 3
+        assert all(store.read(frame_id) == payload for frame_id in range(6))
+        store.close()
+
+    def test_truncated_index_is_recovered(self, frames_dir):
+        """Test a partially written index entry is dropped on open."""
+        store = SegmentFrameStore(frames_dir)
+        store.append(0, 0.0, b"ok")
+        store.append(1, 0.0, b"also ok")
+        store.close()
+
+        index_path = frames_dir / INDEX_FILENAME
+        with open(index_path, 'ab') as f:
+            f.write(b"\x00" * (INDEX_ENTRY.size // 2))
+
+        reopened = SegmentFrameStore(frames_dir)
+        assert reopened.frame_ids() == [0, 1]
+        reopened.append(2, 0.0, b"after crash")
+        reopened.close()
+
+        assert SegmentFrameStore(frames_dir).read(2) == b"after crash"
+
+    def test_entry_past_segment_end_is_dropped(self, frames_dir):
+        """Test an index entry whose record never reached disk is discarded."""
+        store = SegmentFrameStore(frames_dir)
+        store.append(0, 0.0, b"complete")
+        store.append(1, 0.0, b"lost" * 50)
+        store.close()
+
+        segment = store.segment_path(0)
+        with open(segment, 'r+b') as f:
+            f.truncate(segment.stat().st_size - 10)
+
+        reopened = SegmentFrameStore(frames_dir)
+        assert reopened.frame_ids() == [0]
+        reopened.close()
+
+
+class TestPngMigration:
+    """Test migration of PNG-per-frame takes."""
+
+    @pytest.fixture
+    def legacy_dir(self):
+        """Create a directory with legacy frame files."""
+        temp_dir = tempfile.mkdtemp()
+        frames_dir = Path(temp_dir) / "frames"
+        frames_dir.mkdir()
+        for frame_id in range(3):
+            (frames_dir / f"frame_{frame_id:06d}.png").write_bytes(b"png-%d" % frame_id)
+            with open(frames_dir / f"frame_{frame_id:06d}.json", 'w') as f:
+                json.dump({'timestamp': frame_id * 0.5, 'metadata': {'n': frame_id}}, f)
+        (frames_dir / "frame_index.json").write_text("{}")
+        yield frames_dir
+        shutil.rmtree(temp_dir)
+
+    def test_migrate_copies_bytes_and_removes_source(self, legacy_dir):
+        """Test PNG bytes and sidecar data are moved into segments."""
+        store = SegmentFrameStore(legacy_dir)
+        assert migrate_png_frames(legacy_dir, store) == 3
+
+        assert store.read(2) == b"png-2"
+        assert store.get_entry(1).timestamp == pytest.approx(0.5)
+        assert store.read_metadata(1) == {'n': 1}
+        assert not list(legacy_dir.glob("frame_*"))
+        store.close()
+
+    def test_migrate_keeps_source_when_requested(self, legacy_dir):
+        """Test source files survive when remove_source is False."""
+        store = SegmentFrameStore(legacy_dir)
+        migrate_png_frames(legacy_dir, store, remove_source=False)
+
+        assert len(list(legacy_dir.glob("frame_*.png"))) == 3
+        assert len(store) == 3
+        store.close()